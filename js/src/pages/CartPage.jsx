@@ -254,6 +254,8 @@ const CartPage = () => {
   const [isDuplicateAddress, setIsDuplicateAddress] = useState(false);
   const [paymentModalOpen, setPaymentModalOpen] = useState(false);
   const [paymentMethod, setPaymentMethod] = useState(null);
+  // One key per checkout attempt so a retried request returns the same order
+  const [orderIdempotencyKey, setOrderIdempotencyKey] = useState(() => crypto.randomUUID());
 
   // Track if user has already made a selection (from modal or manually)
   const [userSelectedAddress, setUserSelectedAddress] = useState(
@@ -446,6 +448,7 @@ const CartPage = () => {
       // graphql-request returns data directly: { createOrder: { id, ... } }
       const order = response?.createOrder;
       if (order && order.id) {
+        setOrderIdempotencyKey(crypto.randomUUID());
         try {
           // Clear cart from Zustand, localStorage, and database
           await clearCartCompletely();
@@ -483,6 +486,7 @@ const CartPage = () => {
       // graphql-request returns data directly: { createOrderWithCod: { id, ... } }
       const order = data?.createOrderWithCod;
       if (order && order.id) {
+        setOrderIdempotencyKey(crypto.randomUUID());
         try {
           // Clear cart from Zustand, localStorage, and database
           await clearCartCompletely();
@@ -585,6 +589,7 @@ const CartPage = () => {
       taxAmount: taxAmount,
       deliveryInstructions: deliveryType === 'pickup' ? null : deliveryInstructions, // Use deliveryType
       customOrder: customOrder,
+      idempotencyKey: orderIdempotencyKey,
     };
 
     mutate(variables);
@@ -633,6 +638,7 @@ const CartPage = () => {
       tipAmount: tipAmount || 0,
       deliveryInstructions: deliveryType === 'pickup' ? null : deliveryInstructions,
       customOrder: customOrder || null,
+      idempotencyKey: orderIdempotencyKey,
     });
   };
 
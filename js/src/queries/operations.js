@@ -28,6 +28,7 @@ export const CREATE_ORDER_MUTATION = `
     $taxAmount: Float
     $deliveryInstructions: String
     $customOrder: String
+    $idempotencyKey: String
   ) {
     createOrder(
       userId: $userId
@@ -43,6 +44,7 @@ export const CREATE_ORDER_MUTATION = `
       taxAmount: $taxAmount
       deliveryInstructions: $deliveryInstructions
       customOrder: $customOrder
+      idempotencyKey: $idempotencyKey
     ) {
       id
       status
@@ -982,6 +984,7 @@ export const CREATE_ORDER_WITH_COD_MUTATION = `
     $tipAmount: Float
     $deliveryInstructions: String
     $customOrder: String
+    $idempotencyKey: String
   ) {
     createOrderWithCod(
       userId: $userId
@@ -993,6 +996,7 @@ export const CREATE_ORDER_WITH_COD_MUTATION = `
       tipAmount: $tipAmount
       deliveryInstructions: $deliveryInstructions
       customOrder: $customOrder
+      idempotencyKey: $idempotencyKey
     ) {
       id
       displayCode
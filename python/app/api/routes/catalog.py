@@ -0,0 +1,40 @@
+import json
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from app.services.store_catalog_service import get_store_catalog
+
+router = APIRouter(prefix="/api/stores", tags=["catalog"])
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+@router.get("/{store_id}/catalog")
+def read_store_catalog(store_id: int, request: Request):
+    """
+    Get a store's precomputed storefront catalog.
+
+    Responses carry an ETag; send it back in If-None-Match to get a 304
+    while the catalog is unchanged.
+    """
+    snapshot = get_store_catalog(store_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
+
+    etag = f'"{snapshot.etag}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # Cacheable, but revalidate every time
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = {
+        **(snapshot.payload or {}),
+        "version": snapshot.version,
+        "built_at": snapshot.builtAt.isoformat() if snapshot.builtAt else None,
+    }
+    return Response(
+        content=json.dumps(body, separators=(",", ":")),
+        media_type="application/json",
+        headers=headers
+    )
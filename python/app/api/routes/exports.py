@@ -0,0 +1,81 @@
+import logging
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.api.dependencies import get_db
+from app.api.routes.s3 import _can_access_store
+from app.db.models.user import UserModel, UserType
+from app.middleware.auth_middleware import CognitoUser, get_current_user
+from app.middleware.rate_limit_middleware import limiter
+from app.services.order_export_service import stream_order_export
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/exports", tags=["exports"])
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+@router.get("/orders")
+@limiter.limit("10/minute")
+def export_orders(
+    request: Request,
+    format: str = Query("csv"),
+    store_id: Optional[int] = Query(None),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    status_filter: Optional[List[str]] = Query(None, alias="status"),
+    gzip: bool = Query(False),
+    current_user: CognitoUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream orders (with payment, fees and current items) as CSV or NDJSON.
+
+    Store managers can export their own store's orders; admins can export any
+    store, or all stores by omitting store_id. Repeat ``status`` to filter by
+    several statuses. With gzip=true the file is compressed on the fly.
+    """
+    db_user = db.query(UserModel).filter(UserModel.cognitoId == current_user.cognito_id).first()
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not found in database")
+
+    if store_id is None:
+        if db_user.type != UserType.ADMIN:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="store_id is required")
+    elif not _can_access_store(db_user, store_id, db):
+        logger.warning(f"User {db_user.email} denied order export for store {store_id}")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You don't have permission to export this store's orders")
+
+    if start_date and end_date and end_date <= start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must be after start_date")
+
+    try:
+        body = stream_order_export(
+            export_format=format,
+            compress=gzip,
+            store_id=store_id,
+            start_date=start_date,
+            end_date=end_date,
+            statuses=status_filter
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    filename = f"orders-{store_id or 'all'}-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    logger.info(f"User {db_user.email} exporting orders (store={store_id}, format={format}, gzip={gzip})")
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,84 @@
+import logging
+import os
+from datetime import datetime
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from sqlalchemy.orm import Session
+from app.api.dependencies import get_db
+from app.api.routes.s3 import BUCKET_NAME, _can_access_store, s3
+from app.db.models.user import UserModel
+from app.middleware.auth_middleware import CognitoUser, get_current_user
+from app.middleware.rate_limit_middleware import limiter
+from app.services.inventory_import_service import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, import_inventory
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/imports", tags=["imports"])
+
+# Presigned error report links stay valid for a day
+ERROR_REPORT_URL_EXPIRY = 24 * 3600
+
+
+def _upload_error_report(report, store_id: int) -> str:
+    """Upload an import error report to S3 and return a presigned download URL."""
+    key = f"imports/{store_id}/inventory-errors-{datetime.utcnow():%Y%m%d%H%M%S}.csv"
+    s3.upload_fileobj(report, BUCKET_NAME, key, ExtraArgs={"ContentType": "text/csv"})
+    return s3.generate_presigned_url(
+        ClientMethod="get_object",
+        Params={
+            "Bucket": BUCKET_NAME,
+            "Key": key,
+            "ResponseContentDisposition": f'attachment; filename="{os.path.basename(key)}"'
+        },
+        ExpiresIn=ERROR_REPORT_URL_EXPIRY,
+    )
+
+
+@router.post("/inventory")
+@limiter.limit("5/minute")
+def import_inventory_file(
+    request: Request,
+    store_id: int = Query(...),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE),
+    file: UploadFile = File(...),
+    current_user: CognitoUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create or update a store's inventory from a CSV or XLSX file.
+
+    Products are matched by name within their category and created when
+    missing. Rows that cannot be imported are listed in a CSV error report,
+    returned as a presigned download URL.
+    """
+    db_user = db.query(UserModel).filter(UserModel.cognitoId == current_user.cognito_id).first()
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not found in database")
+    if not _can_access_store(db_user, store_id, db):
+        logger.warning(f"User {db_user.email} denied inventory import for store {store_id}")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You don't have permission to manage this store's inventory")
+
+    _, ext = os.path.splitext((file.filename or "").lower())
+    import_format = ext.lstrip(".")
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type. Allowed: {', '.join('.' + f for f in IMPORT_FORMATS)}"
+        )
+
+    logger.info(f"User {db_user.email} importing inventory for store {store_id} from {file.filename}")
+    try:
+        summary = import_inventory(store_id, file.file, import_format, chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    report = summary.pop("error_report")
+    summary["error_report_url"] = None
+    if report is not None:
+        try:
+            summary["error_report_url"] = _upload_error_report(report, store_id)
+        except Exception:
+            # The import itself has been committed; only the report is lost
+            logger.exception(f"Failed to upload inventory import error report for store {store_id}")
+        finally:
+            report.close()
+    return summary
@@ -1,11 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.models.product import ProductModel
-from app.api.dependencies import get_db
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from app.services.product_service import PRODUCT_PAGE_DEFAULT_SIZE, list_products_page, validate_product_page
+from app.services.reference_data_cache import PRODUCTS, ReferenceCache, get_cached, get_reference_version
 
 router = APIRouter()
 
+# Serialized product pages get their own cache: there can be many (one per
+# field/page/category combination) and they must not evict fee and checkout data
+PRODUCT_PAGE_CACHE_SIZE = int(os.getenv("PRODUCT_PAGE_CACHE_SIZE", "256"))
+_page_cache = ReferenceCache(PRODUCT_PAGE_CACHE_SIZE)
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    """HTTP date -> naive UTC datetime, or None if unparseable."""
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and last_modified.replace(microsecond=0) <= since
+    return False
+
+
 @router.get("/products")
-def read_products(db: Session = Depends(get_db)):
-    products = db.query(ProductModel).all()
-    return products
\ No newline at end of file
+def read_products(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated, e.g. id,name,image"),
+    first: int = Query(PRODUCT_PAGE_DEFAULT_SIZE),
+    after: Optional[int] = Query(None, description="next_cursor of the previous page"),
+    category_id: Optional[int] = Query(None)
+):
+    """
+    List products, paginated by ID, with optional field projection and category filter.
+
+    Responses carry ETag and Last-Modified derived from the product data
+    version; conditional requests get a 304 while products are unchanged, so
+    polling costs a version check that is usually answered from memory.
+    """
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    # Validate before answering conditional requests: an invalid request is a 400, never a 304
+    try:
+        validate_product_page(field_list, first)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    version, last_modified = get_reference_version(PRODUCTS)
+
+    params = (tuple(field_list) if field_list else None, first, after, category_id)
+    params_digest = hashlib.sha1(repr(params).encode("utf-8")).hexdigest()[:16]
+    etag = f'"products-{version}-{params_digest}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # Cacheable, but revalidate every time
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True
+        )
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Serialized pages are cached until the product version changes
+    body = get_cached(PRODUCTS, ("page",) + params, lambda: [
+        json.dumps(list_products_page(field_list, first, after, category_id), separators=(",", ":"))
+    ], cache=_page_cache)[0]
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,66 @@
+"""add_order_metrics_rollup
+
+Revision ID: 227248e250b1
+Revises: 5dd01822d366
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '227248e250b1'
+down_revision = '5dd01822d366'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Orders had no creation timestamp; use the payment time where we have one
+    op.add_column('orders', sa.Column('createdAt', sa.DateTime(), nullable=True))
+    op.execute("""
+        UPDATE orders o
+        SET "createdAt" = COALESCE(
+            (SELECT p.created_at FROM payment p WHERE p.id = o."paymentId"),
+            timezone('utc', now())
+        )
+    """)
+    op.alter_column('orders', 'createdAt', nullable=False, server_default=sa.text("timezone('utc', now())"))
+
+    op.create_table('order_metrics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('storeId', sa.Integer(), nullable=False),
+        sa.Column('bucketStart', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('orderType', sa.String(), nullable=False),
+        sa.Column('orderCount', sa.Integer(), nullable=False),
+        sa.Column('subtotalAmount', sa.Float(), nullable=False),
+        sa.Column('revenueAmount', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['storeId'], ['store.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('storeId', 'bucketStart', 'status', 'orderType', name='uq_order_metrics_bucket')
+    )
+    op.create_index(op.f('ix_order_metrics_id'), 'order_metrics', ['id'], unique=False)
+    op.create_index('ix_order_metrics_bucketStart', 'order_metrics', ['bucketStart'], unique=False)
+
+    # Initial backfill (same query as order_metrics_service.backfill_order_metrics)
+    op.execute("""
+        INSERT INTO order_metrics ("storeId", "bucketStart", status, "orderType", "orderCount", "subtotalAmount", "revenueAmount")
+        SELECT "storeId",
+               date_trunc('hour', "createdAt"),
+               status::text,
+               COALESCE(type::text, 'UNKNOWN'),
+               count(*),
+               COALESCE(sum("totalAmount"), 0),
+               COALESCE(sum("orderTotalAmount"), 0)
+        FROM orders
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_metrics_bucketStart', table_name='order_metrics')
+    op.drop_index(op.f('ix_order_metrics_id'), table_name='order_metrics')
+    op.drop_table('order_metrics')
+    op.drop_column('orders', 'createdAt')
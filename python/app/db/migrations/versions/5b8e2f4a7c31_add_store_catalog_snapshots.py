@@ -0,0 +1,34 @@
+"""add_store_catalog_snapshots
+
+Revision ID: 5b8e2f4a7c31
+Revises: e41b7c2d9a05
+Create Date: 2026-10-19 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2f4a7c31'
+down_revision = 'e41b7c2d9a05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('store_catalog_snapshots',
+        sa.Column('storeId', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('etag', sa.String(), server_default='', nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('itemCount', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('stale', sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column('builtAt', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+        sa.ForeignKeyConstraint(['storeId'], ['store.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('storeId')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('store_catalog_snapshots')
@@ -0,0 +1,67 @@
+"""add_order_item_revision_tracking
+
+Revision ID: 5dd01822d366
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-19 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5dd01822d366'
+down_revision = 'b2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+# Backfill from the existing updatedOrderitemsId linked list: the head of each
+# chain is the current revision (unless it is a zero-quantity removal), and
+# every row points at the chain's root.
+BACKFILL_STATEMENTS = [
+    'UPDATE order_items SET "isCurrent" = ("updatedOrderitemsId" IS NULL AND quantity > 0)',
+    """
+    WITH RECURSIVE chain AS (
+        SELECT oi.id, oi.id AS root_id, 1 AS revision
+        FROM order_items oi
+        WHERE NOT EXISTS (
+            SELECT 1 FROM order_items prev WHERE prev."updatedOrderitemsId" = oi.id
+        )
+        UNION ALL
+        SELECT nxt.id, chain.root_id, chain.revision + 1
+        FROM chain
+        JOIN order_items prev ON prev.id = chain.id
+        JOIN order_items nxt ON nxt.id = prev."updatedOrderitemsId"
+    )
+    UPDATE order_items oi
+    SET revision = chain.revision,
+        "rootOrderItemId" = CASE WHEN chain.root_id = oi.id THEN NULL ELSE chain.root_id END
+    FROM chain
+    WHERE chain.id = oi.id AND chain.revision > 1
+    """,
+]
+
+
+def upgrade() -> None:
+    op.add_column('order_items', sa.Column('isCurrent', sa.Boolean(), server_default=sa.text('true'), nullable=False))
+    op.add_column('order_items', sa.Column('revision', sa.Integer(), server_default=sa.text('1'), nullable=False))
+    op.add_column('order_items', sa.Column('rootOrderItemId', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'order_items_rootOrderItemId_fkey', 'order_items', 'order_items', ['rootOrderItemId'], ['id']
+    )
+
+    for statement in BACKFILL_STATEMENTS:
+        op.execute(statement)
+
+    op.create_index('ix_order_items_orderId_isCurrent', 'order_items', ['orderId', 'isCurrent'], unique=False)
+    op.create_index(op.f('ix_order_items_rootOrderItemId'), 'order_items', ['rootOrderItemId'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_order_items_rootOrderItemId'), table_name='order_items')
+    op.drop_index('ix_order_items_orderId_isCurrent', table_name='order_items')
+    op.drop_constraint('order_items_rootOrderItemId_fkey', 'order_items', type_='foreignkey')
+    op.drop_column('order_items', 'rootOrderItemId')
+    op.drop_column('order_items', 'revision')
+    op.drop_column('order_items', 'isCurrent')
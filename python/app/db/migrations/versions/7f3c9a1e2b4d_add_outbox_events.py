@@ -0,0 +1,40 @@
+"""add_outbox_events
+
+Revision ID: 7f3c9a1e2b4d
+Revises: cea69ef236eb
+Create Date: 2026-10-19 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3c9a1e2b4d'
+down_revision = 'cea69ef236eb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('eventType', sa.String(), nullable=False),
+        sa.Column('aggregateId', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(), server_default='PENDING', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('availableAt', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+        sa.Column('lastError', sa.Text(), nullable=True),
+        sa.Column('createdAt', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+        sa.Column('processedAt', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outbox_events_id'), 'outbox_events', ['id'], unique=False)
+    op.create_index('ix_outbox_events_status_availableAt', 'outbox_events', ['status', 'availableAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_events_status_availableAt', table_name='outbox_events')
+    op.drop_index(op.f('ix_outbox_events_id'), table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,233 @@
+"""partition_orders_by_archive_and_month
+
+Revision ID: a028aa5ad958
+Revises: 227248e250b1
+Create Date: 2026-10-19 11:00:00
+
+Turns ``orders`` and ``order_items`` into declaratively partitioned tables:
+
+    orders                      PARTITION BY LIST ("isArchived")
+      orders_active             FOR VALUES IN (false), PARTITION BY RANGE ("createdAt")
+        orders_active_pYYYYMM   one per month
+        orders_active_default
+      orders_archive            FOR VALUES IN (true), PARTITION BY RANGE ("createdAt")
+        orders_archive_pYYYY    one per year
+        orders_archive_default
+
+(same layout for order_items). Archiving a closed order is a plain
+``UPDATE ... SET "isArchived" = true``; Postgres moves the row to the archive
+partition, and queries on the parent tables keep seeing every order.
+
+Partitioned tables can only have unique constraints that include the
+partition keys, so ``id`` alone cannot be the primary key or a foreign key
+target any more. Each table's ids are therefore registered in an
+unpartitioned table with ``id`` as its primary key (``order_ids``,
+``order_item_ids``), kept in step by a row trigger. The registry enforces
+id uniqueness, and the foreign keys from delivery/order_items to orders and
+the self references on order_items point at it. Those foreign keys are
+deferred to commit because archiving a row moves it between partitions,
+which Postgres runs as a delete and an insert (the trigger unregisters and
+registers the id again within the same statement). Future monthly/yearly
+partitions are created by order_archival_service.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a028aa5ad958'
+down_revision = '227248e250b1'
+branch_labels = None
+depends_on = None
+
+ACTIVE_MONTHS_AHEAD = 3
+
+ORDER_FOREIGN_KEYS = [
+    ('orders_addressId_fkey', 'orders', 'address', ['addressId']),
+    ('orders_cancelledByUserId_fkey', 'orders', 'users', ['cancelledByUserId']),
+    ('orders_createdByUserId_fkey', 'orders', 'users', ['createdByUserId']),
+    ('orders_paymentId_fkey', 'orders', 'payment', ['paymentId']),
+    ('orders_pickupId_fkey', 'orders', 'pickup_addresses', ['pickupId']),
+    ('orders_storeId_fkey', 'orders', 'store', ['storeId']),
+    ('order_items_inventoryId_fkey', 'order_items', 'inventory', ['inventoryId']),
+    ('order_items_productId_fkey', 'order_items', 'products', ['productId']),
+]
+
+# (table, id registry, trigger function)
+ID_REGISTRIES = [
+    ('orders', 'order_ids', 'register_order_id'),
+    ('order_items', 'order_item_ids', 'register_order_item_id'),
+]
+
+# Foreign keys to partitioned tables, redirected to the id registries
+REGISTRY_FOREIGN_KEYS = [
+    ('delivery_orderId_fkey', 'delivery', 'order_ids', ['orderId']),
+    ('order_items_orderId_fkey', 'order_items', 'order_ids', ['orderId']),
+    ('order_items_updatedOrderitemsId_fkey', 'order_items', 'order_item_ids', ['updatedOrderitemsId']),
+    ('order_items_rootOrderItemId_fkey', 'order_items', 'order_item_ids', ['rootOrderItemId']),
+]
+
+
+def _create_id_registry(table: str, registry: str, function: str) -> None:
+    op.execute(f'CREATE TABLE {registry} (id integer PRIMARY KEY)')
+    op.execute(f'INSERT INTO {registry} (id) SELECT id FROM {table}')
+    op.execute(f"""
+        CREATE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO {registry} (id) VALUES (NEW.id);
+                RETURN NEW;
+            END IF;
+            DELETE FROM {registry} WHERE id = OLD.id;
+            RETURN OLD;
+        END $$
+    """)
+    # Cloned onto every partition, including ones created later
+    op.execute(f"""
+        CREATE TRIGGER {table}_register_id
+            AFTER INSERT OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {function}()
+    """)
+
+
+def _create_partitions(table: str) -> None:
+    op.execute(f"""
+        CREATE TABLE {table}_active PARTITION OF {table}
+            FOR VALUES IN (false) PARTITION BY RANGE ("createdAt");
+        CREATE TABLE {table}_archive PARTITION OF {table}
+            FOR VALUES IN (true) PARTITION BY RANGE ("createdAt");
+        CREATE TABLE {table}_active_default PARTITION OF {table}_active DEFAULT;
+        CREATE TABLE {table}_archive_default PARTITION OF {table}_archive DEFAULT;
+    """)
+    # Monthly active partitions from the oldest row until a few months ahead,
+    # yearly archive partitions over the same span
+    op.execute(f"""
+        DO $$
+        DECLARE
+            first_month date := date_trunc('month', COALESCE(
+                (SELECT min("createdAt") FROM {table}_legacy), timezone('utc', now())
+            ));
+            m date;
+            y date;
+        BEGIN
+            FOR m IN SELECT generate_series(
+                first_month,
+                date_trunc('month', timezone('utc', now())) + interval '{ACTIVE_MONTHS_AHEAD} months',
+                interval '1 month'
+            )::date LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table}_active FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_active_p' || to_char(m, 'YYYYMM'), m, (m + interval '1 month')::date
+                );
+            END LOOP;
+            FOR y IN SELECT generate_series(
+                date_trunc('year', first_month),
+                date_trunc('year', timezone('utc', now())) + interval '1 year',
+                interval '1 year'
+            )::date LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table}_archive FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_archive_p' || to_char(y, 'YYYY'), y, (y + interval '1 year')::date
+                );
+            END LOOP;
+        END $$;
+    """)
+
+
+def upgrade() -> None:
+    # Partition keys: archive flag on both tables, creation time on order_items
+    op.add_column('orders', sa.Column('isArchived', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+    op.add_column('order_items', sa.Column('isArchived', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+    op.add_column('order_items', sa.Column('createdAt', sa.DateTime(), nullable=True))
+    op.execute("""
+        UPDATE order_items oi
+        SET "createdAt" = o."createdAt"
+        FROM orders o
+        WHERE o.id = oi."orderId"
+    """)
+    op.execute("""UPDATE order_items SET "createdAt" = timezone('utc', now()) WHERE "createdAt" IS NULL""")
+    op.alter_column('order_items', 'createdAt', nullable=False, server_default=sa.text("timezone('utc', now())"))
+
+    op.rename_table('orders', 'orders_legacy')
+    op.rename_table('order_items', 'order_items_legacy')
+
+    # New partitioned parents with the same columns (and serial defaults)
+    op.execute('CREATE TABLE orders (LIKE orders_legacy INCLUDING DEFAULTS) PARTITION BY LIST ("isArchived")')
+    op.execute('CREATE TABLE order_items (LIKE order_items_legacy INCLUDING DEFAULTS) PARTITION BY LIST ("isArchived")')
+    _create_partitions('orders')
+    _create_partitions('order_items')
+
+    op.execute('INSERT INTO orders SELECT * FROM orders_legacy')
+    op.execute('INSERT INTO order_items SELECT * FROM order_items_legacy')
+
+    # Keep the id sequences when the legacy tables are dropped
+    op.execute('ALTER SEQUENCE orders_id_seq OWNED BY orders.id')
+    op.execute('ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id')
+
+    # CASCADE also drops the foreign keys to the legacy tables; they are
+    # recreated against the id registries below
+    op.execute('DROP TABLE order_items_legacy CASCADE')
+    op.execute('DROP TABLE orders_legacy CASCADE')
+
+    op.create_primary_key('orders_pkey', 'orders', ['id', 'createdAt', 'isArchived'])
+    op.create_primary_key('order_items_pkey', 'order_items', ['id', 'createdAt', 'isArchived'])
+    for name, source, referent, columns in ORDER_FOREIGN_KEYS:
+        op.create_foreign_key(name, source, referent, columns, ['id'])
+
+    for table, registry, function in ID_REGISTRIES:
+        _create_id_registry(table, registry, function)
+    for name, source, registry, columns in REGISTRY_FOREIGN_KEYS:
+        op.create_foreign_key(name, source, registry, columns, ['id'], deferrable=True, initially='DEFERRED')
+
+    op.create_index(op.f('ix_orders_id'), 'orders', ['id'], unique=False)
+    op.create_index('ix_orders_createdByUserId', 'orders', ['createdByUserId'], unique=False)
+    op.create_index('ix_orders_storeId_createdAt', 'orders', ['storeId', 'createdAt'], unique=False)
+    op.create_index(op.f('ix_order_items_id'), 'order_items', ['id'], unique=False)
+    op.create_index('ix_order_items_orderId_isCurrent', 'order_items', ['orderId', 'isCurrent'], unique=False)
+    op.create_index(op.f('ix_order_items_rootOrderItemId'), 'order_items', ['rootOrderItemId'], unique=False)
+
+
+def downgrade() -> None:
+    for name, source, _, _ in REGISTRY_FOREIGN_KEYS:
+        op.execute(f'ALTER TABLE {source} DROP CONSTRAINT "{name}"')
+    for table, registry, function in ID_REGISTRIES:
+        op.execute(f'DROP TRIGGER {table}_register_id ON {table}')
+        op.execute(f'DROP FUNCTION {function}()')
+        op.execute(f'DROP TABLE {registry}')
+
+    op.rename_table('orders', 'orders_partitioned')
+    op.rename_table('order_items', 'order_items_partitioned')
+    for index in ('ix_orders_id', 'ix_orders_createdByUserId', 'ix_orders_storeId_createdAt',
+                  'ix_order_items_id', 'ix_order_items_orderId_isCurrent', 'ix_order_items_rootOrderItemId'):
+        op.execute(f'DROP INDEX IF EXISTS "{index}"')
+    op.execute('ALTER TABLE orders_partitioned DROP CONSTRAINT orders_pkey')
+    op.execute('ALTER TABLE order_items_partitioned DROP CONSTRAINT order_items_pkey')
+    for name, source, _, _ in ORDER_FOREIGN_KEYS:
+        op.execute(f'ALTER TABLE {source}_partitioned DROP CONSTRAINT "{name}"')
+
+    op.execute('CREATE TABLE orders (LIKE orders_partitioned INCLUDING DEFAULTS)')
+    op.execute('CREATE TABLE order_items (LIKE order_items_partitioned INCLUDING DEFAULTS)')
+    op.execute('INSERT INTO orders SELECT * FROM orders_partitioned')
+    op.execute('INSERT INTO order_items SELECT * FROM order_items_partitioned')
+    op.execute('ALTER SEQUENCE orders_id_seq OWNED BY orders.id')
+    op.execute('ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id')
+    op.execute('DROP TABLE order_items_partitioned CASCADE')
+    op.execute('DROP TABLE orders_partitioned CASCADE')
+
+    op.create_primary_key('orders_pkey', 'orders', ['id'])
+    op.create_primary_key('order_items_pkey', 'order_items', ['id'])
+    for name, source, referent, columns in ORDER_FOREIGN_KEYS:
+        op.create_foreign_key(name, source, referent, columns, ['id'])
+    op.create_foreign_key('delivery_orderId_fkey', 'delivery', 'orders', ['orderId'], ['id'])
+    op.create_foreign_key('order_items_orderId_fkey', 'order_items', 'orders', ['orderId'], ['id'])
+    op.create_foreign_key('order_items_updatedOrderitemsId_fkey', 'order_items', 'order_items', ['updatedOrderitemsId'], ['id'])
+    op.create_foreign_key('order_items_rootOrderItemId_fkey', 'order_items', 'order_items', ['rootOrderItemId'], ['id'])
+
+    op.create_index(op.f('ix_orders_id'), 'orders', ['id'], unique=False)
+    op.create_index(op.f('ix_order_items_id'), 'order_items', ['id'], unique=False)
+    op.create_index('ix_order_items_orderId_isCurrent', 'order_items', ['orderId', 'isCurrent'], unique=False)
+    op.create_index(op.f('ix_order_items_rootOrderItemId'), 'order_items', ['rootOrderItemId'], unique=False)
+
+    op.drop_column('order_items', 'createdAt')
+    op.drop_column('order_items', 'isArchived')
+    op.drop_column('orders', 'isArchived')
@@ -0,0 +1,39 @@
+"""add_amount_cents_columns
+
+Revision ID: a7d3e9c1f508
+Revises: f2c8d5a7b914
+Create Date: 2026-10-19 23:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9c1f508'
+down_revision = 'f2c8d5a7b914'
+branch_labels = None
+depends_on = None
+
+ORDER_AMOUNTS = ('totalAmount', 'orderTotalAmount', 'deliveryFee', 'tipAmount', 'taxAmount')
+
+
+def upgrade() -> None:
+    for column in ORDER_AMOUNTS:
+        op.add_column('orders', sa.Column(f'{column}Cents', sa.BigInteger(), nullable=True))
+    op.add_column('order_items', sa.Column('orderAmountCents', sa.BigInteger(), nullable=True))
+    op.add_column('payment', sa.Column('amount_cents', sa.BigInteger(), nullable=True))
+
+    # Backfill: numeric round() rounds half away from zero, as app.services.money does for amounts >= 0
+    op.execute(
+        'UPDATE orders SET ' + ', '.join(f'"{column}Cents" = round("{column}"::numeric * 100)' for column in ORDER_AMOUNTS)
+    )
+    op.execute('UPDATE order_items SET "orderAmountCents" = round("orderAmount"::numeric * 100)')
+    op.execute('UPDATE payment SET amount_cents = round(amount::numeric * 100)')
+
+
+def downgrade() -> None:
+    op.drop_column('payment', 'amount_cents')
+    op.drop_column('order_items', 'orderAmountCents')
+    for column in reversed(ORDER_AMOUNTS):
+        op.drop_column('orders', f'{column}Cents')
@@ -0,0 +1,29 @@
+"""add_lower_name_indexes
+
+Revision ID: b3f6d2e8c417
+Revises: a7d3e9c1f508
+Create Date: 2026-10-20 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f6d2e8c417'
+down_revision = 'a7d3e9c1f508'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The inventory import matches categories and products by lower(name)
+    op.create_index('ix_categories_lower_name', 'categories', [sa.text('lower(name)')], unique=False)
+    op.create_index(
+        'ix_products_categoryId_lower_name', 'products', ['categoryId', sa.text('lower(name)')], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_categoryId_lower_name', table_name='products')
+    op.drop_index('ix_categories_lower_name', table_name='categories')
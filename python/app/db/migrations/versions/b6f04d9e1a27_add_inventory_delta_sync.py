@@ -0,0 +1,40 @@
+"""add_inventory_delta_sync
+
+Revision ID: b6f04d9e1a27
+Revises: 9d1a6c3e8f52
+Create Date: 2026-10-19 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6f04d9e1a27'
+down_revision = '9d1a6c3e8f52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows never stamped count as changed when the column was introduced
+    op.execute("""UPDATE inventory SET "updatedAt" = timezone('utc', now()) WHERE "updatedAt" IS NULL""")
+    op.create_index('ix_inventory_storeId_updatedAt', 'inventory', ['storeId', 'updatedAt'], unique=False)
+
+    op.create_table('inventory_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('inventoryId', sa.Integer(), nullable=False),
+        sa.Column('storeId', sa.Integer(), nullable=False),
+        sa.Column('productId', sa.Integer(), nullable=False),
+        sa.Column('deletedAt', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_inventory_tombstones_id'), 'inventory_tombstones', ['id'], unique=False)
+    op.create_index('ix_inventory_tombstones_storeId_deletedAt', 'inventory_tombstones', ['storeId', 'deletedAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_tombstones_storeId_deletedAt', table_name='inventory_tombstones')
+    op.drop_index(op.f('ix_inventory_tombstones_id'), table_name='inventory_tombstones')
+    op.drop_table('inventory_tombstones')
+    op.drop_index('ix_inventory_storeId_updatedAt', table_name='inventory')
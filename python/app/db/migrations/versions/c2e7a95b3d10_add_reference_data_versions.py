@@ -0,0 +1,29 @@
+"""add_reference_data_versions
+
+Revision ID: c2e7a95b3d10
+Revises: b6f04d9e1a27
+Create Date: 2026-10-19 19:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e7a95b3d10'
+down_revision = 'b6f04d9e1a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('reference_data_versions',
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updatedAt', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+        sa.PrimaryKeyConstraint('entity')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reference_data_versions')
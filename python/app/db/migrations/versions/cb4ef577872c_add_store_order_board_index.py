@@ -0,0 +1,26 @@
+"""add_store_order_board_index
+
+Revision ID: cb4ef577872c
+Revises: a028aa5ad958
+Create Date: 2026-10-19 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cb4ef577872c'
+down_revision = 'a028aa5ad958'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_orders_storeId_status_createdAt', 'orders', ['storeId', 'status', 'createdAt'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_storeId_status_createdAt', table_name='orders')
@@ -0,0 +1,50 @@
+"""add_order_idempotency_keys
+
+Revision ID: cea69ef236eb
+Revises: cb4ef577872c
+Create Date: 2026-10-19 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cea69ef236eb'
+down_revision = 'cb4ef577872c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('order_idempotency_keys',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=False),
+        sa.Column('orderId', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(), nullable=False),
+        sa.Column('requestHash', sa.String(length=64), nullable=True),
+        sa.Column('createdAt', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['userId'], ['users.id']),
+        # orders is partitioned, so reference its id registry (as delivery and order_items do)
+        sa.ForeignKeyConstraint(['orderId'], ['order_ids.id'], name='order_idempotency_keys_orderId_fkey',
+                                deferrable=True, initially='DEFERRED'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+    op.create_index(op.f('ix_order_idempotency_keys_id'), 'order_idempotency_keys', ['id'], unique=False)
+
+    # Square checkouts already carry a unique payment idempotency key
+    op.execute("""
+        INSERT INTO order_idempotency_keys (key, "userId", "orderId", operation, "createdAt")
+        SELECT p.idempotency_key, o."createdByUserId", o.id, 'createOrderWithPayment', o."createdAt"
+        FROM orders o
+        JOIN payment p ON p.id = o."paymentId"
+        WHERE p.idempotency_key IS NOT NULL
+        ON CONFLICT (key) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_order_idempotency_keys_id'), table_name='order_idempotency_keys')
+    op.drop_table('order_idempotency_keys')
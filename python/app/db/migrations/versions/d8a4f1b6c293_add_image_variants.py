@@ -0,0 +1,26 @@
+"""add_image_variants
+
+Revision ID: d8a4f1b6c293
+Revises: c2e7a95b3d10
+Create Date: 2026-10-19 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a4f1b6c293'
+down_revision = 'c2e7a95b3d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('image_variants', sa.JSON(), nullable=True))
+    op.add_column('store', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('store', 'image_variants')
+    op.drop_column('products', 'image_variants')
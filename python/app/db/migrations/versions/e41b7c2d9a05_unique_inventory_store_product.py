@@ -0,0 +1,58 @@
+"""unique_inventory_store_product
+
+Revision ID: e41b7c2d9a05
+Revises: 7f3c9a1e2b4d
+Create Date: 2026-10-19 15:00:00
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41b7c2d9a05'
+down_revision = '7f3c9a1e2b4d'
+branch_labels = None
+depends_on = None
+
+# Configured at INFO in alembic.ini, so the counts show in the migration output
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Keep the most recently updated row of each (store, product) duplicate group
+RANKED_INVENTORY = """
+    WITH ranked AS (
+        SELECT id,
+               first_value(id) OVER (
+                   PARTITION BY "storeId", "productId"
+                   ORDER BY "updatedAt" DESC NULLS LAST, id DESC
+               ) AS keep_id
+        FROM inventory
+    )
+"""
+
+
+def upgrade() -> None:
+    # Point order items of duplicate rows at the kept row, then drop the duplicates
+    bind = op.get_bind()
+    repointed = bind.execute(sa.text(RANKED_INVENTORY + """
+        UPDATE order_items oi
+        SET "inventoryId" = ranked.keep_id
+        FROM ranked
+        WHERE oi."inventoryId" = ranked.id AND ranked.id <> ranked.keep_id
+    """)).rowcount
+    deleted = bind.execute(sa.text(RANKED_INVENTORY + """
+        DELETE FROM inventory i
+        USING ranked
+        WHERE i.id = ranked.id AND ranked.id <> ranked.keep_id
+        RETURNING i.id, i."storeId", i."productId"
+    """)).all()
+    for row in deleted:
+        logger.info(f"Deleted duplicate inventory row {row.id} (store {row.storeId}, product {row.productId})")
+    logger.info(f"Deleted {len(deleted)} duplicate inventory rows; repointed {repointed} order items to the kept rows")
+    op.create_unique_constraint('uq_inventory_storeId_productId', 'inventory', ['storeId', 'productId'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_inventory_storeId_productId', 'inventory', type_='unique')
@@ -0,0 +1,24 @@
+"""add_store_pincodes_index
+
+Revision ID: e4b7c1d9a6f2
+Revises: d8a4f1b6c293
+Create Date: 2026-10-19 21:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7c1d9a6f2'
+down_revision = 'd8a4f1b6c293'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_store_pincodes', 'store', ['pincodes'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_store_pincodes', table_name='store')
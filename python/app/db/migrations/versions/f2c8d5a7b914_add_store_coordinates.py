@@ -0,0 +1,32 @@
+"""add_store_coordinates
+
+Revision ID: f2c8d5a7b914
+Revises: e4b7c1d9a6f2
+Create Date: 2026-10-19 22:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8d5a7b914'
+down_revision = 'e4b7c1d9a6f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('store', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('store', sa.Column('longitude', sa.Float(), nullable=True))
+    op.create_index('ix_store_latitude_longitude', 'store', ['latitude', 'longitude'], unique=False)
+    op.add_column('pickup_addresses', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('pickup_addresses', sa.Column('longitude', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pickup_addresses', 'longitude')
+    op.drop_column('pickup_addresses', 'latitude')
+    op.drop_index('ix_store_latitude_longitude', table_name='store')
+    op.drop_column('store', 'longitude')
+    op.drop_column('store', 'latitude')
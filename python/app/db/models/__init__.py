@@ -16,3 +16,9 @@ from .pickup_address import PickupAddressModel
 from .fees import FeesModel
 from .payment_onboarding import PaymentOnboardingModel, PaymentOnboardingStatus, PaymentMethod
 from .saved_cart import SavedCartModel
+from .order_metric import OrderMetricModel
+from .order_idempotency_key import OrderIdempotencyKeyModel
+from .outbox_event import OutboxEventModel
+from .store_catalog_snapshot import StoreCatalogSnapshotModel
+from .inventory_tombstone import InventoryTombstoneModel
+from .reference_data_version import ReferenceDataVersionModel
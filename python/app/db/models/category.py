@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -12,3 +12,8 @@ class CategoryModel(Base):
     
     # Relationships
     products = relationship("ProductModel", back_populates="category")
+
+    __table_args__ = (
+        # Case-insensitive name lookups (inventory import)
+        Index("ix_categories_lower_name", func.lower(name)),
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, String, Boolean
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, String, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -21,3 +21,10 @@ class InventoryModel(Base):
     store = relationship("StoreModel", back_populates="inventory")
     product = relationship("ProductModel", back_populates="inventory_items")
     order_items = relationship("OrderItemModel", back_populates="inventory")
+
+    __table_args__ = (
+        # One inventory row per product per store (target of bulk upserts)
+        UniqueConstraint("storeId", "productId", name="uq_inventory_storeId_productId"),
+        # Delta sync: a store's rows changed since a cursor
+        Index("ix_inventory_storeId_updatedAt", "storeId", "updatedAt"),
+    )
@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, Index
+from app.db.base import Base
+
+
+class InventoryTombstoneModel(Base):
+    """
+    Record of a removed inventory row, so delta-sync clients learn about
+    deletions (see app.services.inventory_sync_service). Purged after
+    INVENTORY_TOMBSTONE_RETENTION_DAYS; older sync cursors must resync.
+    """
+    __tablename__ = 'inventory_tombstones'
+
+    id = Column(Integer, primary_key=True, index=True)
+    inventoryId = Column(Integer, nullable=False)  # No FK: the row is gone
+    storeId = Column(Integer, nullable=False)
+    productId = Column(Integer, nullable=False)
+    deletedAt = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_inventory_tombstones_storeId_deletedAt", "storeId", "deletedAt"),
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 import strawberry
@@ -36,12 +36,24 @@ class OrderModel(Base):
     tipAmount = Column(Float, nullable=True)
     orderTotalAmount = Column(Float, nullable=False)
     taxAmount = Column(Float, nullable=True)
+    # The amounts above in integer cents, written together with them (see app.services.money);
+    # sum these for exact totals
+    totalAmountCents = Column(BigInteger, nullable=True)
+    orderTotalAmountCents = Column(BigInteger, nullable=True)
+    deliveryFeeCents = Column(BigInteger, nullable=True)
+    tipAmountCents = Column(BigInteger, nullable=True)
+    taxAmountCents = Column(BigInteger, nullable=True)
     display_code = Column(String, nullable=True)
     custom_order = Column(String, nullable=True)
     # Cancellation tracking fields
     cancelMessage = Column(String, nullable=True)
     cancelledByUserId = Column(Integer, ForeignKey("users.id"), nullable=True)
     cancelledAt = Column(DateTime, nullable=True)
+    createdAt = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Partition keys: orders is LIST-partitioned on isArchived and RANGE-partitioned
+    # by createdAt month (see migration a028aa5ad958 and order_archival_service).
+    # id stays unique through the order_ids registry.
+    isArchived = Column(Boolean, default=False, server_default="false", nullable=False)
     
     # Relationships
     creator = relationship("UserModel", foreign_keys=[createdByUserId], back_populates="orders")
@@ -52,3 +64,10 @@ class OrderModel(Base):
     pickup_address = relationship("PickupAddressModel", foreign_keys=[pickupId])
     cancelled_by = relationship("UserModel", foreign_keys=[cancelledByUserId], back_populates="cancelled_orders")
     store = relationship("StoreModel", foreign_keys=[storeId])
+
+    __table_args__ = (
+        Index("ix_orders_createdByUserId", "createdByUserId"),
+        Index("ix_orders_storeId_createdAt", "storeId", "createdAt"),
+        # Store order board: filter by status set, newest first
+        Index("ix_orders_storeId_status_createdAt", "storeId", "status", "createdAt"),
+    )
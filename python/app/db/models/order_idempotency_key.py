@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from app.db.base import Base
+
+
+class OrderIdempotencyKeyModel(Base):
+    """
+    Client-supplied idempotency key -> order created for it.
+
+    Lets order-creation mutations return the original order when a client
+    retries. Since orders is partitioned, the database foreign key on orderId
+    references the order_ids registry (deferred; see migration a028aa5ad958).
+    """
+    __tablename__ = 'order_idempotency_keys'
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(255), unique=True, nullable=False)
+    userId = Column(Integer, ForeignKey("users.id"), nullable=False)
+    orderId = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    operation = Column(String, nullable=False)  # Mutation that created the order
+    requestHash = Column(String(64), nullable=True)  # SHA-256 of the request; NULL for backfilled keys
+    createdAt = Column(DateTime, default=datetime.utcnow, nullable=False)
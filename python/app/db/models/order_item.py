@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, Float, ForeignKey, Boolean, Index, DateTime
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -11,7 +12,20 @@ class OrderItemModel(Base):
     quantity = Column(Integer, nullable=False)
     orderId = Column(Integer, ForeignKey("orders.id"), nullable=False)
     orderAmount = Column(Float, nullable=False)
+    orderAmountCents = Column(BigInteger, nullable=True)  # orderAmount in integer cents
     updatedOrderitemsId = Column(Integer, ForeignKey("order_items.id"), nullable=True)
+    # Revision tracking: edits create a new row instead of updating in place.
+    # isCurrent marks the latest revision of a line (removed lines have none),
+    # rootOrderItemId points at the original line (NULL for the original itself)
+    # and revision counts from 1.
+    isCurrent = Column(Boolean, default=True, server_default="true", nullable=False)
+    revision = Column(Integer, default=1, server_default="1", nullable=False)
+    rootOrderItemId = Column(Integer, ForeignKey("order_items.id"), nullable=True, index=True)
+    # Partition keys, mirroring orders. In the database, ids are unique through
+    # the order_ids/order_item_ids registries, which the foreign keys to
+    # orders/order_items reference (partitioned tables cannot be referenced).
+    createdAt = Column(DateTime, default=datetime.utcnow, nullable=False)
+    isArchived = Column(Boolean, default=False, server_default="false", nullable=False)
     
     # Relationships
     product = relationship("ProductModel", back_populates="order_items")
@@ -19,3 +33,7 @@ class OrderItemModel(Base):
     inventory = relationship("InventoryModel", back_populates="order_items")
     updated_order_item = relationship("OrderItemModel", remote_side=[id], uselist=False, 
                                       foreign_keys=[updatedOrderitemsId], backref="original_order_item")
+
+    __table_args__ = (
+        Index("ix_order_items_orderId_isCurrent", "orderId", "isCurrent"),
+    )
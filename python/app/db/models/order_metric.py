@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint, Index
+from app.db.base import Base
+
+
+class OrderMetricModel(Base):
+    """
+    Hourly order rollup per store, status and order type.
+
+    Orders are counted in the bucket of the hour they were created and under
+    their current status, so a status change moves an order between rows of
+    the same bucket. Kept up to date in the same transaction as the order
+    write by app.services.order_metrics_service.
+    """
+    __tablename__ = 'order_metrics'
+
+    id = Column(Integer, primary_key=True, index=True)
+    storeId = Column(Integer, ForeignKey("store.id"), nullable=False)
+    bucketStart = Column(DateTime, nullable=False)  # UTC, truncated to the hour
+    status = Column(String, nullable=False)  # OrderStatus value
+    orderType = Column(String, nullable=False)  # FeeType value, or UNKNOWN
+    orderCount = Column(Integer, default=0, nullable=False)
+    subtotalAmount = Column(Float, default=0, nullable=False)  # Sum of orders.totalAmount
+    revenueAmount = Column(Float, default=0, nullable=False)  # Sum of orders.orderTotalAmount
+
+    __table_args__ = (
+        UniqueConstraint('storeId', 'bucketStart', 'status', 'orderType', name='uq_order_metrics_bucket'),
+        Index('ix_order_metrics_bucketStart', 'bucketStart'),
+    )
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from app.db.base import Base
+
+
+class OutboxEventModel(Base):
+    """
+    Domain event waiting to be delivered to its handlers (emails, webhooks, ...).
+
+    Written in the same transaction as the change that caused it and drained
+    by the background dispatcher in app.services.outbox_service, so side
+    effects never run on the request path and are never lost on a crash.
+    """
+    __tablename__ = 'outbox_events'
+
+    id = Column(Integer, primary_key=True, index=True)
+    eventType = Column(String, nullable=False)  # e.g. ORDER_CREATED
+    aggregateId = Column(Integer, nullable=True)  # Order ID the event is about
+    payload = Column(JSON, nullable=False, default={})
+    status = Column(String, nullable=False, default="PENDING")  # PENDING, PROCESSING, SENT, FAILED
+    attempts = Column(Integer, nullable=False, default=0)
+    availableAt = Column(DateTime, default=datetime.utcnow, nullable=False)  # Next time the event may be claimed
+    lastError = Column(Text, nullable=True)
+    createdAt = Column(DateTime, default=datetime.utcnow, nullable=False)
+    processedAt = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbox_events_status_availableAt", "status", "availableAt"),
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, Enum, String, Float, DateTime
+from sqlalchemy import Column, Integer, BigInteger, Enum, String, Float, DateTime
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 import strawberry
@@ -27,6 +27,7 @@ class PaymentModel(Base):
     square_payment_id = Column(String, nullable=True, unique=True)
     idempotency_key = Column(String, nullable=True, unique=True)
     amount = Column(Float, nullable=True)
+    amount_cents = Column(BigInteger, nullable=True)  # amount in integer cents, as charged
     currency = Column(String, default="USD", nullable=True)
     status = Column(Enum(PaymentStatus), nullable=True)
     receipt_url = Column(String, nullable=True)
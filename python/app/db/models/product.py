@@ -1,7 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Computed, Index, JSON, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.db.base import Base
 
+# Name terms rank above description terms; 'simple' avoids English stemming of product names
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
 class ProductModel(Base):
     __tablename__ = 'products'
     
@@ -10,8 +17,18 @@ class ProductModel(Base):
     description = Column(String, nullable=True)
     categoryId = Column(Integer, ForeignKey("categories.id"), nullable=False)
     image = Column(String, nullable=True)  # URL stored as string
+    image_variants = Column(JSON, nullable=True)  # {"source": image URL, "variants": [...]}, see image_variant_service
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))  # Maintained by Postgres
     
     # Relationships
     category = relationship("CategoryModel", back_populates="products")
     order_items = relationship("OrderItemModel", back_populates="product")
     inventory_items = relationship("InventoryModel", back_populates="product")
+
+    __table_args__ = (
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram index for typo-tolerant name matching (requires pg_trgm)
+        Index("ix_products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        # Case-insensitive name lookups within a category (inventory import)
+        Index("ix_products_categoryId_lower_name", categoryId, func.lower(name)),
+    )
@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, String, BigInteger, DateTime
+from app.db.base import Base
+
+
+class ReferenceDataVersionModel(Base):
+    """
+    Change counter per kind of reference data (categories, products, fees, ...).
+
+    Writers bump the counter in the transaction that changes the data; every
+    worker's in-process cache compares counters to decide whether its copy is
+    still current (see app.services.reference_data_cache).
+    """
+    __tablename__ = 'reference_data_versions'
+
+    entity = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updatedAt = Column(DateTime, default=datetime.utcnow, nullable=False)
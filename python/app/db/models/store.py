@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, ARRAY
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, ARRAY, JSON, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 from app.db.custom_types.encrypted import EncryptedType
@@ -10,7 +10,9 @@ class StoreModel(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     address = Column(String, nullable=False)
-    radius = Column(Float, nullable=True)
+    radius = Column(Float, nullable=True)  # Delivery radius in miles
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     managerUserId = Column(Integer, ForeignKey("users.id"), nullable=False)
     email = Column(String, unique=True, nullable=False)
     mobile = Column(String, unique=True, nullable=True)
@@ -24,6 +26,7 @@ class StoreModel(Base):
     section_headers = Column(ARRAY(String), nullable=True)  # Array of section header strings
     display_field = Column(String, unique=True, nullable=False)  # Unique display field, required
     images = Column(ARRAY(String), nullable=True)  # Array of store image URLs
+    image_variants = Column(JSON, nullable=True)  # {image URL: [variants]}, see image_variant_service
     subdomain = Column(String, unique=True, nullable=True, index=True)  # Unique subdomain for multi-tenancy (e.g., 'store1' for store1.indimitra.com)
 
     # Square payment integration - encrypted credentials
@@ -45,3 +48,10 @@ class StoreModel(Base):
     location_codes = relationship("StoreLocationCodeModel", back_populates="store")
     pickup_addresses = relationship("PickupAddressModel", back_populates="store")
     fees = relationship("FeesModel", back_populates="store")
+
+    __table_args__ = (
+        # Reverse pincode lookup: which stores deliver to a pincode (pincodes @> ARRAY[...])
+        Index("ix_store_pincodes", "pincodes", postgresql_using="gin"),
+        # Bounding-box prefilter for stores near a point, see store_locator_service
+        Index("ix_store_latitude_longitude", "latitude", "longitude"),
+    )
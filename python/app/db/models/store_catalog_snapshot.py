@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, JSON
+from app.db.base import Base
+
+
+class StoreCatalogSnapshotModel(Base):
+    """
+    Denormalized storefront catalog of one store (listed, available inventory
+    with product and category details), served to shoppers as-is.
+
+    Inventory, product, category and store edits mark affected snapshots
+    stale in their own transaction; a background job rebuilds them. See
+    app.services.store_catalog_service.
+    """
+    __tablename__ = 'store_catalog_snapshots'
+
+    storeId = Column(Integer, ForeignKey("store.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # Bumped whenever the content changes
+    etag = Column(String, nullable=False, default="")  # Hash of the payload
+    payload = Column(JSON, nullable=False, default={})
+    itemCount = Column(Integer, nullable=False, default=0)
+    stale = Column(Boolean, nullable=False, default=True)
+    builtAt = Column(DateTime, default=datetime.utcnow, nullable=False)
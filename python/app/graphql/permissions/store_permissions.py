@@ -65,6 +65,10 @@ class IsStoreOwnerOrAdmin(BasePermission):
 
         cognito_user = request.state.user
         store_id = kwargs.get("store_id")
+        tenant = info.context.get("tenant")
+        if store_id is None and tenant is not None:
+            # Operations with an optional store_id default to the subdomain's store (see resolve_store_id)
+            store_id = tenant.store_id
 
         if not store_id:
             logger.warning("IsStoreOwnerOrAdmin: No store_id provided in kwargs")
@@ -1,7 +1,9 @@
 import strawberry
-from typing import Optional
+from typing import List, Optional
 from strawberry.scalars import JSON
 from app.services.cart_service import save_cart, get_saved_cart, delete_saved_cart
+from app.services.amount_calculation_service import quote_carts
+from app.graphql.types import OrderItemInput
 
 
 @strawberry.type
@@ -13,6 +15,29 @@ class SavedCart:
     updatedAt: str
 
 
+
+@strawberry.input
+class CartQuoteInput:
+    store_id: int
+    items: List[OrderItemInput]
+    delivery_type: str  # "pickup" or "delivery"
+    tip_amount: float = 0.0
+
+
+@strawberry.type
+class CartQuote:
+    """Server-side totals of one cart; the amount checkout will charge for it"""
+    store_id: int
+    delivery_type: str
+    subtotal: float
+    delivery_fee: float
+    tax_amount: float
+    tip_amount: float
+    total: float
+    total_cents: int
+    error: Optional[str] = None  # Why the cart cannot be quoted (amounts are then 0)
+
+
 @strawberry.type
 class CartQuery:
     @strawberry.field
@@ -28,6 +53,26 @@ class CartQuery:
             updatedAt=cart.updatedAt.isoformat() if cart.updatedAt else ""
         )
 
+    @strawberry.field
+    def quote_carts(self, carts: List[CartQuoteInput]) -> List[CartQuote]:
+        """Totals for many carts in one call, computed as at payment"""
+        try:
+            quotes = quote_carts([
+                {
+                    "store_id": cart.store_id,
+                    "items": [{"product_id": item.productId, "quantity": item.quantity} for item in cart.items],
+                    "delivery_type": cart.delivery_type,
+                    "tip_amount": cart.tip_amount,
+                }
+                for cart in carts
+            ])
+        except ValueError as e:
+            raise Exception(str(e))
+        return [
+            CartQuote(store_id=cart.store_id, delivery_type=cart.delivery_type, **quote)
+            for cart, quote in zip(carts, quotes)
+        ]
+
 
 @strawberry.type
 class CartMutation:
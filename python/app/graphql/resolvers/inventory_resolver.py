@@ -1,6 +1,16 @@
 import strawberry
 from typing import List, Optional
-from app.graphql.types import Product, Inventory
+from strawberry.types import Info
+from app.graphql.types import (
+    Product,
+    Inventory,
+    InventoryUpsertResult,
+    StoreCatalog,
+    InventoryChanges,
+    InventoryRemoval
+)
+from app.graphql.permissions.store_permissions import IsStoreOwnerOrAdmin
+from app.graphql.tenant import resolve_store_id
 from app.services.inventory_service import (
     get_inventory_by_store,
     get_inventory_item,
@@ -8,20 +18,64 @@ from app.services.inventory_service import (
     update_inventory_quantity,
     update_inventory_price,
     remove_from_inventory,
-    update_inventory_item
+    update_inventory_item,
+    bulk_upsert_inventory
 )
+from app.services.store_catalog_service import get_store_catalog
+from app.services.inventory_sync_service import get_inventory_changes
+
+@strawberry.input
+class InventoryUpsertInput:
+    """One product in a bulk inventory upsert; omitted fields are left unchanged"""
+    product_id: int
+    price: Optional[float] = None
+    quantity: Optional[int] = None
+    measurement: Optional[int] = None
+    unit: Optional[str] = None
+    is_listed: Optional[bool] = None
+    is_available: Optional[bool] = None
 
 @strawberry.type
 class InventoryQuery:
     @strawberry.field
-    def get_inventory_by_store(self, store_id: int, is_listed: Optional[bool] = None) -> List[Inventory]:
-        """Get inventory items for a specific store with optional is_listed filter"""
-        return get_inventory_by_store(store_id, is_listed)
+    def get_inventory_by_store(
+        self,
+        info: Info,
+        store_id: Optional[int] = None,
+        is_listed: Optional[bool] = None
+    ) -> List[Inventory]:
+        """Get inventory items for a specific store (default: the subdomain's) with optional is_listed filter"""
+        return get_inventory_by_store(resolve_store_id(info, store_id), is_listed)
     
     @strawberry.field
-    def get_inventory_item(self, store_id: int, product_id: int) -> Optional[Inventory]:
-        """Get inventory details for a specific product in a specific store"""
-        return get_inventory_item(store_id, product_id)
+    def get_inventory_item(self, info: Info, product_id: int, store_id: Optional[int] = None) -> Optional[Inventory]:
+        """Get inventory details for a specific product in a specific store (default: the subdomain's)"""
+        return get_inventory_item(resolve_store_id(info, store_id), product_id)
+
+    @strawberry.field
+    def store_catalog(self, info: Info, store_id: Optional[int] = None) -> Optional[StoreCatalog]:
+        """Get a store's (default: the subdomain's) precomputed storefront catalog (listed, available products by category)"""
+        snapshot = get_store_catalog(resolve_store_id(info, store_id))
+        return StoreCatalog.from_snapshot(snapshot) if snapshot else None
+
+    @strawberry.field
+    def inventory_changes_since(
+        self,
+        info: Info,
+        store_id: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> InventoryChanges:
+        """Get a store's (default: the subdomain's) inventory rows changed or removed since a cursor from a previous call"""
+        try:
+            changes = get_inventory_changes(resolve_store_id(info, store_id), cursor)
+            return InventoryChanges(
+                changed=changes["changed"],
+                removed=[InventoryRemoval(**removal) for removal in changes["removed"]],
+                cursor=changes["cursor"],
+                reset=changes["reset"]
+            )
+        except ValueError as e:
+            raise Exception(str(e))
 
 @strawberry.type
 class InventoryMutation:
@@ -91,4 +145,28 @@ class InventoryMutation:
                 raise Exception(f"Inventory item with ID {inventory_id} not found")
             return inventory
         except ValueError as e:
-            raise Exception(str(e)) 
\ No newline at end of file
+            raise Exception(str(e))
+
+    @strawberry.mutation(permission_classes=[IsStoreOwnerOrAdmin])
+    def bulk_upsert_inventory(
+        self,
+        store_id: int,
+        items: List[InventoryUpsertInput]
+    ) -> List[InventoryUpsertResult]:
+        """Add or update many products in a store's inventory in one batch"""
+        try:
+            results = bulk_upsert_inventory(store_id, [
+                {
+                    "product_id": item.product_id,
+                    "price": item.price,
+                    "quantity": item.quantity,
+                    "measurement": item.measurement,
+                    "unit": item.unit,
+                    "is_listed": item.is_listed,
+                    "is_available": item.is_available
+                }
+                for item in items
+            ])
+            return [InventoryUpsertResult.from_dict(result) for result in results]
+        except ValueError as e:
+            raise Exception(str(e))
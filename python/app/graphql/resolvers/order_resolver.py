@@ -3,10 +3,8 @@ from typing import List, Optional
 from datetime import datetime
 from app.db.session import SessionLocal
 
-from app.graphql.types import Order, OrderStats
+from app.graphql.types import Order, OrderItem, OrderItemInput, OrderStats, OrderMetricsSummary, OrderMetricsPeriod, StoreOrderBoard, BulkOrderStatusResult
 from app.db.models.order import OrderModel, OrderStatus
-from app.db.models.delivery import DeliveryModel
-from app.db.models.user import UserModel
 from app.services.order_service import (
     get_all_orders,
     get_orders_by_user,
@@ -14,14 +12,34 @@ from app.services.order_service import (
     create_order,
     cancel_order,
     update_order_status,
+    transition_order,
+    bulk_update_order_status,
     get_orders_by_store,
+    get_store_order_board,
+    get_current_order_items,
     update_order_bill_url,
     update_order_items,
-    get_order_stats
+    get_order_stats,
+    find_replayed_order,
+    order_request_hash
 )
-from app.services.delivery_service import assign_delivery
-from app.services.email_service import EmailService
-from app.graphql.permissions.store_permissions import IsAuthenticated, IsAdmin
+from app.services.order_metrics_service import (
+    get_order_metrics_summary,
+    get_order_metrics_by_period
+)
+from app.graphql.permissions.store_permissions import IsAuthenticated, IsAdmin, IsStoreOwnerOrAdmin
+
+
+# ✅ Input Type for Store Order Board filters
+@strawberry.input
+class StoreOrderBoardFilter:
+    """Filters for the store order board; all are optional and combined with AND"""
+    statuses: Optional[List[OrderStatus]] = None
+    startDate: Optional[datetime] = None  # Created at or after
+    endDate: Optional[datetime] = None  # Created before
+    orderType: Optional[str] = None  # "DELIVERY" or "PICKUP"
+    search: Optional[str] = None  # Substring of the display code
+    includeArchived: bool = False
 
 
 # ✅ Order Queries
@@ -47,6 +65,46 @@ class OrderQuery:
         """Fetch all orders for a specific store - Authenticated users only"""
         return get_orders_by_store(store_id=storeId)
 
+    @strawberry.field(permission_classes=[IsStoreOwnerOrAdmin])
+    def getStoreOrderBoard(
+        self,
+        store_id: int,
+        filter: Optional[StoreOrderBoardFilter] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> StoreOrderBoard:
+        """
+        Fetch a filtered page of a store's orders with current items - Store owner or admin
+
+        Archived (old closed) orders are skipped unless filter.includeArchived is set.
+        """
+        filter = filter or StoreOrderBoardFilter()
+        try:
+            board = get_store_order_board(
+                store_id=store_id,
+                statuses=filter.statuses,
+                start_date=filter.startDate,
+                end_date=filter.endDate,
+                order_type=filter.orderType,
+                search=filter.search,
+                include_archived=filter.includeArchived,
+                limit=limit,
+                offset=offset
+            )
+        except ValueError as e:
+            raise Exception(str(e))
+
+        return StoreOrderBoard(
+            orders=board["orders"],
+            total_count=board["total_count"],
+            has_more=offset + len(board["orders"]) < board["total_count"]
+        )
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    def getCurrentOrderItems(self, orderId: int) -> List[OrderItem]:
+        """Fetch only the current revision of each line of an order - Authenticated users only"""
+        return get_current_order_items(order_id=orderId)
+
     @strawberry.field(permission_classes=[IsAdmin])
     def getOrderStats(self) -> OrderStats:
         """Get order statistics for dashboard - Admin only"""
@@ -58,13 +116,46 @@ class OrderQuery:
             orders_by_type=stats['orders_by_type']
         )
 
+    @strawberry.field(permission_classes=[IsStoreOwnerOrAdmin])
+    def getStoreOrderStats(
+        self,
+        store_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> OrderMetricsSummary:
+        """Get order counts and revenue for a store, optionally within a period - Store owner or admin"""
+        return OrderMetricsSummary.from_dict(
+            get_order_metrics_summary(store_id=store_id, start=start_date, end=end_date)
+        )
 
-# ✅ Input Type for Order Items
-@strawberry.input
-class OrderItemInput:
-    """Defines input format for creating order items"""
-    productId: int
-    quantity: int
+    @strawberry.field(permission_classes=[IsStoreOwnerOrAdmin])
+    def getStoreOrderStatsByPeriod(
+        self,
+        store_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        granularity: str = "day"
+    ) -> List[OrderMetricsPeriod]:
+        """Get a store's order metrics per hour/day/week/month - Store owner or admin"""
+        try:
+            periods = get_order_metrics_by_period(start_date, end_date, granularity, store_id=store_id)
+            return [OrderMetricsPeriod.from_dict(period) for period in periods]
+        except ValueError as e:
+            raise Exception(str(e))
+
+    @strawberry.field(permission_classes=[IsAdmin])
+    def getOrderStatsByPeriod(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        granularity: str = "day"
+    ) -> List[OrderMetricsPeriod]:
+        """Get platform-wide order metrics per hour/day/week/month - Admin only"""
+        try:
+            periods = get_order_metrics_by_period(start_date, end_date, granularity)
+            return [OrderMetricsPeriod.from_dict(period) for period in periods]
+        except ValueError as e:
+            raise Exception(str(e))
 
 
 # ✅ Input Type for Payment
@@ -113,7 +204,8 @@ class OrderMutation:
         tipAmount: Optional[float] = None,
         taxAmount: Optional[float] = None,
         deliveryInstructions: Optional[str] = None,
-        customOrder: Optional[str] = None
+        customOrder: Optional[str] = None,
+        idempotencyKey: Optional[str] = None
     ) -> Order:
         """
         Create a new order with multiple order items.
@@ -132,6 +224,8 @@ class OrderMutation:
             taxAmount (float, optional): Tax amount.
             deliveryInstructions (str, optional): Special instructions for delivery.
             customOrder (str, optional): Custom order instructions.
+            idempotencyKey (str, optional): Client-generated key; retries with the same key
+                return the original order instead of creating a duplicate.
         
         Returns:
             Order: The newly created order.
@@ -162,7 +256,8 @@ class OrderMutation:
                 pickup_or_delivery=pickupOrDelivery,
                 custom_order=customOrder,
                 address_id=addressId,
-                pickup_id=pickupId
+                pickup_id=pickupId,
+                idempotency_key=idempotencyKey
             )
         except ValueError as e:
             raise Exception(str(e))
@@ -179,16 +274,21 @@ class OrderMutation:
         pickupId: Optional[int] = None,
         tipAmount: Optional[float] = None,
         deliveryInstructions: Optional[str] = None,
-        customOrder: Optional[str] = None
+        customOrder: Optional[str] = None,
+        idempotencyKey: Optional[str] = None
     ) -> Order:
         """
         Process payment and create order with explicit recovery for the
         payment-succeeds-but-order-fails scenario.
 
         Transaction Design:
-        - Square payment is processed FIRST (outside DB transaction)
+        - A retry with an already used idempotency key returns the original order
+          before any calculation, reservation or Square call
+        - Stock is reserved FIRST in its own transaction and released if the payment fails
+        - Square payment is processed next (outside DB transaction)
         - If payment succeeds, create PaymentModel + OrderModel in single DB transaction
         - If DB transaction fails after payment succeeds:
+          - Release the reserved stock (reconciliation reserves it again)
           - Log all details for recovery (square_payment_id, idempotency_key, order params)
           - Return error to user (they are charged but have no order)
           - Admin can use payment_reconciliation_service to create order from Square data
@@ -209,6 +309,7 @@ class OrderMutation:
             tipAmount: Optional tip
             deliveryInstructions: Special instructions
             customOrder: Custom order notes
+            idempotencyKey: Order idempotency key (defaults to payment.idempotencyKey)
 
         Returns:
             Created Order with payment linked
@@ -222,10 +323,13 @@ class OrderMutation:
             from app.services.amount_calculation_service import (
                 calculate_order_amount,
                 verify_amounts_match,
-                calculate_amount_cents,
                 AmountMismatchError
             )
             from app.services.order_service import create_order_with_payment
+            from app.services.inventory_reservation_service import (
+                reserve_order_inventory,
+                release_order_inventory
+            )
             import logging
             import json
 
@@ -240,6 +344,16 @@ class OrderMutation:
             # Convert OrderItemInput to dictionary
             items = [{"product_id": item.productId, "quantity": item.quantity} for item in productItems]
 
+            # Step 0: Replay a retried checkout without recalculating or charging again
+            # (a different request reusing the key is rejected)
+            order_idempotency_key = idempotencyKey or payment.idempotencyKey
+            replayed = find_replayed_order(order_idempotency_key, userId, order_request_hash(
+                "createOrderWithPayment", storeId, items, pickupOrDelivery,
+                addressId, pickupId, tipAmount, deliveryInstructions, customOrder
+            ))
+            if replayed:
+                return replayed
+
             # Step 1: Calculate server-side amount
             server_amounts = calculate_order_amount(
                 store_id=storeId,
@@ -261,17 +375,21 @@ class OrderMutation:
                     f"Please refresh and try again."
                 )
 
-            # Step 3: Process payment via Square (OUTSIDE DB transaction)
+            # Step 3: Reserve stock before charging so a sold-out item is never paid for
+            reserve_order_inventory(store_id=storeId, product_items=items)
+
+            # Step 4: Process payment via Square (OUTSIDE DB transaction)
             # This is intentional - see design_decision section above
             try:
                 square_result = create_square_payment_for_store(
                     store_id=storeId,
                     payment_token=payment.paymentToken,
-                    amount_cents=calculate_amount_cents(server_amounts["total"]),
+                    amount_cents=server_amounts["total_cents"],
                     idempotency_key=payment.idempotencyKey
                 )
             except PaymentError as e:
-                # Payment failed - safe state, no charge, return error
+                # Payment failed - safe state, no charge, give the stock back
+                release_order_inventory(store_id=storeId, product_items=items)
                 raise ValueError(e.message)
 
             # CRITICAL: Payment succeeded. From here, customer is charged.
@@ -294,22 +412,33 @@ class OrderMutation:
                 "custom_order": customOrder,
             }
 
-            # Step 4: Create order with payment (in service layer with DB transaction)
+            # Step 5: Create order with payment (in service layer with DB transaction)
             try:
                 return create_order_with_payment(
                     **order_params,
                     square_payment_id=square_result["payment_id"],
                     idempotency_key=payment.idempotencyKey,
                     payment_status=square_result["status"],
-                    receipt_url=square_result.get("receipt_url")
+                    receipt_url=square_result.get("receipt_url"),
+                    inventory_reserved=True,
+                    order_idempotency_key=order_idempotency_key
                 )
             except Exception as db_error:
-                # CRITICAL: Payment succeeded but order creation failed
+                # CRITICAL: Payment succeeded but order creation failed.
+                # Give the stock back so it does not stay held until someone
+                # reconciles; reconcile_payment reserves it again for the order.
+                try:
+                    release_order_inventory(store_id=storeId, product_items=items)
+                    order_params["inventory_released"] = True
+                except Exception:
+                    order_params["inventory_released"] = False
+
                 # Log everything needed for manual recovery
                 logger.critical(
                     "ORPHANED_PAYMENT: Payment succeeded but order creation failed. "
                     "Customer is charged. Manual recovery required. "
                     f"square_payment_id={square_result['payment_id']}, "
+                    f"charged_amount_cents={square_result.get('amount_cents')}, "
                     f"idempotency_key={payment.idempotencyKey}, "
                     f"user_id={userId}, "
                     f"amount=${server_amounts['total']:.2f}, "
@@ -342,7 +471,8 @@ class OrderMutation:
         pickupId: Optional[int] = None,
         tipAmount: Optional[float] = None,
         deliveryInstructions: Optional[str] = None,
-        customOrder: Optional[str] = None
+        customOrder: Optional[str] = None,
+        idempotencyKey: Optional[str] = None
     ) -> Order:
         """
         Create an order with Cash on Delivery payment (no Square processing).
@@ -357,6 +487,7 @@ class OrderMutation:
             tipAmount: Optional tip
             deliveryInstructions: Special instructions
             customOrder: Custom order notes
+            idempotencyKey: Client-generated key; retries with the same key return the original order
 
         Returns:
             Created Order with COD payment
@@ -368,8 +499,7 @@ class OrderMutation:
             # Import services
             from app.services.amount_calculation_service import calculate_order_amount
             from app.services.order_service import create_order_with_cod_payment
-            from app.db.session import SessionLocal
-            from app.db.models.store import StoreModel
+            from app.services.checkout_config_service import get_checkout_config
 
             # Validate required IDs based on order type
             if pickupOrDelivery == "delivery" and not addressId:
@@ -377,20 +507,25 @@ class OrderMutation:
             if pickupOrDelivery == "pickup" and not pickupId:
                 raise ValueError("Pickup address ID is required for pickup orders")
 
-            # Verify store has COD enabled
-            db = SessionLocal()
-            try:
-                store = db.query(StoreModel).filter(StoreModel.id == storeId).first()
-                if not store:
-                    raise ValueError(f"Store with ID {storeId} not found")
-                if not store.cod_enabled:
-                    raise ValueError("Cash on Delivery is not available for this store")
-            finally:
-                db.close()
-
             # Convert OrderItemInput to dictionary
             items = [{"product_id": item.productId, "quantity": item.quantity} for item in productItems]
 
+            # Replay a retried checkout before doing any work
+            # (a different request reusing the key is rejected)
+            replayed = find_replayed_order(idempotencyKey, userId, order_request_hash(
+                "createOrderWithCod", storeId, items, pickupOrDelivery,
+                addressId, pickupId, tipAmount, deliveryInstructions, customOrder
+            ))
+            if replayed:
+                return replayed
+
+            # Verify store has COD enabled
+            config = get_checkout_config(storeId)
+            if not config:
+                raise ValueError(f"Store with ID {storeId} not found")
+            if not config.cod_enabled:
+                raise ValueError("Cash on Delivery is not available for this store")
+
             # Calculate server-side amount
             server_amounts = calculate_order_amount(
                 store_id=storeId,
@@ -413,7 +548,8 @@ class OrderMutation:
                 address_id=addressId,
                 pickup_id=pickupId,
                 delivery_instructions=deliveryInstructions,
-                custom_order=customOrder
+                custom_order=customOrder,
+                idempotency_key=idempotencyKey
             )
 
         except ValueError as e:
@@ -445,7 +581,11 @@ class OrderMutation:
     @strawberry.mutation(permission_classes=[IsAuthenticated])
     def updateOrderStatus(self, input: UpdateOrderStatusInput) -> Optional[Order]:
         """
-        Update order status and send email notification for specific status changes.
+        Update order status and queue the customer notification for specific status changes.
+
+        The transition is validated against order_service.ORDER_TRANSITIONS and
+        all its writes (delivery instructions, driver assignment or reset,
+        deliveryDate, stock release, status) are committed together.
 
         Args:
             input: Contains orderId, status, driverId (optional), scheduleTime (optional),
@@ -456,81 +596,54 @@ class OrderMutation:
         Returns:
             Updated Order object.
         """
-        db = SessionLocal()
         try:
-            # ✅ Check if order exists
-            order = db.query(OrderModel).filter(OrderModel.id == input.orderId).first()
+            order = transition_order(
+                order_id=input.orderId,
+                status=input.status,
+                driver_id=input.driverId,
+                schedule_time=input.scheduleTime,
+                delivery_instructions=input.deliveryInstructions,
+                notify_customer=True
+            )
             if not order:
                 raise ValueError(f"Order with ID {input.orderId} not found.")
-
-            # ✅ Check if status is valid
-            if input.status not in OrderStatus.__members__:
-                raise ValueError(f"Invalid order status: {input.status}. Allowed: {list(OrderStatus.__members__.keys())}")
-
-            # ✅ Update delivery instructions if provided
-            if input.deliveryInstructions is not None:
-                order.deliveryInstructions = input.deliveryInstructions
-                db.commit()
-
-            # Define statuses that should maintain the delivery agent
-            delivery_progression_statuses = ["READY_FOR_DELIVERY", "SCHEDULED", "PICKED_UP", "DELIVERED"]
-
-            # ✅ If order status changes to a status outside the delivery progression, remove the driver
-            delivery = db.query(DeliveryModel).filter(DeliveryModel.orderId == input.orderId).first()
-            if delivery and input.status not in delivery_progression_statuses:
-                # Instead of deleting, set the driver to null and update status to FAILED
-                delivery.driverId = None
-                db.commit()
-
-            # ✅ Assign Delivery only if status is READY_FOR_DELIVERY
-            if input.status == "READY_FOR_DELIVERY":
-                if not input.driverId:
-                    raise ValueError("Driver ID is required for READY_FOR_DELIVERY status.")
-                if not input.scheduleTime:
-                    raise ValueError("Schedule time is required for READY_FOR_DELIVERY.")
-
-                # ✅ Check if driver exists
-                driver = db.query(UserModel).filter(UserModel.id == input.driverId, UserModel.type == "DELIVERY").first()
-                if not driver:
-                    raise ValueError(f"Driver with ID {input.driverId} not found or not a delivery driver.")
-
-                # ✅ Set order's deliveryDate first
-                order.deliveryDate = input.scheduleTime
-                db.commit()
-                
-                # ✅ Then assign delivery
-                assign_delivery(order_id=input.orderId, driver_id=input.driverId, schedule_time=input.scheduleTime)
-
-            # ✅ Update order status only if changed
-            if order.status != input.status:
-                order.status = OrderStatus[input.status]
-                db.commit()
-                db.refresh(order)
-
-                # Send email notification for specific status changes
-                email_statuses = ["ACCEPTED", "PICKED_UP", "DELIVERED", "CANCELLED"]
-                if input.status in email_statuses:
-                    # Get user's email from the order
-                    user = db.query(UserModel).filter(UserModel.id == order.createdByUserId).first()
-                    if user and user.email:
-                        email_service = EmailService()
-                        email_service.send_order_status_update(
-                            to_email=user.email,
-                            order_id=str(order.id),
-                            status=input.status
-                        )
-
             return order
 
         except ValueError as e:
-            return str(e)  # ✅ Return detailed error message
-
+            raise Exception(str(e))
         except Exception as e:
-            return f"Unexpected error: {str(e)}"  # ✅ Catch unexpected errors
-
-        finally:
-            db.close()
+            import logging
+            logging.error(f"updateOrderStatus failed for order {input.orderId}: {str(e)}")
+            raise Exception("An unexpected error occurred updating the order status. Please try again.")
     
+    @strawberry.mutation(permission_classes=[IsStoreOwnerOrAdmin])
+    def bulkUpdateOrderStatus(
+        self,
+        store_id: int,
+        order_ids: List[int],
+        status: str,
+        cancel_message: Optional[str] = None,
+        cancelled_by_user_id: Optional[int] = None
+    ) -> List[BulkOrderStatusResult]:
+        """
+        Move many of a store's orders to the same status at once - Store owner or admin
+
+        All valid transitions are applied in one transaction and their
+        notifications queued together; invalid ones are reported per order.
+        READY_FOR_DELIVERY needs a driver, use updateOrderStatus.
+        """
+        try:
+            results = bulk_update_order_status(
+                store_id=store_id,
+                order_ids=order_ids,
+                status=status,
+                cancel_message=cancel_message,
+                cancelled_by_user_id=cancelled_by_user_id
+            )
+            return [BulkOrderStatusResult.from_dict(result) for result in results]
+        except ValueError as e:
+            raise Exception(str(e))
+
     @strawberry.mutation(permission_classes=[IsAuthenticated])
     def updateOrderBillUrl(self, orderId: int, billUrl: Optional[str] = None) -> Optional[Order]:
         """
@@ -26,11 +26,15 @@ class PickupAddressResponse:
 class PickupAddressInput:
     store_id: int
     address: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 @strawberry.input
 class UpdatePickupAddressInput:
     id: int
     address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 # Queries
 @strawberry.type
@@ -49,7 +53,7 @@ class PickupAddressMutation:
         Create a new pickup address
         
         Args:
-            input: Contains store_id and address
+            input: Contains store_id, address and optional coordinates
             
         Returns:
             Response with either the created pickup address or an error message
@@ -57,7 +61,9 @@ class PickupAddressMutation:
         try:
             pickup_address = create_pickup_address(
                 store_id=input.store_id,
-                address=input.address
+                address=input.address,
+                latitude=input.latitude,
+                longitude=input.longitude
             )
             return PickupAddressResponse(pickup_address=pickup_address)
         except ValueError as e:
@@ -69,7 +75,7 @@ class PickupAddressMutation:
         Update an existing pickup address
         
         Args:
-            input: Contains id and optional address
+            input: Contains id, optional address and optional coordinates
             
         Returns:
             Response with either the updated pickup address or an error message
@@ -77,7 +83,9 @@ class PickupAddressMutation:
         try:
             pickup_address = update_pickup_address(
                 id=input.id,
-                address=input.address
+                address=input.address,
+                latitude=input.latitude,
+                longitude=input.longitude
             )
             if not pickup_address:
                 return PickupAddressResponse(
@@ -1,8 +1,11 @@
 import strawberry
 from typing import List, Optional
-from app.graphql.types import Product
+from strawberry.types import Info
+from app.graphql.types import Product, ProductSearchResult
 from app.services.product_service import get_all_products, create_product, delete_product, update_product
+from app.services.product_search_service import DEFAULT_PAGE_SIZE, search_products
 from app.graphql.permissions.store_permissions import IsAdmin
+from app.graphql.tenant import resolve_store_id
 
 @strawberry.type
 class ProductQuery:
@@ -10,6 +13,26 @@ class ProductQuery:
     def products(self) -> List[Product]:
         return get_all_products()
 
+    @strawberry.field
+    def search_products(
+        self,
+        info: Info,
+        query: str,
+        store_id: Optional[int] = None,
+        first: int = DEFAULT_PAGE_SIZE,
+        after: Optional[str] = None
+    ) -> ProductSearchResult:
+        """Search a store's (default: the subdomain's) listed, available products by name and description, best match first"""
+        try:
+            result = search_products(resolve_store_id(info, store_id), query, first, after)
+            return ProductSearchResult(
+                items=result["items"],
+                end_cursor=result["end_cursor"],
+                has_more=result["has_more"]
+            )
+        except ValueError as e:
+            raise Exception(str(e))
+
 @strawberry.type
 class ProductMutation:
     @strawberry.mutation(permission_classes=[IsAdmin])
@@ -12,6 +12,7 @@ from app.graphql.permissions.store_permissions import (
     IsAdmin,
     IsStoreOwnerOrAdmin
 )
+from app.graphql.tenant import resolve_store_id
 from sqlalchemy.orm import Session
 import os
 import logging
@@ -71,8 +72,9 @@ def _mask_merchant_id(merchant_id: Optional[str]) -> Optional[str]:
 @strawberry.type
 class SquareCredentialQuery:
     @strawberry.field(permission_classes=[IsStoreOwnerOrAdmin])
-    def store_square_status(self, store_id: int, info: Info) -> Optional[SquareConnectionStatus]:
-        """Get Square connection status for a specific store"""
+    def store_square_status(self, info: Info, store_id: Optional[int] = None) -> Optional[SquareConnectionStatus]:
+        """Get Square connection status for a store (default: the subdomain's store)"""
+        store_id = resolve_store_id(info, store_id)
         db: Session = next(get_db())
         try:
             store = db.query(StoreModel).filter(StoreModel.id == store_id).first()
@@ -110,13 +112,15 @@ class SquareCredentialQuery:
             db.close()
 
     @strawberry.field
-    def store_payment_config(self, store_id: int) -> Optional[StorePaymentConfig]:
+    def store_payment_config(self, info: Info, store_id: Optional[int] = None) -> Optional[StorePaymentConfig]:
         """
         Get payment configuration for a store (public query for checkout).
+        Defaults to the store of the request's subdomain.
 
         Returns available payment methods and public identifiers needed by
         frontend payment SDKs. Does NOT expose secret credentials.
         """
+        store_id = resolve_store_id(info, store_id)
         db: Session = next(get_db())
         try:
             store = db.query(StoreModel).filter(StoreModel.id == store_id).first()
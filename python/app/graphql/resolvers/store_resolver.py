@@ -1,10 +1,12 @@
 import strawberry
 from typing import List, Optional
-from app.graphql.types import Store
+from strawberry.types import Info
+from app.graphql.types import Store, StoreDistance
 from app.services.store_service import (
     get_all_stores,
     get_store_by_id,
     get_stores_by_manager,
+    get_stores_serving_pincode,
     create_store,
     update_store,
     delete_store,
@@ -16,6 +18,8 @@ from app.services.store_service import (
     toggle_store_cod
 )
 from app.graphql.permissions.store_permissions import IsAdmin, IsAuthenticated
+from app.graphql.tenant import resolve_store_id
+from app.services.store_locator_service import DEFAULT_PAGE_SIZE, get_stores_near
 
 @strawberry.type
 class StoreQuery:
@@ -25,15 +29,34 @@ class StoreQuery:
         return get_all_stores(is_active, disabled)
     
     @strawberry.field
-    def store(self, store_id: int) -> Optional[Store]:
-        """Get a store by ID"""
-        return get_store_by_id(store_id)
+    def store(self, info: Info, store_id: Optional[int] = None) -> Optional[Store]:
+        """Get a store by ID (default: the store of the request's subdomain)"""
+        return get_store_by_id(resolve_store_id(info, store_id))
     
     @strawberry.field
     def stores_by_manager(self, manager_user_id: int) -> List[Store]:
         """Get all stores managed by a specific user"""
         return get_stores_by_manager(manager_user_id)
     
+    @strawberry.field
+    def stores_serving_pincode(self, pincode: str) -> List[Store]:
+        """Get the active stores that deliver to a pincode"""
+        try:
+            return get_stores_serving_pincode(pincode)
+        except ValueError as e:
+            raise Exception(str(e))
+    
+    @strawberry.field
+    def stores_near(self, latitude: float, longitude: float, first: int = DEFAULT_PAGE_SIZE) -> List[StoreDistance]:
+        """Get the active stores whose delivery radius covers a point, nearest first"""
+        try:
+            return [
+                StoreDistance(store=store, distance_miles=round(distance, 2))
+                for store, distance in get_stores_near(latitude, longitude, first)
+            ]
+        except ValueError as e:
+            raise Exception(str(e))
+    
     @strawberry.field
     def store_count(self) -> int:
         """Get the total number of stores"""
@@ -59,7 +82,9 @@ class StoreMutation:
         pincodes: Optional[List[str]] = None,
         images: Optional[List[str]] = None,
         cod_enabled: Optional[bool] = False,
-        whatsapp_number: Optional[str] = None
+        whatsapp_number: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
     ) -> Store:
         """
         Create a new store
@@ -78,6 +103,8 @@ class StoreMutation:
             tax_percentage: Optional store tax percentage
             section_headers: Optional list of section header strings
             pincodes: Optional list of pincodes
+            latitude: Optional store latitude (given together with longitude)
+            longitude: Optional store longitude
         """
         try:
             return create_store(
@@ -96,7 +123,9 @@ class StoreMutation:
                 pincodes=pincodes,
                 images=images,
                 cod_enabled=cod_enabled,
-                whatsapp_number=whatsapp_number
+                whatsapp_number=whatsapp_number,
+                latitude=latitude,
+                longitude=longitude
             )
         except ValueError as e:
             raise Exception(str(e))
@@ -121,7 +150,10 @@ class StoreMutation:
         section_headers: Optional[List[str]] = None,
         display_field: Optional[str] = None,
         images: Optional[List[str]] = None,
-        whatsapp_number: Optional[str] = None
+        whatsapp_number: Optional[str] = None,
+        subdomain: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
     ) -> Optional[Store]:
         """
         Update an existing store
@@ -143,6 +175,9 @@ class StoreMutation:
             tax_percentage: Optional tax percentage
             section_headers: Optional list of section header strings
             display_field: Optional new display field (must be unique if provided)
+            subdomain: Optional storefront subdomain, e.g. 'store1' for store1.indimitra.com (empty clears it)
+            latitude: Optional new latitude (given together with longitude)
+            longitude: Optional new longitude
         """
         try:
             store = update_store(
@@ -163,7 +198,10 @@ class StoreMutation:
                 section_headers,
                 display_field,
                 images,
-                whatsapp_number
+                whatsapp_number,
+                subdomain,
+                latitude,
+                longitude
             )
             if not store:
                 raise Exception(f"Store with ID {store_id} not found")
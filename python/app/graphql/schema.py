@@ -1,11 +1,10 @@
 import strawberry
 from strawberry.extensions import QueryDepthLimiter, MaxAliasesLimiter
-from app.graphql.types import mapper, DashboardStats, OrderStats
+from app.graphql.types import mapper, DashboardStats, OrderItemInput, OrderStats
 from app.graphql.resolvers.user_resolver import UserQuery, UserMutation
 from app.graphql.resolvers.product_resolver import ProductQuery, ProductMutation
 from app.graphql.resolvers.order_resolver import OrderQuery, OrderMutation
 from app.graphql.resolvers.delivery_resolver import DeliveryQuery, DeliveryMutation
-from app.graphql.resolvers.order_resolver import OrderItemInput
 from app.graphql.resolvers.address_resolver import AddressQuery, AddressMutation
 from app.graphql.resolvers.inventory_resolver import InventoryQuery, InventoryMutation
 from app.graphql.resolvers.store_resolver import StoreQuery, StoreMutation
@@ -0,0 +1,15 @@
+from typing import Optional
+from strawberry.types import Info
+
+
+def resolve_store_id(info: Info, store_id: Optional[int] = None) -> int:
+    """
+    The store an operation is for: ``store_id`` if given, otherwise the store
+    of the subdomain the request was sent to (see SubdomainMiddleware).
+    """
+    if store_id is not None:
+        return store_id
+    tenant = info.context.get("tenant")
+    if tenant is None:
+        raise Exception("store_id is required outside a store subdomain")
+    return tenant.store_id
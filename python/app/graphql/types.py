@@ -1,13 +1,14 @@
 import strawberry
 from strawberry_sqlalchemy_mapper import StrawberrySQLAlchemyMapper
 from app.db import models
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from app.db.models.order import OrderStatus
 from app.db.models.fees import FeeType
 from strawberry.scalars import JSON
 from app.db.custom_types.encrypted import EncryptedType
 from sqlalchemy.sql.sqltypes import LargeBinary
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 # Create a single mapper instance.
 mapper = StrawberrySQLAlchemyMapper()
@@ -17,6 +18,8 @@ mapper = StrawberrySQLAlchemyMapper()
 # Use the same sentinel value that's used for LargeBinary
 SkipTypeSentinel = mapper.sqlalchemy_type_to_strawberry_type_map[LargeBinary]
 mapper.sqlalchemy_type_to_strawberry_type_map[EncryptedType] = SkipTypeSentinel
+# Full-text search vectors are an index detail, not product data
+mapper.sqlalchemy_type_to_strawberry_type_map[TSVECTOR] = SkipTypeSentinel
 
 # Generate a GraphQL type for UserModel.
 @mapper.type(models.UserModel)
@@ -99,13 +102,17 @@ class PickupAddress:
     id: int
     store_id: int
     address: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     @classmethod
     def from_db(cls, model):
         return cls(
             id=model.id,
             store_id=model.store_id,
-            address=model.address
+            address=model.address,
+            latitude=model.latitude,
+            longitude=model.longitude
         )
 
 @strawberry.type
@@ -145,6 +152,170 @@ class OrderStats:
     orders_by_status: JSON
     orders_by_type: JSON
 
+@strawberry.type
+class StoreOrderBoard:
+    """GraphQL type for a page of the store order board"""
+    orders: List[Order]
+    total_count: int
+    has_more: bool
+
+@strawberry.type
+class InventoryRemoval:
+    """GraphQL type for an inventory row removed since a sync cursor"""
+    inventory_id: int
+    product_id: int
+    removed_at: datetime
+
+@strawberry.type
+class InventoryChanges:
+    """GraphQL type for a store's inventory changes since a sync cursor"""
+    changed: List[Inventory]
+    removed: List[InventoryRemoval]
+    cursor: str  # Pass back on the next call
+    reset: bool  # True if `changed` is the full inventory and replaces the client's copy
+
+@strawberry.type
+class StoreDistance:
+    """GraphQL type for a store that delivers to a point, with its distance"""
+    store: Store
+    distance_miles: float
+
+@strawberry.type
+class ProductSearchResult:
+    """GraphQL type for a page of product search results in a store"""
+    items: List[Inventory]
+    end_cursor: Optional[str]  # Pass as `after` to get the next page
+    has_more: bool
+
+@strawberry.type
+class BulkOrderStatusResult:
+    """GraphQL type for the outcome of one order in a bulk status update"""
+    order_id: int
+    success: bool
+    changed: bool  # False if the order already had the requested status or failed
+    old_status: Optional[str] = None
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, result: dict) -> "BulkOrderStatusResult":
+        return cls(
+            order_id=result["order_id"],
+            success=result["success"],
+            changed=result["changed"],
+            old_status=result["old_status"],
+            status=result["status"],
+            error=result["error"]
+        )
+
+@strawberry.type
+class InventoryUpsertResult:
+    """GraphQL type for the outcome of one item in a bulk inventory upsert"""
+    product_id: int
+    success: bool
+    created: bool  # True if a new inventory row was inserted
+    inventory_id: Optional[int] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, result: dict) -> "InventoryUpsertResult":
+        return cls(
+            product_id=result["product_id"],
+            success=result["success"],
+            created=result["created"],
+            inventory_id=result["inventory_id"],
+            error=result["error"]
+        )
+
+@strawberry.type
+class CatalogItem:
+    """GraphQL type for one product in a store catalog snapshot"""
+    inventory_id: int
+    product_id: int
+    name: str
+    description: Optional[str] = None
+    image: Optional[str] = None
+    image_variants: Optional[JSON] = None  # Resized WebP/AVIF copies: url, width, height, format
+    price: Optional[float] = None
+    measurement: Optional[int] = None
+    unit: Optional[str] = None
+
+@strawberry.type
+class CatalogCategory:
+    """GraphQL type for a category section of a store catalog snapshot"""
+    id: int
+    name: str
+    items: List[CatalogItem]
+
+@strawberry.type
+class StoreCatalog:
+    """GraphQL type for a store's precomputed storefront catalog"""
+    store_id: int
+    version: int
+    etag: str  # Changes exactly when the content changes
+    built_at: datetime
+    section_headers: List[str]
+    categories: List[CatalogCategory]
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "StoreCatalog":
+        payload = snapshot.payload or {}
+        return cls(
+            store_id=snapshot.storeId,
+            version=snapshot.version,
+            etag=snapshot.etag,
+            built_at=snapshot.builtAt,
+            section_headers=payload.get("section_headers", []),
+            categories=[
+                CatalogCategory(
+                    id=category["id"],
+                    name=category["name"],
+                    items=[CatalogItem(**item) for item in category["items"]]
+                )
+                for category in payload.get("categories", [])
+            ]
+        )
+
+@strawberry.type
+class OrderMetricsSummary:
+    """GraphQL type for order counts and revenue read from the order_metrics rollup"""
+    total_orders: int
+    subtotal_amount: float
+    revenue_amount: float  # Excludes cancelled orders
+    orders_by_status: JSON
+    orders_by_type: JSON
+
+    @classmethod
+    def from_dict(cls, summary: dict) -> "OrderMetricsSummary":
+        return cls(
+            total_orders=summary["total_orders"],
+            subtotal_amount=summary["subtotal_amount"],
+            revenue_amount=summary["revenue_amount"],
+            orders_by_status=summary["orders_by_status"],
+            orders_by_type=summary["orders_by_type"]
+        )
+
+@strawberry.type
+class OrderMetricsPeriod:
+    """GraphQL type for order metrics of one hour/day/week/month"""
+    period_start: datetime
+    total_orders: int
+    subtotal_amount: float
+    revenue_amount: float  # Excludes cancelled orders
+    orders_by_status: JSON
+    orders_by_type: JSON
+
+    @classmethod
+    def from_dict(cls, period: dict) -> "OrderMetricsPeriod":
+        return cls(
+            period_start=period["period_start"],
+            total_orders=period["total_orders"],
+            subtotal_amount=period["subtotal_amount"],
+            revenue_amount=period["revenue_amount"],
+            orders_by_status=period["orders_by_status"],
+            orders_by_type=period["orders_by_type"]
+        )
+
 @strawberry.type
 class Payment:
     """GraphQL type for Payment model"""
@@ -155,3 +326,11 @@ class Payment:
     currency: Optional[str] = None
     status: Optional[str] = None
     receipt_url: Optional[str] = None
+
+
+# Input type for order items; shared by order creation and cart quotes
+@strawberry.input
+class OrderItemInput:
+    """Defines input format for creating order items"""
+    productId: int
+    quantity: int
@@ -16,10 +16,19 @@ load_dotenv()
 from app.api.routes.product import router as product_router
 from app.api.routes.s3 import router as s3_router
 from app.api.routes.oauth import router as oauth_router
+from app.api.routes.exports import router as exports_router
+from app.api.routes.imports import router as imports_router
+from app.api.routes.catalog import router as catalog_router
 from app.api.dependencies import get_db
 from app.services.token_refresh_service import setup_token_refresh_scheduler
+from app.services.order_archival_service import setup_order_maintenance_scheduler
+from app.services.image_variant_service import setup_image_variant_scheduler
+from app.services.store_catalog_service import setup_catalog_rebuild_scheduler
+from app.services.outbox_service import setup_outbox_dispatcher
+from app.services.inventory_sync_service import setup_tombstone_purge_scheduler
 from app.middleware.auth_middleware import CognitoAuthMiddleware
 from app.middleware.rate_limit_middleware import limiter, RateLimitMiddleware
+from app.middleware.subdomain_middleware import SubdomainMiddleware
 from sqlalchemy.orm import Session
 
 app = FastAPI(title="Indimitra API")
@@ -39,11 +48,21 @@ async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
         }
     )
 
-# Startup event: Initialize token refresh scheduler
+# Startup event: Initialize background schedulers
 @app.on_event("startup")
 async def startup_event():
-    """Start background scheduler for Square token refresh"""
+    """Start background schedulers for Square token refresh, order partition maintenance/archival, the outbox dispatcher, image variants, catalog rebuilds and inventory tombstone purges"""
     setup_token_refresh_scheduler()
+    setup_order_maintenance_scheduler()
+    setup_outbox_dispatcher()
+    setup_image_variant_scheduler()
+    setup_catalog_rebuild_scheduler()
+    setup_tombstone_purge_scheduler()
+
+# Add store subdomain middleware (BEFORE CORS; resolves store1.indimitra.com to its store).
+# Middleware added later wraps middleware added earlier, so CORS also covers
+# this middleware's 404/503 responses
+app.add_middleware(SubdomainMiddleware)
 
 # Add CORS middleware with restricted origins
 # Include both localhost and 127.0.0.1 for local development
@@ -69,7 +88,8 @@ async def get_context(request: Request, db: Session = Depends(get_db)):
     return {
         "sqlalchemy_loader": StrawberrySQLAlchemyLoader(bind=db),
         "request": request,
-        "user": getattr(request.state, "user", None)  # Authenticated user from middleware
+        "user": getattr(request.state, "user", None),  # Authenticated user from middleware
+        "tenant": getattr(request.state, "tenant", None)  # Store of the request's subdomain, if any
     }
 
 # Set up the GraphQL endpoint with playground controlled by environment variable
@@ -83,8 +103,20 @@ graphql_app = GraphQLRouter(
 )
 app.include_router(graphql_app, prefix="/graphql")
 
+# Include the products router
+app.include_router(product_router)
+
 # Include the S3 router
 app.include_router(s3_router)
 
 # Include the OAuth router
-app.include_router(oauth_router)
\ No newline at end of file
+app.include_router(oauth_router)
+
+# Include the exports router
+app.include_router(exports_router)
+
+# Include the imports router
+app.include_router(imports_router)
+
+# Include the storefront catalog router
+app.include_router(catalog_router)
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Store subdomain middleware
+
+Resolves the request's host (store1.indimitra.com) to the store it belongs to
+and attaches it to ``request.state.tenant``, so resolvers can default their
+store to it. Resolution is cached (see app.services.tenant_service); a
+request normally costs no database query.
+
+- No subdomain, or a reserved one (www, admin, ...): ``tenant`` is None
+- Unknown store subdomain: 404
+- Inactive or disabled store: 503
+
+On localhost the subdomain can also be given with ``?subdomain=`` or an
+``X-Subdomain`` header for development.
+"""
+
+import logging
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.services.tenant_service import (
+    RESERVED_SUBDOMAINS,
+    extract_subdomain,
+    is_valid_subdomain,
+    resolve_tenant
+)
+
+logger = logging.getLogger(__name__)
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1"}
+
+
+class SubdomainMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware to attach the store addressed by the Host header to the request.
+
+    Excluded paths (never rejected):
+    - /health (health check endpoint)
+    - /oauth (Square OAuth callbacks)
+    """
+
+    EXCLUDED_PATHS = {
+        "/health",
+        "/oauth",
+    }
+
+    async def dispatch(self, request: Request, call_next):
+        request.state.tenant = None
+
+        host = request.headers.get("host", "")
+        subdomain = extract_subdomain(host)
+        if subdomain is None and host.split(":", 1)[0] in LOCAL_HOSTS:
+            subdomain = request.query_params.get("subdomain") or request.headers.get("X-Subdomain")
+            subdomain = subdomain.strip().lower() if subdomain else None
+
+        if not subdomain or subdomain in RESERVED_SUBDOMAINS:
+            return await call_next(request)
+
+        if any(request.url.path.startswith(path) for path in self.EXCLUDED_PATHS):
+            return await call_next(request)
+
+        if not is_valid_subdomain(subdomain):
+            return JSONResponse(status_code=404, content={"detail": "Store not found"})
+
+        # Usually answered from memory; a cache miss queries the database
+        tenant = await run_in_threadpool(resolve_tenant, subdomain)
+        if tenant is None:
+            logger.info(f"Store not found for subdomain: {subdomain}")
+            return JSONResponse(status_code=404, content={"detail": "Store not found"})
+
+        if not tenant.available:
+            return JSONResponse(status_code=503, content={"detail": "This store is currently unavailable"})
+
+        request.state.tenant = tenant
+        return await call_next(request)
@@ -4,15 +4,22 @@ Amount calculation service for server-side order total verification.
 Replicates frontend getCartTotals() logic to ensure payment amounts are verified
 server-side. Never trust client-calculated amounts for payments.
 
+Amounts are computed in integer cents (app.services.money) and returned as
+dollars rounded to the cent.
+
 Frontend reference: js/src/store/useStore.js - getCartTotals()
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
 from app.db.models.inventory import InventoryModel
-from app.db.models.fees import FeesModel
-from app.db.models.store import StoreModel
+from app.services.checkout_config_service import CheckoutConfig, get_checkout_config
+from app.services.money import OrderAmounts, from_cents, percentage_of, to_cents
+
+MAX_QUOTE_CARTS = 50
+MAX_QUOTE_ITEMS = 500
 
 
 class AmountMismatchError(Exception):
@@ -31,6 +38,30 @@ class AmountMismatchError(Exception):
         super().__init__(self.message)
 
 
+def _totals(
+    config: CheckoutConfig,
+    prices: Dict[int, float],
+    product_items: List[dict],
+    delivery_type: str,
+    tip_amount: float
+) -> dict:
+    """Totals of one cart whose products are all in ``prices``; shared by every quote path."""
+    # Subtotal in cents (exact)
+    # Frontend reference: cart.items.reduce((acc, item) => acc + item.price * item.quantity, 0)
+    subtotal = sum(to_cents(prices[item["product_id"]]) * item["quantity"] for item in product_items)
+
+    amounts = OrderAmounts(
+        subtotal=subtotal,
+        # Fee tiers compare the subtotal in dollars (compiled fee schedule)
+        delivery_fee=to_cents(config.delivery_fee(delivery_type, from_cents(subtotal))),
+        # Frontend reference: subtotal * (store.taxPercentage / 100), rounded half up to a cent
+        tax=percentage_of(subtotal, config.tax_percentage),
+        tip=to_cents(tip_amount) if tip_amount else 0
+    )
+    # Frontend reference: subtotal + deliveryFee + tax + tip
+    return amounts.as_dollars()
+
+
 def calculate_order_amount(
     store_id: int,
     product_items: List[dict],
@@ -51,12 +82,13 @@ def calculate_order_amount(
         db: Optional database session (creates new if not provided)
 
     Returns:
-        dict with:
+        dict with (dollars, each a whole number of cents; see app.services.money):
             - subtotal: Sum of (price * quantity) for all items
             - delivery_fee: Fee based on store's fee tiers
-            - tax_amount: Calculated from store's tax percentage
+            - tax_amount: Calculated from store's tax percentage, rounded half up
             - tip_amount: Passed through from input
             - total: subtotal + delivery_fee + tax_amount + tip_amount
+            - total_cents: total in cents, for the payment provider
 
     Raises:
         ValueError: If store not found or product not in inventory
@@ -68,88 +100,104 @@ def calculate_order_amount(
 
     try:
         # 1. Get inventory prices for products
-        # Frontend reference: cart.items.reduce((acc, item) => acc + item.price * item.quantity, 0)
         product_ids = [item["product_id"] for item in product_items]
 
-        inventory_items = db.query(InventoryModel).filter(
+        prices = dict(db.query(InventoryModel.productId, InventoryModel.price).filter(
             InventoryModel.storeId == store_id,
             InventoryModel.productId.in_(product_ids)
-        ).all()
-
-        # Build lookup dict
-        inventory_dict = {inv.productId: inv for inv in inventory_items}
+        ).all())
 
         # Verify all products exist in inventory
         for item in product_items:
-            if item["product_id"] not in inventory_dict:
+            if item["product_id"] not in prices:
                 raise ValueError(
                     f"Product ID {item['product_id']} not found in store {store_id} inventory"
                 )
 
-        # 2. Calculate subtotal
-        # Frontend reference: getCartTotals() subtotal calculation
-        subtotal = 0.0
-        for item in product_items:
-            inventory = inventory_dict[item["product_id"]]
-            subtotal += inventory.price * item["quantity"]
-
-        # Round to 2 decimal places (matches frontend toFixed(2) pattern)
-        subtotal = round(subtotal, 2)
-
-        # 3. Get store for tax percentage
-        store = db.query(StoreModel).filter(StoreModel.id == store_id).first()
-        if not store:
+        # 2. Get store checkout configuration (tax percentage, fee tiers; cached)
+        config = get_checkout_config(store_id)
+        if not config:
             raise ValueError(f"Store ID {store_id} not found")
 
-        # 4. Get delivery fee based on fee tiers
-        # Frontend reference: fees.sort((a,b) => a.limit - b.limit), find first where subtotal <= limit
-        delivery_fee = 0.0
-        if delivery_type.upper() in ["DELIVERY", "PICKUP"]:
-            fees = db.query(FeesModel).filter(
-                FeesModel.store_id == store_id,
-                FeesModel.type == delivery_type.upper()
-            ).all()
-
-            if fees:
-                # Sort by limit (None/null limits go last - they're the "above X" tier)
-                # Frontend reference: fees.sort((a,b) => a.limit - b.limit)
-                sorted_fees = sorted(
-                    fees,
-                    key=lambda f: f.limit if f.limit is not None else float('inf')
-                )
-
-                # Find first matching tier (where subtotal <= limit)
-                # Frontend reference: fees.find(f => subtotal <= f.limit)
-                for fee in sorted_fees:
-                    if fee.limit is None or subtotal <= fee.limit:
-                        delivery_fee = fee.fee_rate
-                        break
-
-        delivery_fee = round(delivery_fee, 2)
-
-        # 5. Calculate tax
-        # Frontend reference: subtotal * (store.taxPercentage / 100)
-        tax_rate = (store.taxPercentage or 0) / 100
-        tax_amount = round(subtotal * tax_rate, 2)
-
-        # 6. Calculate total
-        # Frontend reference: subtotal + deliveryFee + tax + tip
-        tip = round(tip_amount, 2) if tip_amount else 0.0
-        total = round(subtotal + delivery_fee + tax_amount + tip, 2)
-
-        return {
-            "subtotal": subtotal,
-            "delivery_fee": delivery_fee,
-            "tax_amount": tax_amount,
-            "tip_amount": tip,
-            "total": total
-        }
+        return _totals(config, prices, product_items, delivery_type, tip_amount)
 
     finally:
         if close_db:
             db.close()
 
 
+def quote_carts(carts: List[dict], db: Optional[Session] = None) -> List[dict]:
+    """
+    Calculate totals for many carts at once, e.g. every saved cart of a user
+    or one cart under several fulfillment options.
+
+    Prices for all carts come from one inventory query and store settings
+    from the cached checkout configuration; each cart is then totalled
+    exactly as calculate_order_amount would, so a quote matches the amount
+    charged at payment.
+
+    Args:
+        carts: List of {"store_id": int, "items": [{"product_id": int, "quantity": int}, ...],
+               "delivery_type": "pickup" or "delivery", "tip_amount": float (optional)}
+        db: Optional database session (creates new if not provided)
+
+    Returns:
+        One dict per cart, in order: the calculate_order_amount totals plus
+        ``error`` (None, or why the cart cannot be quoted; its amounts are then 0)
+
+    Raises:
+        ValueError: If there are too many carts or items, a quantity is not positive or a tip is negative
+    """
+    if len(carts) > MAX_QUOTE_CARTS:
+        raise ValueError(f"At most {MAX_QUOTE_CARTS} carts can be quoted at once")
+    if sum(len(cart["items"]) for cart in carts) > MAX_QUOTE_ITEMS:
+        raise ValueError(f"At most {MAX_QUOTE_ITEMS} items can be quoted at once")
+    for cart in carts:
+        if (cart.get("tip_amount") or 0) < 0:
+            raise ValueError("Tip amount cannot be negative")
+        for item in cart["items"]:
+            if item["quantity"] <= 0:
+                raise ValueError(f"Quantity for product ID {item['product_id']} must be positive")
+
+    pairs = {(cart["store_id"], item["product_id"]) for cart in carts for item in cart["items"]}
+    prices = {}
+    if pairs:
+        close_db = False
+        if db is None:
+            db = SessionLocal()
+            close_db = True
+        try:
+            rows = db.query(InventoryModel.storeId, InventoryModel.productId, InventoryModel.price).filter(
+                tuple_(InventoryModel.storeId, InventoryModel.productId).in_(pairs)
+            )
+            for store_id, product_id, price in rows:
+                prices.setdefault(store_id, {})[product_id] = price
+        finally:
+            if close_db:
+                db.close()
+
+    quotes = []
+    for cart in carts:
+        store_id = cart["store_id"]
+        store_prices = prices.get(store_id, {})
+        config = get_checkout_config(store_id)
+        missing = [item["product_id"] for item in cart["items"] if item["product_id"] not in store_prices]
+        if not config:
+            error = f"Store ID {store_id} not found"
+        elif missing:
+            error = f"Product ID {missing[0]} not found in store {store_id} inventory"
+        else:
+            error = None
+
+        if error:
+            quote = OrderAmounts(subtotal=0, delivery_fee=0, tax=0, tip=0).as_dollars()
+        else:
+            quote = _totals(config, store_prices, cart["items"], cart["delivery_type"], cart.get("tip_amount", 0.0))
+        quote["error"] = error
+        quotes.append(quote)
+    return quotes
+
+
 def verify_amounts_match(
     client_amount: float,
     server_amount: float,
@@ -169,7 +217,8 @@ def verify_amounts_match(
     Raises:
         AmountMismatchError: If difference exceeds tolerance
     """
-    difference = abs(client_amount - server_amount)
+    # Compare in cents: float differences like 0.010000000000002 are not mismatches
+    difference = abs(to_cents(client_amount) - to_cents(server_amount)) / 100
 
     if difference > tolerance:
         raise AmountMismatchError(
@@ -193,4 +242,4 @@ def calculate_amount_cents(amount_dollars: float) -> int:
     Returns:
         Amount in cents as integer (e.g., 2550)
     """
-    return int(round(amount_dollars * 100))
+    return to_cents(amount_dollars)
@@ -2,19 +2,17 @@ from typing import List, Optional
 from sqlalchemy.exc import IntegrityError
 from app.db.session import SessionLocal
 from app.db.models.category import CategoryModel
+from app.services.store_catalog_service import mark_catalogs_stale_for_category
+from app.services.reference_data_cache import CATEGORIES, bump_reference_version, get_cached_models
 
 def get_all_categories() -> List[CategoryModel]:
     """
     Get all categories
     
     Returns:
-        List of all categories
+        List of all categories (built from cached values; not attached to a session)
     """
-    db = SessionLocal()
-    try:
-        return db.query(CategoryModel).all()
-    finally:
-        db.close()
+    return get_cached_models(CATEGORIES, "all", CategoryModel)
 
 def get_category_by_id(category_id: int) -> Optional[CategoryModel]:
     """
@@ -55,6 +53,7 @@ def create_category(name: str) -> CategoryModel:
         # Create new category
         category = CategoryModel(name=name)
         db.add(category)
+        bump_reference_version(db, CATEGORIES)
         db.commit()
         db.refresh(category)
         return category
@@ -95,6 +94,8 @@ def update_category(category_id: int, name: str) -> Optional[CategoryModel]:
             
         # Update category
         category.name = name
+        mark_catalogs_stale_for_category(db, category_id)
+        bump_reference_version(db, CATEGORIES)
         db.commit()
         db.refresh(category)
         return category
@@ -130,6 +131,7 @@ def delete_category(category_id: int) -> bool:
             
         # Delete category
         db.delete(category)
+        bump_reference_version(db, CATEGORIES)
         db.commit()
         return True
     except IntegrityError:
@@ -0,0 +1,100 @@
+"""
+Per-store checkout configuration.
+
+Checkout needs the same store data several times per order: tax rate, fee
+tiers, COD flag, served pincodes, location codes and whether Square is
+connected. get_checkout_config compiles it into one immutable object per
+store, cached per worker and reloaded when the ``stores``, ``fees`` or
+``store_location_codes`` reference-data versions move (see
+reference_data_cache), so the checkout path reads it from memory.
+
+Square access tokens are not part of it: the payment call reads them when it
+needs them, so a revoked or refreshed token is never served from memory.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, Optional
+
+from app.db.session import SessionLocal
+from app.db.models.fees import FeesModel
+from app.db.models.store import StoreModel
+from app.db.models.store_location_code import StoreLocationCodeModel
+from app.services.fee_schedule import EMPTY_FEE_SCHEDULE, FeeSchedule
+from app.services.reference_data_cache import FEES, STORE_LOCATION_CODES, STORES, get_cached
+
+DEFAULT_LOCATION_CODE = "00"
+
+
+@dataclass(frozen=True)
+class CheckoutConfig:
+    """Everything checkout reads about a store. Immutable and shared between requests."""
+    store_id: int
+    tax_percentage: float
+    cod_enabled: bool
+    square_connected: bool  # Connected, with an access token
+    square_location_configured: bool
+    pincodes: FrozenSet[str]  # Empty: delivers everywhere
+    fee_schedules: Mapping[str, FeeSchedule]  # Fee type -> compiled tiers
+    location_codes: Mapping[str, str]  # City -> order display code prefix
+
+    def delivery_fee(self, delivery_type: str, subtotal: float) -> float:
+        """Rate of the first tier whose limit covers ``subtotal`` (0 if none does)."""
+        return self.fee_schedules.get(delivery_type.upper(), EMPTY_FEE_SCHEDULE).fee_for(subtotal)
+
+    def serves_pincode(self, pincode: str) -> bool:
+        return not self.pincodes or pincode in self.pincodes
+
+    def location_code(self, address: Optional[str]) -> str:
+        """Code for the city of a "street, city, ..." address, or DEFAULT_LOCATION_CODE."""
+        if address:
+            address_parts = address.split(',')
+            if len(address_parts) >= 2:
+                return self.location_codes.get(address_parts[1].strip(), DEFAULT_LOCATION_CODE)
+        return DEFAULT_LOCATION_CODE
+
+
+def _load_checkout_config(store_id: int) -> list:
+    db = SessionLocal()
+    try:
+        # Only the columns checkout needs; loading the model would decrypt every Square column
+        store = db.query(
+            StoreModel.id,
+            StoreModel.taxPercentage,
+            StoreModel.cod_enabled,
+            StoreModel.is_square_connected,
+            StoreModel.square_access_token.isnot(None).label("has_square_token"),
+            StoreModel.square_merchant_id.isnot(None).label("has_square_location"),
+            StoreModel.pincodes,
+        ).filter(StoreModel.id == store_id).first()
+        if store is None:
+            return []
+
+        tiers = {}
+        fees = db.query(FeesModel.type, FeesModel.limit, FeesModel.fee_rate).filter(
+            FeesModel.store_id == store_id
+        ).order_by(FeesModel.id)  # Equal limits: the oldest tier wins
+        for fee in fees:
+            tiers.setdefault(fee.type.value, []).append((fee.limit, fee.fee_rate))
+
+        codes = db.query(StoreLocationCodeModel.location, StoreLocationCodeModel.code).filter(
+            StoreLocationCodeModel.store_id == store_id
+        ).order_by(StoreLocationCodeModel.id.desc())  # The oldest code wins for duplicate cities
+
+        return [CheckoutConfig(
+            store_id=store.id,
+            tax_percentage=store.taxPercentage or 0,
+            cod_enabled=bool(store.cod_enabled),
+            square_connected=bool(store.is_square_connected and store.has_square_token),
+            square_location_configured=bool(store.has_square_location),
+            pincodes=frozenset(store.pincodes or ()),
+            fee_schedules=MappingProxyType({fee_type: FeeSchedule.compile(rows) for fee_type, rows in tiers.items()}),
+            location_codes=MappingProxyType({row.location: row.code for row in codes}),
+        )]
+    finally:
+        db.close()
+
+
+def get_checkout_config(store_id: int) -> Optional[CheckoutConfig]:
+    """The store's checkout configuration (cached), or None if the store does not exist."""
+    configs = get_cached((STORES, FEES, STORE_LOCATION_CODES), ("checkout", store_id), lambda: _load_checkout_config(store_id))
+    return configs[0] if configs else None
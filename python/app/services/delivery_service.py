@@ -4,8 +4,8 @@ from sqlalchemy.exc import IntegrityError
 
 from app.db.session import SessionLocal
 from app.db.models.delivery import DeliveryModel
-from app.db.models.order import OrderModel, OrderStatus
-from app.db.models.user import UserModel
+from app.db.models.order import OrderStatus
+from app.services.order_service import apply_order_transition, assign_order_driver, check_order_transition, lock_order
 
 def get_delivery_by_driver(driver_id: int) -> List[DeliveryModel]:
     """
@@ -32,40 +32,21 @@ def assign_delivery(order_id: int, driver_id: int, schedule_time: datetime) -> O
     Assign a delivery partner to an order or update if already assigned.
     Ensures no duplicate order IDs exist in the delivery table.
     Handles foreign key violations properly.
+
+    Assigns the driver and moves the order to SCHEDULED in one transaction
+    (see order_service.ORDER_TRANSITIONS).
     """
     db = SessionLocal()
     try:
-        # Check if order exists
-        order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
+        order = lock_order(db, order_id)
         if not order:
             raise ValueError(f"Order with ID {order_id} not found.")
 
-        # Check if driver exists in users table
-        driver = db.query(UserModel).filter(UserModel.id == driver_id, UserModel.type == "DELIVERY").first()
-        if not driver:
-            raise ValueError(f"Driver with ID {driver_id} does not exist in users table.")
-            
-        # Update the order's deliveryDate and status
-        order.deliveryDate = schedule_time
-        order.status = OrderStatus.SCHEDULED
-        db.commit()
-
-        # Check if a delivery already exists for this order
-        delivery = db.query(DeliveryModel).filter(DeliveryModel.orderId == order_id).first()
-
-        if delivery:
-            # Update the existing delivery record
-            delivery.driverId = driver_id
-        else:
-            # Create a new delivery record if it doesn't exist
-            delivery = DeliveryModel(
-                orderId=order_id,
-                driverId=driver_id,
-                pickedUpTime=None,
-                deliveredTime=None
-            )
-            db.add(delivery)
-
+        error = check_order_transition(order.status, OrderStatus.SCHEDULED)
+        if error:
+            raise ValueError(error)
+        delivery = assign_order_driver(db, order, driver_id, schedule_time, OrderStatus.SCHEDULED)
+        apply_order_transition(db, order, OrderStatus.SCHEDULED)
         db.commit()
         db.refresh(delivery)
         return delivery
@@ -85,24 +66,27 @@ def update_delivery_status(order_id: int, picked_up_time: Optional[datetime] = N
     db = SessionLocal()
     try:
         # Get both the delivery and order
+        order = lock_order(db, order_id)
         delivery = db.query(DeliveryModel).filter(DeliveryModel.orderId == order_id).first()
-        order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
         
         if not delivery or not order:
             return None
-        
+
         # Update pickup time and order status
         if picked_up_time:
             delivery.pickedUpTime = picked_up_time
-            order.status = OrderStatus.PICKED_UP
+            apply_order_transition(db, order, OrderStatus.PICKED_UP)
         
         # Update delivery time and order status
         if delivered_time:
             delivery.deliveredTime = delivered_time
-            order.status = OrderStatus.DELIVERED
+            apply_order_transition(db, order, OrderStatus.DELIVERED)
         
         db.commit()
         db.refresh(delivery)
         return delivery
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
@@ -0,0 +1,46 @@
+"""
+Tiered fee schedules.
+
+A store's delivery (or pickup) fee depends on the order subtotal: each fee
+row has a ``limit`` and a ``fee_rate``, and an order pays the rate of the
+first tier, by ascending limit, whose limit covers its subtotal. A tier
+without a limit covers any subtotal above the others; a subtotal above every
+limit pays nothing. This mirrors the frontend's
+``fees.sort((a, b) => a.limit - b.limit).find(f => subtotal <= f.limit)``.
+
+FeeSchedule compiles the tiers once into parallel sorted tuples, so a lookup
+is a bisect instead of a sort and scan. Schedules are built and cached as
+part of the store's checkout configuration (see checkout_config_service).
+"""
+import math
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class FeeSchedule:
+    """Immutable fee tiers of one store and fee type."""
+    limits: Tuple[float, ...]  # Ascending; math.inf for the open-ended tier
+    rates: Tuple[float, ...]  # Fee of the tier with the same index
+
+    @classmethod
+    def compile(cls, tiers: Iterable[Tuple[Optional[float], float]]) -> "FeeSchedule":
+        """
+        Build a schedule from (limit, fee rate) pairs in any order.
+
+        Tiers with equal limits keep their given order; the first one wins.
+        """
+        ordered = sorted(
+            ((math.inf if limit is None else limit, rate) for limit, rate in tiers),
+            key=lambda tier: tier[0]
+        )
+        return cls(limits=tuple(limit for limit, _ in ordered), rates=tuple(rate for _, rate in ordered))
+
+    def fee_for(self, subtotal: float) -> float:
+        """Rate of the first tier whose limit covers ``subtotal`` (0 if none does)."""
+        index = bisect_left(self.limits, subtotal)
+        return self.rates[index] if index < len(self.rates) else 0.0
+
+
+EMPTY_FEE_SCHEDULE = FeeSchedule(limits=(), rates=())
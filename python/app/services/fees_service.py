@@ -1,8 +1,32 @@
 from typing import List, Optional
 from app.db.session import SessionLocal
+from app.services.reference_data_cache import FEES, bump_reference_version, get_cached_models
 from app.db.models.fees import FeesModel
 from app.db.models.fees import FeeType
 
+def _validate_tier(db, store_id: int, type: str, fee_rate: float, limit: Optional[float], fee_id: Optional[int] = None) -> None:
+    """
+    Check that a tier fits the store's fee schedule for its type: no negative
+    amounts, and no other tier with the same limit (at most one open-ended
+    tier), which would make the fee for that subtotal depend on row order.
+    """
+    if fee_rate < 0:
+        raise ValueError("Fee rate cannot be negative")
+    if limit is not None and limit < 0:
+        raise ValueError("Fee limit cannot be negative")
+
+    query = db.query(FeesModel.id).filter(
+        FeesModel.store_id == store_id,
+        FeesModel.type == type,
+        FeesModel.limit.is_(None) if limit is None else FeesModel.limit == limit
+    )
+    if fee_id is not None:
+        query = query.filter(FeesModel.id != fee_id)
+    if query.first():
+        if limit is None:
+            raise ValueError(f"The store already has a {type} fee without a limit")
+        raise ValueError(f"The store already has a {type} fee with limit {limit}")
+
 def create_fee(store_id: int, fee_rate: float, fee_currency: str, type: str, limit: Optional[float] = None) -> FeesModel:
     """
     Create a new fee for a store.
@@ -16,13 +40,16 @@ def create_fee(store_id: int, fee_rate: float, fee_currency: str, type: str, lim
         
     Returns:
         The created FeesModel instance
+        
+    Raises:
+        ValueError: If the type is unknown or the tier conflicts with the store's other tiers
     """
-    print('type', type)
     if type not in [fee_type.value for fee_type in FeeType]:
         raise ValueError("Fee type must be either 'DELIVERY' or 'PICKUP'")
         
     db = SessionLocal()
     try:
+        _validate_tier(db, store_id, type, fee_rate, limit)
         fee = FeesModel(
             store_id=store_id,
             fee_rate=fee_rate,
@@ -31,6 +58,7 @@ def create_fee(store_id: int, fee_rate: float, fee_currency: str, type: str, lim
             limit=limit
         )
         db.add(fee)
+        bump_reference_version(db, FEES)
         db.commit()
         db.refresh(fee)
         return fee
@@ -51,6 +79,9 @@ def update_fee(id: int, fee_rate: Optional[float] = None, fee_currency: Optional
         
     Returns:
         The updated FeesModel instance, or None if not found
+        
+    Raises:
+        ValueError: If the type is unknown or the tier conflicts with the store's other tiers
     """
     if type is not None and type not in [fee_type.value for fee_type in FeeType]:
         raise ValueError("Fee type must be either 'DELIVERY' or 'PICKUP'")
@@ -61,6 +92,15 @@ def update_fee(id: int, fee_rate: Optional[float] = None, fee_currency: Optional
         if not fee:
             return None
             
+        _validate_tier(
+            db,
+            fee.store_id,
+            type if type is not None else fee.type.value,
+            fee_rate if fee_rate is not None else fee.fee_rate,
+            limit if limit is not None else fee.limit,
+            fee_id=fee.id
+        )
+
         if fee_rate is not None:
             fee.fee_rate = fee_rate
         if fee_currency is not None:
@@ -70,6 +110,7 @@ def update_fee(id: int, fee_rate: Optional[float] = None, fee_currency: Optional
         if limit is not None:
             fee.limit = limit
             
+        bump_reference_version(db, FEES)
         db.commit()
         db.refresh(fee)
         return fee
@@ -93,6 +134,7 @@ def delete_fee(id: int) -> bool:
             return False
             
         db.delete(fee)
+        bump_reference_version(db, FEES)
         db.commit()
         return True
     finally:
@@ -106,10 +148,6 @@ def get_fees_by_store(store_id: int) -> List[FeesModel]:
         store_id: ID of the store
         
     Returns:
-        List of FeesModel instances for the store
+        List of FeesModel instances for the store (built from cached values; not attached to a session)
     """
-    db = SessionLocal()
-    try:
-        return db.query(FeesModel).filter(FeesModel.store_id == store_id).all()
-    finally:
-        db.close() 
\ No newline at end of file
+    return get_cached_models(FEES, store_id, FeesModel, FeesModel.store_id == store_id) 
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Storage backends for uploaded images and their generated variants.
+
+Product and store images are stored as public URLs (the upload URL without
+its query string). A backend maps those URLs back to object keys, reads the
+originals and writes derived files next to them. Select the backend with
+IMAGE_STORAGE_BACKEND: ``s3`` (default, the upload bucket) or ``local``
+(a directory, for tests and local development).
+"""
+import os
+import urllib.parse
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+import boto3
+from botocore.client import Config
+
+IMAGE_STORAGE_BACKEND = os.getenv("IMAGE_STORAGE_BACKEND", "s3")
+# Served as immutable: variant keys change whenever their source changes
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImageStorage(ABC):
+    """Where images live and how they are addressed."""
+
+    @abstractmethod
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Object key for a URL served by this backend, or None for external URLs."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Public URL of ``key``."""
+
+    @abstractmethod
+    def read(self, key: str) -> bytes:
+        """
+        Raises:
+            FileNotFoundError: If ``key`` does not exist
+        """
+
+    @abstractmethod
+    def write(self, key: str, data: bytes, content_type: str) -> None:
+        """Create or replace ``key``."""
+
+
+class S3ImageStorage(ImageStorage):
+    """Images in an S3 bucket, served from its virtual-hosted URLs."""
+
+    def __init__(self, bucket: str, region: Optional[str] = None, client=None):
+        self.bucket = bucket
+        self.region = region
+        self._client = client or boto3.client("s3", region_name=region, config=Config(signature_version="s3v4"))
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        parsed = urllib.parse.urlparse(url)
+        host = parsed.netloc.lower()
+        # <bucket>.s3.amazonaws.com, <bucket>.s3.<region>.amazonaws.com or <bucket>.s3-<region>.amazonaws.com
+        if not (host.startswith(f"{self.bucket.lower()}.s3.") or host.startswith(f"{self.bucket.lower()}.s3-")):
+            return None
+        key = urllib.parse.unquote(parsed.path.lstrip("/"))
+        return key or None
+
+    def url(self, key: str) -> str:
+        host = f"{self.bucket}.s3.{self.region}.amazonaws.com" if self.region else f"{self.bucket}.s3.amazonaws.com"
+        return f"https://{host}/{urllib.parse.quote(key)}"
+
+    def read(self, key: str) -> bytes:
+        try:
+            return self._client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        except self._client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+
+    def write(self, key: str, data: bytes, content_type: str) -> None:
+        self._client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl=VARIANT_CACHE_CONTROL
+        )
+
+
+class LocalImageStorage(ImageStorage):
+    """Images in a local directory, served under ``base_url``."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Key outside storage root: {key}")
+        return path
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        url = url.split("?", 1)[0]
+        if not url.startswith(self.base_url + "/"):
+            return None
+        return urllib.parse.unquote(url[len(self.base_url) + 1:]) or None
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{urllib.parse.quote(key)}"
+
+    def read(self, key: str) -> bytes:
+        return self._path(key).read_bytes()
+
+    def write(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+_storage: Optional[ImageStorage] = None
+
+
+def get_image_storage() -> ImageStorage:
+    """The configured backend (created on first use)."""
+    global _storage
+    if _storage is None:
+        if IMAGE_STORAGE_BACKEND == "local":
+            _storage = LocalImageStorage(
+                os.getenv("IMAGE_STORAGE_LOCAL_ROOT", "media"),
+                os.getenv("IMAGE_STORAGE_LOCAL_BASE_URL", "http://localhost:8000/media")
+            )
+        elif IMAGE_STORAGE_BACKEND == "s3":
+            _storage = S3ImageStorage(os.getenv("S3_BUCKET_NAME", "indimitra-dev-order-files"), os.getenv("AWS_REGION"))
+        else:
+            raise ValueError(f"Unknown IMAGE_STORAGE_BACKEND: {IMAGE_STORAGE_BACKEND}")
+    return _storage
+
+
+def set_image_storage(storage: Optional[ImageStorage]) -> None:
+    """Replace the configured backend (e.g. with a LocalImageStorage in tests)."""
+    global _storage
+    _storage = storage
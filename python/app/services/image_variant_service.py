@@ -0,0 +1,283 @@
+"""
+Resized WebP/AVIF variants of product and store images.
+
+Uploads go straight to storage at full resolution. A background job (started
+on application startup) finds products and stores whose images have no
+variants yet, decodes and resizes them on a process pool (image encoding is
+CPU-bound and would otherwise hold the GIL) and writes one file per width and
+format next to the original. The variant URLs are recorded in
+``image_variants`` on the product (``{"source": image, "variants": [...]}``)
+or store (``{image: [...]}``); each variant is a dict with url, width, height
+and format. Clients pick a variant by width and fall back to the original
+while ``source`` does not match the current image.
+
+Requires Pillow; AVIF variants are skipped if its AVIF codec is unavailable.
+"""
+import hashlib
+import io
+import logging
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import or_
+
+from app.db.session import SessionLocal
+from app.db.models.product import ProductModel
+from app.db.models.store import StoreModel
+from app.services.image_storage import get_image_storage
+from app.services.reference_data_cache import PRODUCTS, bump_reference_version
+from app.services.store_catalog_service import mark_catalogs_stale_for_products
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional; the job does not start without it
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = tuple(int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "160,480,960").split(","))
+VARIANT_FORMATS = ("webp", "avif")
+VARIANT_QUALITY = {"webp": 80, "avif": 55}
+CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+BATCH_SIZE = int(os.getenv("IMAGE_VARIANT_BATCH_SIZE", "20"))
+MAX_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))
+POLL_INTERVAL_SECONDS = int(os.getenv("IMAGE_VARIANT_POLL_INTERVAL_SECONDS", "60"))
+# Refuse decompression bombs before resizing
+MAX_SOURCE_PIXELS = 50_000_000
+
+# Background scheduler instance (initialized on startup)
+_scheduler: Optional[BackgroundScheduler] = None
+
+
+def available_formats() -> List[str]:
+    """Variant formats the installed Pillow can encode."""
+    if Image is None:
+        return []
+    return [fmt for fmt in VARIANT_FORMATS if features.check(fmt)]
+
+
+def render_variants(data: bytes, widths: Sequence[int], formats: Sequence[str]) -> List[dict]:
+    """
+    Encode ``data`` at each width (never upscaled) in each format.
+
+    Runs in a worker process, so it only takes and returns plain data.
+
+    Returns:
+        Dicts with width, height, format and data (encoded bytes)
+
+    Raises:
+        ValueError: If the image cannot be decoded or is too large
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            if source.width * source.height > MAX_SOURCE_PIXELS:
+                raise ValueError(f"Image too large ({source.width}x{source.height})")
+            image = ImageOps.exif_transpose(source)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Cannot decode image: {e}")
+
+    # Widths at or above the original collapse into one full-size variant
+    targets = sorted({min(width, image.width) for width in widths})
+    variants = []
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            buffer = io.BytesIO()
+            resized.save(buffer, format=fmt.upper(), quality=VARIANT_QUALITY[fmt])
+            variants.append({"width": width, "height": height, "format": fmt, "data": buffer.getvalue()})
+    return variants
+
+
+def variant_key(source_key: str, source_url: str, width: int, fmt: str) -> str:
+    """
+    ``products/x.jpg`` -> ``products/variants/x-<hash>-480w.webp``.
+
+    The hash covers the full source URL, so re-uploading to the same key
+    (product image keys are derived from the product name) gets new variant
+    keys and the old ones can be cached forever.
+    """
+    directory, filename = posixpath.split(source_key)
+    stem = posixpath.splitext(filename)[0]
+    digest = hashlib.sha1(source_url.encode("utf-8")).hexdigest()[:10]
+    return posixpath.join(directory, "variants", f"{stem}-{digest}-{width}w.{fmt}")
+
+
+def _pending_products(db, limit: int) -> List[ProductModel]:
+    return (
+        db.query(ProductModel)
+        .filter(
+            ProductModel.image.isnot(None),
+            ProductModel.image != "",
+            or_(
+                ProductModel.image_variants.is_(None),
+                ProductModel.image_variants["source"].as_string() != ProductModel.image
+            )
+        )
+        .order_by(ProductModel.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _pending_store_images(db, limit: int) -> List[tuple]:
+    """(store id, image URL) pairs without variants; stores are few, so this filters in Python."""
+    pending = []
+    stores = db.query(StoreModel.id, StoreModel.images, StoreModel.image_variants).filter(
+        StoreModel.images.isnot(None)
+    ).order_by(StoreModel.id)
+    for store_id, images, image_variants in stores:
+        for url in images or []:
+            if url and url not in (image_variants or {}):
+                pending.append((store_id, url))
+                if len(pending) >= limit:
+                    return pending
+    return pending
+
+
+def _generate(executor: ProcessPoolExecutor, urls: List[str], formats: List[str]) -> Dict[str, List[dict]]:
+    """
+    Variants for each URL; an empty list for images that cannot be processed
+    (external URLs, missing or undecodable files) so they are not retried.
+    """
+    storage = get_image_storage()
+    futures = {}
+    results = {}
+    for url in urls:
+        key = storage.key_from_url(url)
+        if key is None:
+            logger.info(f"Skipping image variants for external URL {url}")
+            results[url] = []
+            continue
+        try:
+            data = storage.read(key)
+        except FileNotFoundError:
+            logger.warning(f"Image not found for variants: {url}")
+            results[url] = []
+            continue
+        futures[url] = (key, executor.submit(render_variants, data, VARIANT_WIDTHS, formats))
+
+    for url, (key, future) in futures.items():
+        try:
+            rendered = future.result()
+        except ValueError as e:
+            logger.warning(f"Cannot create variants for {url}: {e}")
+            results[url] = []
+            continue
+        variants = []
+        for variant in rendered:
+            target = variant_key(key, url, variant["width"], variant["format"])
+            storage.write(target, variant["data"], CONTENT_TYPES[variant["format"]])
+            variants.append({
+                "url": storage.url(target),
+                "width": variant["width"],
+                "height": variant["height"],
+                "format": variant["format"],
+            })
+        results[url] = variants
+    return results
+
+
+def process_pending_images(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Create variants for up to ``batch_size`` product images and ``batch_size``
+    store images that have none.
+
+    Variants are recorded only if the image was not changed while they were
+    being generated; otherwise the next run picks up the new image.
+
+    Returns:
+        Number of images processed
+    """
+    formats = available_formats()
+    if not formats:
+        logger.warning("Pillow with WebP or AVIF support is not installed; skipping image variants")
+        return 0
+
+    db = SessionLocal()
+    try:
+        products = _pending_products(db, batch_size)
+        store_images = _pending_store_images(db, batch_size)
+        urls = list(dict.fromkeys([product.image for product in products] + [url for _, url in store_images]))
+        if not urls:
+            return 0
+        product_ids = [product.id for product in products]
+        # Release the connection while images are processed
+        db.rollback()
+
+        with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            variants = _generate(executor, urls, formats)
+
+        updated_products = []
+        for product in db.query(ProductModel).filter(ProductModel.id.in_(product_ids)):
+            if product.image in variants:
+                product.image_variants = {"source": product.image, "variants": variants[product.image]}
+                updated_products.append(product.id)
+
+        store_ids = {store_id for store_id, _ in store_images}
+        for store in db.query(StoreModel).filter(StoreModel.id.in_(store_ids)):
+            current = store.images or []
+            recorded = {url: entry for url, entry in (store.image_variants or {}).items() if url in current}
+            recorded.update({url: variants[url] for url in current if url in variants})
+            # Reassign: in-place changes to a JSON column are not tracked
+            store.image_variants = recorded
+
+        if updated_products:
+            mark_catalogs_stale_for_products(db, updated_products)
+            bump_reference_version(db, PRODUCTS)
+        db.commit()
+        logger.info(f"Created variants for {len(urls)} images")
+        return len(urls)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _image_variant_job() -> None:
+    try:
+        process_pending_images()
+    except Exception as e:
+        logger.error(f"Image variant generation failed: {e}")
+
+
+def setup_image_variant_scheduler():
+    """
+    Configure and start the APScheduler background scheduler that generates image variants.
+
+    Runs every IMAGE_VARIANT_POLL_INTERVAL_SECONDS seconds; not started if Pillow is missing.
+    """
+    global _scheduler
+
+    if _scheduler is not None:
+        logger.warning("Image variant scheduler already running")
+        return
+
+    if not available_formats():
+        logger.warning("Pillow with WebP or AVIF support is not installed; image variant scheduler not started")
+        return
+
+    _scheduler = BackgroundScheduler(
+        job_defaults={
+            'coalesce': True,  # Combine multiple missed runs into one
+            'max_instances': 1  # Only one instance of job can run at a time
+        },
+        timezone='UTC'
+    )
+
+    _scheduler.add_job(
+        _image_variant_job,
+        trigger='interval',
+        seconds=POLL_INTERVAL_SECONDS,
+        id='image_variants',
+        replace_existing=True
+    )
+
+    _scheduler.start()
+
+    logger.info(f"Image variant scheduler started (every {POLL_INTERVAL_SECONDS}s)")
@@ -0,0 +1,431 @@
+"""
+Inventory import from CSV / XLSX files.
+
+Rows are read one at a time (``csv.reader`` over the uploaded file, or
+openpyxl in read-only mode) and processed in chunks: categories and products
+are matched by name (case-insensitive) with one query per chunk and created
+when missing, then the chunk is written with ``upsert_inventory_rows``.
+Rows that fail validation are written to a CSV error report in a spooled
+temporary file, so memory is bounded by the chunk size (plus the
+name -> id caches) rather than by the size of the file.
+
+The whole file is imported in one transaction. Each chunk runs under a
+savepoint, so a database error rolls back and reports that chunk alone,
+while an error about the file itself (bad header, too many rows, bad
+encoding) leaves the inventory untouched.
+"""
+import csv
+import io
+import logging
+import math
+import os
+import tempfile
+from collections import ChainMap
+from typing import BinaryIO, Iterator, List, Mapping, MutableMapping, Optional, Tuple
+
+from sqlalchemy import func, insert, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models.category import CategoryModel
+from app.db.models.product import ProductModel
+from app.db.models.store import StoreModel
+from app.services.inventory_service import BULK_UPSERT_MAX_ITEMS, UPSERT_FIELDS, upsert_inventory_rows
+from app.services.reference_data_cache import CATEGORIES, PRODUCTS, bump_reference_version
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "xlsx")
+DEFAULT_CHUNK_SIZE = int(os.getenv("INVENTORY_IMPORT_CHUNK_SIZE", "1000"))
+MAX_IMPORT_ROWS = int(os.getenv("INVENTORY_IMPORT_MAX_ROWS", "200000"))
+# Error reports larger than this are spooled to disk
+REPORT_SPOOL_SIZE = 1024 * 1024
+
+# Accepted header spellings (lower-cased, spaces and dashes as underscores) -> field
+HEADER_ALIASES = {
+    "product": "product_name",
+    "product_name": "product_name",
+    "name": "product_name",
+    "category": "category",
+    "category_name": "category",
+    "description": "description",
+    "price": "price",
+    "quantity": "quantity",
+    "qty": "quantity",
+    "stock": "quantity",
+    "measurement": "measurement",
+    "unit": "unit",
+    "is_listed": "is_listed",
+    "listed": "is_listed",
+    "is_available": "is_available",
+    "available": "is_available",
+}
+REQUIRED_COLUMNS = ("product_name", "category")
+ERROR_REPORT_FIELDS = ["row", "product_name", "category", "error"]
+SUMMARY_COUNTERS = ("created", "updated", "failed", "categories_created", "products_created")
+
+TRUE_VALUES = {"true", "yes", "y", "1"}
+FALSE_VALUES = {"false", "no", "n", "0"}
+
+
+def _normalize_header(header) -> Optional[str]:
+    if header is None:
+        return None
+    key = str(header).strip().lower().replace(" ", "_").replace("-", "_")
+    return HEADER_ALIASES.get(key)
+
+
+def _iter_csv(file: BinaryIO) -> Iterator[list]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    except UnicodeDecodeError:
+        raise ValueError("CSV files must be UTF-8 encoded")
+    finally:
+        text.detach()  # Leave the uploaded file open for its owner
+
+
+def _iter_xlsx(file: BinaryIO) -> Iterator[tuple]:
+    from openpyxl import load_workbook
+
+    # read_only streams rows from the sheet XML instead of building the whole workbook
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_import_rows(file: BinaryIO, import_format: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Yield (row number, {field: raw value}) for each non-blank data row.
+
+    Row numbers are 1-based and count the header row, matching what a
+    spreadsheet shows. Columns with unrecognised headers are ignored.
+
+    Raises:
+        ValueError: If the file is empty or a required column is missing
+    """
+    rows = _iter_csv(file) if import_format == "csv" else _iter_xlsx(file)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("The file is empty")
+    fields = [_normalize_header(column) for column in header]
+    missing = [column for column in REQUIRED_COLUMNS if column not in fields]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    for number, values in enumerate(rows, start=2):
+        if not values or all(_text(value) is None for value in values):
+            continue
+        yield number, {field: value for field, value in zip(fields, values) if field}
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _number(value, field: str, integer: bool = False):
+    text = _text(value)
+    if text is None:
+        return None
+    try:
+        number = float(text)
+    except ValueError:
+        raise ValueError(f"Invalid {field}: {text}")
+    if not math.isfinite(number):
+        raise ValueError(f"Invalid {field}: {text}")
+    if integer:
+        if not number.is_integer():
+            raise ValueError(f"{field} must be a whole number")
+        return int(number)
+    return number
+
+
+def _bool(value, field: str) -> Optional[bool]:
+    if isinstance(value, bool):
+        return value
+    text = _text(value)
+    if text is None:
+        return None
+    if text.lower() in TRUE_VALUES:
+        return True
+    if text.lower() in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid {field}: {text}")
+
+
+def parse_import_row(raw: dict) -> dict:
+    """
+    Convert a raw row into product/category names and upsert fields.
+
+    Raises:
+        ValueError: If a required value is missing or a value cannot be parsed
+    """
+    product_name = _text(raw.get("product_name"))
+    category = _text(raw.get("category"))
+    if not product_name:
+        raise ValueError("Product name is required")
+    if not category:
+        raise ValueError("Category is required")
+    return {
+        "product_name": product_name,
+        "category": category,
+        "description": _text(raw.get("description")),
+        "price": _number(raw.get("price"), "price"),
+        "quantity": _number(raw.get("quantity"), "quantity", integer=True),
+        "measurement": _number(raw.get("measurement"), "measurement", integer=True),
+        "unit": _text(raw.get("unit")),
+        "is_listed": _bool(raw.get("is_listed"), "is_listed"),
+        "is_available": _bool(raw.get("is_available"), "is_available"),
+    }
+
+
+def _product_key(row: dict) -> Tuple[str, str]:
+    return row["category"].lower(), row["product_name"].lower()
+
+
+def _resolve_categories(db: Session, rows: List[dict], cache: MutableMapping[str, int], counts: dict) -> None:
+    """Fill ``cache`` (lower-cased name -> id) for the rows' categories, creating missing ones."""
+    missing = {}
+    for row in rows:
+        key = row["category"].lower()
+        if key not in cache:
+            missing.setdefault(key, row["category"])
+    if not missing:
+        return
+
+    name_key = func.lower(CategoryModel.name)
+    existing = (
+        db.query(CategoryModel.id, name_key.label("key"))
+        .filter(name_key.in_(list(missing)))
+        .order_by(CategoryModel.id)
+    )
+    for category in existing:
+        cache.setdefault(category.key, category.id)
+
+    to_create = [name for key, name in missing.items() if key not in cache]
+    if to_create:
+        created = db.execute(
+            insert(CategoryModel)
+            .values([{"name": name} for name in to_create])
+            .returning(CategoryModel.id, CategoryModel.name)
+        )
+        for category in created:
+            cache[category.name.lower()] = category.id
+        counts["categories_created"] += len(to_create)
+        bump_reference_version(db, CATEGORIES)
+
+
+def _resolve_products(
+    db: Session,
+    rows: List[dict],
+    category_ids: Mapping[str, int],
+    cache: MutableMapping[Tuple[int, str], int],
+    counts: dict
+) -> None:
+    """Fill ``cache`` ((category id, lower-cased name) -> id) for the rows' products, creating missing ones."""
+    missing = {}
+    for row in rows:
+        key = (category_ids[row["category"].lower()], row["product_name"].lower())
+        if key not in cache:
+            missing.setdefault(key, row)
+    if not missing:
+        return
+
+    name_key = func.lower(ProductModel.name)
+    existing = (
+        db.query(ProductModel.id, ProductModel.categoryId, name_key.label("key"))
+        .filter(tuple_(ProductModel.categoryId, name_key).in_(list(missing)))
+        .order_by(ProductModel.id)
+    )
+    for product in existing:
+        cache.setdefault((product.categoryId, product.key), product.id)
+
+    to_create = [(key, row) for key, row in missing.items() if key not in cache]
+    if to_create:
+        created = db.execute(
+            insert(ProductModel)
+            .values([
+                {"name": row["product_name"], "categoryId": key[0], "description": row["description"]}
+                for key, row in to_create
+            ])
+            .returning(ProductModel.id, ProductModel.categoryId, ProductModel.name)
+        )
+        for product in created:
+            cache[(product.categoryId, product.name.lower())] = product.id
+        counts["products_created"] += len(to_create)
+        bump_reference_version(db, PRODUCTS)
+
+
+def _import_chunk(
+    db: Session,
+    store_id: int,
+    chunk: List[Tuple[int, dict]],
+    caches: dict,
+    counts: dict
+) -> List[list]:
+    """Write one chunk in the caller's transaction and return its error report rows."""
+    rows = [row for _, row in chunk]
+    _resolve_categories(db, rows, caches["categories"], counts)
+    _resolve_products(db, rows, caches["categories"], caches["products"], counts)
+
+    items = []
+    for row in rows:
+        category_id = caches["categories"][row["category"].lower()]
+        product_id = caches["products"][(category_id, row["product_name"].lower())]
+        items.append({"product_id": product_id, **{field: row[field] for field in UPSERT_FIELDS}})
+
+    failures = []
+    results = upsert_inventory_rows(db, store_id, items)
+    for (number, row), result in zip(chunk, results):
+        if not result["success"]:
+            counts["failed"] += 1
+            failures.append([number, row["product_name"], row["category"], result["error"]])
+        elif result["created"]:
+            counts["created"] += 1
+        else:
+            counts["updated"] += 1
+    return failures
+
+
+def _write_chunk(
+    db: Session,
+    store_id: int,
+    chunk: List[Tuple[int, dict]],
+    caches: dict,
+    summary: dict,
+    report: csv.writer
+) -> None:
+    """
+    Import one chunk under a savepoint and add its outcome to ``summary``.
+
+    If the database rejects the chunk, its writes are rolled back, every row
+    in it is reported as failed and the chunk is listed in
+    ``summary["failed_chunks"]``; the caches and counters only take the
+    chunk's results once it has been written.
+    """
+    first_row, last_row = chunk[0][0], chunk[-1][0]
+    new_entries = {name: {} for name in caches}
+    chunk_caches = {name: ChainMap(new_entries[name], cache) for name, cache in caches.items()}
+    counts = dict.fromkeys(SUMMARY_COUNTERS, 0)
+    try:
+        with db.begin_nested():
+            failures = _import_chunk(db, store_id, chunk, chunk_caches, counts)
+    except SQLAlchemyError:
+        logger.exception(f"Inventory import for store {store_id} failed on rows {first_row}-{last_row}")
+        error = f"Rows {first_row}-{last_row} could not be written; none of them were imported"
+        summary["failed"] += len(chunk)
+        summary["failed_chunks"].append({"first_row": first_row, "last_row": last_row, "rows": len(chunk), "error": error})
+        for number, row in chunk:
+            report.writerow([number, row["product_name"], row["category"], error])
+        return
+
+    for name, entries in new_entries.items():
+        caches[name].update(entries)
+    for counter, value in counts.items():
+        summary[counter] += value
+    summary["chunks"] += 1
+    report.writerows(failures)
+
+
+def import_inventory(
+    store_id: int,
+    file: BinaryIO,
+    import_format: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict:
+    """
+    Import a store's inventory from a CSV or XLSX file.
+
+    The first row holds the column names (see HEADER_ALIASES); product name
+    and category are required, every other column is optional and empty cells
+    leave the current value unchanged. A product listed twice keeps its last
+    row. Rows are written ``chunk_size`` at a time and committed together at
+    the end; a chunk the database rejects is rolled back on its own and its
+    rows are reported as failed.
+
+    Returns:
+        Dict with total_rows, created, updated, failed, categories_created,
+        products_created, chunks (chunks written), failed_chunks (first_row,
+        last_row, rows and error of each rolled back chunk) and error_report:
+        a binary file positioned at the start of the CSV error report with
+        one line per failed row (the caller closes it), or None when every
+        row was imported
+
+    Raises:
+        ValueError: If the store, format, chunk size or file is invalid;
+            nothing is imported
+    """
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f"Invalid import format: {import_format}. Allowed: {list(IMPORT_FORMATS)}")
+    if not 1 <= chunk_size <= BULK_UPSERT_MAX_ITEMS:
+        raise ValueError(f"Chunk size must be between 1 and {BULK_UPSERT_MAX_ITEMS}")
+
+    summary = {
+        "total_rows": 0,
+        "created": 0,
+        "updated": 0,
+        "failed": 0,
+        "categories_created": 0,
+        "products_created": 0,
+        "chunks": 0,
+        "failed_chunks": [],
+    }
+    caches = {"categories": {}, "products": {}}
+
+    report_file = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_SIZE)
+    report_text = io.TextIOWrapper(report_file, encoding="utf-8", newline="")
+    report = csv.writer(report_text)
+    report.writerow(ERROR_REPORT_FIELDS)
+
+    db = SessionLocal()
+    try:
+        if not db.query(StoreModel.id).filter(StoreModel.id == store_id).first():
+            raise ValueError(f"Store with ID {store_id} does not exist")
+
+        chunk: List[Tuple[int, dict]] = []
+        chunk_keys = set()
+        for number, raw in iter_import_rows(file, import_format):
+            summary["total_rows"] += 1
+            if summary["total_rows"] > MAX_IMPORT_ROWS:
+                raise ValueError(f"Files can contain at most {MAX_IMPORT_ROWS} rows")
+            try:
+                row = parse_import_row(raw)
+            except ValueError as e:
+                summary["failed"] += 1
+                report.writerow([number, _text(raw.get("product_name")), _text(raw.get("category")), str(e)])
+                continue
+
+            # A chunk is one upsert statement, which cannot touch a product twice:
+            # write the pending rows first so the later row wins
+            if len(chunk) >= chunk_size or _product_key(row) in chunk_keys:
+                _write_chunk(db, store_id, chunk, caches, summary, report)
+                chunk, chunk_keys = [], set()
+            chunk.append((number, row))
+            chunk_keys.add(_product_key(row))
+
+        if chunk:
+            _write_chunk(db, store_id, chunk, caches, summary, report)
+        db.commit()
+    except Exception:
+        db.rollback()
+        report_text.close()
+        raise
+    finally:
+        db.close()
+
+    logger.info(f"Imported inventory for store {store_id}: {summary}")
+    report_text.flush()
+    report_text.detach()
+    if summary["failed"]:
+        report_file.seek(0)
+        summary["error_report"] = report_file
+    else:
+        report_file.close()
+        summary["error_report"] = None
+    return summary
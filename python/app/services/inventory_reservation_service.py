@@ -0,0 +1,257 @@
+"""
+Inventory reservation service for checkout stock control.
+
+Reserves stock for all cart lines with one conditional UPDATE
+(``quantity = quantity - n WHERE quantity >= n``) instead of a
+read-check-write per line, so concurrent buyers of the same SKU never
+oversell and only hold the row lock for the duration of a single statement.
+
+Reservations are released back to inventory when an order is cancelled or
+when a store manager reduces/removes order items.
+
+Inventory rows with a NULL quantity are treated as untracked stock: they are
+never decremented and never cause a reservation to fail.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Integer, column, or_, select, update, values
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models.inventory import InventoryModel
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientStockError(ValueError):
+    """Raised when one or more cart lines cannot be reserved."""
+    def __init__(self, message: str, product_ids: List[int]):
+        self.message = message
+        self.product_ids = product_ids
+        super().__init__(self.message)
+
+
+def aggregate_product_quantities(product_items: List[dict]) -> Dict[int, int]:
+    """
+    Sum quantities per product ID.
+
+    Args:
+        product_items: List of [{"product_id": int, "quantity": int}, ...]
+
+    Returns:
+        Dict of {product_id: total_quantity} for positive quantities only
+    """
+    totals = defaultdict(int)
+    for item in product_items:
+        totals[item["product_id"]] += item["quantity"]
+    return {product_id: quantity for product_id, quantity in totals.items() if quantity > 0}
+
+
+def _conditional_decrement(db: Session, key_column, quantities: Dict[int, int], *criteria) -> set:
+    """
+    Decrement stock for every key in ``quantities`` in a single statement.
+
+    Rows are locked in primary-key order first so two checkouts sharing SKUs
+    always queue in the same order instead of deadlocking. Only rows with
+    enough stock (or untracked stock) are updated.
+
+    Returns:
+        The set of keys that were successfully decremented
+    """
+    requested = values(
+        column("key", Integer),
+        column("quantity", Integer),
+        name="requested"
+    ).data(sorted(quantities.items()))
+
+    locked = (
+        select(InventoryModel.id)
+        .where(key_column.in_(list(quantities.keys())), *criteria)
+        .order_by(InventoryModel.id)
+        .with_for_update()
+        .cte("locked")
+    )
+
+    stmt = (
+        update(InventoryModel)
+        .where(
+            InventoryModel.id.in_(select(locked.c.id)),
+            key_column == requested.c.key,
+            or_(
+                InventoryModel.quantity.is_(None),
+                InventoryModel.quantity >= requested.c.quantity
+            )
+        )
+        .values(
+            quantity=InventoryModel.quantity - requested.c.quantity,
+            updatedAt=datetime.utcnow()
+        )
+        .returning(key_column)
+        .execution_options(synchronize_session=False)
+    )
+
+    return {row[0] for row in db.execute(stmt)}
+
+
+def _increment(db: Session, key_column, quantities: Dict[int, int], *criteria) -> None:
+    """Add stock back for every key in ``quantities`` in a single statement."""
+    released = values(
+        column("key", Integer),
+        column("quantity", Integer),
+        name="released"
+    ).data(sorted(quantities.items()))
+
+    stmt = (
+        update(InventoryModel)
+        .where(
+            key_column == released.c.key,
+            InventoryModel.quantity.isnot(None),
+            *criteria
+        )
+        .values(
+            quantity=InventoryModel.quantity + released.c.quantity,
+            updatedAt=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(stmt)
+
+
+def reserve_inventory(db: Session, store_id: int, product_items: List[dict]) -> None:
+    """
+    Reserve stock for all cart lines of a store in one statement.
+
+    Does not commit - the reservation is part of the caller's transaction, so
+    it is rolled back together with the order if anything fails later.
+
+    Args:
+        db: Database session owning the checkout transaction
+        store_id: ID of the store
+        product_items: List of [{"product_id": int, "quantity": int}, ...]
+
+    Raises:
+        InsufficientStockError: If any line does not have enough stock. The
+            caller must roll back, since other lines may have been decremented.
+    """
+    quantities = aggregate_product_quantities(product_items)
+    if not quantities:
+        return
+
+    reserved = _conditional_decrement(
+        db,
+        InventoryModel.productId,
+        quantities,
+        InventoryModel.storeId == store_id
+    )
+
+    short = sorted(set(quantities) - reserved)
+    if short:
+        raise InsufficientStockError(
+            message=f"Insufficient stock for product(s) {', '.join(str(p) for p in short)} in store {store_id}",
+            product_ids=short
+        )
+
+
+def release_inventory(db: Session, store_id: int, product_items: List[dict]) -> None:
+    """
+    Return stock for cart lines of a store in one statement. Does not commit.
+
+    Args:
+        db: Database session
+        store_id: ID of the store
+        product_items: List of [{"product_id": int, "quantity": int}, ...]
+    """
+    quantities = aggregate_product_quantities(product_items)
+    if not quantities:
+        return
+
+    _increment(db, InventoryModel.productId, quantities, InventoryModel.storeId == store_id)
+
+
+def reserve_inventory_lines(db: Session, quantities_by_inventory_id: Dict[int, int]) -> None:
+    """
+    Reserve additional stock for existing order lines, keyed by inventory ID.
+
+    Used when a store manager increases item quantities on an order.
+    Does not commit.
+
+    Raises:
+        InsufficientStockError: If any line does not have enough stock
+    """
+    quantities = {inv_id: qty for inv_id, qty in quantities_by_inventory_id.items() if qty > 0}
+    if not quantities:
+        return
+
+    reserved = _conditional_decrement(db, InventoryModel.id, quantities)
+
+    short = sorted(set(quantities) - reserved)
+    if short:
+        product_ids = [
+            row[0] for row in db.query(InventoryModel.productId).filter(InventoryModel.id.in_(short))
+        ]
+        raise InsufficientStockError(
+            message=f"Insufficient stock for product(s) {', '.join(str(p) for p in product_ids)}",
+            product_ids=product_ids
+        )
+
+
+def release_inventory_lines(db: Session, quantities_by_inventory_id: Dict[int, int]) -> None:
+    """
+    Return stock for order lines, keyed by inventory ID. Does not commit.
+
+    Used when an order is cancelled or item quantities are reduced.
+    """
+    quantities = {inv_id: qty for inv_id, qty in quantities_by_inventory_id.items() if qty > 0}
+    if not quantities:
+        return
+
+    _increment(db, InventoryModel.id, quantities)
+
+
+def reserve_order_inventory(store_id: int, product_items: List[dict], db: Optional[Session] = None) -> None:
+    """
+    Reserve stock for a checkout in its own committed transaction.
+
+    Used by the Square checkout, which must hold stock before charging the
+    card (the charge cannot be rolled back together with the DB transaction).
+    Call release_order_inventory() if the payment fails.
+
+    Raises:
+        InsufficientStockError: If any line does not have enough stock
+    """
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+
+    try:
+        reserve_inventory(db, store_id, product_items)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if close_db:
+            db.close()
+
+
+def release_order_inventory(store_id: int, product_items: List[dict], db: Optional[Session] = None) -> None:
+    """Release a reservation made by reserve_order_inventory() in its own transaction."""
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+
+    try:
+        release_inventory(db, store_id, product_items)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to release inventory reservation for store {store_id}: {e}")
+        raise
+    finally:
+        if close_db:
+            db.close()
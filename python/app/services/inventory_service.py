@@ -4,6 +4,16 @@ from app.db.models.store import StoreModel
 from app.db.models.product import ProductModel
 from typing import List, Optional
 from datetime import datetime
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.services.store_catalog_service import mark_catalogs_stale
+from app.services.inventory_sync_service import record_inventory_tombstones
+
+# Upper bound on rows per bulkUpsertInventory call
+BULK_UPSERT_MAX_ITEMS = 1000
+# Optional fields of a bulk upsert item; None means "leave unchanged"
+UPSERT_FIELDS = ("price", "quantity", "measurement", "unit", "is_listed", "is_available")
 
 def get_inventory_by_store(store_id: int, is_listed: Optional[bool] = None) -> List[InventoryModel]:
     """Get inventory items for a specific store with optional is_listed filter"""
@@ -67,6 +77,7 @@ def add_product_to_inventory(
             if unit is not None:
                 existing.unit = unit
             existing.updatedAt = datetime.utcnow()
+            mark_catalogs_stale(db, [store_id])
             db.commit()
             db.refresh(existing)
             return existing
@@ -81,6 +92,7 @@ def add_product_to_inventory(
                 unit=unit
             )
             db.add(inventory_item)
+            mark_catalogs_stale(db, [store_id])
             db.commit()
             db.refresh(inventory_item)
             return inventory_item
@@ -127,6 +139,7 @@ def update_inventory_price(store_id: int, product_id: int, price: Optional[float
             inventory_item.price = price
             
         inventory_item.updatedAt = datetime.utcnow()
+        mark_catalogs_stale(db, [store_id])
         db.commit()
         db.refresh(inventory_item)
         return inventory_item
@@ -145,7 +158,9 @@ def remove_from_inventory(store_id: int, product_id: int) -> bool:
         if not inventory_item:
             return False
             
+        record_inventory_tombstones(db, InventoryModel.id == inventory_item.id)
         db.delete(inventory_item)
+        mark_catalogs_stale(db, [store_id])
         db.commit()
         return True
     finally:
@@ -174,8 +189,114 @@ def update_inventory_item(
         if is_available is not None:
             inventory.is_available = is_available
             
+        inventory.updatedAt = datetime.utcnow()
+        mark_catalogs_stale(db, [inventory.storeId])
         db.commit()
         db.refresh(inventory)
         return inventory
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def _upsert_item_error(item: dict) -> Optional[str]:
+    if item.get("price") is not None and item["price"] < 0:
+        return "Price must not be negative"
+    if item.get("quantity") is not None and item["quantity"] < 0:
+        return "Quantity must not be negative"
+    return None
+
+def upsert_inventory_rows(db: Session, store_id: int, items: List[dict]) -> List[dict]:
+    """
+    Write bulk upsert items for an existing store in the caller's transaction. Does not commit.
+
+    See bulk_upsert_inventory for the item format and the returned outcomes.
+    """
+    results = [
+        {"product_id": item["product_id"], "inventory_id": None, "success": False, "created": False, "error": None}
+        for item in items
+    ]
+    if not items:
+        return results
+
+    product_ids = {item["product_id"] for item in items}
+    existing_ids = {
+        row.id for row in db.query(ProductModel.id).filter(ProductModel.id.in_(product_ids))
+    }
+
+    # Group valid rows by which fields they set so each group is one statement
+    groups = {}
+    row_index = {}
+    for index, item in enumerate(items):
+        product_id = item["product_id"]
+        if product_id not in existing_ids:
+            error = f"Product with ID {product_id} does not exist"
+        elif product_id in row_index:
+            # ON CONFLICT cannot touch the same row twice in one statement
+            error = f"Product with ID {product_id} appears more than once"
+        else:
+            error = _upsert_item_error(item)
+        if error:
+            results[index]["error"] = error
+            continue
+        row_index[product_id] = index
+        fields = tuple(field for field in UPSERT_FIELDS if item.get(field) is not None)
+        groups.setdefault(fields, []).append(item)
+
+    now = datetime.utcnow()
+    for fields, group in groups.items():
+        rows = [
+            {"storeId": store_id, "productId": item["product_id"], "updatedAt": now,
+             **{field: item[field] for field in fields}}
+            for item in group
+        ]
+        statement = insert(InventoryModel).values(rows)
+        statement = statement.on_conflict_do_update(
+            constraint="uq_inventory_storeId_productId",
+            set_={**{field: statement.excluded[field] for field in fields}, "updatedAt": now}
+        ).returning(
+            InventoryModel.id,
+            InventoryModel.productId,
+            # xmax is 0 only for freshly inserted tuples
+            literal_column("xmax = 0").label("inserted")
+        )
+        for row in db.execute(statement):
+            result = results[row_index[row.productId]]
+            result.update(inventory_id=row.id, success=True, created=row.inserted)
+
+    if groups:
+        mark_catalogs_stale(db, [store_id])
+    return results
+
+def bulk_upsert_inventory(store_id: int, items: List[dict]) -> List[dict]:
+    """
+    Add or update many products in a store's inventory at once.
+
+    Each item is a dict with ``product_id`` and any of UPSERT_FIELDS; fields
+    left as None keep their current value (or the column default for new rows),
+    as with add_product_to_inventory. All product IDs are validated with one
+    query and valid rows are written with INSERT ... ON CONFLICT (storeId,
+    productId) DO UPDATE, one statement per set of provided fields (usually
+    one), in a single transaction. Invalid rows are reported and skipped.
+
+    Returns:
+        One dict per item, in order, with product_id, inventory_id,
+        success, created and error
+
+    Raises:
+        ValueError: If the store does not exist or there are too many items
+    """
+    if len(items) > BULK_UPSERT_MAX_ITEMS:
+        raise ValueError(f"At most {BULK_UPSERT_MAX_ITEMS} items can be upserted at once")
+
+    db = SessionLocal()
+    try:
+        if not db.query(StoreModel.id).filter(StoreModel.id == store_id).first():
+            raise ValueError(f"Store with ID {store_id} does not exist")
+
+        results = upsert_inventory_rows(db, store_id, items)
+        db.commit()
+        return results
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
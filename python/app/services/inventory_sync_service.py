@@ -0,0 +1,207 @@
+"""
+Inventory delta sync.
+
+Clients keep a copy of a store's inventory and poll get_inventory_changes
+with the cursor from their previous call, receiving only the rows whose
+``updatedAt`` moved past it plus tombstones of removed rows. Every inventory
+write path stamps ``updatedAt``; deletions go through record_inventory_tombstones.
+
+``updatedAt`` is set before a transaction commits, so a slow transaction can
+commit a row stamped earlier than rows another client has already seen. The
+returned cursor therefore trails the newest change by SYNC_CURSOR_LAG; rows
+inside that window are sent again on the next call and clients apply changes
+idempotently, keyed by inventory ID.
+
+Tombstones are kept for TOMBSTONE_RETENTION_DAYS and purged daily by the
+scheduler started with setup_tombstone_purge_scheduler.
+"""
+import base64
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.db.session import SessionLocal
+from app.db.models.inventory import InventoryModel
+from app.db.models.inventory_tombstone import InventoryTombstoneModel
+from app.db.models.product import ProductModel
+
+logger = logging.getLogger(__name__)
+
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("INVENTORY_TOMBSTONE_RETENTION_DAYS", "30"))
+# Longest time an inventory write is expected to stay uncommitted
+SYNC_CURSOR_LAG = timedelta(seconds=int(os.getenv("INVENTORY_SYNC_CURSOR_LAG_SECONDS", "10")))
+
+# Background scheduler instance (initialized on startup)
+_scheduler: Optional[BackgroundScheduler] = None
+
+
+def encode_sync_cursor(timestamp: datetime) -> str:
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode("utf-8")).decode("ascii")
+
+
+def decode_sync_cursor(cursor: str) -> datetime:
+    """
+    Raises:
+        ValueError: If the cursor was not produced by encode_sync_cursor
+    """
+    try:
+        return datetime.fromisoformat(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def record_inventory_tombstones(db: Session, *criteria) -> None:
+    """
+    Record tombstones for the inventory rows matching ``criteria``, in the
+    caller's transaction, before the caller deletes them. Does not commit.
+    """
+    removed = select(
+        InventoryModel.id,
+        InventoryModel.storeId,
+        InventoryModel.productId,
+    ).where(*criteria)
+    db.execute(
+        insert(InventoryTombstoneModel).from_select(
+            ["inventoryId", "storeId", "productId"], removed
+        )
+    )
+
+
+def get_inventory_changes(store_id: int, cursor: Optional[str] = None) -> dict:
+    """
+    Get a store's inventory rows changed or removed since ``cursor``.
+
+    Without a cursor, or with one older than the tombstone retention period,
+    the full current inventory is returned with ``reset`` set: the client
+    should replace its copy rather than merge into it.
+
+    Returns:
+        Dict with ``changed`` (InventoryModel rows, product and category
+        loaded), ``removed`` (dicts with inventory_id, product_id and
+        removed_at), ``cursor`` for the next call and ``reset``
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    since = decode_sync_cursor(cursor) if cursor else None
+    now = datetime.utcnow()
+    reset = since is None or since < now - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(InventoryModel)
+            .options(joinedload(InventoryModel.product).joinedload(ProductModel.category))
+            .filter(InventoryModel.storeId == store_id)
+        )
+        if not reset:
+            query = query.filter(InventoryModel.updatedAt > since)
+        changed = query.order_by(InventoryModel.updatedAt, InventoryModel.id).all()
+
+        removed = []
+        if not reset:
+            removed = [
+                {
+                    "inventory_id": tombstone.inventoryId,
+                    "product_id": tombstone.productId,
+                    "removed_at": tombstone.deletedAt,
+                }
+                for tombstone in db.query(InventoryTombstoneModel).filter(
+                    InventoryTombstoneModel.storeId == store_id,
+                    InventoryTombstoneModel.deletedAt > since
+                ).order_by(InventoryTombstoneModel.deletedAt, InventoryTombstoneModel.id)
+            ]
+
+        stamps = [row.updatedAt for row in changed if row.updatedAt] + [row["removed_at"] for row in removed]
+        newest = max(stamps, default=since or now)
+        next_cursor = min(newest, now - SYNC_CURSOR_LAG)
+        if since is not None and not reset:
+            next_cursor = max(next_cursor, since)
+
+        return {
+            "changed": changed,
+            "removed": removed,
+            "cursor": encode_sync_cursor(next_cursor),
+            "reset": reset,
+        }
+    finally:
+        db.close()
+
+
+def purge_inventory_tombstones(
+    retention_days: int = TOMBSTONE_RETENTION_DAYS,
+    db: Optional[Session] = None
+) -> int:
+    """
+    Delete tombstones older than the retention period.
+
+    Returns:
+        Number of tombstones deleted
+    """
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+    try:
+        result = db.execute(
+            delete(InventoryTombstoneModel).where(
+                InventoryTombstoneModel.deletedAt < datetime.utcnow() - timedelta(days=retention_days)
+            )
+        )
+        db.commit()
+        if result.rowcount:
+            logger.info(f"Purged {result.rowcount} inventory tombstones")
+        return result.rowcount
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if close_db:
+            db.close()
+
+
+def _tombstone_purge_job() -> None:
+    try:
+        purge_inventory_tombstones()
+    except Exception as e:
+        logger.error(f"Inventory tombstone purge failed: {e}")
+
+
+def setup_tombstone_purge_scheduler():
+    """
+    Configure and start the APScheduler background scheduler that purges expired tombstones.
+
+    Runs purge_inventory_tombstones daily at 03:30 UTC. The purge is a single
+    idempotent DELETE, so every worker may run it.
+    """
+    global _scheduler
+
+    if _scheduler is not None:
+        logger.warning("Inventory tombstone purge scheduler already running")
+        return
+
+    _scheduler = BackgroundScheduler(
+        job_defaults={
+            'coalesce': True,  # Combine multiple missed runs into one
+            'max_instances': 1  # Only one instance of job can run at a time
+        },
+        timezone='UTC'
+    )
+
+    _scheduler.add_job(
+        _tombstone_purge_job,
+        trigger='cron',
+        hour=3,
+        minute=30,
+        id='inventory_tombstone_purge',
+        replace_existing=True
+    )
+
+    _scheduler.start()
+
+    logger.info("Inventory tombstone purge scheduler started (daily at 03:30 UTC)")
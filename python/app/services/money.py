@@ -0,0 +1,73 @@
+"""
+Money as integer cents.
+
+Amounts are carried through checkout as ints (``Cents``) and converted from
+the float dollars stored on inventory, fees and the API at the edges, so
+sums are exact and every rounding happens once, in a defined way:
+
+- Dollars -> cents: the amount's shortest decimal form (``repr``) rounded
+  half up, so 2.675 is 268 cents although the float is slightly below it
+- Tax: subtotal cents x percentage, rounded half up to a cent
+- Totals: plain integer sums
+"""
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional, Union
+
+Cents = int
+
+ROUNDING = ROUND_HALF_UP
+_ONE = Decimal(1)
+
+
+def to_cents(amount: Union[float, int, Decimal, str]) -> Cents:
+    """Dollar amount to cents, rounding half up."""
+    return int((Decimal(repr(amount) if isinstance(amount, float) else amount) * 100).quantize(_ONE, rounding=ROUNDING))
+
+
+def optional_cents(amount: Optional[Union[float, int, Decimal, str]]) -> Optional[Cents]:
+    return None if amount is None else to_cents(amount)
+
+
+def from_cents(cents: Cents) -> float:
+    """Cents to float dollars, for the API and the float columns."""
+    return cents / 100
+
+
+def percentage_of(cents: Cents, percentage: float) -> Cents:
+    """``percentage`` percent of ``cents``, rounded half up to a cent."""
+    return int((Decimal(cents) * Decimal(repr(float(percentage))) / 100).quantize(_ONE, rounding=ROUNDING))
+
+
+def rescale(cents: Cents, quantity: int, new_quantity: int) -> Cents:
+    """
+    A line amount for ``quantity`` units scaled to ``new_quantity`` units,
+    rounded half up; exact when the amount is a whole number of cents per unit.
+    """
+    if quantity <= 0:
+        return 0
+    return int((Decimal(cents) * new_quantity / quantity).quantize(_ONE, rounding=ROUNDING))
+
+
+@dataclass(frozen=True)
+class OrderAmounts:
+    """Amounts of one order, in cents."""
+    subtotal: Cents
+    delivery_fee: Cents
+    tax: Cents
+    tip: Cents
+
+    @property
+    def total(self) -> Cents:
+        return self.subtotal + self.delivery_fee + self.tax + self.tip
+
+    def as_dollars(self) -> dict:
+        """The amounts as calculate_order_amount returns them (dollars, plus total_cents)."""
+        return {
+            "subtotal": from_cents(self.subtotal),
+            "delivery_fee": from_cents(self.delivery_fee),
+            "tax_amount": from_cents(self.tax),
+            "tip_amount": from_cents(self.tip),
+            "total": from_cents(self.total),
+            "total_cents": self.total,
+        }
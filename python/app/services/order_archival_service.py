@@ -0,0 +1,261 @@
+"""
+Order archival and partition maintenance.
+
+``orders`` and ``order_items`` are partitioned by archive flag and creation
+time (see migration a028aa5ad958). This service:
+
+- creates upcoming monthly active partitions and yearly archive partitions
+  ahead of time, so new rows never land in the default partitions
+- archives closed (DELIVERED/CANCELLED) orders older than a threshold by
+  flipping ``isArchived``, which moves the rows into the archive partitions
+
+Both jobs are idempotent and run daily from a background scheduler. With
+several application workers, only the worker holding the maintenance
+advisory lock starts the scheduler.
+"""
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import select, text, update
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal, engine
+from app.db.models.order import OrderModel, OrderStatus
+from app.db.models.order_item import OrderItemModel
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("orders", "order_items")
+CLOSED_STATUSES = [OrderStatus.DELIVERED, OrderStatus.CANCELLED]
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", "1000"))
+ACTIVE_MONTHS_AHEAD = 3
+
+# Session-level advisory lock held by the one worker that runs maintenance
+MAINTENANCE_LOCK_KEY = 2_902_801
+
+# Background scheduler instance (initialized on startup)
+_scheduler: Optional[BackgroundScheduler] = None
+# Connection holding MAINTENANCE_LOCK_KEY, kept open while the scheduler runs
+_lock_connection = None
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def ensure_order_partitions(months_ahead: int = ACTIVE_MONTHS_AHEAD, db: Optional[Session] = None) -> List[str]:
+    """
+    Create missing partitions for the current period and the coming ones.
+
+    Args:
+        months_ahead: How many future monthly active partitions to keep ready
+        db: Optional database session
+
+    Returns:
+        Names of the partitions that were checked/created
+    """
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+
+    today = datetime.utcnow().date()
+    this_month = today.replace(day=1)
+    partitions = []
+
+    try:
+        for table in PARTITIONED_TABLES:
+            for offset in range(months_ahead + 1):
+                start = _add_months(this_month, offset)
+                end = _add_months(start, 1)
+                partitions.append((f"{table}_active_p{start:%Y%m}", f"{table}_active", start, end))
+
+            for year in (today.year, today.year + 1):
+                partitions.append((f"{table}_archive_p{year}", f"{table}_archive", date(year, 1, 1), date(year + 1, 1, 1)))
+
+        for name, parent, start, end in partitions:
+            # Identifiers are generated from constants above, values are dates
+            db.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{parent}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+        db.commit()
+        return [name for name, _, _, _ in partitions]
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if close_db:
+            db.close()
+
+
+def archive_closed_orders(
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    db: Optional[Session] = None
+) -> int:
+    """
+    Move closed orders older than the threshold (and their items) to the archive partitions.
+
+    Works in batches, one short transaction per batch, so it never holds locks
+    on a large number of active rows. Archived orders stay visible to every
+    query on ``orders``; only queries filtering on ``isArchived = false`` skip them.
+
+    Args:
+        older_than_days: Archive orders created more than this many days ago
+        batch_size: Orders moved per transaction
+        db: Optional database session
+
+    Returns:
+        Number of orders archived
+    """
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    archived = 0
+
+    try:
+        while True:
+            batch = (
+                db.query(OrderModel.id)
+                .filter(
+                    OrderModel.isArchived.is_(False),
+                    OrderModel.status.in_(CLOSED_STATUSES),
+                    OrderModel.createdAt < cutoff
+                )
+                .order_by(OrderModel.id)
+                .limit(batch_size)
+                .subquery()
+            )
+            order_ids = [
+                row[0] for row in db.execute(
+                    update(OrderModel)
+                    .where(OrderModel.id.in_(select(batch.c.id)), OrderModel.isArchived.is_(False))
+                    .values(isArchived=True)
+                    .returning(OrderModel.id)
+                    .execution_options(synchronize_session=False)
+                )
+            ]
+            if not order_ids:
+                break
+
+            db.execute(
+                update(OrderItemModel)
+                .where(OrderItemModel.orderId.in_(order_ids), OrderItemModel.isArchived.is_(False))
+                .values(isArchived=True)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            archived += len(order_ids)
+
+        if archived:
+            logger.info(f"Archived {archived} closed orders created before {cutoff:%Y-%m-%d}")
+        return archived
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if close_db:
+            db.close()
+
+
+def run_order_maintenance() -> Dict[str, int]:
+    """
+    Scheduled job: prepare upcoming partitions, then archive old closed orders.
+    """
+    result = {"partitions": 0, "archived": 0}
+    try:
+        result["partitions"] = len(ensure_order_partitions())
+    except Exception as e:
+        logger.error(f"Order partition maintenance failed: {e}")
+    try:
+        result["archived"] = archive_closed_orders()
+    except Exception as e:
+        logger.error(f"Order archival failed: {e}")
+    return result
+
+
+def acquire_maintenance_lock() -> bool:
+    """
+    Try to become the one process that runs order maintenance.
+
+    Takes a session-level advisory lock on a dedicated connection that stays
+    open for the life of the process. Postgres releases the lock when the
+    process exits, and the next worker to start takes it over.
+
+    Returns:
+        True if this process now holds the lock
+    """
+    global _lock_connection
+
+    if _lock_connection is not None:
+        return True
+
+    connection = engine.connect()
+    try:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        ).scalar()
+        # The lock outlives the transaction; do not leave the connection idle in one
+        connection.commit()
+    except Exception:
+        connection.close()
+        raise
+
+    if not acquired:
+        connection.close()
+        return False
+    _lock_connection = connection
+    return True
+
+
+def setup_order_maintenance_scheduler():
+    """
+    Configure and start the APScheduler background scheduler for order maintenance.
+
+    Runs run_order_maintenance daily at 03:00 UTC, plus once shortly after startup.
+    Only started in the worker that acquires the maintenance lock.
+    """
+    global _scheduler
+
+    if _scheduler is not None:
+        logger.warning("Order maintenance scheduler already running")
+        return
+
+    try:
+        if not acquire_maintenance_lock():
+            logger.info("Order maintenance scheduler runs in another worker")
+            return
+    except Exception as e:
+        logger.error(f"Order maintenance scheduler not started, could not take the maintenance lock: {e}")
+        return
+
+    _scheduler = BackgroundScheduler(
+        job_defaults={
+            'coalesce': True,  # Combine multiple missed runs into one
+            'max_instances': 1  # Only one instance of job can run at a time
+        },
+        timezone='UTC'
+    )
+
+    _scheduler.add_job(
+        run_order_maintenance,
+        trigger='cron',
+        hour=3,
+        id='order_maintenance',
+        replace_existing=True,
+        next_run_time=datetime.utcnow() + timedelta(minutes=1)
+    )
+
+    _scheduler.start()
+
+    logger.info("Order maintenance scheduler started (daily at 03:00 UTC)")
@@ -0,0 +1,202 @@
+"""
+Streaming order export (CSV / NDJSON) for accounting.
+
+Orders are read through a server-side cursor in batches (``yield_per``) with
+their payment and current items loaded per batch, encoded incrementally and
+optionally gzip-compressed on the fly, so memory stays constant no matter
+how many orders are exported.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.db.session import SessionLocal
+from app.db.models.order import OrderModel, OrderStatus
+from app.db.models.order_item import OrderItemModel
+from app.services.order_metrics_service import to_naive_utc
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_BATCH_SIZE = 500
+# Encoded output is flushed to the client in chunks of roughly this size
+CHUNK_SIZE = 64 * 1024
+
+ORDER_FIELDS = [
+    "order_id", "display_code", "created_at", "store_id", "customer_id", "status", "order_type",
+    "subtotal", "delivery_fee", "tip_amount", "tax_amount", "order_total",
+    "payment_type", "payment_status", "payment_amount", "square_payment_id",
+    "cancelled_at", "cancel_message",
+]
+ITEM_FIELDS = ["item_id", "product_id", "product_name", "quantity", "item_amount"]
+CSV_FIELDS = ORDER_FIELDS + ITEM_FIELDS
+
+
+def _enum_value(value):
+    return value.value if value is not None else None
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _order_record(order: OrderModel) -> dict:
+    payment = order.payment
+    return {
+        "order_id": order.id,
+        "display_code": order.display_code,
+        "created_at": _isoformat(order.createdAt),
+        "store_id": order.storeId,
+        "customer_id": order.createdByUserId,
+        "status": _enum_value(order.status),
+        "order_type": _enum_value(order.type),
+        "subtotal": order.totalAmount,
+        "delivery_fee": order.deliveryFee,
+        "tip_amount": order.tipAmount,
+        "tax_amount": order.taxAmount,
+        "order_total": order.orderTotalAmount,
+        "payment_type": _enum_value(payment.type) if payment else None,
+        "payment_status": _enum_value(payment.status) if payment else None,
+        "payment_amount": payment.amount if payment else None,
+        "square_payment_id": payment.square_payment_id if payment else None,
+        "cancelled_at": _isoformat(order.cancelledAt),
+        "cancel_message": order.cancelMessage,
+    }
+
+
+def _item_record(item: OrderItemModel) -> dict:
+    return {
+        "item_id": item.id,
+        "product_id": item.productId,
+        "product_name": item.product.name if item.product else None,
+        "quantity": item.quantity,
+        "item_amount": item.orderAmount,
+    }
+
+
+def parse_export_statuses(statuses: Optional[List[str]]) -> Optional[List[OrderStatus]]:
+    """
+    Raises:
+        ValueError: If a status is not an OrderStatus name
+    """
+    if not statuses:
+        return None
+    invalid = [status for status in statuses if status not in OrderStatus.__members__]
+    if invalid:
+        raise ValueError(f"Invalid order status: {invalid}. Allowed: {list(OrderStatus.__members__.keys())}")
+    return [OrderStatus[status] for status in statuses]
+
+
+def iter_export_orders(
+    store_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    statuses: Optional[List[str]] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[OrderModel]:
+    """
+    Stream matching orders, oldest first, with payment and current items loaded.
+
+    Uses its own session, held open until the iterator is exhausted or closed.
+
+    Args:
+        store_id: Optional store to restrict to
+        start_date: Orders created at or after this time
+        end_date: Orders created before this time
+        statuses: Optional OrderStatus names to restrict to
+        batch_size: Rows fetched from the cursor at a time
+    """
+    status_filter = parse_export_statuses(statuses)
+
+    db = SessionLocal()
+    try:
+        query = db.query(OrderModel).options(
+            joinedload(OrderModel.payment),
+            selectinload(OrderModel.order_items.and_(OrderItemModel.isCurrent.is_(True)))
+            .joinedload(OrderItemModel.product),
+        )
+        if store_id is not None:
+            query = query.filter(OrderModel.storeId == store_id)
+        if start_date is not None:
+            query = query.filter(OrderModel.createdAt >= to_naive_utc(start_date))
+        if end_date is not None:
+            query = query.filter(OrderModel.createdAt < to_naive_utc(end_date))
+        if status_filter:
+            query = query.filter(OrderModel.status.in_(status_filter))
+
+        query = query.order_by(OrderModel.createdAt, OrderModel.id).execution_options(stream_results=True)
+        for order in query.yield_per(batch_size):
+            yield order
+    finally:
+        db.close()
+
+
+def _encode_csv(orders: Iterator[OrderModel]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for order in orders:
+        record = _order_record(order)
+        items = sorted(order.order_items, key=lambda item: item.id)
+        if not items:
+            writer.writerow(record)
+        for item in items:
+            writer.writerow({**record, **_item_record(item)})
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _encode_ndjson(orders: Iterator[OrderModel]) -> Iterator[str]:
+    lines = []
+    size = 0
+    for order in orders:
+        record = _order_record(order)
+        record["items"] = [_item_record(item) for item in sorted(order.order_items, key=lambda item: item.id)]
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(lines)
+            lines, size = [], 0
+    yield "".join(lines)
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_order_export(
+    export_format: str = "csv",
+    compress: bool = False,
+    **filters
+) -> Iterator[bytes]:
+    """
+    Encode the orders matching ``filters`` (see iter_export_orders) as CSV or NDJSON bytes.
+
+    CSV has one row per current order item (orders without items get one row
+    with empty item columns); NDJSON has one object per order with an
+    ``items`` array.
+
+    Raises:
+        ValueError: If the format or a status filter is invalid
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format: {export_format}. Allowed: {list(EXPORT_FORMATS)}")
+    # Validate eagerly: the orders generator only runs once the response has started
+    parse_export_statuses(filters.get("statuses"))
+
+    orders = iter_export_orders(**filters)
+    encode = _encode_csv if export_format == "csv" else _encode_ndjson
+    chunks = (text.encode("utf-8") for text in encode(orders) if text)
+    return _gzip(chunks) if compress else chunks
@@ -0,0 +1,174 @@
+"""
+Idempotency keys for order-creation mutations.
+
+Clients send an idempotency key with each checkout attempt and reuse it when
+retrying. The key -> order mapping is stored in ``order_idempotency_keys``
+(unique key, written in the same transaction as the order) and cached in a
+bounded in-process LRU, so a retry costs one dictionary lookup (or one
+indexed query on a cold cache) instead of re-running the checkout pipeline.
+
+Each key also stores a hash of the request it was first used with; reusing
+the key for a different request is rejected instead of returning the first
+order.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models.order_idempotency_key import OrderIdempotencyKeyModel
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+CACHE_SIZE = int(os.getenv("ORDER_IDEMPOTENCY_CACHE_SIZE", "10000"))
+
+# (user_id, order_id, request_hash)
+KeyEntry = Tuple[int, int, Optional[str]]
+
+
+class IdempotencyConflictError(ValueError):
+    """Raised when an idempotency key is reused for a different request."""
+    def __init__(self, message: str = "This idempotency key was already used for a different request"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class _LRUCache:
+    """Thread-safe bounded mapping of idempotency key -> (user_id, order_id, request_hash)."""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, KeyEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[KeyEntry]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: KeyEntry) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _LRUCache(CACHE_SIZE)
+
+
+def validate_idempotency_key(key: str) -> None:
+    """
+    Raises:
+        ValueError: If the key is empty or too long
+    """
+    if not key or not key.strip():
+        raise ValueError("Idempotency key must not be empty")
+    if len(key) > MAX_KEY_LENGTH:
+        raise ValueError(f"Idempotency key must be at most {MAX_KEY_LENGTH} characters")
+
+
+def hash_order_request(operation: str, request: dict) -> str:
+    """SHA-256 of an order request (JSON with sorted keys), stored with its key."""
+    payload = json.dumps({"operation": operation, "request": request}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def find_idempotent_order_id(
+    key: str,
+    user_id: int,
+    request_hash: Optional[str] = None,
+    db: Optional[Session] = None
+) -> Optional[int]:
+    """
+    Look up the order already created for an idempotency key.
+
+    Args:
+        key: Client-supplied idempotency key
+        user_id: User making the request
+        request_hash: Hash of the request (see hash_order_request); checked against
+            the hash stored with the key when both are known
+        db: Optional database session
+
+    Returns:
+        The order ID, or None if the key has not been used yet
+
+    Raises:
+        ValueError: If the key is invalid or was used by a different user
+        IdempotencyConflictError: If the key was used for a different request
+    """
+    validate_idempotency_key(key)
+
+    entry = _cache.get(key)
+    if entry is None:
+        close_db = False
+        if db is None:
+            db = SessionLocal()
+            close_db = True
+        try:
+            row = db.query(
+                OrderIdempotencyKeyModel.userId,
+                OrderIdempotencyKeyModel.orderId,
+                OrderIdempotencyKeyModel.requestHash
+            ).filter(
+                OrderIdempotencyKeyModel.key == key
+            ).first()
+        finally:
+            if close_db:
+                db.close()
+
+        if row is None:
+            return None
+        entry = (row.userId, row.orderId, row.requestHash)
+        _cache.put(key, entry)
+
+    owner_id, order_id, stored_hash = entry
+    if owner_id != user_id:
+        logger.warning(f"Idempotency key reused across users (owner {owner_id}, requester {user_id})")
+        raise ValueError("This idempotency key has already been used")
+    # Keys recorded before request hashes were stored have none to compare
+    if request_hash and stored_hash and request_hash != stored_hash:
+        raise IdempotencyConflictError()
+    return order_id
+
+
+def record_idempotency_key(
+    db: Session,
+    key: str,
+    user_id: int,
+    order_id: int,
+    operation: str,
+    request_hash: Optional[str] = None
+) -> None:
+    """
+    Store the key for a newly created order in the caller's transaction. Does not commit.
+
+    A concurrent request with the same key makes the commit fail with an
+    IntegrityError; the caller should roll back and replay the winning order.
+    """
+    validate_idempotency_key(key)
+    db.add(OrderIdempotencyKeyModel(
+        key=key,
+        userId=user_id,
+        orderId=order_id,
+        operation=operation,
+        requestHash=request_hash
+    ))
+
+
+def remember_idempotency_key(key: str, user_id: int, order_id: int, request_hash: Optional[str] = None) -> None:
+    """Cache the key after the order transaction committed."""
+    _cache.put(key, (user_id, order_id, request_hash))
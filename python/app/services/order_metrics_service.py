@@ -0,0 +1,322 @@
+"""
+Order metrics rollup service.
+
+Maintains the ``order_metrics`` table (store x hour x status x order type)
+incrementally from the order write paths, so dashboards read a few small
+rollup rows instead of scanning ``orders``.
+
+Writers call record_order_created / record_status_change /
+record_amount_change with the session that writes the order, before it
+commits, so the rollup is exactly as consistent as the orders themselves.
+Counters are only ever changed by an atomic upsert (``n = n + delta``);
+status and amount changes must be recorded while holding the order's row
+lock (order_service.lock_order), so the old values a delta is computed
+from cannot change underneath it.
+backfill_order_metrics() rebuilds the rollup from ``orders`` when needed.
+"""
+import enum
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import String, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models.order import OrderModel, OrderStatus
+from app.db.models.order_metric import OrderMetricModel
+
+UNKNOWN = "UNKNOWN"
+PERIOD_GRANULARITIES = ("hour", "day", "week", "month")
+RECENT_ORDERS_WINDOW = timedelta(hours=24)
+
+# Orders in these statuses are counted but excluded from revenue
+NON_REVENUE_STATUSES = {OrderStatus.CANCELLED.value}
+
+MetricKey = Tuple[int, datetime, str, str]
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Order timestamps are stored as naive UTC; convert timezone-aware input to match."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def bucket_start(value: Optional[datetime]) -> datetime:
+    """Truncate a timestamp to the start of its hourly bucket."""
+    return to_naive_utc(value or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+
+
+def _enum_value(value) -> str:
+    if value is None:
+        return UNKNOWN
+    return value.value if isinstance(value, enum.Enum) else str(value)
+
+
+def metric_key(order: OrderModel, status=None) -> MetricKey:
+    """Rollup row key for an order, optionally under a different status."""
+    return (
+        order.storeId,
+        bucket_start(order.createdAt),
+        _enum_value(status if status is not None else order.status),
+        _enum_value(order.type),
+    )
+
+
+def apply_metric_deltas(db: Session, deltas: Iterable[Tuple[MetricKey, int, float, float]]) -> None:
+    """
+    Add (count, subtotal, revenue) deltas to rollup rows in one upsert.
+
+    Deltas for the same row are summed first (an upsert cannot touch the same
+    row twice) and rows are written in key order so concurrent writers never
+    deadlock. Does not commit.
+    """
+    totals: Dict[MetricKey, list] = defaultdict(lambda: [0, 0.0, 0.0])
+    for key, count, subtotal, revenue in deltas:
+        total = totals[key]
+        total[0] += count
+        total[1] += subtotal or 0.0
+        total[2] += revenue or 0.0
+
+    rows = [
+        {
+            "storeId": store_id,
+            "bucketStart": bucket,
+            "status": status,
+            "orderType": order_type,
+            "orderCount": count,
+            "subtotalAmount": subtotal,
+            "revenueAmount": revenue,
+        }
+        for (store_id, bucket, status, order_type), (count, subtotal, revenue) in sorted(totals.items())
+        if count or subtotal or revenue
+    ]
+    if not rows:
+        return
+
+    stmt = insert(OrderMetricModel).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_order_metrics_bucket",
+        set_={
+            "orderCount": OrderMetricModel.orderCount + stmt.excluded.orderCount,
+            "subtotalAmount": OrderMetricModel.subtotalAmount + stmt.excluded.subtotalAmount,
+            "revenueAmount": OrderMetricModel.revenueAmount + stmt.excluded.revenueAmount,
+        }
+    )
+    db.execute(stmt)
+
+
+def order_created_deltas(order: OrderModel) -> List[Tuple[MetricKey, int, float, float]]:
+    return [(metric_key(order), 1, order.totalAmount, order.orderTotalAmount)]
+
+
+def status_change_deltas(order: OrderModel, old_status) -> List[Tuple[MetricKey, int, float, float]]:
+    """Move an order from its old status row to its current status row."""
+    if _enum_value(old_status) == _enum_value(order.status):
+        return []
+    return [
+        (metric_key(order, old_status), -1, -(order.totalAmount or 0.0), -(order.orderTotalAmount or 0.0)),
+        (metric_key(order), 1, order.totalAmount, order.orderTotalAmount),
+    ]
+
+
+def record_order_created(db: Session, order: OrderModel) -> None:
+    """Count a newly created (flushed) order. Does not commit."""
+    apply_metric_deltas(db, order_created_deltas(order))
+
+
+def record_status_change(db: Session, order: OrderModel, old_status) -> None:
+    """Record that ``order`` moved from ``old_status`` to its current status. Does not commit."""
+    apply_metric_deltas(db, status_change_deltas(order, old_status))
+
+
+def record_amount_change(db: Session, order: OrderModel, old_subtotal: Optional[float], old_total: Optional[float]) -> None:
+    """Record a change of an order's amounts under its current status. Does not commit."""
+    apply_metric_deltas(db, [(
+        metric_key(order),
+        0,
+        (order.totalAmount or 0.0) - (old_subtotal or 0.0),
+        (order.orderTotalAmount or 0.0) - (old_total or 0.0),
+    )])
+
+
+def backfill_order_metrics(since: Optional[datetime] = None, db: Optional[Session] = None) -> int:
+    """
+    Rebuild the rollup from ``orders``.
+
+    Args:
+        since: Only rebuild buckets from this time onwards (default: everything)
+        db: Optional database session
+
+    Returns:
+        Number of rollup rows written
+    """
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+
+    try:
+        # Block concurrent rollup writers until the rebuild commits, so an order
+        # written meanwhile is neither lost nor counted twice
+        db.execute(text("LOCK TABLE order_metrics IN EXCLUSIVE MODE"))
+
+        delete_query = db.query(OrderMetricModel)
+        if since is not None:
+            delete_query = delete_query.filter(OrderMetricModel.bucketStart >= bucket_start(since))
+        delete_query.delete(synchronize_session=False)
+
+        bucket = func.date_trunc("hour", OrderModel.createdAt)
+        status = cast(OrderModel.status, String)
+        order_type = func.coalesce(cast(OrderModel.type, String), UNKNOWN)
+        source = select(
+            OrderModel.storeId,
+            bucket,
+            status,
+            order_type,
+            func.count(OrderModel.id),
+            # Exact sums of the integer cents columns (every order has them since a7d3e9c1f508)
+            func.coalesce(func.sum(OrderModel.totalAmountCents), 0) / 100.0,
+            func.coalesce(func.sum(OrderModel.orderTotalAmountCents), 0) / 100.0,
+        ).group_by(OrderModel.storeId, bucket, status, order_type)
+        if since is not None:
+            source = source.where(OrderModel.createdAt >= bucket_start(since))
+
+        result = db.execute(
+            insert(OrderMetricModel).from_select(
+                ["storeId", "bucketStart", "status", "orderType", "orderCount", "subtotalAmount", "revenueAmount"],
+                source
+            )
+        )
+        db.commit()
+        return result.rowcount
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if close_db:
+            db.close()
+
+
+def _filtered(query, store_id: Optional[int], start: Optional[datetime], end: Optional[datetime]):
+    if store_id is not None:
+        query = query.filter(OrderMetricModel.storeId == store_id)
+    if start is not None:
+        query = query.filter(OrderMetricModel.bucketStart >= bucket_start(start))
+    if end is not None:
+        query = query.filter(OrderMetricModel.bucketStart < to_naive_utc(end))
+    return query
+
+
+def _summarize(rows) -> dict:
+    """Fold (status, type, count, subtotal, revenue) rows into a summary dict."""
+    summary = {
+        "total_orders": 0,
+        "subtotal_amount": 0.0,
+        "revenue_amount": 0.0,
+        "orders_by_status": defaultdict(int),
+        "orders_by_type": defaultdict(int),
+    }
+    for status, order_type, count, subtotal, revenue in rows:
+        count = int(count or 0)
+        if count:
+            summary["total_orders"] += count
+            summary["orders_by_status"][status] += count
+            summary["orders_by_type"][order_type] += count
+        if status not in NON_REVENUE_STATUSES:
+            summary["subtotal_amount"] += subtotal or 0.0
+            summary["revenue_amount"] += revenue or 0.0
+
+    summary["subtotal_amount"] = round(summary["subtotal_amount"], 2)
+    summary["revenue_amount"] = round(summary["revenue_amount"], 2)
+    summary["orders_by_status"] = dict(summary["orders_by_status"])
+    summary["orders_by_type"] = dict(summary["orders_by_type"])
+    return summary
+
+
+def get_order_metrics_summary(
+    store_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Optional[Session] = None
+) -> dict:
+    """
+    Order counts and revenue from the rollup, optionally for one store and period.
+
+    Revenue and subtotal exclude cancelled orders.
+
+    Returns:
+        {"total_orders", "subtotal_amount", "revenue_amount", "orders_by_status", "orders_by_type"}
+    """
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+
+    try:
+        query = db.query(
+            OrderMetricModel.status,
+            OrderMetricModel.orderType,
+            func.sum(OrderMetricModel.orderCount),
+            func.sum(OrderMetricModel.subtotalAmount),
+            func.sum(OrderMetricModel.revenueAmount),
+        )
+        query = _filtered(query, store_id, start, end)
+        return _summarize(query.group_by(OrderMetricModel.status, OrderMetricModel.orderType).all())
+    finally:
+        if close_db:
+            db.close()
+
+
+def get_order_metrics_by_period(
+    start: datetime,
+    end: datetime,
+    granularity: str = "day",
+    store_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Order counts and revenue per hour/day/week/month from the rollup.
+
+    Args:
+        start: Start of the range (inclusive)
+        end: End of the range (exclusive)
+        granularity: One of "hour", "day", "week", "month"
+        store_id: Optional store to restrict to (default: all stores)
+
+    Returns:
+        List of summaries (see get_order_metrics_summary) with "period_start", oldest first
+
+    Raises:
+        ValueError: If the granularity or range is invalid
+    """
+    if granularity not in PERIOD_GRANULARITIES:
+        raise ValueError(f"Invalid granularity: {granularity}. Allowed: {list(PERIOD_GRANULARITIES)}")
+    if to_naive_utc(end) <= to_naive_utc(start):
+        raise ValueError("end must be after start")
+
+    db = SessionLocal()
+    try:
+        period = func.date_trunc(granularity, OrderMetricModel.bucketStart).label("period_start")
+        query = db.query(
+            period,
+            OrderMetricModel.status,
+            OrderMetricModel.orderType,
+            func.sum(OrderMetricModel.orderCount),
+            func.sum(OrderMetricModel.subtotalAmount),
+            func.sum(OrderMetricModel.revenueAmount),
+        )
+        query = _filtered(query, store_id, start, end)
+        rows = query.group_by(period, OrderMetricModel.status, OrderMetricModel.orderType).order_by(period).all()
+
+        rows_by_period = defaultdict(list)
+        for period_start, *row in rows:
+            rows_by_period[period_start].append(row)
+
+        return [
+            {"period_start": period_start, **_summarize(period_rows)}
+            for period_start, period_rows in rows_by_period.items()
+        ]
+    finally:
+        db.close()
@@ -1,6 +1,10 @@
-from typing import List, Optional
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, joinedload, selectinload
 
 from app.db.session import SessionLocal
 from app.db.models.order import OrderModel, OrderStatus
@@ -8,13 +12,144 @@ from app.db.models.order_item import OrderItemModel
 from app.db.models.product import ProductModel
 from app.db.models.address import AddressModel
 from app.db.models.inventory import InventoryModel
-from app.db.models.store_location_code import StoreLocationCodeModel
 from app.db.models.pickup_address import PickupAddressModel
 from app.db.models.fee_type import FeeType
 from app.db.models.payment import PaymentModel, PaymentType, PaymentStatus
+from app.db.models.delivery import DeliveryModel
 from app.db.models.user import UserModel
-from app.db.models.store import StoreModel
 from app.services.validation_service import validate_delivery_pincode
+from app.services.checkout_config_service import DEFAULT_LOCATION_CODE, get_checkout_config
+from app.services.money import from_cents, optional_cents, rescale, to_cents
+from app.services.order_metrics_service import (
+    apply_metric_deltas,
+    get_order_metrics_summary,
+    record_amount_change,
+    record_order_created,
+    record_status_change,
+    status_change_deltas,
+    to_naive_utc,
+    RECENT_ORDERS_WINDOW,
+)
+from app.services.inventory_reservation_service import (
+    aggregate_product_quantities,
+    reserve_inventory,
+    release_inventory_lines,
+    release_order_inventory,
+    reserve_inventory_lines,
+)
+from app.services.outbox_service import enqueue_delivery_assigned, enqueue_order_created, enqueue_status_change
+from app.services.order_idempotency_service import (
+    find_idempotent_order_id,
+    hash_order_request,
+    record_idempotency_key,
+    remember_idempotency_key,
+)
+
+STORE_ORDER_BOARD_DEFAULT_LIMIT = 50
+STORE_ORDER_BOARD_MAX_LIMIT = 200
+BULK_STATUS_UPDATE_MAX_ORDERS = 200
+
+
+def _location_code(store_id: int, address: Optional[str]) -> str:
+    """Order display code prefix for the city of ``address`` (from the cached checkout config)."""
+    config = get_checkout_config(store_id)
+    return config.location_code(address) if config else DEFAULT_LOCATION_CODE
+
+
+def order_amount_columns(
+    total_amount: float,
+    order_total_amount: float,
+    delivery_fee: Optional[float] = None,
+    tip_amount: Optional[float] = None,
+    tax_amount: Optional[float] = None
+) -> dict:
+    """OrderModel amount columns, in dollars rounded to the cent and in integer cents."""
+    columns = {}
+    for name, amount in (
+        ("totalAmount", total_amount),
+        ("orderTotalAmount", order_total_amount),
+        ("deliveryFee", delivery_fee),
+        ("tipAmount", tip_amount),
+        ("taxAmount", tax_amount),
+    ):
+        cents = optional_cents(amount)
+        columns[name] = None if cents is None else from_cents(cents)
+        columns[f"{name}Cents"] = cents
+    return columns
+
+
+def line_amount_columns(unit_price: float, quantity: int) -> dict:
+    """OrderItemModel amount columns for ``quantity`` units at ``unit_price``."""
+    cents = to_cents(unit_price) * quantity
+    return {"orderAmount": from_cents(cents), "orderAmountCents": cents}
+
+
+def payment_amount_columns(amount: float) -> dict:
+    """PaymentModel amount columns."""
+    cents = to_cents(amount)
+    return {"amount": from_cents(cents), "amount_cents": cents}
+
+
+@dataclass(frozen=True)
+class OrderTransition:
+    """Rule for moving an order into a status (see ORDER_TRANSITIONS)"""
+    allowed_from: FrozenSet[OrderStatus]
+    requires_driver: bool = False  # driver_id and schedule_time required; (re)assigns the delivery driver
+    keeps_driver: bool = False  # Otherwise the delivery's driver is unassigned
+    releases_stock: bool = False  # Give the reserved stock of the current items back
+    records_cancellation: bool = False  # Store cancel message, user and time
+
+
+_OPEN = frozenset({OrderStatus.PENDING, OrderStatus.ORDER_PLACED, OrderStatus.ACCEPTED})
+_WITH_DRIVER = frozenset({OrderStatus.READY_FOR_DELIVERY, OrderStatus.SCHEDULED})  # Delivery in progress
+
+# Target status -> rule. DELIVERED and CANCELLED are terminal (no rule lists them
+# in allowed_from); PENDING is only ever the initial status.
+ORDER_TRANSITIONS: Dict[OrderStatus, OrderTransition] = {
+    OrderStatus.PENDING: OrderTransition(allowed_from=frozenset()),
+    OrderStatus.ORDER_PLACED: OrderTransition(allowed_from=frozenset({OrderStatus.PENDING})),
+    OrderStatus.ACCEPTED: OrderTransition(allowed_from=_OPEN | _WITH_DRIVER),
+    OrderStatus.READY_FOR_DELIVERY: OrderTransition(
+        allowed_from=_OPEN | _WITH_DRIVER, requires_driver=True, keeps_driver=True
+    ),
+    # SCHEDULED keeps the existing delivery row; delivery_service.assign_delivery assigns one explicitly
+    OrderStatus.SCHEDULED: OrderTransition(allowed_from=_OPEN | _WITH_DRIVER, keeps_driver=True),
+    OrderStatus.PICKED_UP: OrderTransition(allowed_from=_OPEN | _WITH_DRIVER, keeps_driver=True),
+    OrderStatus.DELIVERED: OrderTransition(
+        allowed_from=_OPEN | _WITH_DRIVER | {OrderStatus.PICKED_UP}, keeps_driver=True
+    ),
+    OrderStatus.CANCELLED: OrderTransition(
+        allowed_from=_OPEN | _WITH_DRIVER | {OrderStatus.PICKED_UP},
+        releases_stock=True,
+        records_cancellation=True
+    ),
+}
+
+
+def parse_order_status(status) -> OrderStatus:
+    """
+    Raises:
+        ValueError: If the status is not an OrderStatus name
+    """
+    if isinstance(status, OrderStatus):
+        return status
+    if status not in OrderStatus.__members__:
+        raise ValueError(f"Invalid order status: {status}. Allowed: {list(OrderStatus.__members__.keys())}")
+    return OrderStatus[status]
+
+
+def check_order_transition(current: OrderStatus, target: OrderStatus) -> Optional[str]:
+    """
+    Returns:
+        None if ``current`` may move to ``target`` (or already is ``target``), else the reason it may not
+    """
+    transition = ORDER_TRANSITIONS[target]
+    if current == target and not transition.requires_driver:
+        return None
+    if current not in transition.allowed_from:
+        return f"Cannot change order status from {current.value} to {target.value}"
+    return None
+
 
 def get_order_by_id(order_id: int) -> Optional[OrderModel]:
     """Get an order by its ID"""
@@ -24,6 +159,62 @@ def get_order_by_id(order_id: int) -> Optional[OrderModel]:
     finally:
         db.close()
 
+def order_request_hash(
+    operation: str,
+    store_id: int,
+    product_items: List[dict],
+    pickup_or_delivery: str,
+    address_id: Optional[int] = None,
+    pickup_id: Optional[int] = None,
+    tip_amount: Optional[float] = None,
+    delivery_instructions: Optional[str] = None,
+    custom_order: Optional[str] = None
+) -> str:
+    """Hash of what the client asked for (not the amounts computed from it), stored with its idempotency key."""
+    return hash_order_request(operation, {
+        "store_id": store_id,
+        "items": sorted(aggregate_product_quantities(product_items).items()),
+        "pickup_or_delivery": pickup_or_delivery,
+        "address_id": address_id if pickup_or_delivery == "delivery" else None,
+        "pickup_id": pickup_id if pickup_or_delivery == "pickup" else None,
+        "tip_cents": to_cents(tip_amount or 0),
+        "delivery_instructions": delivery_instructions,
+        "custom_order": custom_order,
+    })
+
+def find_replayed_order(
+    idempotency_key: Optional[str],
+    user_id: int,
+    request_hash: Optional[str] = None
+) -> Optional[OrderModel]:
+    """
+    Return the order already created with this idempotency key, if any.
+
+    Raises:
+        ValueError: If the key is invalid or belongs to another user
+        IdempotencyConflictError: If the key was used for a different request
+    """
+    if not idempotency_key:
+        return None
+    order_id = find_idempotent_order_id(idempotency_key, user_id, request_hash)
+    return get_order_by_id(order_id) if order_id is not None else None
+
+def _commit_order(db, idempotency_key: Optional[str], user_id: int, request_hash: Optional[str] = None) -> Optional[OrderModel]:
+    """
+    Commit a new order. If a concurrent request with the same idempotency key
+    committed first (unique key violation), roll back and return that order
+    instead, or raise IdempotencyConflictError if it was a different request.
+    """
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        replayed = find_replayed_order(idempotency_key, user_id, request_hash)
+        if replayed is None:
+            raise
+        return replayed
+    return None
+
 def get_all_orders() -> List[OrderModel]:
     """Get all orders"""
     db = SessionLocal()
@@ -76,6 +267,116 @@ def get_orders_by_store(store_id: int) -> List[OrderModel]:
     finally:
         db.close()
 
+def get_store_order_board(
+    store_id: int,
+    statuses: Optional[List[OrderStatus]] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    order_type: Optional[str] = None,
+    search: Optional[str] = None,
+    include_archived: bool = False,
+    limit: int = STORE_ORDER_BOARD_DEFAULT_LIMIT,
+    offset: int = 0
+) -> dict:
+    """
+    Get a filtered, paginated page of a store's orders for the order board
+
+    Uses the (storeId, status, createdAt) index and skips archived partitions
+    unless asked otherwise, so cost scales with active orders. Loads the page
+    in a fixed number of queries: count, orders (with customer, addresses and
+    delivery joined), and current item revisions with their products.
+
+    Args:
+        store_id: The ID of the store
+        statuses: Only orders in these statuses
+        start_date: Only orders created at or after this time
+        end_date: Only orders created before this time
+        order_type: Only "DELIVERY" or "PICKUP" orders
+        search: Case-insensitive substring of the display code
+        include_archived: Also include archived (old closed) orders
+        limit: Page size (max STORE_ORDER_BOARD_MAX_LIMIT)
+        offset: Number of orders to skip
+
+    Returns:
+        {"orders": [...], "total_count": int}
+
+    Raises:
+        ValueError: If the pagination or order type is invalid
+    """
+    if limit < 1 or limit > STORE_ORDER_BOARD_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {STORE_ORDER_BOARD_MAX_LIMIT}")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+
+    db = SessionLocal()
+    try:
+        query = db.query(OrderModel).filter(OrderModel.storeId == store_id)
+
+        if not include_archived:
+            query = query.filter(OrderModel.isArchived.is_(False))
+        if statuses:
+            query = query.filter(OrderModel.status.in_(statuses))
+        if start_date is not None:
+            query = query.filter(OrderModel.createdAt >= to_naive_utc(start_date))
+        if end_date is not None:
+            query = query.filter(OrderModel.createdAt < to_naive_utc(end_date))
+        if order_type:
+            if order_type.upper() not in FeeType.__members__:
+                raise ValueError(f"Invalid order type: {order_type}. Allowed: {list(FeeType.__members__.keys())}")
+            query = query.filter(OrderModel.type == FeeType[order_type.upper()])
+        if search:
+            escaped = search.strip().replace("/", "//").replace("%", "/%").replace("_", "/_")
+            query = query.filter(OrderModel.display_code.ilike(f"%{escaped}%", escape="/"))
+
+        total_count = query.order_by(None).count()
+
+        orders = (
+            query
+            .options(
+                joinedload(OrderModel.creator),
+                joinedload(OrderModel.address),
+                joinedload(OrderModel.pickup_address),
+                joinedload(OrderModel.delivery),
+                selectinload(OrderModel.order_items.and_(OrderItemModel.isCurrent.is_(True)))
+                .joinedload(OrderItemModel.product)
+            )
+            .order_by(OrderModel.createdAt.desc(), OrderModel.id.desc())
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+
+        return {"orders": orders, "total_count": total_count}
+    finally:
+        db.close()
+
+
+def get_current_order_items(order_id: int) -> List[OrderItemModel]:
+    """
+    Get the current revision of each line of an order, with product details
+
+    Edited lines keep their earlier revisions for history; this returns only
+    the latest one (removed lines have none) using the (orderId, isCurrent)
+    index instead of walking the revision chain.
+
+    Args:
+        order_id: The ID of the order
+
+    Returns:
+        A list of current order items
+    """
+    db = SessionLocal()
+    try:
+        return (
+            db.query(OrderItemModel)
+            .filter(OrderItemModel.orderId == order_id, OrderItemModel.isCurrent.is_(True))
+            .options(joinedload(OrderItemModel.product))
+            .order_by(func.coalesce(OrderItemModel.rootOrderItemId, OrderItemModel.id))
+            .all()
+        )
+    finally:
+        db.close()
+
 def create_order(user_id: int, store_id: int, product_items: List[dict], 
                  total_amount: float, order_total_amount: float, 
                  pickup_or_delivery: str = "delivery",
@@ -85,7 +386,8 @@ def create_order(user_id: int, store_id: int, product_items: List[dict],
                  tip_amount: Optional[float] = None, 
                  tax_amount: Optional[float] = None,
                  delivery_instructions: Optional[str] = None,
-                 custom_order: Optional[str] = None) -> OrderModel:
+                 custom_order: Optional[str] = None,
+                 idempotency_key: Optional[str] = None) -> OrderModel:
     """
     Create a new order with multiple order items
     
@@ -103,6 +405,7 @@ def create_order(user_id: int, store_id: int, product_items: List[dict],
         tax_amount: Optional tax amount
         delivery_instructions: Optional special instructions for delivery
         custom_order: Optional custom order instructions
+        idempotency_key: Optional client key; a retry with the same key returns the original order
     
     Returns:
         The created order
@@ -110,9 +413,18 @@ def create_order(user_id: int, store_id: int, product_items: List[dict],
     Raises:
         ValueError: If pickup_or_delivery is not "pickup" or "delivery"
         ValueError: If required address/pickup ID is missing
+        InsufficientStockError: If any product does not have enough stock
     """
     if pickup_or_delivery not in ["pickup", "delivery"]:
         raise ValueError("pickup_or_delivery must be 'pickup' or 'delivery'")
+
+    request_hash = order_request_hash(
+        "createOrder", store_id, product_items, pickup_or_delivery,
+        address_id, pickup_id, tip_amount, delivery_instructions, custom_order
+    )
+    replayed = find_replayed_order(idempotency_key, user_id, request_hash)
+    if replayed:
+        return replayed
         
     db = SessionLocal()
     try:
@@ -131,21 +443,10 @@ def create_order(user_id: int, store_id: int, product_items: List[dict],
                 raise ValueError(f"Address with ID {address_id} not found or does not belong to user {user_id}")
             
             # Validate delivery pincode is serviced by the store
-            validate_delivery_pincode(address_id, store_id)
+            validate_delivery_pincode(address.address, store_id)
             
-            # Extract city name from address and get location code
-            location_code = "00"  # Default code
-            if address.address:
-                address_parts = address.address.split(',')
-                if len(address_parts) >= 2:
-                    city_name = address_parts[1].strip()
-                    # Query StoreLocationCodeModel for the city code
-                    location_code_record = db.query(StoreLocationCodeModel).filter(
-                        StoreLocationCodeModel.store_id == store_id,
-                        StoreLocationCodeModel.location == city_name
-                    ).first()
-                    if location_code_record:
-                        location_code = location_code_record.code
+            # Get location code for the address's city
+            location_code = _location_code(store_id, address.address)
         else:  # pickup
             if not pickup_id:
                 raise ValueError("Pickup address ID is required for pickup orders")
@@ -160,18 +461,7 @@ def create_order(user_id: int, store_id: int, product_items: List[dict],
                 raise ValueError(f"Pickup address with ID {pickup_id} not found or does not belong to store {store_id}")
             
             # Get location code for pickup address
-            location_code = "00"  # Default code
-            if pickup_address.address:
-                address_parts = pickup_address.address.split(',')
-                if len(address_parts) >= 2:
-                    city_name = address_parts[1].strip()
-                    # Query StoreLocationCodeModel for the city code
-                    location_code_record = db.query(StoreLocationCodeModel).filter(
-                        StoreLocationCodeModel.store_id == store_id,
-                        StoreLocationCodeModel.location == city_name
-                    ).first()
-                    if location_code_record:
-                        location_code = location_code_record.code
+            location_code = _location_code(store_id, pickup_address.address)
         
         # Extract all product IDs from the items
         product_ids = [item["product_id"] for item in product_items]
@@ -189,6 +479,9 @@ def create_order(user_id: int, store_id: int, product_items: List[dict],
         for item in product_items:
             if item["product_id"] not in inventory_dict:
                 raise ValueError(f"Product with ID {item['product_id']} not found in store inventory")
+
+        # Reserve stock for all lines in one conditional UPDATE (rolled back with the order on failure)
+        reserve_inventory(db, store_id, product_items)
         
         # Create the order with the provided amounts (no calculation in BE)
         order = OrderModel(
@@ -198,11 +491,7 @@ def create_order(user_id: int, store_id: int, product_items: List[dict],
             type=FeeType.DELIVERY if pickup_or_delivery == "delivery" else FeeType.PICKUP,
             storeId=store_id,
             status=OrderStatus.PENDING,
-            totalAmount=total_amount,
-            orderTotalAmount=order_total_amount,
-            deliveryFee=delivery_fee,
-            tipAmount=tip_amount,
-            taxAmount=tax_amount,
+            **order_amount_columns(total_amount, order_total_amount, delivery_fee, tip_amount, tax_amount),
             deliveryDate=None,
             deliveryInstructions=delivery_instructions
         )
@@ -213,6 +502,8 @@ def create_order(user_id: int, store_id: int, product_items: List[dict],
         # Set display code and custom order
         order.display_code = f"{location_code}{order.id}{pickup_or_delivery[0].upper()}"
         order.custom_order = custom_order
+        record_order_created(db, order)
+        enqueue_order_created(db, order)
         
         # Create order items with inventory prices
         for item in product_items:
@@ -221,13 +512,21 @@ def create_order(user_id: int, store_id: int, product_items: List[dict],
                 productId=item["product_id"],
                 quantity=item["quantity"],
                 orderId=order.id,
-                orderAmount=inventory_item.price * item["quantity"],
+                **line_amount_columns(inventory_item.price, item["quantity"]),
                 inventoryId=inventory_item.id
             )
             db.add(order_item)
+
+        if idempotency_key:
+            record_idempotency_key(db, idempotency_key, user_id, order.id, "createOrder", request_hash)
             
-        db.commit()
+        replayed = _commit_order(db, idempotency_key, user_id, request_hash)
+        if replayed:
+            return replayed
         db.refresh(order)
+
+        if idempotency_key:
+            remember_idempotency_key(idempotency_key, user_id, order.id, request_hash)
         
         return order
     finally:
@@ -250,7 +549,9 @@ def create_order_with_payment(
     tax_amount: Optional[float] = None,
     delivery_instructions: Optional[str] = None,
     custom_order: Optional[str] = None,
-    receipt_url: Optional[str] = None
+    receipt_url: Optional[str] = None,
+    inventory_reserved: bool = False,
+    order_idempotency_key: Optional[str] = None
 ) -> OrderModel:
     """
     Create an order with Square payment atomically in a single DB transaction.
@@ -277,6 +578,10 @@ def create_order_with_payment(
         delivery_instructions: Special instructions
         custom_order: Custom order notes
         receipt_url: Square receipt URL
+        inventory_reserved: True if the caller already reserved stock before charging
+            (see reserve_order_inventory); otherwise stock is reserved in this transaction
+        order_idempotency_key: Client key for the order mutation (defaults to idempotency_key);
+            a retry with the same key returns the original order
 
     Returns:
         Created OrderModel with payment linked
@@ -288,6 +593,17 @@ def create_order_with_payment(
     if pickup_or_delivery not in ["pickup", "delivery"]:
         raise ValueError("pickup_or_delivery must be 'pickup' or 'delivery'")
 
+    order_idempotency_key = order_idempotency_key or idempotency_key
+    request_hash = order_request_hash(
+        "createOrderWithPayment", store_id, product_items, pickup_or_delivery,
+        address_id, pickup_id, tip_amount, delivery_instructions, custom_order
+    )
+    replayed = find_replayed_order(order_idempotency_key, user_id, request_hash)
+    if replayed:
+        if inventory_reserved:
+            release_order_inventory(store_id, product_items)
+        return replayed
+
     db = SessionLocal()
     try:
         # Handle address validation based on order type (same as create_order)
@@ -303,19 +619,9 @@ def create_order_with_payment(
             if not address:
                 raise ValueError(f"Address with ID {address_id} not found or does not belong to user {user_id}")
 
-            validate_delivery_pincode(address_id, store_id)
-
-            location_code = "00"
-            if address.address:
-                address_parts = address.address.split(',')
-                if len(address_parts) >= 2:
-                    city_name = address_parts[1].strip()
-                    location_code_record = db.query(StoreLocationCodeModel).filter(
-                        StoreLocationCodeModel.store_id == store_id,
-                        StoreLocationCodeModel.location == city_name
-                    ).first()
-                    if location_code_record:
-                        location_code = location_code_record.code
+            validate_delivery_pincode(address.address, store_id)
+
+            location_code = _location_code(store_id, address.address)
         else:  # pickup
             if not pickup_id:
                 raise ValueError("Pickup address ID is required for pickup orders")
@@ -328,17 +634,7 @@ def create_order_with_payment(
             if not pickup_address:
                 raise ValueError(f"Pickup address with ID {pickup_id} not found or does not belong to store {store_id}")
 
-            location_code = "00"
-            if pickup_address.address:
-                address_parts = pickup_address.address.split(',')
-                if len(address_parts) >= 2:
-                    city_name = address_parts[1].strip()
-                    location_code_record = db.query(StoreLocationCodeModel).filter(
-                        StoreLocationCodeModel.store_id == store_id,
-                        StoreLocationCodeModel.location == city_name
-                    ).first()
-                    if location_code_record:
-                        location_code = location_code_record.code
+            location_code = _location_code(store_id, pickup_address.address)
 
         # Verify products exist in inventory
         product_ids = [item["product_id"] for item in product_items]
@@ -352,6 +648,9 @@ def create_order_with_payment(
             if item["product_id"] not in inventory_dict:
                 raise ValueError(f"Product with ID {item['product_id']} not found in store inventory")
 
+        if not inventory_reserved:
+            reserve_inventory(db, store_id, product_items)
+
         # Create PaymentModel and OrderModel in single transaction
         # If this fails, caller is responsible for orphan recovery logging
 
@@ -359,7 +658,7 @@ def create_order_with_payment(
             type=PaymentType.SQUARE,
             square_payment_id=square_payment_id,
             idempotency_key=idempotency_key,
-            amount=round(order_total_amount, 2),
+            **payment_amount_columns(order_total_amount),
             currency="USD",
             status=PaymentStatus[payment_status] if payment_status in PaymentStatus.__members__ else PaymentStatus.COMPLETED,
             receipt_url=receipt_url
@@ -375,11 +674,7 @@ def create_order_with_payment(
             storeId=store_id,
             status=OrderStatus.PENDING,
             paymentId=payment.id,  # Link to payment
-            totalAmount=total_amount,
-            orderTotalAmount=order_total_amount,
-            deliveryFee=delivery_fee,
-            tipAmount=tip_amount,
-            taxAmount=tax_amount,
+            **order_amount_columns(total_amount, order_total_amount, delivery_fee, tip_amount, tax_amount),
             deliveryDate=None,
             deliveryInstructions=delivery_instructions
         )
@@ -389,6 +684,8 @@ def create_order_with_payment(
         # Set display code and custom order
         order.display_code = f"{location_code}{order.id}{pickup_or_delivery[0].upper()}"
         order.custom_order = custom_order
+        record_order_created(db, order)
+        enqueue_order_created(db, order, notify_customer=True)
 
         # Create order items
         for item in product_items:
@@ -397,40 +694,24 @@ def create_order_with_payment(
                 productId=item["product_id"],
                 quantity=item["quantity"],
                 orderId=order.id,
-                orderAmount=inventory_item.price * item["quantity"],
+                **line_amount_columns(inventory_item.price, item["quantity"]),
                 inventoryId=inventory_item.id
             )
             db.add(order_item)
 
+        record_idempotency_key(db, order_idempotency_key, user_id, order.id, "createOrderWithPayment", request_hash)
+
         # Commit everything together
-        db.commit()
+        replayed = _commit_order(db, order_idempotency_key, user_id, request_hash)
+        if replayed:
+            # A concurrent retry created the order; give back this attempt's reservation
+            if inventory_reserved:
+                release_order_inventory(store_id, product_items)
+            return replayed
         db.refresh(order)
+        remember_idempotency_key(order_idempotency_key, user_id, order.id, request_hash)
 
-        # Send order confirmation email with payment details (non-blocking)
-        try:
-            from app.services.email_service import EmailService
-
-            # Get user email
-            user = db.query(UserModel).filter(UserModel.id == user_id).first()
-            store = db.query(StoreModel).filter(StoreModel.id == store_id).first()
-
-            if user and user.email:
-                email_service = EmailService()
-                email_service.send_order_confirmation_with_payment(
-                    to_email=user.email,
-                    order_id=str(order.id),
-                    display_code=order.display_code,
-                    order_total=order_total_amount,
-                    payment_id=square_payment_id,
-                    payment_amount=round(order_total_amount, 2),
-                    receipt_url=receipt_url,
-                    order_type=pickup_or_delivery,
-                    store_name=store.name if store else "Indimitra"
-                )
-        except Exception as email_error:
-            # Email failure should not fail the order
-            import logging
-            logging.warning(f"Failed to send order confirmation email: {email_error}")
+        # Confirmation email is sent by the outbox dispatcher (ORDER_CREATED)
 
         return order
 
@@ -456,7 +737,8 @@ def create_order_with_cod_payment(
     tip_amount: Optional[float] = None,
     tax_amount: Optional[float] = None,
     delivery_instructions: Optional[str] = None,
-    custom_order: Optional[str] = None
+    custom_order: Optional[str] = None,
+    idempotency_key: Optional[str] = None
 ) -> OrderModel:
     """
     Create an order with Cash on Delivery payment atomically in a single DB transaction.
@@ -477,6 +759,7 @@ def create_order_with_cod_payment(
         tax_amount: Tax amount
         delivery_instructions: Special instructions
         custom_order: Custom order notes
+        idempotency_key: Optional client key; a retry with the same key returns the original order
 
     Returns:
         Created OrderModel with COD payment linked
@@ -488,6 +771,14 @@ def create_order_with_cod_payment(
     if pickup_or_delivery not in ["pickup", "delivery"]:
         raise ValueError("pickup_or_delivery must be 'pickup' or 'delivery'")
 
+    request_hash = order_request_hash(
+        "createOrderWithCod", store_id, product_items, pickup_or_delivery,
+        address_id, pickup_id, tip_amount, delivery_instructions, custom_order
+    )
+    replayed = find_replayed_order(idempotency_key, user_id, request_hash)
+    if replayed:
+        return replayed
+
     db = SessionLocal()
     try:
         # Handle address validation based on order type (same as create_order_with_payment)
@@ -503,19 +794,9 @@ def create_order_with_cod_payment(
             if not address:
                 raise ValueError(f"Address with ID {address_id} not found or does not belong to user {user_id}")
 
-            validate_delivery_pincode(address_id, store_id)
-
-            location_code = "00"
-            if address.address:
-                address_parts = address.address.split(',')
-                if len(address_parts) >= 2:
-                    city_name = address_parts[1].strip()
-                    location_code_record = db.query(StoreLocationCodeModel).filter(
-                        StoreLocationCodeModel.store_id == store_id,
-                        StoreLocationCodeModel.location == city_name
-                    ).first()
-                    if location_code_record:
-                        location_code = location_code_record.code
+            validate_delivery_pincode(address.address, store_id)
+
+            location_code = _location_code(store_id, address.address)
         else:  # pickup
             if not pickup_id:
                 raise ValueError("Pickup address ID is required for pickup orders")
@@ -528,17 +809,7 @@ def create_order_with_cod_payment(
             if not pickup_address:
                 raise ValueError(f"Pickup address with ID {pickup_id} not found or does not belong to store {store_id}")
 
-            location_code = "00"
-            if pickup_address.address:
-                address_parts = pickup_address.address.split(',')
-                if len(address_parts) >= 2:
-                    city_name = address_parts[1].strip()
-                    location_code_record = db.query(StoreLocationCodeModel).filter(
-                        StoreLocationCodeModel.store_id == store_id,
-                        StoreLocationCodeModel.location == city_name
-                    ).first()
-                    if location_code_record:
-                        location_code = location_code_record.code
+            location_code = _location_code(store_id, pickup_address.address)
 
         # Verify products exist in inventory
         product_ids = [item["product_id"] for item in product_items]
@@ -552,12 +823,15 @@ def create_order_with_cod_payment(
             if item["product_id"] not in inventory_dict:
                 raise ValueError(f"Product with ID {item['product_id']} not found in store inventory")
 
+        # Reserve stock for all lines in one conditional UPDATE (rolled back with the order on failure)
+        reserve_inventory(db, store_id, product_items)
+
         # Create PaymentModel for Cash on Delivery
         payment = PaymentModel(
             type=PaymentType.CASH,
             square_payment_id=None,
             idempotency_key=None,
-            amount=round(order_total_amount, 2),
+            **payment_amount_columns(order_total_amount),
             currency="USD",
             status=PaymentStatus.PENDING,  # COD is pending until delivery
             receipt_url=None
@@ -573,11 +847,7 @@ def create_order_with_cod_payment(
             storeId=store_id,
             status=OrderStatus.PENDING,
             paymentId=payment.id,  # Link to COD payment
-            totalAmount=total_amount,
-            orderTotalAmount=order_total_amount,
-            deliveryFee=delivery_fee,
-            tipAmount=tip_amount,
-            taxAmount=tax_amount,
+            **order_amount_columns(total_amount, order_total_amount, delivery_fee, tip_amount, tax_amount),
             deliveryDate=None,
             deliveryInstructions=delivery_instructions
         )
@@ -587,6 +857,8 @@ def create_order_with_cod_payment(
         # Set display code and custom order
         order.display_code = f"{location_code}{order.id}{pickup_or_delivery[0].upper()}"
         order.custom_order = custom_order
+        record_order_created(db, order)
+        enqueue_order_created(db, order, notify_customer=True)
 
         # Create order items
         for item in product_items:
@@ -595,40 +867,23 @@ def create_order_with_cod_payment(
                 productId=item["product_id"],
                 quantity=item["quantity"],
                 orderId=order.id,
-                orderAmount=inventory_item.price * item["quantity"],
+                **line_amount_columns(inventory_item.price, item["quantity"]),
                 inventoryId=inventory_item.id
             )
             db.add(order_item)
 
+        if idempotency_key:
+            record_idempotency_key(db, idempotency_key, user_id, order.id, "createOrderWithCod", request_hash)
+
         # Commit everything together
-        db.commit()
+        replayed = _commit_order(db, idempotency_key, user_id, request_hash)
+        if replayed:
+            return replayed
         db.refresh(order)
+        if idempotency_key:
+            remember_idempotency_key(idempotency_key, user_id, order.id, request_hash)
 
-        # Send COD order confirmation email (non-blocking)
-        try:
-            from app.services.email_service import EmailService
-
-            # Get user email
-            user = db.query(UserModel).filter(UserModel.id == user_id).first()
-            store = db.query(StoreModel).filter(StoreModel.id == store_id).first()
-
-            if user and user.email:
-                email_service = EmailService()
-                email_service.send_order_confirmation_with_payment(
-                    to_email=user.email,
-                    order_id=str(order.id),
-                    display_code=order.display_code,
-                    order_total=order_total_amount,
-                    payment_id="COD",  # Indicate Cash on Delivery
-                    payment_amount=round(order_total_amount, 2),
-                    receipt_url=None,  # No receipt for COD
-                    order_type=pickup_or_delivery,
-                    store_name=store.name if store else "Indimitra"
-                )
-        except Exception as email_error:
-            # Email failure should not fail the order
-            import logging
-            logging.warning(f"Failed to send COD order confirmation email: {email_error}")
+        # Confirmation email is sent by the outbox dispatcher (ORDER_CREATED)
 
         return order
 
@@ -640,40 +895,207 @@ def create_order_with_cod_payment(
         db.close()
 
 
-def update_order_status(order_id: int, status: str, delivery_instructions: Optional[str] = None) -> Optional[OrderModel]:
+def apply_order_transition(
+    db,
+    order: OrderModel,
+    status,
+    driver_id: Optional[int] = None,
+    schedule_time: Optional[datetime] = None,
+    delivery_instructions: Optional[str] = None,
+    cancel_message: Optional[str] = None,
+    cancelled_by_user_id: Optional[int] = None,
+    notify_customer: bool = False
+) -> Optional[DeliveryModel]:
     """
-    Update order status and prevent overwriting if already assigned.
+    Validate and apply a status transition to a locked order, with all its side
+    effects (delivery driver, stock, metrics, outbox event). Does not commit.
+
+    Setting the current status again is a no-op, except for statuses that
+    assign a driver, where it reassigns the driver and schedule.
 
     Args:
-        order_id: Order ID to update
-        status: The new status
+        db: Database session holding the order row lock
+        order: The order (loaded with FOR UPDATE)
+        status: Target OrderStatus or status name
+        driver_id: Delivery driver (required for READY_FOR_DELIVERY)
+        schedule_time: Delivery date (required for READY_FOR_DELIVERY)
         delivery_instructions: Optional delivery instructions to update
+        cancel_message: Reason recorded when cancelling
+        cancelled_by_user_id: User recorded as having cancelled the order
+        notify_customer: Email the customer about the new status (see outbox_service)
+
+    Returns:
+        The order's delivery if the transition assigned a driver, else None
+
+    Raises:
+        ValueError: If the status is invalid, the transition is not allowed or a required input is missing
+    """
+    new_status = parse_order_status(status)
+    transition = ORDER_TRANSITIONS[new_status]
+    error = check_order_transition(order.status, new_status)
+    if error:
+        raise ValueError(error)
+
+    if delivery_instructions is not None:
+        order.deliveryInstructions = delivery_instructions
+
+    if order.status == new_status and not transition.requires_driver:
+        return None
+
+    delivery = None
+    if transition.requires_driver:
+        delivery = assign_order_driver(db, order, driver_id, schedule_time, new_status)
+    elif not transition.keeps_driver:
+        db.execute(
+            update(DeliveryModel)
+            .where(DeliveryModel.orderId == order.id, DeliveryModel.driverId.isnot(None))
+            .values(driverId=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    if transition.releases_stock:
+        release_inventory_lines(db, current_item_quantities(db, order.id))
+
+    if transition.records_cancellation:
+        order.cancelMessage = cancel_message
+        order.cancelledByUserId = cancelled_by_user_id
+        order.cancelledAt = datetime.now()
+
+    old_status = order.status
+    order.status = new_status
+    record_status_change(db, order, old_status)
+    enqueue_status_change(db, order, old_status, notify_customer=notify_customer)
+    return delivery
+
+
+def assign_order_driver(
+    db,
+    order: OrderModel,
+    driver_id: Optional[int],
+    schedule_time: Optional[datetime],
+    status: OrderStatus = OrderStatus.READY_FOR_DELIVERY
+) -> DeliveryModel:
+    """
+    (Re)assign a locked order's delivery driver and schedule, creating its
+    delivery row if needed. Does not change the order status or commit.
+
+    Returns:
+        The order's delivery
+
+    Raises:
+        ValueError: If the driver or schedule time is missing, or the driver is not a delivery driver
+    """
+    if not driver_id:
+        raise ValueError(f"Driver ID is required for {status.value} status.")
+    if not schedule_time:
+        raise ValueError(f"Schedule time is required for {status.value}.")
+    driver_exists = db.query(UserModel.id).filter(
+        UserModel.id == driver_id, UserModel.type == "DELIVERY"
+    ).first()
+    if not driver_exists:
+        raise ValueError(f"Driver with ID {driver_id} not found or not a delivery driver.")
+
+    order.deliveryDate = schedule_time
+    delivery = db.query(DeliveryModel).filter(DeliveryModel.orderId == order.id).with_for_update().first()
+    if delivery:
+        delivery.driverId = driver_id
+    else:
+        delivery = DeliveryModel(orderId=order.id, driverId=driver_id, pickedUpTime=None, deliveredTime=None)
+        db.add(delivery)
+    enqueue_delivery_assigned(db, order, driver_id, schedule_time)
+    return delivery
+
+
+def lock_order(db, order_id: int) -> Optional[OrderModel]:
+    """Load an order with a row lock held until the transaction ends"""
+    return db.query(OrderModel).filter(OrderModel.id == order_id).with_for_update(of=OrderModel).first()
+
+
+def transition_order(
+    order_id: int,
+    status,
+    driver_id: Optional[int] = None,
+    schedule_time: Optional[datetime] = None,
+    delivery_instructions: Optional[str] = None,
+    cancel_message: Optional[str] = None,
+    cancelled_by_user_id: Optional[int] = None,
+    notify_customer: bool = False
+) -> Optional[OrderModel]:
+    """
+    Move an order to a new status in one transaction (see apply_order_transition).
 
     Returns:
         Updated order or None if not found
+
+    Raises:
+        ValueError: If the transition is invalid
     """
     db = SessionLocal()
     try:
-        order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
+        order = lock_order(db, order_id)
         if not order:
             return None
 
-        # Update delivery instructions if provided
-        if delivery_instructions is not None:
-            order.deliveryInstructions = delivery_instructions
-
-        # ✅ Only update if status is different
-        if order.status != status:
-            order.status = OrderStatus(status)
-            
+        apply_order_transition(
+            db,
+            order,
+            status,
+            driver_id=driver_id,
+            schedule_time=schedule_time,
+            delivery_instructions=delivery_instructions,
+            cancel_message=cancel_message,
+            cancelled_by_user_id=cancelled_by_user_id,
+            notify_customer=notify_customer
+        )
         db.commit()
         db.refresh(order)
-
         return order
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
 
+def update_order_status(order_id: int, status: str, delivery_instructions: Optional[str] = None) -> Optional[OrderModel]:
+    """
+    Update order status (validated against ORDER_TRANSITIONS).
+
+    Args:
+        order_id: Order ID to update
+        status: The new status
+        delivery_instructions: Optional delivery instructions to update
+
+    Returns:
+        Updated order or None if not found
+    """
+    return transition_order(order_id, status, delivery_instructions=delivery_instructions)
+
+
+def current_item_quantities(db, order_id) -> Dict[int, int]:
+    """
+    Sum quantities of the current (latest) revision of each order item, keyed by inventory ID.
+
+    Args:
+        db: Database session
+        order_id: The ID of the order, or a list of order IDs to sum over
+
+    Returns:
+        Dict of {inventory_id: quantity}
+    """
+    order_filter = (
+        OrderItemModel.orderId.in_(order_id)
+        if isinstance(order_id, (list, tuple, set))
+        else OrderItemModel.orderId == order_id
+    )
+    rows = db.query(OrderItemModel.inventoryId, func.sum(OrderItemModel.quantity)).filter(
+        order_filter,
+        OrderItemModel.isCurrent.is_(True),
+        OrderItemModel.inventoryId.isnot(None)
+    ).group_by(OrderItemModel.inventoryId).all()
+    return {inventory_id: int(quantity or 0) for inventory_id, quantity in rows}
+
+
 def cancel_order(order_id: int, cancel_message: str, cancelled_by_user_id: int) -> Optional[OrderModel]:
     """
     Cancel an order and record cancellation details
@@ -685,26 +1107,140 @@ def cancel_order(order_id: int, cancel_message: str, cancelled_by_user_id: int)
         
     Returns:
         The canceled order, or None if the order doesn't exist
+
+    Raises:
+        ValueError: If the order is already delivered
+    """
+    return transition_order(
+        order_id,
+        OrderStatus.CANCELLED,
+        cancel_message=cancel_message,
+        cancelled_by_user_id=cancelled_by_user_id
+    )
+
+def bulk_update_order_status(
+    store_id: int,
+    order_ids: List[int],
+    status: str,
+    cancel_message: Optional[str] = None,
+    cancelled_by_user_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Move many orders of one store to the same status in a single transaction.
+
+    All orders are locked and validated against ORDER_TRANSITIONS first; the valid ones are then updated
+    with one set-based UPDATE per table, their metrics are applied in one
+    upsert and their notifications are queued in the same commit. Orders that
+    fail validation are reported and left untouched.
+
+    Args:
+        store_id: Store the orders must belong to
+        order_ids: Orders to update (duplicates are ignored)
+        status: The new status (READY_FOR_DELIVERY needs a driver and is not allowed)
+        cancel_message: Reason recorded when cancelling
+        cancelled_by_user_id: User recorded as having cancelled the orders
+
+    Returns:
+        One result per order, in request order:
+        {"order_id", "success", "changed", "old_status", "status", "error"}
+
+    Raises:
+        ValueError: If the status is invalid or not allowed in bulk, or too many orders are given
     """
+    new_status = parse_order_status(status)
+    transition = ORDER_TRANSITIONS[new_status]
+    if transition.requires_driver:
+        raise ValueError(f"{status} requires a driver and schedule time; use updateOrderStatus")
+
+    order_ids = list(dict.fromkeys(order_ids))
+    if not order_ids:
+        return []
+    if len(order_ids) > BULK_STATUS_UPDATE_MAX_ORDERS:
+        raise ValueError(f"At most {BULK_STATUS_UPDATE_MAX_ORDERS} orders can be updated at once")
+
     db = SessionLocal()
     try:
-        order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
-        if not order:
-            return None
-            
-        # Check if order is already cancelled
-        if order.status == OrderStatus.CANCELLED:
-            return order
-            
-        # Store cancellation details
-        order.status = OrderStatus.CANCELLED
-        order.cancelMessage = cancel_message
-        order.cancelledByUserId = cancelled_by_user_id
-        order.cancelledAt = datetime.now()
-        
+        # Lock in id order so concurrent bulk updates cannot deadlock
+        orders = {
+            order.id: order
+            for order in db.query(OrderModel)
+            .filter(OrderModel.id.in_(order_ids), OrderModel.storeId == store_id)
+            .order_by(OrderModel.id)
+            .with_for_update()
+            .all()
+        }
+
+        results = []
+        changing = []
+        for order_id in order_ids:
+            order = orders.get(order_id)
+            result = {
+                "order_id": order_id,
+                "success": False,
+                "changed": False,
+                "old_status": order.status.value if order else None,
+                "status": order.status.value if order else None,
+                "error": None,
+            }
+            error = check_order_transition(order.status, new_status) if order else None
+            if not order:
+                result["error"] = f"Order with ID {order_id} not found in store {store_id}"
+            elif order.status == new_status:
+                result["success"] = True
+            elif error:
+                result["error"] = error
+            else:
+                result["success"] = True
+                result["changed"] = True
+                result["status"] = new_status.value
+                changing.append(order)
+            results.append(result)
+
+        if not changing:
+            return results
+
+        changing_ids = [order.id for order in changing]
+        old_statuses = {order.id: order.status for order in changing}
+
+        # Return reserved stock of all cancelled orders in one statement
+        if transition.releases_stock:
+            release_inventory_lines(db, current_item_quantities(db, changing_ids))
+
+        values = {"status": new_status}
+        if transition.records_cancellation:
+            values.update(
+                cancelMessage=cancel_message,
+                cancelledByUserId=cancelled_by_user_id,
+                cancelledAt=datetime.now()
+            )
+        db.execute(
+            update(OrderModel)
+            .where(OrderModel.id.in_(changing_ids))
+            .values(**values)
+            .execution_options(synchronize_session="evaluate")
+        )
+
+        if not transition.keeps_driver:
+            db.execute(
+                update(DeliveryModel)
+                .where(DeliveryModel.orderId.in_(changing_ids), DeliveryModel.driverId.isnot(None))
+                .values(driverId=None)
+                .execution_options(synchronize_session=False)
+            )
+
+        apply_metric_deltas(db, [
+            delta
+            for order in changing
+            for delta in status_change_deltas(order, old_statuses[order.id])
+        ])
+        for order in changing:
+            enqueue_status_change(db, order, old_statuses[order.id], notify_customer=True)
+
         db.commit()
-        db.refresh(order)
-        return order
+        return results
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
@@ -733,34 +1269,17 @@ def update_order_bill_url(order_id: int, bill_url: Optional[str] = None) -> Opti
         db.close()
 
 def get_order_stats():
-    """Get order statistics for dashboard"""
+    """Get order statistics for dashboard (read from the order_metrics rollup)"""
     db = SessionLocal()
     try:
-        # Get total orders count
-        total_orders = db.query(OrderModel).count()
-        
-        # Get orders by status
-        orders_by_status = db.query(OrderModel.status, func.count(OrderModel.id)).group_by(OrderModel.status).all()
-        
-        # Get orders by type (delivery/pickup)
-        orders_by_type = db.query(OrderModel.type, func.count(OrderModel.id)).group_by(OrderModel.type).all()
-        
-        # Since OrderModel doesn't have createdAt field, we'll set recent_orders to 0
-        recent_orders = 0
-        
+        summary = get_order_metrics_summary(db=db)
+        recent = get_order_metrics_summary(start=datetime.utcnow() - RECENT_ORDERS_WINDOW, db=db)
+
         return {
-            'total_orders': total_orders,
-            'recent_orders': recent_orders,
-            # ✅ Fixed: Add null checks for status
-            'orders_by_status': {
-                status.value if status else 'UNKNOWN': count 
-                for status, count in orders_by_status
-            },
-            # ✅ Fixed: Add null checks for type
-            'orders_by_type': {
-                order_type.value if order_type else 'UNKNOWN': count 
-                for order_type, count in orders_by_type
-            }
+            'total_orders': summary['total_orders'],
+            'recent_orders': recent['total_orders'],
+            'orders_by_status': summary['orders_by_status'],
+            'orders_by_type': summary['orders_by_type']
         }
     except Exception as e:
         print(f"Error in get_order_stats: {e}")
@@ -788,6 +1307,7 @@ def update_order_items(
         order_item_updates: List of order item updates [{"order_item_id": int, "quantity_change": int}, ...]
                            A negative quantity_change means reduce quantity, positive means increase
                            A quantity_change of None means delete the item
+                           A removed line keeps a zero-quantity revision for history, but no current one
         total_amount: The updated total amount for products
         tax_amount: The updated tax amount for the order
         order_total_amount: The updated final total amount for the order
@@ -797,8 +1317,9 @@ def update_order_items(
     """
     db = SessionLocal()
     try:
-        # Get the order
-        order = db.query(OrderModel).filter(OrderModel.id == order_id).first()
+        # Lock the order so its status and old amounts (the metrics delta)
+        # cannot change under a concurrent transition or item update
+        order = lock_order(db, order_id)
         if not order:
             return None
         
@@ -808,101 +1329,85 @@ def update_order_items(
             raise ValueError(f"Cannot update items for order with status {order.status}. Only orders with status PENDING, ORDER_PLACED, or ACCEPTED can be updated.")
         
         # Update order amounts
-        order.totalAmount = total_amount
+        old_subtotal, old_total = order.totalAmount, order.orderTotalAmount
+        order.totalAmountCents = to_cents(total_amount)
+        order.totalAmount = from_cents(order.totalAmountCents)
         
         if tax_amount is not None:
-            order.taxAmount = tax_amount
+            order.taxAmountCents = to_cents(tax_amount)
+            order.taxAmount = from_cents(order.taxAmountCents)
             
         if order_total_amount is not None:
-            order.orderTotalAmount = order_total_amount
+            order.orderTotalAmountCents = to_cents(order_total_amount)
+            order.orderTotalAmount = from_cents(order.orderTotalAmountCents)
+
+        record_amount_change(db, order, old_subtotal, old_total)
         
-        # Process each order item update
+        # Resolve the current revision of every requested line in one query:
+        # a requested item and its current revision share the same root
+        requested_ids = [u.get("order_item_id") for u in order_item_updates if u.get("order_item_id") is not None]
+        requested = aliased(OrderItemModel)
+        current_by_requested = dict(
+            db.query(requested.id, OrderItemModel).join(
+                requested,
+                func.coalesce(OrderItemModel.rootOrderItemId, OrderItemModel.id)
+                == func.coalesce(requested.rootOrderItemId, requested.id)
+            ).filter(
+                requested.id.in_(requested_ids),
+                requested.orderId == order_id,
+                OrderItemModel.orderId == order_id,
+                OrderItemModel.isCurrent.is_(True)
+            ).all()
+        )
+
+        # Apply the updates in order to the quantity of each current line, so several
+        # updates to the same line produce a single new revision
+        current_items = {}
+        new_quantities = {}
         for update in order_item_updates:
-            order_item_id = update.get("order_item_id")
-            quantity_change = update.get("quantity_change")
-            
-            # Get the order item
-            order_item = db.query(OrderItemModel).filter(
-                OrderItemModel.id == order_item_id,
-                OrderItemModel.orderId == order_id
-            ).first()
-            
-            if not order_item:
+            current = current_by_requested.get(update.get("order_item_id"))
+            if current is None:
                 continue  # Skip if order item not found
-            
-            # Check if this is the original item or an already updated one
-            if order_item.updatedOrderitemsId is not None:
-                # This is already updated once, we need to find the latest revision
-                latest_item = order_item
-                while latest_item.updated_order_item is not None:
-                    latest_item = latest_item.updated_order_item
-                
-                # Update or delete the latest revision
-                if quantity_change is None:
-                    # Delete the item (mark as zero quantity)
-                    new_order_item = OrderItemModel(
-                        productId=latest_item.productId,
-                        quantity=0,  # Set to zero to indicate deletion
-                        orderId=order_id,
-                        orderAmount=0,
-                        inventoryId=latest_item.inventoryId
-                    )
-                    db.add(new_order_item)
-                    db.flush()  # Get the ID
-                    
-                    # Link to the original item
-                    latest_item.updatedOrderitemsId = new_order_item.id
-                else:
-                    # Calculate new quantity (can't be negative)
-                    new_quantity = max(0, latest_item.quantity + quantity_change)
-                    
-                    # Create a new order item with updated quantity
-                    new_order_item = OrderItemModel(
-                        productId=latest_item.productId,
-                        quantity=new_quantity,
-                        orderId=order_id,
-                        orderAmount=latest_item.orderAmount / latest_item.quantity * new_quantity if latest_item.quantity > 0 else 0,
-                        inventoryId=latest_item.inventoryId
-                    )
-                    db.add(new_order_item)
-                    db.flush()  # Get the ID
-                    
-                    # Link to the original item
-                    latest_item.updatedOrderitemsId = new_order_item.id
-            else:
-                # This is the original item, create a new revision
-                if quantity_change is None:
-                    # Delete the item (mark as zero quantity)
-                    new_order_item = OrderItemModel(
-                        productId=order_item.productId,
-                        quantity=0,  # Set to zero to indicate deletion
-                        orderId=order_id,
-                        orderAmount=0,
-                        inventoryId=order_item.inventoryId
-                    )
-                    db.add(new_order_item)
-                    db.flush()  # Get the ID
-                    
-                    # Link to the original item
-                    order_item.updatedOrderitemsId = new_order_item.id
-                else:
-                    # Calculate new quantity (can't be negative)
-                    new_quantity = max(0, order_item.quantity + quantity_change)
-                    
-                    # Create a new order item with updated quantity
-                    new_order_item = OrderItemModel(
-                        productId=order_item.productId,
-                        quantity=new_quantity,
-                        orderId=order_id,
-                        orderAmount=order_item.orderAmount / order_item.quantity * new_quantity if order_item.quantity > 0 else 0,
-                        inventoryId=order_item.inventoryId
-                    )
-                    db.add(new_order_item)
-                    db.flush()  # Get the ID
-                    
-                    # Link to the original item
-                    order_item.updatedOrderitemsId = new_order_item.id
-        
+
+            current_items[current.id] = current
+            quantity = new_quantities.get(current.id, current.quantity)
+            quantity_change = update.get("quantity_change")
+
+            # A quantity_change of None deletes the item (zero quantity); quantity can't be negative
+            new_quantities[current.id] = 0 if quantity_change is None else max(0, quantity + quantity_change)
+
+        revisions = []
+        stock_deltas = defaultdict(int)
+        for current_id, new_quantity in new_quantities.items():
+            current = current_items[current_id]
+            # Same unit price in whole cents (lines written before the cents columns fall back to the float)
+            current_cents = current.orderAmountCents if current.orderAmountCents is not None else to_cents(current.orderAmount)
+            amount_cents = rescale(current_cents, current.quantity, new_quantity)
+            new_order_item = OrderItemModel(
+                productId=current.productId,
+                quantity=new_quantity,
+                orderId=order_id,
+                orderAmount=from_cents(amount_cents),
+                orderAmountCents=amount_cents,
+                inventoryId=current.inventoryId,
+                isCurrent=new_quantity > 0,
+                revision=current.revision + 1,
+                rootOrderItemId=current.rootOrderItemId or current.id
+            )
+            revisions.append((current, new_order_item))
+            stock_deltas[current.inventoryId] += new_quantity - current.quantity
+
+        # Insert all new revisions in one batch, then retire the previous ones
+        db.add_all([new_order_item for _, new_order_item in revisions])
+        db.flush()
+        for current, new_order_item in revisions:
+            current.isCurrent = False
+            current.updatedOrderitemsId = new_order_item.id  # Forward pointer kept for existing clients
+
+        # Apply stock changes in two set-based statements
+        release_inventory_lines(db, {inv_id: -delta for inv_id, delta in stock_deltas.items() if inv_id and delta < 0})
+        reserve_inventory_lines(db, {inv_id: delta for inv_id, delta in stock_deltas.items() if inv_id and delta > 0})
+
         db.commit()
         db.refresh(order)
         return order
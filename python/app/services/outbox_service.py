@@ -0,0 +1,378 @@
+"""
+Transactional outbox for order side effects.
+
+Order write paths call the enqueue_* helpers with the session that writes the
+order, before it commits, so an event exists exactly when its change does.
+A background dispatcher (started on application startup) claims due events
+in batches with ``FOR UPDATE SKIP LOCKED``, runs their handlers on a bounded
+thread pool and retries failures with exponential backoff. Emails (and any
+future webhooks or subscriptions) therefore never run on the request path.
+
+Handlers receive the event payload and raise on failure. Delivery is
+at-least-once, so a handler may see the same event again after a retry or a
+crashed worker. Register new ones with register_handler(event_type, handler).
+
+Every order change records an event, but customers are only emailed where
+they were before the outbox: the confirmation for Square and COD checkouts,
+and status updates from updateOrderStatus / bulkUpdateOrderStatus. Those
+writers set ``notify_customer`` in the payload; the email handlers skip
+events without it (reconciled orders, cancelOrderById, driver updates).
+"""
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models.outbox_event import OutboxEventModel
+from app.db.models.order import OrderModel, OrderStatus
+from app.db.models.payment import PaymentType
+from app.db.models.user import UserModel
+from app.db.models.store import StoreModel
+
+logger = logging.getLogger(__name__)
+
+# Event types
+ORDER_CREATED = "ORDER_CREATED"
+ORDER_STATUS_CHANGED = "ORDER_STATUS_CHANGED"
+ORDER_CANCELLED = "ORDER_CANCELLED"
+DELIVERY_ASSIGNED = "DELIVERY_ASSIGNED"
+
+# Event statuses
+PENDING = "PENDING"
+PROCESSING = "PROCESSING"
+SENT = "SENT"
+FAILED = "FAILED"
+
+POLL_INTERVAL_SECONDS = int(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "5"))
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+MAX_CONCURRENCY = int(os.getenv("OUTBOX_MAX_CONCURRENCY", "4"))
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+# A claimed event not finished within this time is claimed again (worker crashed)
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# Order statuses customers are emailed about
+EMAIL_STATUSES = {"ACCEPTED", "PICKED_UP", "DELIVERED", "CANCELLED"}
+
+Handler = Callable[[dict], None]
+_handlers: Dict[str, List[Handler]] = defaultdict(list)
+
+# Background scheduler instance (initialized on startup)
+_scheduler: Optional[BackgroundScheduler] = None
+
+
+def register_handler(event_type: str, handler: Handler) -> None:
+    """Run ``handler(payload)`` for every dispatched event of ``event_type``."""
+    _handlers[event_type].append(handler)
+
+
+def enqueue_event(db: Session, event_type: str, aggregate_id: Optional[int], payload: dict) -> OutboxEventModel:
+    """Add an event to the caller's transaction. Does not commit."""
+    event = OutboxEventModel(
+        eventType=event_type,
+        aggregateId=aggregate_id,
+        payload=payload,
+        status=PENDING,
+        attempts=0,
+        availableAt=datetime.utcnow()
+    )
+    db.add(event)
+    return event
+
+
+def _status_name(status) -> Optional[str]:
+    if status is None:
+        return None
+    return status.value if isinstance(status, OrderStatus) else str(status)
+
+
+def enqueue_order_created(db: Session, order: OrderModel, notify_customer: bool = False) -> None:
+    """
+    Record that a (flushed) order was created. Does not commit.
+
+    ``notify_customer`` sends the customer the order confirmation email.
+    """
+    enqueue_event(db, ORDER_CREATED, order.id, {
+        "order_id": order.id,
+        "store_id": order.storeId,
+        "notify_customer": notify_customer,
+    })
+
+
+def enqueue_status_change(db: Session, order: OrderModel, old_status, notify_customer: bool = False) -> None:
+    """
+    Record that ``order`` moved from ``old_status`` to its current status.
+
+    Cancellations are recorded as ORDER_CANCELLED, everything else as
+    ORDER_STATUS_CHANGED. Does nothing if the status did not change. Does not commit.
+    ``notify_customer`` sends the status email (for EMAIL_STATUSES).
+    """
+    old_name, new_name = _status_name(old_status), _status_name(order.status)
+    if old_name == new_name:
+        return
+    event_type = ORDER_CANCELLED if new_name == OrderStatus.CANCELLED.value else ORDER_STATUS_CHANGED
+    enqueue_event(db, event_type, order.id, {
+        "order_id": order.id,
+        "store_id": order.storeId,
+        "old_status": old_name,
+        "status": new_name,
+        "notify_customer": notify_customer,
+    })
+
+
+def enqueue_delivery_assigned(db: Session, order: OrderModel, driver_id: int, schedule_time: Optional[datetime]) -> None:
+    """Record that a driver was assigned to an order. Does not commit."""
+    enqueue_event(db, DELIVERY_ASSIGNED, order.id, {
+        "order_id": order.id,
+        "store_id": order.storeId,
+        "driver_id": driver_id,
+        "schedule_time": schedule_time.isoformat() if schedule_time else None,
+    })
+
+
+def _claim_events(batch_size: int) -> list:
+    """
+    Claim up to ``batch_size`` due events in one short transaction.
+
+    Returns (id, eventType, payload, attempts) rows; ``attempts`` includes this claim.
+
+    SKIP LOCKED lets several dispatchers (one per app worker) drain the outbox
+    concurrently without handing out the same event twice.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        due = (
+            select(OutboxEventModel.id)
+            .where(
+                or_(OutboxEventModel.status == PENDING, OutboxEventModel.status == PROCESSING),
+                OutboxEventModel.availableAt <= now
+            )
+            .order_by(OutboxEventModel.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        events = db.execute(
+            update(OutboxEventModel)
+            .where(OutboxEventModel.id.in_(due))
+            .values(
+                status=PROCESSING,
+                attempts=OutboxEventModel.attempts + 1,
+                availableAt=now + CLAIM_TIMEOUT
+            )
+            .returning(
+                OutboxEventModel.id,
+                OutboxEventModel.eventType,
+                OutboxEventModel.payload,
+                OutboxEventModel.attempts
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+        return sorted(events, key=lambda event: event.id)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _run_handlers(event) -> Optional[str]:
+    """Run every handler for an event. Returns an error message, or None on success."""
+    try:
+        for handler in _handlers.get(event.eventType, []):
+            handler(event.payload or {})
+        return None
+    except Exception as e:
+        logger.warning(f"Outbox event {event.id} ({event.eventType}) attempt {event.attempts} failed: {e}")
+        return str(e) or e.__class__.__name__
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS))
+
+
+def _complete_events(events: list, errors: List[Optional[str]]) -> None:
+    """Mark dispatched events sent, or schedule their retry, in one transaction."""
+    now = datetime.utcnow()
+    sent_ids = [event.id for event, error in zip(events, errors) if error is None]
+
+    db = SessionLocal()
+    try:
+        if sent_ids:
+            db.execute(
+                update(OutboxEventModel)
+                .where(OutboxEventModel.id.in_(sent_ids))
+                .values(status=SENT, processedAt=now, lastError=None)
+                .execution_options(synchronize_session=False)
+            )
+        for event, error in zip(events, errors):
+            if error is None:
+                continue
+            if event.attempts >= MAX_ATTEMPTS:
+                logger.error(f"Outbox event {event.id} ({event.eventType}) failed permanently: {error}")
+                values = {"status": FAILED, "processedAt": now, "lastError": error}
+            else:
+                values = {"status": PENDING, "availableAt": now + _retry_delay(event.attempts), "lastError": error}
+            db.execute(
+                update(OutboxEventModel)
+                .where(OutboxEventModel.id == event.id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def dispatch_pending_events(batch_size: int = BATCH_SIZE, max_batches: int = 10) -> int:
+    """
+    Deliver due outbox events.
+
+    Args:
+        batch_size: Events claimed per transaction
+        max_batches: Stop after this many batches so one run stays short
+
+    Returns:
+        Number of events processed (sent or failed)
+    """
+    processed = 0
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="outbox") as executor:
+        for _ in range(max_batches):
+            events = _claim_events(batch_size)
+            if not events:
+                break
+            errors = list(executor.map(_run_handlers, events))
+            _complete_events(events, errors)
+            processed += len(events)
+            if len(events) < batch_size:
+                break
+    return processed
+
+
+def _dispatch_job() -> None:
+    try:
+        dispatch_pending_events()
+    except Exception as e:
+        logger.error(f"Outbox dispatch failed: {e}")
+
+
+def setup_outbox_dispatcher():
+    """
+    Configure and start the APScheduler background scheduler that drains the outbox.
+
+    Polls every OUTBOX_POLL_INTERVAL_SECONDS seconds.
+    """
+    global _scheduler
+
+    if _scheduler is not None:
+        logger.warning("Outbox dispatcher already running")
+        return
+
+    _scheduler = BackgroundScheduler(
+        job_defaults={
+            'coalesce': True,  # Combine multiple missed runs into one
+            'max_instances': 1  # Only one instance of job can run at a time
+        },
+        timezone='UTC'
+    )
+
+    _scheduler.add_job(
+        _dispatch_job,
+        trigger='interval',
+        seconds=POLL_INTERVAL_SECONDS,
+        id='outbox_dispatch',
+        replace_existing=True
+    )
+
+    _scheduler.start()
+
+    logger.info(f"Outbox dispatcher started (every {POLL_INTERVAL_SECONDS}s)")
+
+
+# Email handlers
+
+def _require_sent(sent: bool, what: str) -> None:
+    # EmailService swallows errors and returns False; raise so the event is retried
+    if not sent:
+        raise RuntimeError(f"Failed to send {what}")
+
+
+def send_order_confirmation_email(payload: dict) -> None:
+    """ORDER_CREATED: confirmation email for paid (Square or COD) orders."""
+    from app.services.email_service import EmailService
+
+    if not payload.get("notify_customer"):
+        return
+
+    db = SessionLocal()
+    try:
+        order = db.query(OrderModel).filter(OrderModel.id == payload["order_id"]).first()
+        if not order or not order.payment:
+            return
+        user = db.query(UserModel).filter(UserModel.id == order.createdByUserId).first()
+        if not user or not user.email:
+            return
+        store = db.query(StoreModel).filter(StoreModel.id == order.storeId).first()
+        payment = order.payment
+
+        is_cod = payment.type == PaymentType.CASH
+        sent = EmailService().send_order_confirmation_with_payment(
+            to_email=user.email,
+            order_id=str(order.id),
+            display_code=order.display_code,
+            order_total=order.orderTotalAmount,
+            payment_id="COD" if is_cod else (payment.square_payment_id or ""),  # Indicate Cash on Delivery
+            payment_amount=round(order.orderTotalAmount, 2),
+            receipt_url=None if is_cod else payment.receipt_url,
+            order_type=order.type.value.lower() if order.type else "delivery",
+            store_name=store.name if store else "Indimitra"
+        )
+        _require_sent(sent, f"order confirmation email for order {order.id}")
+    finally:
+        db.close()
+
+
+def send_order_status_email(payload: dict) -> None:
+    """ORDER_STATUS_CHANGED / ORDER_CANCELLED: status update email for selected statuses."""
+    from app.services.email_service import EmailService
+
+    status = payload.get("status")
+    if not payload.get("notify_customer") or status not in EMAIL_STATUSES:
+        return
+
+    db = SessionLocal()
+    try:
+        user = (
+            db.query(UserModel)
+            .join(OrderModel, OrderModel.createdByUserId == UserModel.id)
+            .filter(OrderModel.id == payload["order_id"])
+            .first()
+        )
+        if not user or not user.email:
+            return
+        sent = EmailService().send_order_status_update(
+            to_email=user.email,
+            order_id=str(payload["order_id"]),
+            status=status
+        )
+        _require_sent(sent, f"status email for order {payload['order_id']}")
+    finally:
+        db.close()
+
+
+register_handler(ORDER_CREATED, send_order_confirmation_email)
+register_handler(ORDER_STATUS_CHANGED, send_order_status_email)
+register_handler(ORDER_CANCELLED, send_order_status_email)
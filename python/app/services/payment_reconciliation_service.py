@@ -10,9 +10,15 @@ This service allows admins to:
 1. Find orphaned payments by querying Square
 2. Create the missing order from the logged order_params
 
-Usage (admin/CLI):
+Usage (admin/CLI), with the values from the ORPHANED_PAYMENT log line:
     from app.services.payment_reconciliation_service import reconcile_payment
-    reconcile_payment(idempotency_key="...", order_params={...})
+    reconcile_payment(
+        square_payment_id="...", idempotency_key="...", order_params={...},
+        charged_amount_cents=...
+    )
+
+or, within 24 hours of the payment, let Square supply the payment details:
+    reconcile_payment_by_idempotency_key(idempotency_key="...", order_params={...})
 """
 import logging
 from typing import Optional, Dict, Any
@@ -25,6 +31,11 @@ from app.db.models.order import OrderModel, OrderStatus
 from app.db.models.order_item import OrderItemModel
 from app.db.models.inventory import InventoryModel
 from app.db.models.fees import FeeType
+from app.services.inventory_reservation_service import InsufficientStockError, reserve_inventory
+from app.services.money import to_cents
+from app.services.order_metrics_service import record_order_created
+from app.services.order_service import line_amount_columns, order_amount_columns, payment_amount_columns
+from app.services.outbox_service import enqueue_order_created
 
 logger = logging.getLogger(__name__)
 
@@ -110,7 +121,8 @@ def reconcile_payment(
     idempotency_key: str,
     order_params: Dict[str, Any],
     payment_status: str = "COMPLETED",
-    receipt_url: Optional[str] = None
+    receipt_url: Optional[str] = None,
+    charged_amount_cents: Optional[int] = None
 ) -> OrderModel:
     """
     Create order and payment records for an orphaned Square payment.
@@ -127,15 +139,18 @@ def reconcile_payment(
             Required keys: user_id, store_id, product_items, total_amount,
                           order_total_amount, pickup_or_delivery
             Optional keys: address_id, pickup_id, delivery_fee, tip_amount,
-                          tax_amount, delivery_instructions, custom_order
+                          tax_amount, delivery_instructions, custom_order,
+                          inventory_released (stock is reserved again when true)
         payment_status: Square payment status (default COMPLETED)
         receipt_url: Square receipt URL
+        charged_amount_cents: Amount Square charged (``amount_cents`` from
+            find_payment_by_idempotency_key); must equal order_total_amount
 
     Returns:
         Created OrderModel
 
     Raises:
-        ValueError: If payment already reconciled or params invalid
+        ValueError: If payment already reconciled, params invalid or the charged amount differs
     """
     # Check not already reconciled
     if check_payment_exists_locally(square_payment_id):
@@ -154,12 +169,27 @@ def reconcile_payment(
         order_total_amount = order_params["order_total_amount"]
         pickup_or_delivery = order_params["pickup_or_delivery"]
 
+        if charged_amount_cents is not None and charged_amount_cents != to_cents(order_total_amount):
+            raise ValueError(
+                f"Square charged {charged_amount_cents} cents but the order total is "
+                f"{to_cents(order_total_amount)} cents"
+            )
+
+        # The failed checkout gave its stock back; take it again for the order.
+        # The customer has paid, so a shortfall is logged rather than blocking it.
+        if order_params.get("inventory_released"):
+            try:
+                with db.begin_nested():
+                    reserve_inventory(db, store_id, product_items)
+            except InsufficientStockError as e:
+                logger.warning(f"Reconciling payment {square_payment_id}: {e.message}")
+
         # Create PaymentModel
         payment = PaymentModel(
             type=PaymentType.SQUARE,
             square_payment_id=square_payment_id,
             idempotency_key=idempotency_key,
-            amount=round(order_total_amount, 2),
+            **payment_amount_columns(order_total_amount),
             currency="USD",
             status=PaymentStatus[payment_status] if payment_status in PaymentStatus.__members__ else PaymentStatus.COMPLETED,
             receipt_url=receipt_url
@@ -176,11 +206,13 @@ def reconcile_payment(
             storeId=store_id,
             status=OrderStatus.PENDING,
             paymentId=payment.id,
-            totalAmount=total_amount,
-            orderTotalAmount=order_total_amount,
-            deliveryFee=order_params.get("delivery_fee"),
-            tipAmount=order_params.get("tip_amount"),
-            taxAmount=order_params.get("tax_amount"),
+            **order_amount_columns(
+                total_amount,
+                order_total_amount,
+                order_params.get("delivery_fee"),
+                order_params.get("tip_amount"),
+                order_params.get("tax_amount")
+            ),
             deliveryDate=None,
             deliveryInstructions=order_params.get("delivery_instructions")
         )
@@ -190,6 +222,8 @@ def reconcile_payment(
         # Set display code
         order.display_code = f"REC{order.id}{pickup_or_delivery[0].upper()}"  # REC prefix for reconciled
         order.custom_order = order_params.get("custom_order")
+        record_order_created(db, order)
+        enqueue_order_created(db, order)
 
         # Create order items
         product_ids = [item["product_id"] for item in product_items]
@@ -208,7 +242,7 @@ def reconcile_payment(
                 productId=item["product_id"],
                 quantity=item["quantity"],
                 orderId=order.id,
-                orderAmount=inventory_item.price * item["quantity"],
+                **line_amount_columns(inventory_item.price, item["quantity"]),
                 inventoryId=inventory_item.id
             )
             db.add(order_item)
@@ -231,6 +265,39 @@ def reconcile_payment(
         db.close()
 
 
+def reconcile_payment_by_idempotency_key(idempotency_key: str, order_params: Dict[str, Any]) -> OrderModel:
+    """
+    Reconcile an orphaned payment using the payment Square has on record.
+
+    The payment ID, status, receipt and charged amount come from
+    find_payment_by_idempotency_key, so the order is only created if Square
+    charged exactly its total.
+
+    Args:
+        idempotency_key: Original idempotency key
+        order_params: Dict with order details (see reconcile_payment)
+
+    Returns:
+        Created OrderModel
+
+    Raises:
+        ValueError: If Square has no such payment, or reconcile_payment rejects it
+        PaymentError: If the Square query fails
+    """
+    square_payment = find_payment_by_idempotency_key(idempotency_key)
+    if not square_payment:
+        raise ValueError(f"No Square payment found for idempotency key {idempotency_key}")
+
+    return reconcile_payment(
+        square_payment_id=square_payment["payment_id"],
+        idempotency_key=idempotency_key,
+        order_params=order_params,
+        payment_status=square_payment["status"],
+        receipt_url=square_payment.get("receipt_url"),
+        charged_amount_cents=square_payment["amount_cents"]
+    )
+
+
 def find_orphaned_payments(hours_back: int = 24) -> list:
     """
     Search logs for ORPHANED_PAYMENT entries that haven't been reconciled.
@@ -69,6 +69,7 @@ def create_square_payment(
             - payment_id: Square payment ID
             - status: Payment status (COMPLETED, APPROVED, PENDING, etc.)
             - receipt_url: URL to payment receipt (if available)
+            - amount_cents: Amount Square charged, in cents
 
     Raises:
         PaymentError: If Square API returns error or payment is declined
@@ -121,7 +122,8 @@ def create_square_payment(
         return {
             "payment_id": payment.id,
             "status": payment.status,
-            "receipt_url": payment.receipt_url if payment.receipt_url else None
+            "receipt_url": payment.receipt_url if payment.receipt_url else None,
+            "amount_cents": payment.amount_money.amount if payment.amount_money else None
         }
 
     except PaymentError:
@@ -175,6 +177,7 @@ def create_square_payment_for_store(
             - payment_id: Square payment ID
             - status: Payment status (COMPLETED, APPROVED, PENDING, etc.)
             - receipt_url: URL to payment receipt (if available)
+            - amount_cents: Amount Square charged, in cents
 
     Raises:
         PaymentError: If Square API returns error or payment is declined
@@ -184,9 +187,19 @@ def create_square_payment_for_store(
 
     db = SessionLocal()
     try:
-        # Fetch store from database
-        store = db.query(StoreModel).filter(StoreModel.id == store_id).first()
+        # Read the connection state here rather than from the cached checkout config, so a
+        # disconnect or token change applies to the very next payment. Only the Square
+        # columns: loading the store would decrypt every Square column
+        store = db.query(
+            StoreModel.is_square_connected,
+            StoreModel.square_access_token,
+            StoreModel.square_merchant_id
+        ).filter(StoreModel.id == store_id).first()
+    finally:
+        # Release the connection before calling Square
+        db.close()
 
+    try:
         if not store:
             raise PaymentError(
                 message=f"Store with ID {store_id} not found",
@@ -270,7 +283,8 @@ def create_square_payment_for_store(
                 return {
                     "payment_id": payment.id,
                     "status": payment.status,
-                    "receipt_url": payment.receipt_url if payment.receipt_url else None
+                    "receipt_url": payment.receipt_url if payment.receipt_url else None,
+                    "amount_cents": payment.amount_money.amount if payment.amount_money else None
                 }
 
             except PaymentError:
@@ -312,5 +326,3 @@ def create_square_payment_for_store(
             message="An unexpected error occurred while processing your payment. Please try again.",
             code="UNEXPECTED_ERROR"
         )
-    finally:
-        db.close()
@@ -1,38 +1,58 @@
 from typing import List, Optional
 from app.db.session import SessionLocal
+from app.services.reference_data_cache import PICKUP_ADDRESSES, bump_reference_version, get_cached_models
 from app.db.models.pickup_address import PickupAddressModel
+from app.services.store_locator_service import validate_location
 
-def create_pickup_address(store_id: int, address: str) -> PickupAddressModel:
+def create_pickup_address(
+    store_id: int,
+    address: str,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None
+) -> PickupAddressModel:
     """
     Create a new pickup address for a store.
     
     Args:
         store_id: ID of the store
         address: Pickup address
+        latitude: Optional latitude (given together with longitude)
+        longitude: Optional longitude
         
     Returns:
         The created PickupAddressModel instance
     """
+    validate_location(latitude, longitude)
     db = SessionLocal()
     try:
         pickup_address = PickupAddressModel(
             store_id=store_id,
-            address=address
+            address=address,
+            latitude=latitude,
+            longitude=longitude
         )
         db.add(pickup_address)
+        bump_reference_version(db, PICKUP_ADDRESSES)
         db.commit()
         db.refresh(pickup_address)
         return pickup_address
     finally:
         db.close()
 
-def update_pickup_address(id: int, address: Optional[str] = None) -> Optional[PickupAddressModel]:
+def update_pickup_address(
+    id: int,
+    address: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None
+) -> Optional[PickupAddressModel]:
     """
     Update an existing pickup address.
     
     Args:
         id: ID of the pickup address to update
         address: New address (optional)
+        latitude: New latitude (optional, given together with longitude)
+        longitude: New longitude (optional)
         
     Returns:
         The updated PickupAddressModel instance, or None if not found
@@ -45,7 +65,12 @@ def update_pickup_address(id: int, address: Optional[str] = None) -> Optional[Pi
             
         if address is not None:
             pickup_address.address = address
+        if latitude is not None or longitude is not None:
+            validate_location(latitude, longitude)
+            pickup_address.latitude = latitude
+            pickup_address.longitude = longitude
             
+        bump_reference_version(db, PICKUP_ADDRESSES)
         db.commit()
         db.refresh(pickup_address)
         return pickup_address
@@ -69,6 +94,7 @@ def delete_pickup_address(id: int) -> bool:
             return False
             
         db.delete(pickup_address)
+        bump_reference_version(db, PICKUP_ADDRESSES)
         db.commit()
         return True
     finally:
@@ -82,10 +108,6 @@ def get_pickup_addresses_by_store(store_id: int) -> List[PickupAddressModel]:
         store_id: ID of the store
         
     Returns:
-        List of PickupAddressModel instances for the store
+        List of PickupAddressModel instances for the store (built from cached values; not attached to a session)
     """
-    db = SessionLocal()
-    try:
-        return db.query(PickupAddressModel).filter(PickupAddressModel.store_id == store_id).all()
-    finally:
-        db.close() 
\ No newline at end of file
+    return get_cached_models(PICKUP_ADDRESSES, store_id, PickupAddressModel, PickupAddressModel.store_id == store_id) 
\ No newline at end of file
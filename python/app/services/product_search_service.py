@@ -0,0 +1,130 @@
+"""
+Product search within a store's storefront.
+
+Matches products by full-text prefix search on ``products.search_vector``
+(name weighted above description) or by trigram similarity on the name, so
+both "toor d" and "tor dal" find "Toor Dal". Both conditions are served by
+GIN indexes. Results are restricted to the store's listed and available
+inventory, ranked by text rank plus name similarity, and paginated with an
+opaque keyset cursor on (rank, product id).
+"""
+import base64
+import json
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import Float, and_, cast, func, or_
+from sqlalchemy.orm import Session, contains_eager, joinedload
+
+from app.db.session import SessionLocal
+from app.db.models.inventory import InventoryModel
+from app.db.models.product import ProductModel
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_QUERY_LENGTH = 100
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _prefix_tsquery(query: str) -> Optional[str]:
+    """'toor d' -> 'toor:* & d:*'; None if the query has no word characters."""
+    terms = _TERM_PATTERN.findall(query.lower())
+    return " & ".join(f"{term}:*" for term in terms) if terms else None
+
+
+def encode_cursor(rank: float, product_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, product_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor
+    """
+    try:
+        rank, product_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(rank), int(product_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def search_products(
+    store_id: int,
+    query: str,
+    first: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    db: Optional[Session] = None
+) -> dict:
+    """
+    Search a store's listed, available products.
+
+    Args:
+        store_id: Store to search in
+        query: Search text
+        first: Page size (max MAX_PAGE_SIZE)
+        after: Cursor of the last result of the previous page
+        db: Optional database session
+
+    Returns:
+        Dict with ``items`` (InventoryModel rows with product and category
+        loaded, best match first), ``end_cursor`` and ``has_more``
+
+    Raises:
+        ValueError: If the query, page size or cursor is invalid
+    """
+    query = (query or "").strip()
+    if not query:
+        raise ValueError("Search query must not be empty")
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f"Search query must be at most {MAX_QUERY_LENGTH} characters")
+    if not 1 <= first <= MAX_PAGE_SIZE:
+        raise ValueError(f"first must be between 1 and {MAX_PAGE_SIZE}")
+    cursor = decode_cursor(after) if after else None
+
+    # `%` is pg_trgm's similarity operator (pg_trgm.similarity_threshold, 0.3 by default)
+    similarity = cast(func.similarity(ProductModel.name, query), Float(53))
+    matches = ProductModel.name.op("%")(query)
+    rank = similarity
+    tsquery_text = _prefix_tsquery(query)
+    if tsquery_text:
+        tsquery = func.to_tsquery("simple", tsquery_text)
+        matches = or_(ProductModel.search_vector.op("@@")(tsquery), matches)
+        # Double precision so the rank survives the round trip through the cursor exactly
+        rank = cast(func.ts_rank(ProductModel.search_vector, tsquery), Float(53)) + similarity
+
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+    try:
+        statement = (
+            db.query(InventoryModel, rank.label("rank"))
+            .join(ProductModel, ProductModel.id == InventoryModel.productId)
+            .options(contains_eager(InventoryModel.product).joinedload(ProductModel.category))
+            .filter(
+                InventoryModel.storeId == store_id,
+                InventoryModel.is_listed.is_(True),
+                InventoryModel.is_available.is_(True),
+                matches
+            )
+        )
+        if cursor:
+            last_rank, last_product_id = cursor
+            statement = statement.filter(or_(
+                rank < last_rank,
+                and_(rank == last_rank, ProductModel.id > last_product_id)
+            ))
+        rows = statement.order_by(rank.desc(), ProductModel.id).limit(first + 1).all()
+
+        has_more = len(rows) > first
+        rows = rows[:first]
+        end_cursor = encode_cursor(rows[-1].rank, rows[-1].InventoryModel.productId) if rows else None
+        return {
+            "items": [row.InventoryModel for row in rows],
+            "end_cursor": end_cursor,
+            "has_more": has_more,
+        }
+    finally:
+        if close_db:
+            db.close()
@@ -2,12 +2,86 @@ from app.db.session import SessionLocal
 from app.db.models.product import ProductModel
 from app.db.models.inventory import InventoryModel
 from app.db.models.category import CategoryModel
-from typing import Optional
+from app.services.store_catalog_service import mark_catalogs_stale_for_products
+from app.services.inventory_sync_service import record_inventory_tombstones
+from app.services.reference_data_cache import PRODUCTS, bump_reference_version, get_cached_models
+from typing import List, Optional
 
 def get_all_products():
+    """All products (built from cached values; not attached to a session)"""
+    return get_cached_models(PRODUCTS, "all", ProductModel)
+
+# Fields exposed by the product listing API -> columns
+PRODUCT_LIST_FIELDS = {
+    "id": ProductModel.id,
+    "name": ProductModel.name,
+    "description": ProductModel.description,
+    "category_id": ProductModel.categoryId,
+    "image": ProductModel.image,
+    "image_variants": ProductModel.image_variants,
+}
+PRODUCT_PAGE_DEFAULT_SIZE = 100
+PRODUCT_PAGE_MAX_SIZE = 500
+
+def validate_product_page(fields: Optional[List[str]], first: int) -> List[str]:
+    """
+    Check list_products_page arguments without querying.
+
+    Returns:
+        The fields to return (default: all)
+
+    Raises:
+        ValueError: If a field or the page size is invalid
+    """
+    fields = fields or list(PRODUCT_LIST_FIELDS)
+    invalid = [field for field in fields if field not in PRODUCT_LIST_FIELDS]
+    if invalid:
+        raise ValueError(f"Invalid fields: {invalid}. Allowed: {list(PRODUCT_LIST_FIELDS)}")
+    if not 1 <= first <= PRODUCT_PAGE_MAX_SIZE:
+        raise ValueError(f"first must be between 1 and {PRODUCT_PAGE_MAX_SIZE}")
+    return fields
+
+def list_products_page(
+    fields: Optional[List[str]] = None,
+    first: int = PRODUCT_PAGE_DEFAULT_SIZE,
+    after: Optional[int] = None,
+    category_id: Optional[int] = None
+) -> dict:
+    """
+    A page of products ordered by ID, with only the requested fields.
+
+    Args:
+        fields: Keys of PRODUCT_LIST_FIELDS to return (default: all)
+        first: Page size (max PRODUCT_PAGE_MAX_SIZE)
+        after: Return products with an ID greater than this (the previous page's next_cursor)
+        category_id: Optional category to restrict to
+
+    Returns:
+        Dict with ``items`` (plain dicts), ``next_cursor`` and ``has_more``
+
+    Raises:
+        ValueError: If a field or the page size is invalid
+    """
+    fields = validate_product_page(fields, first)
+
     db = SessionLocal()
     try:
-        return db.query(ProductModel).all()
+        # Always select the ID: it is the pagination key
+        columns = [ProductModel.id.label("_id")] + [PRODUCT_LIST_FIELDS[field].label(field) for field in fields]
+        query = db.query(*columns)
+        if after is not None:
+            query = query.filter(ProductModel.id > after)
+        if category_id is not None:
+            query = query.filter(ProductModel.categoryId == category_id)
+        rows = query.order_by(ProductModel.id).limit(first + 1).all()
+
+        has_more = len(rows) > first
+        rows = rows[:first]
+        return {
+            "items": [{field: getattr(row, field) for field in fields} for row in rows],
+            "next_cursor": rows[-1]._id if has_more else None,
+            "has_more": has_more,
+        }
     finally:
         db.close()
 
@@ -36,6 +110,7 @@ def create_product(name: str, description: str, categoryId: int, image: Optional
             image=image
         )
         db.add(product)
+        bump_reference_version(db, PRODUCTS)
         db.commit()
         db.refresh(product)
         print(f"Created product with image: {product.image}")  # Add logging
@@ -51,11 +126,16 @@ def delete_product(product_id: int) -> bool:
         if not product:
             return False
             
+        # Flag the catalogs of stores stocking it while the inventory rows still exist
+        mark_catalogs_stale_for_products(db, [product_id])
+
         # Delete associated inventory items first
+        record_inventory_tombstones(db, InventoryModel.productId == product_id)
         db.query(InventoryModel).filter(InventoryModel.productId == product_id).delete()
         
         # Delete the product
         db.delete(product)
+        bump_reference_version(db, PRODUCTS)
         db.commit()
         return True
     except Exception as e:
@@ -82,7 +162,11 @@ def update_product(product_id: int, name: str, description: str, categoryId: int
         product.name = name
         product.description = description
         product.categoryId = categoryId
+        if image != product.image:
+            product.image_variants = None  # Regenerated by image_variant_service
         product.image = image
+        mark_catalogs_stale_for_products(db, [product_id])
+        bump_reference_version(db, PRODUCTS)
         
         db.commit()
         db.refresh(product)
@@ -0,0 +1,223 @@
+"""
+In-process cache for reference data (categories, products, fees, store
+location codes, pickup addresses, store subdomains).
+
+This data is read on nearly every request and changes a few times a day.
+Each kind of data has a version counter in ``reference_data_versions``,
+bumped by writers in the same transaction as their change. Readers serve
+cached results tagged with the version they were loaded under; the counters
+themselves are re-read (one small query) at most every
+REFERENCE_CACHE_MAX_STALENESS_SECONDS, which bounds how stale another
+worker's copy can be. A worker that writes sees its own change immediately.
+
+Cached values are shared between requests and threads, so they must be
+plain data that no session owns: frozen dataclasses, tuples, numbers, or
+dicts nobody mutates. ORM instances are never cached; get_cached_models
+caches a model's column values and builds fresh instances on every call.
+"""
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models.reference_data_version import ReferenceDataVersionModel
+
+logger = logging.getLogger(__name__)
+
+# Entities
+CATEGORIES = "categories"
+PRODUCTS = "products"
+FEES = "fees"
+STORE_LOCATION_CODES = "store_location_codes"
+PICKUP_ADDRESSES = "pickup_addresses"
+STORES = "stores"
+
+CACHE_SIZE = int(os.getenv("REFERENCE_CACHE_SIZE", "2048"))
+MAX_STALENESS_SECONDS = float(os.getenv("REFERENCE_CACHE_MAX_STALENESS_SECONDS", "5"))
+
+
+# Every cache instance, so clear_reference_cache can empty them all
+_all_caches: "weakref.WeakSet[ReferenceCache]" = weakref.WeakSet()
+
+
+class ReferenceCache:
+    """
+    Thread-safe bounded mapping of (entity, key) -> (version, value).
+
+    get_cached uses a shared default instance; give bulky or numerous values
+    their own instance so they cannot evict everything else.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: "OrderedDict[Tuple[Hashable, Hashable], Tuple[Hashable, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        _all_caches.add(self)
+
+    def get(self, entity: Hashable, key: Hashable, version: Hashable):
+        with self._lock:
+            entry = self._entries.get((entity, key))
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end((entity, key))
+            return entry
+
+    def put(self, entity: Hashable, key: Hashable, version: Hashable, value) -> None:
+        with self._lock:
+            self._entries[(entity, key)] = (version, value)
+            self._entries.move_to_end((entity, key))
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _VersionedLRUCache(ReferenceCache):
+    """The default cache, which also holds this worker's copy of the version counters."""
+
+    def __init__(self, max_size: int):
+        super().__init__(max_size)
+        self._versions: Dict[str, Tuple[int, Optional[datetime]]] = {}
+        self._versions_checked_at = float("-inf")
+        self._generation = 0  # Bumped by expire_versions
+
+    def current_version(self, entity: str) -> Tuple[int, Optional[datetime]]:
+        """(version, last change time) of ``entity``, re-reading all counters if the last read is too old."""
+        with self._lock:
+            if time.monotonic() - self._versions_checked_at < MAX_STALENESS_SECONDS:
+                return self._versions.get(entity, (0, None))
+            generation = self._generation
+
+        versions = _read_versions()
+        with self._lock:
+            # Only trust the read for the full interval if no local write committed meanwhile
+            if generation == self._generation:
+                self._versions = versions
+                self._versions_checked_at = time.monotonic()
+            return versions.get(entity, (0, None))
+
+    def expire_versions(self) -> None:
+        """Force the next read to re-check the counters."""
+        with self._lock:
+            self._generation += 1
+            self._versions_checked_at = float("-inf")
+
+    def clear(self) -> None:
+        super().clear()
+        with self._lock:
+            self._versions.clear()
+            self._versions_checked_at = float("-inf")
+
+
+def _read_versions() -> Dict[str, Tuple[int, Optional[datetime]]]:
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            ReferenceDataVersionModel.entity,
+            ReferenceDataVersionModel.version,
+            ReferenceDataVersionModel.updatedAt
+        )
+        return {row.entity: (row.version, row.updatedAt) for row in rows}
+    finally:
+        db.close()
+
+
+_cache = _VersionedLRUCache(CACHE_SIZE)
+
+
+def get_cached(
+    entity: Union[str, Tuple[str, ...]],
+    key: Hashable,
+    loader: Callable[[], List],
+    cache: Optional[ReferenceCache] = None
+) -> List:
+    """
+    Return ``loader()`` for (entity, key), from memory while ``entity``'s version is unchanged.
+
+    ``entity`` may be a tuple of entities for values built from several kinds
+    of data; the value is then reloaded when any of their versions changes.
+    Entries are kept in ``cache`` (default: the shared reference cache).
+    Returns a new list on every call; the items themselves are shared, so
+    ``loader`` must return plain, read-only values, never ORM instances.
+    """
+    # Read the version before loading: a change committed while loading then
+    # leaves the entry tagged with the old version, and it is reloaded next time
+    if isinstance(entity, tuple):
+        version = tuple(_cache.current_version(name)[0] for name in entity)
+    else:
+        version, _ = _cache.current_version(entity)
+    cache = cache or _cache
+    entry = cache.get(entity, key, version)
+    if entry is not None:
+        return list(entry[1])
+
+    value = loader()
+    cache.put(entity, key, version, list(value))
+    return list(value)
+
+
+def get_cached_models(entity: str, key: Hashable, model: type, *criteria) -> List:
+    """
+    Return ``model`` rows matching ``criteria``, with their column values cached under (entity, key).
+
+    Each call builds new, unsaved ``model`` instances from the cached values,
+    so callers own what they get back. Deferred columns are not loaded.
+    """
+    columns = [attribute.key for attribute in inspect(model).column_attrs if not attribute.deferred]
+
+    def load() -> List[dict]:
+        db = SessionLocal()
+        try:
+            rows = db.query(*(getattr(model, column) for column in columns)).filter(*criteria)
+            return [dict(zip(columns, row)) for row in rows]
+        finally:
+            db.close()
+
+    return [model(**values) for values in get_cached(entity, key, load)]
+
+
+def get_reference_version(entity: str) -> Tuple[int, Optional[datetime]]:
+    """
+    (version, last change time) of ``entity``, at most MAX_STALENESS_SECONDS old.
+
+    Usually answered from memory; use it to build ETag / Last-Modified headers.
+    """
+    return _cache.current_version(entity)
+
+
+def bump_reference_version(db: Session, *entities: str) -> None:
+    """
+    Mark ``entities`` as changed in the caller's transaction. Does not commit.
+
+    Other workers notice within MAX_STALENESS_SECONDS of the commit; this
+    worker re-checks on its first read after the commit.
+    """
+    now = datetime.utcnow()
+    for entity in entities:
+        statement = insert(ReferenceDataVersionModel).values(entity=entity, version=1, updatedAt=now)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["entity"],
+            set_={"version": ReferenceDataVersionModel.version + 1, "updatedAt": now}
+        ))
+    event.listen(db, "after_commit", _expire_versions_after_commit, once=True)
+
+
+def _expire_versions_after_commit(session: Session) -> None:
+    _cache.expire_versions()
+
+
+def clear_reference_cache() -> None:
+    """Drop every cached entry (e.g. in tests or after bulk maintenance)."""
+    for cache in list(_all_caches):
+        cache.clear()
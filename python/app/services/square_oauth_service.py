@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from square.client import Square, SquareEnvironment
 from app.db.models.store import StoreModel
+from app.services.reference_data_cache import STORES, bump_reference_version
 
 logger = logging.getLogger(__name__)
 
@@ -198,6 +199,7 @@ def exchange_authorization_code(code: str, store_id: int, db: Session) -> dict:
         store.square_refresh_token = result.refresh_token
         store.square_merchant_id = location_id  # Store location_id in merchant_id field for payment processing
         store.is_square_connected = True
+        bump_reference_version(db, STORES)
 
         db.commit()
 
@@ -266,6 +268,7 @@ def revoke_square_tokens(store_id: int, db: Session) -> bool:
     store.square_merchant_id = None
     store.square_location_id = None
     store.is_square_connected = False
+    bump_reference_version(db, STORES)
 
     db.commit()
 
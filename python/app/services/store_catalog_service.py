@@ -0,0 +1,291 @@
+"""
+Precomputed storefront catalog per store.
+
+A store's catalog (its listed and available inventory with product and
+category details, grouped by category) is stored as one JSON document in
+``store_catalog_snapshots`` together with a content hash (the ETag) and a
+version that only moves when the content changes. Shoppers read that
+document instead of resolving product and category per inventory item.
+
+Write paths that change what a catalog shows call the mark_*_stale helpers
+with their own session before committing; only the snapshots of the stores
+actually affected are flagged. A background job rebuilds flagged (and
+missing) snapshots every CATALOG_REBUILD_INTERVAL_SECONDS; until it has,
+reads build the catalog in memory without saving it, so reads never write.
+Stock quantities change on every checkout and are not part of the snapshot.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Iterable, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models.category import CategoryModel
+from app.db.models.inventory import InventoryModel
+from app.db.models.product import ProductModel
+from app.db.models.store import StoreModel
+from app.db.models.store_catalog_snapshot import StoreCatalogSnapshotModel
+
+logger = logging.getLogger(__name__)
+
+REBUILD_INTERVAL_SECONDS = int(os.getenv("CATALOG_REBUILD_INTERVAL_SECONDS", "10"))
+REBUILD_BATCH_SIZE = int(os.getenv("CATALOG_REBUILD_BATCH_SIZE", "50"))
+
+# Background scheduler instance (initialized on startup)
+_scheduler: Optional[BackgroundScheduler] = None
+
+
+def mark_catalogs_stale(db: Session, store_ids: Iterable[int]) -> None:
+    """Flag the catalogs of ``store_ids`` for rebuild. Does not commit."""
+    store_ids = list(set(store_ids))
+    if not store_ids:
+        return
+    db.execute(
+        update(StoreCatalogSnapshotModel)
+        .where(StoreCatalogSnapshotModel.storeId.in_(store_ids))
+        .values(stale=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_catalogs_stale_for_products(db: Session, product_ids: Iterable[int]) -> None:
+    """Flag the catalogs of every store stocking one of ``product_ids``. Does not commit."""
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return
+    stocking_stores = select(InventoryModel.storeId).where(InventoryModel.productId.in_(product_ids))
+    db.execute(
+        update(StoreCatalogSnapshotModel)
+        .where(StoreCatalogSnapshotModel.storeId.in_(stocking_stores))
+        .values(stale=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_catalogs_stale_for_category(db: Session, category_id: int) -> None:
+    """Flag the catalogs of every store stocking a product of ``category_id``. Does not commit."""
+    stocking_stores = (
+        select(InventoryModel.storeId)
+        .join(ProductModel, ProductModel.id == InventoryModel.productId)
+        .where(ProductModel.categoryId == category_id)
+    )
+    db.execute(
+        update(StoreCatalogSnapshotModel)
+        .where(StoreCatalogSnapshotModel.storeId.in_(stocking_stores))
+        .values(stale=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _current_variants(image: Optional[str], image_variants: Optional[dict]) -> list:
+    """Recorded variants of ``image``; none while they are still being generated."""
+    if not image_variants or image_variants.get("source") != image:
+        return []
+    return image_variants.get("variants", [])
+
+
+def build_catalog_payload(db: Session, store: StoreModel) -> dict:
+    """Read a store's listed, available inventory in one query and group it by category."""
+    rows = (
+        db.query(
+            InventoryModel.id.label("inventory_id"),
+            InventoryModel.price,
+            InventoryModel.measurement,
+            InventoryModel.unit,
+            ProductModel.id.label("product_id"),
+            ProductModel.name,
+            ProductModel.description,
+            ProductModel.image,
+            ProductModel.image_variants,
+            CategoryModel.id.label("category_id"),
+            CategoryModel.name.label("category_name"),
+        )
+        .join(ProductModel, ProductModel.id == InventoryModel.productId)
+        .join(CategoryModel, CategoryModel.id == ProductModel.categoryId)
+        .filter(
+            InventoryModel.storeId == store.id,
+            InventoryModel.is_listed.is_(True),
+            InventoryModel.is_available.is_(True)
+        )
+        .order_by(CategoryModel.name, CategoryModel.id, ProductModel.name, ProductModel.id)
+        .all()
+    )
+
+    categories = []
+    for row in rows:
+        if not categories or categories[-1]["id"] != row.category_id:
+            categories.append({"id": row.category_id, "name": row.category_name, "items": []})
+        categories[-1]["items"].append({
+            "inventory_id": row.inventory_id,
+            "product_id": row.product_id,
+            "name": row.name,
+            "description": row.description,
+            "image": row.image,
+            "image_variants": _current_variants(row.image, row.image_variants),
+            "price": row.price,
+            "measurement": row.measurement,
+            "unit": row.unit,
+        })
+
+    return {
+        "store_id": store.id,
+        "section_headers": store.section_headers or [],
+        "categories": categories,
+    }
+
+
+def _payload_etag(payload: dict) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def _rebuild(db: Session, snapshot: StoreCatalogSnapshotModel, store: StoreModel) -> None:
+    payload = build_catalog_payload(db, store)
+    etag = _payload_etag(payload)
+    if etag != snapshot.etag:
+        snapshot.version = (snapshot.version or 0) + 1
+        snapshot.etag = etag
+        snapshot.payload = payload
+        snapshot.itemCount = sum(len(category["items"]) for category in payload["categories"])
+    snapshot.stale = False
+    snapshot.builtAt = datetime.utcnow()
+
+
+def get_store_catalog(store_id: int) -> Optional[StoreCatalogSnapshotModel]:
+    """
+    Get a store's catalog snapshot. Read-only.
+
+    A stale or missing snapshot is built in memory and returned unsaved (with
+    the version it will get once rebuilt); the background job saves it.
+
+    Returns:
+        The snapshot (detached or unsaved), or None if the store does not exist
+    """
+    db = SessionLocal()
+    try:
+        snapshot = db.query(StoreCatalogSnapshotModel).filter(
+            StoreCatalogSnapshotModel.storeId == store_id
+        ).first()
+        if snapshot is not None and not snapshot.stale:
+            return snapshot
+
+        store = db.query(StoreModel).filter(StoreModel.id == store_id).first()
+        if not store:
+            return None
+
+        unsaved = StoreCatalogSnapshotModel(
+            storeId=store_id,
+            version=snapshot.version if snapshot else 0,
+            etag=snapshot.etag if snapshot else "",
+            stale=True
+        )
+        _rebuild(db, unsaved, store)
+        return unsaved
+    finally:
+        db.close()
+
+
+def rebuild_stale_catalogs(batch_size: int = REBUILD_BATCH_SIZE, db: Optional[Session] = None) -> int:
+    """
+    Save fresh snapshots for stores whose catalog is stale or missing.
+
+    Each snapshot is rebuilt in its own short transaction under a row lock
+    taken with SKIP LOCKED, so several workers running this job never
+    rebuild the same catalog twice.
+
+    Args:
+        batch_size: Most catalogs rebuilt per call
+        db: Optional database session
+
+    Returns:
+        Number of catalogs rebuilt
+    """
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+
+    rebuilt = 0
+    try:
+        missing = select(
+            StoreModel.id, literal(0), literal(""), literal({}, StoreCatalogSnapshotModel.payload.type),
+            literal(0), literal(True), literal(datetime.utcnow())
+        ).where(~select(StoreCatalogSnapshotModel.storeId).where(
+            StoreCatalogSnapshotModel.storeId == StoreModel.id
+        ).exists())
+        db.execute(
+            insert(StoreCatalogSnapshotModel)
+            .from_select(["storeId", "version", "etag", "payload", "itemCount", "stale", "builtAt"], missing)
+            .on_conflict_do_nothing(index_elements=["storeId"])
+        )
+        db.commit()
+
+        while rebuilt < batch_size:
+            snapshot = (
+                db.query(StoreCatalogSnapshotModel)
+                .filter(StoreCatalogSnapshotModel.stale.is_(True))
+                .order_by(StoreCatalogSnapshotModel.storeId)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if snapshot is None:
+                break
+            store = db.query(StoreModel).filter(StoreModel.id == snapshot.storeId).first()
+            _rebuild(db, snapshot, store)
+            db.commit()
+            rebuilt += 1
+            logger.info(f"Rebuilt catalog for store {snapshot.storeId} (version {snapshot.version}, {snapshot.itemCount} items)")
+        return rebuilt
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if close_db:
+            db.close()
+
+
+def _rebuild_job() -> None:
+    try:
+        rebuild_stale_catalogs()
+    except Exception as e:
+        logger.error(f"Catalog rebuild failed: {e}")
+
+
+def setup_catalog_rebuild_scheduler():
+    """
+    Configure and start the APScheduler background scheduler that rebuilds stale catalogs.
+
+    Runs every CATALOG_REBUILD_INTERVAL_SECONDS seconds.
+    """
+    global _scheduler
+
+    if _scheduler is not None:
+        logger.warning("Catalog rebuild scheduler already running")
+        return
+
+    _scheduler = BackgroundScheduler(
+        job_defaults={
+            'coalesce': True,  # Combine multiple missed runs into one
+            'max_instances': 1  # Only one instance of job can run at a time
+        },
+        timezone='UTC'
+    )
+
+    _scheduler.add_job(
+        _rebuild_job,
+        trigger='interval',
+        seconds=REBUILD_INTERVAL_SECONDS,
+        id='catalog_rebuild',
+        replace_existing=True
+    )
+
+    _scheduler.start()
+
+    logger.info(f"Catalog rebuild scheduler started (every {REBUILD_INTERVAL_SECONDS}s)")
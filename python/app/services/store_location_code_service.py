@@ -1,5 +1,6 @@
 from typing import List, Optional
 from app.db.session import SessionLocal
+from app.services.reference_data_cache import STORE_LOCATION_CODES, bump_reference_version, get_cached_models
 from app.db.models.store_location_code import StoreLocationCodeModel
 
 def create_store_location_code(store_id: int, location: str, code: str) -> StoreLocationCodeModel:
@@ -22,6 +23,7 @@ def create_store_location_code(store_id: int, location: str, code: str) -> Store
             code=code
         )
         db.add(location_code)
+        bump_reference_version(db, STORE_LOCATION_CODES)
         db.commit()
         db.refresh(location_code)
         return location_code
@@ -51,6 +53,7 @@ def update_store_location_code(id: int, location: Optional[str] = None, code: Op
         if code is not None:
             location_code.code = code
             
+        bump_reference_version(db, STORE_LOCATION_CODES)
         db.commit()
         db.refresh(location_code)
         return location_code
@@ -74,6 +77,7 @@ def delete_store_location_code(id: int) -> bool:
             return False
             
         db.delete(location_code)
+        bump_reference_version(db, STORE_LOCATION_CODES)
         db.commit()
         return True
     finally:
@@ -87,10 +91,8 @@ def get_store_location_codes_by_store(store_id: int) -> List[StoreLocationCodeMo
         store_id: ID of the store
         
     Returns:
-        List of StoreLocationCodeModel instances for the store
+        List of StoreLocationCodeModel instances for the store (built from cached values; not attached to a session)
     """
-    db = SessionLocal()
-    try:
-        return db.query(StoreLocationCodeModel).filter(StoreLocationCodeModel.store_id == store_id).all()
-    finally:
-        db.close() 
\ No newline at end of file
+    return get_cached_models(
+        STORE_LOCATION_CODES, store_id, StoreLocationCodeModel, StoreLocationCodeModel.store_id == store_id
+    ) 
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Store discovery by location.
+
+Finds the stores whose delivery radius (``store.radius``, in miles) covers a
+point. Without PostGIS the search is two-step: a bounding box around the
+point, as wide as the largest delivery radius, is answered from the
+(latitude, longitude) index; the candidates it returns are then filtered by
+great-circle (haversine) distance against each store's own radius.
+"""
+import math
+import os
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models.store import StoreModel
+from app.services.reference_data_cache import STORES, get_cached
+
+EARTH_RADIUS_MILES = 3958.8
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Bounds the search box; larger store radii are treated as this
+MAX_DELIVERY_RADIUS_MILES = float(os.getenv("MAX_DELIVERY_RADIUS_MILES", "100"))
+
+
+def validate_coordinates(latitude: float, longitude: float) -> None:
+    """
+    Raises:
+        ValueError: If the latitude or longitude is out of range
+    """
+    if not -90 <= latitude <= 90:
+        raise ValueError("Latitude must be between -90 and 90")
+    if not -180 <= longitude <= 180:
+        raise ValueError("Longitude must be between -180 and 180")
+
+
+def validate_location(latitude: Optional[float], longitude: Optional[float]) -> None:
+    """
+    Check optional coordinates for a store or pickup address.
+
+    Raises:
+        ValueError: If only one is given or either is out of range
+    """
+    if (latitude is None) != (longitude is None):
+        raise ValueError("Latitude and longitude must be given together")
+    if latitude is not None:
+        validate_coordinates(latitude, longitude)
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points, in miles."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude: float, longitude: float, miles: float) -> Tuple[float, float, float, float]:
+    """
+    (min latitude, max latitude, min longitude, max longitude) of a box
+    containing every point within ``miles`` of (latitude, longitude).
+
+    Near the poles, or where the box would cross the antimeridian, it spans
+    every longitude.
+    """
+    d_lat = math.degrees(miles / EARTH_RADIUS_MILES)
+    min_lat, max_lat = latitude - d_lat, latitude + d_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    # Widest at the latitude of the box edge closest to a pole
+    d_lon = math.degrees(miles / (EARTH_RADIUS_MILES * math.cos(math.radians(max(abs(min_lat), abs(max_lat))))))
+    min_lon, max_lon = longitude - d_lon, longitude + d_lon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def _load_max_delivery_radius(db: Session) -> List[float]:
+    radius = db.query(func.max(StoreModel.radius)).filter(
+        StoreModel.latitude.isnot(None),
+        StoreModel.is_active.is_(True),
+        StoreModel.disabled.is_(False)
+    ).scalar()
+    return [min(radius or 0.0, MAX_DELIVERY_RADIUS_MILES)]
+
+
+def get_stores_near(
+    latitude: float,
+    longitude: float,
+    first: int = DEFAULT_PAGE_SIZE,
+    db: Optional[Session] = None
+) -> List[Tuple[StoreModel, float]]:
+    """
+    Active, enabled stores that deliver to (latitude, longitude), nearest first.
+
+    Stores without coordinates or a delivery radius are not included.
+
+    Args:
+        latitude: Latitude of the delivery point
+        longitude: Longitude of the delivery point
+        first: Maximum number of stores (max MAX_PAGE_SIZE)
+        db: Optional database session
+
+    Returns:
+        (store, distance in miles) pairs
+
+    Raises:
+        ValueError: If the coordinates or page size are invalid
+    """
+    validate_coordinates(latitude, longitude)
+    if not 1 <= first <= MAX_PAGE_SIZE:
+        raise ValueError(f"first must be between 1 and {MAX_PAGE_SIZE}")
+
+    close_db = False
+    if db is None:
+        db = SessionLocal()
+        close_db = True
+    try:
+        # The largest radius changes only when a store is edited (cached)
+        max_radius = get_cached(STORES, ("max_delivery_radius",), lambda: _load_max_delivery_radius(db))[0]
+        if max_radius <= 0:
+            return []
+
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, max_radius)
+        candidates = db.query(
+            StoreModel.id,
+            StoreModel.latitude,
+            StoreModel.longitude,
+            StoreModel.radius
+        ).filter(
+            StoreModel.latitude.between(min_lat, max_lat),
+            StoreModel.longitude.between(min_lon, max_lon),
+            StoreModel.radius > 0,
+            StoreModel.is_active.is_(True),
+            StoreModel.disabled.is_(False)
+        )
+
+        nearest = []
+        for store_id, store_lat, store_lon, radius in candidates:
+            distance = haversine_miles(latitude, longitude, store_lat, store_lon)
+            if distance <= min(radius, MAX_DELIVERY_RADIUS_MILES):
+                nearest.append((distance, store_id))
+        nearest.sort()
+        nearest = nearest[:first]
+        if not nearest:
+            return []
+
+        stores = {store.id: store for store in db.query(StoreModel).filter(StoreModel.id.in_([store_id for _, store_id in nearest]))}
+        return [(stores[store_id], distance) for distance, store_id in nearest if store_id in stores]
+    finally:
+        if close_db:
+            db.close()
@@ -1,8 +1,13 @@
 from app.db.session import SessionLocal
 from app.db.models.store import StoreModel
 from app.db.models.inventory import InventoryModel
+from app.services.store_catalog_service import mark_catalogs_stale
+from app.services.reference_data_cache import STORES, bump_reference_version
+from app.services.tenant_service import normalize_subdomain
+from app.services.store_locator_service import validate_location
 from typing import List, Optional
-from sqlalchemy import and_
+from sqlalchemy import and_, String
+from sqlalchemy.dialects.postgresql import array
 
 def get_all_stores(is_active: Optional[bool] = None, disabled: Optional[bool] = None):
     """Get all stores in the system with optional filters"""
@@ -36,6 +41,29 @@ def get_stores_by_manager(manager_user_id: int) -> List[StoreModel]:
     finally:
         db.close()
 
+def get_stores_serving_pincode(pincode: str) -> List[StoreModel]:
+    """
+    Get the active, enabled stores that list ``pincode`` among their delivery pincodes.
+
+    Answered from the GIN index on store.pincodes. Stores without a pincode
+    list are not included: they have not declared a delivery area.
+
+    Raises:
+        ValueError: If the pincode is empty
+    """
+    pincode = pincode.strip()
+    if not pincode:
+        raise ValueError("Pincode is required")
+    db = SessionLocal()
+    try:
+        return db.query(StoreModel).filter(
+            StoreModel.pincodes.op("@>")(array([pincode], type_=String)),
+            StoreModel.is_active.is_(True),
+            StoreModel.disabled.is_(False)
+        ).order_by(StoreModel.id).all()
+    finally:
+        db.close()
+
 def create_store(
     name: str,
     address: str,
@@ -54,7 +82,9 @@ def create_store(
     section_headers: Optional[List[str]] = None,
     images: Optional[List[str]] = None,
     cod_enabled: Optional[bool] = False,
-    whatsapp_number: Optional[str] = None
+    whatsapp_number: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None
 ) -> StoreModel:
     """Create a new store"""
     db = SessionLocal()
@@ -68,6 +98,7 @@ def create_store(
             raise ValueError("Store email cannot be empty")
         if not display_field or display_field.strip() == "":
             raise ValueError("Display field cannot be empty")
+        validate_location(latitude, longitude)
             
         # Normalize input (trim whitespace)
         name = name.strip()
@@ -110,11 +141,13 @@ def create_store(
             mobile=mobile,
             managerUserId=manager_user_id,
             radius=radius,
+            latitude=latitude,
+            longitude=longitude,
             description=description,
             tnc=tnc,
             storeDeliveryFee=store_delivery_fee,
             taxPercentage=tax_percentage,
-            pincodes=pincodes,
+            pincodes=[p.strip() for p in pincodes or [] if p.strip()] or None,
             is_active=is_active,
             disabled=disabled,
             section_headers=section_headers,
@@ -124,6 +157,7 @@ def create_store(
             whatsapp_number=whatsapp_number.strip() if whatsapp_number and whatsapp_number.strip() else None
         )
         db.add(store)
+        bump_reference_version(db, STORES)
         db.commit()
         db.refresh(store)
         return store
@@ -148,9 +182,12 @@ def update_store(
     section_headers: Optional[List[str]] = None,
     display_field: Optional[str] = None,
     images: Optional[List[str]] = None,
-    whatsapp_number: Optional[str] = None
+    whatsapp_number: Optional[str] = None,
+    subdomain: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None
 ) -> Optional[StoreModel]:
-    """Update an existing store"""
+    """Update an existing store (an empty subdomain clears it; coordinates are set together)"""
     db = SessionLocal()
     try:
         # Find the store
@@ -235,6 +272,10 @@ def update_store(
             store.managerUserId = manager_user_id
         if radius is not None:  # Allow setting radius to 0
             store.radius = radius
+        if latitude is not None or longitude is not None:
+            validate_location(latitude, longitude)
+            store.latitude = latitude
+            store.longitude = longitude
         if is_active is not None:
             store.is_active = is_active
         if disabled is not None:
@@ -261,6 +302,7 @@ def update_store(
                 store.section_headers = [h.strip() for h in section_headers if h.strip()]
             else:
                 store.section_headers = None
+            mark_catalogs_stale(db, [store_id])
         if images is not None:
             # Validate and normalize images
             if images:
@@ -270,7 +312,24 @@ def update_store(
                 store.images = []
         if whatsapp_number is not None:
             store.whatsapp_number = whatsapp_number.strip() if whatsapp_number.strip() else None
+        if subdomain is not None:
+            if subdomain.strip() == "":
+                store.subdomain = None
+            else:
+                subdomain = normalize_subdomain(subdomain)
+
+                # Check if the new subdomain is already taken by another store
+                if subdomain != store.subdomain:
+                    existing = db.query(StoreModel).filter(
+                        StoreModel.subdomain == subdomain,
+                        StoreModel.id != store_id
+                    ).first()
+                    if existing:
+                        raise ValueError(f"A store with the subdomain '{subdomain}' already exists")
+                store.subdomain = subdomain
 
+        # Subdomain resolution and checkout configuration are cached per worker
+        bump_reference_version(db, STORES)
         db.commit()
         db.refresh(store)
         return store
@@ -294,6 +353,7 @@ def delete_store(store_id: int) -> bool:
         # Instead of deleting, mark as disabled and inactive
         store.disabled = True
         store.is_active = False
+        bump_reference_version(db, STORES)
         db.commit()
         return True
     finally:
@@ -319,7 +379,8 @@ def update_store_status(store_id: int, is_active: Optional[bool] = None, disable
             store.is_active = is_active
         if disabled is not None:
             store.disabled = disabled
-            
+
+        bump_reference_version(db, STORES)
         db.commit()
         db.refresh(store)
         return store
@@ -358,6 +419,7 @@ def toggle_store_cod(store_id: int, enabled: bool) -> Optional[StoreModel]:
             raise ValueError(f"Store with id {store_id} not found")
 
         store.cod_enabled = enabled
+        bump_reference_version(db, STORES)
         db.commit()
         db.refresh(store)
         return store
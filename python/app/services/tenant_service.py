@@ -0,0 +1,160 @@
+"""
+Store subdomain (tenant) resolution.
+
+Maps the subdomain of a request's host (``store1`` in store1.indimitra.com)
+to the store it belongs to. Lookups go through a bounded in-process TTL
+cache; unknown subdomains are cached too, for a shorter time, so that
+requests for made-up hosts do not each cost a query. Entries are tagged with
+the ``stores`` reference-data version, which store writers bump, so an edited
+store (subdomain, active or disabled flags) is seen by every worker within
+REFERENCE_CACHE_MAX_STALENESS_SECONDS.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.db.session import SessionLocal
+from app.db.models.store import StoreModel
+from app.services.reference_data_cache import STORES, get_reference_version
+
+# Base domain whose subdomains are stores (e.g. store1.indimitra.com)
+BASE_DOMAIN = os.getenv("BASE_DOMAIN", "indimitra.com").lower()
+# Subdomains that never belong to a store
+RESERVED_SUBDOMAINS = {"www", "admin", "api", "cdn", "static", "mail", "ftp"}
+
+TENANT_CACHE_SIZE = int(os.getenv("TENANT_CACHE_SIZE", "1024"))
+TENANT_CACHE_TTL_SECONDS = float(os.getenv("TENANT_CACHE_TTL_SECONDS", "300"))
+TENANT_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("TENANT_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+
+_SUBDOMAIN_PATTERN = re.compile(r"^[a-z][a-z0-9-]{0,62}$")
+
+
+@dataclass(frozen=True)
+class TenantContext:
+    """The store a request was addressed to."""
+    store_id: int
+    subdomain: str
+    is_active: bool
+    disabled: bool
+
+    @property
+    def available(self) -> bool:
+        return self.is_active and not self.disabled
+
+
+def extract_subdomain(host: str) -> Optional[str]:
+    """
+    Subdomain of a Host header value, or None.
+
+    Examples:
+        store1.indimitra.com -> store1
+        store1.localhost:3000 -> store1
+        indimitra.com, localhost:8000, backend:8000 -> None
+    """
+    host = host.split(":", 1)[0].strip().lower().rstrip(".")
+    for domain in (BASE_DOMAIN, "localhost"):
+        if host.endswith("." + domain):
+            subdomain = host[:-len(domain) - 1]
+            # Only one label: a.b.indimitra.com is not a store
+            return subdomain if "." not in subdomain else None
+    return None
+
+
+def is_valid_subdomain(subdomain: str) -> bool:
+    """Lowercase letters, digits and hyphens, starting with a letter, at most 63 characters."""
+    return bool(_SUBDOMAIN_PATTERN.match(subdomain))
+
+
+def normalize_subdomain(subdomain: str) -> str:
+    """
+    Normalize a subdomain for storing on a store.
+
+    Raises:
+        ValueError: If it is malformed or reserved
+    """
+    subdomain = subdomain.strip().lower()
+    if not is_valid_subdomain(subdomain):
+        raise ValueError(
+            "Subdomain must start with a letter and contain only lowercase letters, digits and hyphens (max 63)"
+        )
+    if subdomain in RESERVED_SUBDOMAINS:
+        raise ValueError(f"Subdomain '{subdomain}' is reserved")
+    return subdomain
+
+
+class _TenantCache:
+    """Thread-safe bounded mapping of subdomain -> (version, expires at, tenant or None)."""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[int, float, Optional[TenantContext]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subdomain: str, version: int):
+        """(hit, tenant); a hit with tenant None is a cached unknown subdomain."""
+        with self._lock:
+            entry = self._entries.get(subdomain)
+            if entry is None or entry[0] != version or entry[1] <= time.monotonic():
+                return False, None
+            self._entries.move_to_end(subdomain)
+            return True, entry[2]
+
+    def put(self, subdomain: str, version: int, tenant: Optional[TenantContext]) -> None:
+        ttl = TENANT_CACHE_TTL_SECONDS if tenant is not None else TENANT_CACHE_NEGATIVE_TTL_SECONDS
+        with self._lock:
+            self._entries[subdomain] = (version, time.monotonic() + ttl, tenant)
+            self._entries.move_to_end(subdomain)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _TenantCache(TENANT_CACHE_SIZE)
+
+
+def _load_tenant(subdomain: str) -> Optional[TenantContext]:
+    db = SessionLocal()
+    try:
+        row = db.query(
+            StoreModel.id,
+            StoreModel.is_active,
+            StoreModel.disabled
+        ).filter(StoreModel.subdomain == subdomain).first()
+        if row is None:
+            return None
+        return TenantContext(
+            store_id=row.id,
+            subdomain=subdomain,
+            is_active=bool(row.is_active),
+            disabled=bool(row.disabled)
+        )
+    finally:
+        db.close()
+
+
+def resolve_tenant(subdomain: str) -> Optional[TenantContext]:
+    """
+    The store behind ``subdomain`` (cached), or None if there is none.
+
+    Callers should check is_valid_subdomain and RESERVED_SUBDOMAINS first.
+    """
+    subdomain = subdomain.lower()
+    version, _ = get_reference_version(STORES)
+    hit, tenant = _cache.get(subdomain, version)
+    if hit:
+        return tenant
+    tenant = _load_tenant(subdomain)
+    _cache.put(subdomain, version, tenant)
+    return tenant
+
+
+def clear_tenant_cache() -> None:
+    """Drop every cached tenant (e.g. in tests)."""
+    _cache.clear()
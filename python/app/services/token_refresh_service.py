@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from square.client import Square, SquareEnvironment
 from app.db.models.store import StoreModel
 from app.db.session import SessionLocal
+from app.services.reference_data_cache import STORES, bump_reference_version
 from apscheduler.schedulers.background import BackgroundScheduler
 
 logger = logging.getLogger(__name__)
@@ -82,6 +83,7 @@ def refresh_square_token(store_id: int) -> bool:
 
                 # Mark store as disconnected (token likely revoked)
                 store.is_square_connected = False
+                bump_reference_version(db, STORES)
                 db.commit()
 
                 logger.warning(f"Marked store {store_id} as disconnected due to token refresh failure")
@@ -101,6 +103,7 @@ def refresh_square_token(store_id: int) -> bool:
             logger.error(f"Exception during token refresh for store {store_id}: {e}")
             # Mark store as disconnected on exception
             store.is_square_connected = False
+            bump_reference_version(db, STORES)
             db.commit()
             return False
 
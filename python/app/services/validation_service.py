@@ -1,8 +1,6 @@
 from typing import Optional, List
 import re
-from app.db.session import SessionLocal
-from app.db.models.store import StoreModel
-from app.db.models.address import AddressModel
+from app.services.checkout_config_service import get_checkout_config
 
 def extract_pincode_from_address(address: str) -> Optional[str]:
     """
@@ -23,45 +21,39 @@ def extract_pincode_from_address(address: str) -> Optional[str]:
     # Return the first match if any, otherwise None
     return matches[0] if matches else None
 
-def validate_delivery_pincode(address_id: int, store_id: int) -> bool:
+def validate_delivery_pincode(address: str, store_id: int) -> bool:
     """
     Validate if a delivery address pincode is in the list of pincodes served by a store.
     
+    Callers have already loaded the address; the store's pincodes come from its
+    cached checkout configuration, so this normally runs no query.
+    
     Args:
-        address_id: The ID of the delivery address
+        address: The delivery address string
         store_id: The ID of the store
         
     Returns:
         True if the pincode is valid for delivery, False otherwise
         
     Raises:
-        ValueError: If the address or store doesn't exist, or if the pincode validation fails
+        ValueError: If the store doesn't exist, or if the pincode validation fails
     """
-    db = SessionLocal()
-    try:
-        # Get the address
-        address = db.query(AddressModel).filter(AddressModel.id == address_id).first()
-        if not address:
-            raise ValueError(f"Address with ID {address_id} not found")
-        
-        # Get the store
-        store = db.query(StoreModel).filter(StoreModel.id == store_id).first()
-        if not store:
-            raise ValueError(f"Store with ID {store_id} not found")
-        
-        # If store doesn't have pincodes defined, accept all addresses
-        if not store.pincodes:
-            return True
-        
-        # Extract pincode from address
-        pincode = extract_pincode_from_address(address.address)
-        if not pincode:
-            raise ValueError(f"Could not extract pincode from address: {address.address}")
-        
-        # Check if pincode is in store's pincodes
-        if pincode not in store.pincodes:
-            raise ValueError(f"Store does not deliver to pincode {pincode}. Supported pincodes: {', '.join(store.pincodes)}")
-        
+    # Get the store's served pincodes (cached)
+    config = get_checkout_config(store_id)
+    if not config:
+        raise ValueError(f"Store with ID {store_id} not found")
+    
+    # If store doesn't have pincodes defined, accept all addresses
+    if not config.pincodes:
         return True
-    finally:
-        db.close() 
\ No newline at end of file
+    
+    # Extract pincode from address
+    pincode = extract_pincode_from_address(address)
+    if not pincode:
+        raise ValueError(f"Could not extract pincode from address: {address}")
+    
+    # Set membership, not a scan of the store's list
+    if not config.serves_pincode(pincode):
+        raise ValueError(f"Store does not deliver to pincode {pincode}. Supported pincodes: {', '.join(sorted(config.pincodes))}")
+    
+    return True
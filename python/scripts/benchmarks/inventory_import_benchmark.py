@@ -0,0 +1,165 @@
+"""
+Benchmark the inventory file import against a real Postgres database.
+
+Writes a synthetic CSV (100k rows by default, spread over a few hundred
+categories, with a small share of invalid rows), imports it into a scratch
+store with ``inventory_import_service.import_inventory`` and reports rows per
+second and the peak Python memory allocated during the import. A second run
+of the same file measures the update path (every product already exists).
+
+The import streams rows and works in chunks, so peak memory should stay
+roughly flat as ``--rows`` grows; compare e.g. ``--rows 10000`` with
+``--rows 100000``.
+
+Requires the lower(name) index migration. Creates its own scratch
+user/store/categories/products and removes them afterwards.
+
+Usage (from ``python/``):
+
+    python scripts/benchmarks/inventory_import_benchmark.py --rows 100000 --chunk-size 1000
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+PYTHON_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PYTHON_ROOT) not in sys.path:
+    sys.path.insert(0, str(PYTHON_ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(PYTHON_ROOT / ".env", override=True)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import DATABASE_URL
+from app.db.models.category import CategoryModel
+from app.db.models.inventory import InventoryModel
+from app.db.models.product import ProductModel
+from app.db.models.store import StoreModel
+from app.db.models.user import UserModel, UserType
+from app.services.inventory_import_service import import_inventory
+
+
+def write_csv(path: Path, rows: int, categories: int, invalid_share: float, tag: str, seed: int) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Product Name", "Category", "Description", "Price", "Quantity", "Unit", "Listed"])
+        for i in range(rows):
+            price = f"{rng.uniform(1, 50):.2f}"
+            if rng.random() < invalid_share:
+                price = "n/a"
+            writer.writerow([
+                f"Bench product {i} {tag}",
+                f"Bench {tag} {i % categories}",
+                f"Synthetic product {i}",
+                price,
+                rng.randrange(0, 500),
+                "g",
+                "yes",
+            ])
+
+
+def create_store(Session, tag: str) -> dict:
+    db = Session()
+    try:
+        user = UserModel(
+            email=f"bench-{tag}@example.com",
+            mobile=f"bench-{tag}",
+            active=True,
+            type=UserType.STORE_MANAGER,
+            referralId="",
+            cognitoId=f"bench-{tag}",
+        )
+        db.add(user)
+        db.flush()
+        store = StoreModel(
+            name=f"Benchmark Store {tag}",
+            address="1 Bench St, Bench City, BC 00000",
+            managerUserId=user.id,
+            email=f"bench-store-{tag}@example.com",
+            display_field=f"bench-{tag}",
+        )
+        db.add(store)
+        db.commit()
+        return {"user_id": user.id, "store_id": store.id}
+    finally:
+        db.close()
+
+
+def drop_fixture(Session, fixture: dict, tag: str) -> None:
+    db = Session()
+    try:
+        category_ids = db.query(CategoryModel.id).filter(CategoryModel.name.like(f"Bench {tag} %"))
+        db.query(InventoryModel).filter(InventoryModel.storeId == fixture["store_id"]).delete(synchronize_session=False)
+        db.query(ProductModel).filter(ProductModel.categoryId.in_(category_ids)).delete(synchronize_session=False)
+        db.query(CategoryModel).filter(CategoryModel.name.like(f"Bench {tag} %")).delete(synchronize_session=False)
+        db.query(StoreModel).filter(StoreModel.id == fixture["store_id"]).delete(synchronize_session=False)
+        db.query(UserModel).filter(UserModel.id == fixture["user_id"]).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(store_id: int, path: Path, chunk_size: int) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    with open(path, "rb") as file:
+        summary = import_inventory(store_id, file, "csv", chunk_size)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if summary["error_report"] is not None:
+        summary["error_report"].close()
+    return {
+        "seconds": elapsed,
+        "rows_per_second": summary["total_rows"] / elapsed if elapsed else 0.0,
+        "peak_mb": peak / (1024 * 1024),
+        "summary": summary,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows in the synthetic file")
+    parser.add_argument("--categories", type=int, default=200, help="Distinct categories in the file")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--invalid-share", type=float, default=0.01, help="Share of rows with an invalid price")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    tag = uuid.uuid4().hex[:8]
+    fixture = create_store(Session, tag)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "inventory.csv"
+        write_csv(path, args.rows, args.categories, args.invalid_share, tag, args.seed)
+        print(f"{args.rows} rows, {path.stat().st_size / (1024 * 1024):.1f} MB file, chunk size {args.chunk_size}")
+        try:
+            for name in ("create", "update"):
+                result = run(fixture["store_id"], path, args.chunk_size)
+                summary = result["summary"]
+                print(
+                    f"{name:>8}: {result['seconds']:>7.1f}s  {result['rows_per_second']:>8.0f} rows/s  "
+                    f"peak {result['peak_mb']:>6.1f} MB  created {summary['created']}  updated {summary['updated']}  "
+                    f"failed {summary['failed']}  failed chunks {len(summary['failed_chunks'])}"
+                )
+        finally:
+            drop_fixture(Session, fixture, tag)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmark concurrent checkout of hot SKUs against a real Postgres database.
+
+Compares the previous read-check-write pattern (SELECT ... FOR UPDATE per
+line, check in Python, UPDATE per line) with the single conditional UPDATE
+used by ``inventory_reservation_service.reserve_inventory``. Reports
+throughput, latency percentiles and verifies that stock never went negative
+and that every successful reservation is accounted for.
+
+Creates its own scratch user/store/products and removes them afterwards.
+
+Usage (from ``python/``):
+
+    python scripts/benchmarks/inventory_reservation_benchmark.py --buyers 100 --seconds 20
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PYTHON_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PYTHON_ROOT) not in sys.path:
+    sys.path.insert(0, str(PYTHON_ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(PYTHON_ROOT / ".env", override=True)
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+
+from app.config import DATABASE_URL
+from app.db.models.category import CategoryModel
+from app.db.models.inventory import InventoryModel
+from app.db.models.product import ProductModel
+from app.db.models.store import StoreModel
+from app.db.models.user import UserModel, UserType
+from app.services.inventory_reservation_service import (
+    InsufficientStockError,
+    reserve_inventory,
+)
+
+
+def create_fixture(Session, hot_skus: int, stock: int) -> dict:
+    """Create a scratch store with ``hot_skus`` products of ``stock`` units each."""
+    tag = uuid.uuid4().hex[:8]
+    db = Session()
+    try:
+        user = UserModel(
+            email=f"bench-{tag}@example.com",
+            mobile=f"bench-{tag}",
+            active=True,
+            type=UserType.STORE_MANAGER,
+            referralId="",
+            cognitoId=f"bench-{tag}",
+        )
+        db.add(user)
+        db.flush()
+
+        store = StoreModel(
+            name=f"Benchmark Store {tag}",
+            address="1 Bench St, Bench City, BC 00000",
+            managerUserId=user.id,
+            email=f"bench-store-{tag}@example.com",
+            display_field=f"bench-{tag}",
+        )
+        category = CategoryModel(name=f"Benchmark {tag}")
+        db.add_all([store, category])
+        db.flush()
+
+        products = [ProductModel(name=f"Hot SKU {tag} #{i}", categoryId=category.id) for i in range(hot_skus)]
+        db.add_all(products)
+        db.flush()
+
+        db.add_all([
+            InventoryModel(storeId=store.id, productId=p.id, price=1.0, quantity=stock)
+            for p in products
+        ])
+        db.commit()
+
+        return {
+            "user_id": user.id,
+            "store_id": store.id,
+            "category_id": category.id,
+            "product_ids": [p.id for p in products],
+        }
+    finally:
+        db.close()
+
+
+def reset_stock(Session, fixture: dict, stock: int) -> None:
+    db = Session()
+    try:
+        db.query(InventoryModel).filter(InventoryModel.storeId == fixture["store_id"]).update(
+            {InventoryModel.quantity: stock}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def drop_fixture(Session, fixture: dict) -> None:
+    db = Session()
+    try:
+        db.query(InventoryModel).filter(InventoryModel.storeId == fixture["store_id"]).delete(synchronize_session=False)
+        db.query(ProductModel).filter(ProductModel.id.in_(fixture["product_ids"])).delete(synchronize_session=False)
+        db.query(CategoryModel).filter(CategoryModel.id == fixture["category_id"]).delete(synchronize_session=False)
+        db.query(StoreModel).filter(StoreModel.id == fixture["store_id"]).delete(synchronize_session=False)
+        db.query(UserModel).filter(UserModel.id == fixture["user_id"]).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def naive_checkout(db, store_id: int, items: list) -> None:
+    """Previous pattern: lock and check each line, then write each line."""
+    for item in items:
+        row = db.query(InventoryModel).filter(
+            InventoryModel.storeId == store_id,
+            InventoryModel.productId == item["product_id"]
+        ).with_for_update().first()
+        if row.quantity < item["quantity"]:
+            raise InsufficientStockError("Insufficient stock", [item["product_id"]])
+        row.quantity -= item["quantity"]
+        db.flush()
+
+
+def conditional_checkout(db, store_id: int, items: list) -> None:
+    reserve_inventory(db, store_id, items)
+
+
+def run(Session, fixture: dict, checkout, buyers: int, seconds: float, lines: int, seed: int) -> dict:
+    deadline = time.perf_counter() + seconds
+    latencies = []
+    reserved_units = 0
+    failures = 0
+    errors = 0
+    lock = threading.Lock()
+
+    def buyer(n: int):
+        nonlocal reserved_units, failures, errors
+        rng = random.Random(seed + n)
+        local_latencies, local_units, local_failures, local_errors = [], 0, 0, 0
+        while time.perf_counter() < deadline:
+            chosen = rng.sample(fixture["product_ids"], k=min(lines, len(fixture["product_ids"])))
+            items = [{"product_id": pid, "quantity": rng.randint(1, 3)} for pid in chosen]
+            db = Session()
+            started = time.perf_counter()
+            try:
+                checkout(db, fixture["store_id"], items)
+                db.commit()
+                local_units += sum(i["quantity"] for i in items)
+            except InsufficientStockError:
+                db.rollback()
+                local_failures += 1
+            except DBAPIError:
+                # Deadlocks / lock timeouts abort the checkout
+                db.rollback()
+                local_errors += 1
+            finally:
+                db.close()
+            local_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local_latencies)
+            reserved_units += local_units
+            failures += local_failures
+            errors += local_errors
+
+    with ThreadPoolExecutor(max_workers=buyers) as pool:
+        list(pool.map(buyer, range(buyers)))
+
+    latencies.sort()
+    return {
+        "checkouts": len(latencies),
+        "throughput": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        "reserved_units": reserved_units,
+        "sold_out_rejections": failures,
+        "db_errors": errors,
+    }
+
+
+def verify(Session, fixture: dict, stock: int, reserved_units: int) -> str:
+    db = Session()
+    try:
+        quantities = [
+            q for (q,) in db.query(InventoryModel.quantity).filter(InventoryModel.storeId == fixture["store_id"])
+        ]
+    finally:
+        db.close()
+    remaining = sum(quantities)
+    expected = stock * len(quantities) - reserved_units
+    if min(quantities) < 0:
+        return f"OVERSOLD (min quantity {min(quantities)})"
+    if remaining != expected:
+        return f"MISMATCH (remaining {remaining}, expected {expected})"
+    return "ok"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buyers", type=int, default=100, help="Concurrent buyers (threads)")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Duration of each run")
+    parser.add_argument("--hot-skus", type=int, default=5, help="Number of contended products")
+    parser.add_argument("--lines", type=int, default=3, help="Cart lines per checkout")
+    parser.add_argument("--stock", type=int, default=1_000_000, help="Starting stock per SKU (lower it to exercise sell-out)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL, pool_size=args.buyers, max_overflow=0, pool_pre_ping=True)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    fixture = create_fixture(Session, args.hot_skus, args.stock)
+    try:
+        for name, checkout in (("read-check-write", naive_checkout), ("conditional-update", conditional_checkout)):
+            reset_stock(Session, fixture, args.stock)
+            result = run(Session, fixture, checkout, args.buyers, args.seconds, args.lines, args.seed)
+            status = verify(Session, fixture, args.stock, result["reserved_units"])
+            print(
+                f"{name:>20}: {result['checkouts']:>7} checkouts  "
+                f"{result['throughput']:>8.1f}/s  "
+                f"p50 {result['p50_ms']:>7.1f}ms  p95 {result['p95_ms']:>7.1f}ms  p99 {result['p99_ms']:>7.1f}ms  "
+                f"sold-out {result['sold_out_rejections']:>5}  db errors {result['db_errors']:>5}  stock {status}"
+            )
+    finally:
+        drop_fixture(Session, fixture)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Benchmark store product search against a real Postgres database.
+
+Seeds a synthetic catalog (100k products by default, all stocked by one
+scratch store), then compares the current storefront pattern (load the whole
+listed inventory with products and filter by substring in the client) with
+``product_search_service.search_products`` (first page of ranked results).
+Reports latency percentiles per pattern.
+
+Requires the product search migration (pg_trgm and ``products.search_vector``).
+Creates its own scratch user/store/category/products and removes them afterwards.
+
+Usage (from ``python/``):
+
+    python scripts/benchmarks/product_search_benchmark.py --products 100000 --queries 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+PYTHON_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PYTHON_ROOT) not in sys.path:
+    sys.path.insert(0, str(PYTHON_ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(PYTHON_ROOT / ".env", override=True)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app.config import DATABASE_URL
+from app.db.models.category import CategoryModel
+from app.db.models.inventory import InventoryModel
+from app.db.models.product import ProductModel
+from app.db.models.store import StoreModel
+from app.db.models.user import UserModel, UserType
+from app.services.product_search_service import search_products
+
+ADJECTIVES = ["organic", "fresh", "premium", "spicy", "roasted", "whole", "split", "basmati", "masala", "instant"]
+NOUNS = ["rice", "dal", "atta", "ghee", "chilli", "turmeric", "cumin", "paneer", "mango", "tea",
+         "biscuit", "pickle", "jaggery", "cardamom", "coriander", "mustard", "lentil", "poha", "sooji", "besan"]
+BRANDS = ["Aashirvaad", "Tata", "Haldiram", "MTR", "Everest", "Amul", "Patanjali", "Swad", "Laxmi", "Deep"]
+
+
+def create_fixture(Session, products: int) -> dict:
+    """Create a scratch store stocking ``products`` synthetic products (generated in SQL)."""
+    tag = uuid.uuid4().hex[:8]
+    db = Session()
+    try:
+        user = UserModel(
+            email=f"bench-{tag}@example.com",
+            mobile=f"bench-{tag}",
+            active=True,
+            type=UserType.STORE_MANAGER,
+            referralId="",
+            cognitoId=f"bench-{tag}",
+        )
+        db.add(user)
+        db.flush()
+
+        store = StoreModel(
+            name=f"Benchmark Store {tag}",
+            address="1 Bench St, Bench City, BC 00000",
+            managerUserId=user.id,
+            email=f"bench-store-{tag}@example.com",
+            display_field=f"bench-{tag}",
+        )
+        category = CategoryModel(name=f"Benchmark {tag}")
+        db.add_all([store, category])
+        db.flush()
+
+        params = {
+            "category_id": category.id,
+            "count": products,
+            "tag": tag,
+            "adjectives": ADJECTIVES,
+            "nouns": NOUNS,
+            "brands": BRANDS,
+        }
+        db.execute(text("""
+            INSERT INTO products (name, description, "categoryId")
+            SELECT
+                (:brands)[1 + i % cardinality(:brands)] || ' ' ||
+                (:adjectives)[1 + (i / 7) % cardinality(:adjectives)] || ' ' ||
+                (:nouns)[1 + (i / 3) % cardinality(:nouns)] || ' ' || (i % 50 + 1) * 100 || 'g',
+                'Synthetic product ' || i || ' (' || :tag || ')',
+                :category_id
+            FROM generate_series(1, :count) AS i
+        """), params)
+
+        db.execute(text("""
+            INSERT INTO inventory ("storeId", "productId", price, quantity, is_listed, is_available, "updatedAt")
+            SELECT :store_id, id, 1 + random() * 20, 100, random() > 0.05, random() > 0.05, timezone('utc', now())
+            FROM products WHERE "categoryId" = :category_id
+        """), {"store_id": store.id, "category_id": category.id})
+        db.commit()
+        db.execute(text("ANALYZE products"))
+        db.execute(text("ANALYZE inventory"))
+        db.commit()
+
+        return {
+            "user_id": user.id,
+            "store_id": store.id,
+            "category_id": category.id,
+        }
+    finally:
+        db.close()
+
+
+def drop_fixture(Session, fixture: dict) -> None:
+    db = Session()
+    try:
+        db.query(InventoryModel).filter(InventoryModel.storeId == fixture["store_id"]).delete(synchronize_session=False)
+        db.query(ProductModel).filter(ProductModel.categoryId == fixture["category_id"]).delete(synchronize_session=False)
+        db.query(CategoryModel).filter(CategoryModel.id == fixture["category_id"]).delete(synchronize_session=False)
+        db.query(StoreModel).filter(StoreModel.id == fixture["store_id"]).delete(synchronize_session=False)
+        db.query(UserModel).filter(UserModel.id == fixture["user_id"]).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def make_queries(count: int, seed: int) -> list:
+    """Mix of whole words, prefixes (typing in progress), two-word queries and typos."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        noun = rng.choice(NOUNS)
+        kind = rng.randrange(4)
+        if kind == 0:
+            queries.append(noun)
+        elif kind == 1:
+            queries.append(noun[:max(2, len(noun) - 2)])
+        elif kind == 2:
+            queries.append(f"{rng.choice(ADJECTIVES)} {noun}")
+        else:
+            i = rng.randrange(len(noun))
+            queries.append(noun[:i] + noun[i + 1:] if len(noun) > 3 else noun)
+    return queries
+
+
+def load_and_filter(Session, store_id: int, query: str) -> list:
+    """Current storefront pattern: fetch every listed item, filter on the client."""
+    db = Session()
+    try:
+        items = (
+            db.query(InventoryModel)
+            .options(joinedload(InventoryModel.product).joinedload(ProductModel.category))
+            .filter(InventoryModel.storeId == store_id, InventoryModel.is_listed.is_(True))
+            .all()
+        )
+        needle = query.lower()
+        return [item for item in items if needle in item.product.name.lower()][:20]
+    finally:
+        db.close()
+
+
+def indexed_search(Session, store_id: int, query: str) -> list:
+    db = Session()
+    try:
+        return search_products(store_id, query, first=20, db=db)["items"]
+    finally:
+        db.close()
+
+
+def run(Session, store_id: int, search, queries: list) -> dict:
+    latencies = []
+    hits = 0
+    for query in queries:
+        started = time.perf_counter()
+        results = search(Session, store_id, query)
+        latencies.append(time.perf_counter() - started)
+        hits += bool(results)
+    latencies.sort()
+    return {
+        "queries": len(latencies),
+        "hit_rate": hits / len(latencies) if latencies else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000, help="Synthetic products in the store")
+    parser.add_argument("--queries", type=int, default=200, help="Search queries per pattern")
+    parser.add_argument("--full-scan-queries", type=int, default=10, help="Queries for the (slow) load-and-filter pattern")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    print(f"Seeding {args.products} products...")
+    started = time.perf_counter()
+    fixture = create_fixture(Session, args.products)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    try:
+        queries = make_queries(args.queries, args.seed)
+        runs = (
+            ("load-and-filter", load_and_filter, queries[:args.full_scan_queries]),
+            ("indexed search", indexed_search, queries),
+        )
+        for name, search, batch in runs:
+            result = run(Session, fixture["store_id"], search, batch)
+            print(
+                f"{name:>16}: {result['queries']:>5} queries  hits {result['hit_rate']:>6.1%}  "
+                f"p50 {result['p50_ms']:>8.1f}ms  p95 {result['p95_ms']:>8.1f}ms  max {result['max_ms']:>8.1f}ms"
+            )
+    finally:
+        drop_fixture(Session, fixture)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark "stores near me" against a real Postgres database.
+
+Compares loading every store and measuring the distance to each in Python
+with ``store_locator_service.get_stores_near`` (bounding box on the
+(latitude, longitude) index, then haversine against each store's radius).
+Reports latency percentiles and checks that both return the same stores.
+
+Creates its own scratch user and synthetic stores spread over the
+continental US and removes them afterwards.
+
+Usage (from ``python/``):
+
+    python scripts/benchmarks/store_locator_benchmark.py --stores 50000 --queries 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+PYTHON_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PYTHON_ROOT) not in sys.path:
+    sys.path.insert(0, str(PYTHON_ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(PYTHON_ROOT / ".env", override=True)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.config import DATABASE_URL
+from app.db.models.store import StoreModel
+from app.db.models.user import UserModel, UserType
+from app.services.store_locator_service import MAX_DELIVERY_RADIUS_MILES, get_stores_near, haversine_miles
+
+# Continental US
+MIN_LAT, MAX_LAT = 25.0, 49.0
+MIN_LON, MAX_LON = -124.0, -67.0
+
+
+def create_fixture(Session, stores: int) -> dict:
+    """Create ``stores`` active stores with random coordinates and 2-30 mile radii."""
+    tag = uuid.uuid4().hex[:8]
+    db = Session()
+    try:
+        user = UserModel(
+            email=f"bench-{tag}@example.com",
+            mobile=f"bench-{tag}",
+            active=True,
+            type=UserType.STORE_MANAGER,
+            referralId="",
+            cognitoId=f"bench-{tag}",
+        )
+        db.add(user)
+        db.flush()
+
+        db.execute(text("""
+            INSERT INTO store (name, address, "managerUserId", email, display_field, is_active, disabled,
+                               cod_enabled, is_square_connected, radius, latitude, longitude)
+            SELECT
+                'Benchmark Store ' || :tag || ' ' || i,
+                i || ' Bench St, Bench City, BC 00000',
+                :user_id,
+                'bench-' || :tag || '-' || i || '@example.com',
+                'bench-' || :tag || '-' || i,
+                true, false, false, false,
+                2 + random() * 28,
+                :min_lat + random() * (:max_lat - :min_lat),
+                :min_lon + random() * (:max_lon - :min_lon)
+            FROM generate_series(1, :count) AS i
+        """), {
+            "tag": tag,
+            "user_id": user.id,
+            "count": stores,
+            "min_lat": MIN_LAT,
+            "max_lat": MAX_LAT,
+            "min_lon": MIN_LON,
+            "max_lon": MAX_LON,
+        })
+        db.commit()
+        db.execute(text("ANALYZE store"))
+        db.commit()
+        return {"user_id": user.id, "tag": tag}
+    finally:
+        db.close()
+
+
+def drop_fixture(Session, fixture: dict) -> None:
+    db = Session()
+    try:
+        db.query(StoreModel).filter(StoreModel.managerUserId == fixture["user_id"]).delete(synchronize_session=False)
+        db.query(UserModel).filter(UserModel.id == fixture["user_id"]).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def make_points(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [(rng.uniform(MIN_LAT, MAX_LAT), rng.uniform(MIN_LON, MAX_LON)) for _ in range(count)]
+
+
+def load_and_measure(Session, latitude: float, longitude: float, first: int) -> list:
+    """Previous pattern: fetch every store, measure each one in Python."""
+    db = Session()
+    try:
+        stores = db.query(StoreModel).filter(
+            StoreModel.is_active.is_(True),
+            StoreModel.disabled.is_(False),
+            StoreModel.latitude.isnot(None)
+        ).all()
+        nearest = []
+        for store in stores:
+            distance = haversine_miles(latitude, longitude, store.latitude, store.longitude)
+            if store.radius and distance <= min(store.radius, MAX_DELIVERY_RADIUS_MILES):
+                nearest.append((distance, store.id))
+        nearest.sort()
+        return [store_id for _, store_id in nearest[:first]]
+    finally:
+        db.close()
+
+
+def indexed_search(Session, latitude: float, longitude: float, first: int) -> list:
+    db = Session()
+    try:
+        return [store.id for store, _ in get_stores_near(latitude, longitude, first, db=db)]
+    finally:
+        db.close()
+
+
+def run(Session, search, points: list, first: int) -> dict:
+    latencies = []
+    results = []
+    for latitude, longitude in points:
+        started = time.perf_counter()
+        results.append(search(Session, latitude, longitude, first))
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "results": results,
+        "queries": len(latencies),
+        "hit_rate": sum(bool(result) for result in results) / len(results) if results else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", type=int, default=50_000, help="Synthetic stores")
+    parser.add_argument("--queries", type=int, default=200, help="Lookups with the indexed search")
+    parser.add_argument("--full-scan-queries", type=int, default=10, help="Lookups with the (slow) load-and-measure pattern")
+    parser.add_argument("--first", type=int, default=20, help="Stores per lookup")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    print(f"Seeding {args.stores} stores...")
+    started = time.perf_counter()
+    fixture = create_fixture(Session, args.stores)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    try:
+        points = make_points(args.queries, args.seed)
+        full_scan = run(Session, load_and_measure, points[:args.full_scan_queries], args.first)
+        indexed = run(Session, indexed_search, points, args.first)
+        for name, result in (("load-and-measure", full_scan), ("indexed search", indexed)):
+            print(
+                f"{name:>16}: {result['queries']:>5} queries  hits {result['hit_rate']:>6.1%}  "
+                f"p50 {result['p50_ms']:>8.1f}ms  p95 {result['p95_ms']:>8.1f}ms  max {result['max_ms']:>8.1f}ms"
+            )
+
+        mismatches = sum(a != b for a, b in zip(full_scan["results"], indexed["results"]))
+        print(f"Result mismatches: {mismatches}/{len(full_scan['results'])}")
+    finally:
+        drop_fixture(Session, fixture)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Rebuild the ``order_metrics`` rollup from ``orders``.
+
+Run after bulk data fixes or if the rollup is suspected to have drifted.
+Loads secrets from ``python/.env`` before connecting to Postgres.
+
+Usage (from ``python/``):
+
+    python scripts/maintenance/backfill_order_metrics.py                 # everything
+    python scripts/maintenance/backfill_order_metrics.py --since 2026-01-01
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+PYTHON_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PYTHON_ROOT) not in sys.path:
+    sys.path.insert(0, str(PYTHON_ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(PYTHON_ROOT / ".env", override=True)
+
+from app.services.order_metrics_service import backfill_order_metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the order_metrics rollup from orders")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Only rebuild hourly buckets from this UTC timestamp onwards (ISO format)"
+    )
+    args = parser.parse_args()
+
+    rows = backfill_order_metrics(since=args.since)
+    print(f"Rebuilt order_metrics: {rows} rollup rows written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Unit tests for the compiled per-store checkout configuration
+"""
+
+from types import MappingProxyType
+
+import pytest
+
+from app.services.checkout_config_service import DEFAULT_LOCATION_CODE, CheckoutConfig
+from app.services.fee_schedule import FeeSchedule
+
+
+def _config(**overrides) -> CheckoutConfig:
+    values = dict(
+        store_id=1,
+        tax_percentage=8.5,
+        cod_enabled=True,
+        square_connected=False,
+        square_location_configured=False,
+        pincodes=frozenset(),
+        fee_schedules=MappingProxyType({
+            "DELIVERY": FeeSchedule.compile([(None, 0.0), (50.0, 2.5), (25.0, 5.0)]),
+            "PICKUP": FeeSchedule.compile([(10.0, 1.0)]),
+        }),
+        location_codes=MappingProxyType({"Plano": "PL", "Frisco": "FR"}),
+    )
+    values.update(overrides)
+    return CheckoutConfig(**values)
+
+
+class TestDeliveryFee:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("delivery_type", ["delivery", "DELIVERY", "Delivery"])
+    def test_schedule_of_the_delivery_type(self, delivery_type):
+        # Tier lookups themselves are covered in test_fee_schedule
+        assert _config().delivery_fee(delivery_type, 30.0) == 2.5
+        assert _config().delivery_fee("pickup", 5.0) == 1.0
+
+    @pytest.mark.unit
+    def test_no_matching_tier_is_free(self):
+        config = _config()
+        assert config.delivery_fee("PICKUP", 10.5) == 0.0
+        assert config.delivery_fee("SHIPPING", 10.0) == 0.0
+
+
+class TestPincodesAndLocationCodes:
+
+    @pytest.mark.unit
+    def test_empty_pincodes_serve_everywhere(self):
+        assert _config().serves_pincode("75024")
+        restricted = _config(pincodes=frozenset({"75024"}))
+        assert restricted.serves_pincode("75024")
+        assert not restricted.serves_pincode("75025")
+
+    @pytest.mark.unit
+    def test_location_code_from_city(self):
+        config = _config()
+        assert config.location_code("1 Main St, Plano, TX 75024") == "PL"
+        assert config.location_code("1 Main St, Dallas, TX 75201") == DEFAULT_LOCATION_CODE
+        assert config.location_code("no city") == DEFAULT_LOCATION_CODE
+        assert config.location_code(None) == DEFAULT_LOCATION_CODE
@@ -0,0 +1,166 @@
+"""
+Unit tests for the stock held by a Square checkout: it is given back when
+the payment fails and when the order cannot be created after the charge, and
+taken again when the orphaned payment is reconciled
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from app.graphql.resolvers.order_resolver import OrderMutation
+from app.services import payment_reconciliation_service
+from app.services.inventory_reservation_service import InsufficientStockError
+from app.services.payment_service import PaymentError
+
+ITEMS = [{"product_id": 10, "quantity": 2}]
+AMOUNTS = {
+    "subtotal": 20.0,
+    "delivery_fee": 0.0,
+    "tax_amount": 0.0,
+    "tip_amount": 0.0,
+    "total": 20.0,
+    "total_cents": 2000,
+}
+
+
+def _create_order_with_payment(**overrides):
+    resolver = next(
+        field for field in OrderMutation.__strawberry_definition__.fields
+        if field.python_name == "createOrderWithPayment"
+    ).base_resolver.wrapped_func
+    arguments = dict(
+        userId=1,
+        storeId=1,
+        productItems=[SimpleNamespace(productId=10, quantity=2)],
+        payment=SimpleNamespace(paymentToken="tok", idempotencyKey="key-1", clientCalculatedAmount=20.0),
+        pickupOrDelivery="pickup",
+        pickupId=3,
+    )
+    arguments.update(overrides)
+    return resolver(None, **arguments)
+
+
+@pytest.fixture
+def checkout():
+    with mock.patch("app.graphql.resolvers.order_resolver.find_replayed_order", return_value=None), \
+            mock.patch("app.services.amount_calculation_service.calculate_order_amount", return_value=AMOUNTS), \
+            mock.patch("app.services.inventory_reservation_service.reserve_order_inventory") as reserve, \
+            mock.patch("app.services.inventory_reservation_service.release_order_inventory") as release, \
+            mock.patch("app.services.payment_service.create_square_payment_for_store") as charge, \
+            mock.patch("app.services.order_service.create_order_with_payment") as create_order:
+        charge.return_value = {"payment_id": "sq-1", "status": "COMPLETED", "amount_cents": 2000}
+        yield SimpleNamespace(reserve=reserve, release=release, charge=charge, create_order=create_order)
+
+
+class TestCheckoutReservation:
+
+    @pytest.mark.unit
+    def test_successful_checkout_keeps_stock(self, checkout):
+        assert _create_order_with_payment() is checkout.create_order.return_value
+        checkout.reserve.assert_called_once_with(store_id=1, product_items=ITEMS)
+        checkout.release.assert_not_called()
+
+    @pytest.mark.unit
+    def test_failed_payment_releases_stock(self, checkout):
+        checkout.charge.side_effect = PaymentError(message="Card declined", code="CARD_DECLINED")
+        with pytest.raises(Exception, match="Card declined"):
+            _create_order_with_payment()
+        checkout.release.assert_called_once_with(store_id=1, product_items=ITEMS)
+        checkout.create_order.assert_not_called()
+
+    @pytest.mark.unit
+    def test_failed_order_after_charge_releases_stock(self, checkout, caplog):
+        checkout.create_order.side_effect = RuntimeError("connection lost")
+        with pytest.raises(Exception, match="Your card has been charged"):
+            _create_order_with_payment()
+        checkout.release.assert_called_once_with(store_id=1, product_items=ITEMS)
+        assert '"inventory_released": true' in caplog.text
+        # Everything reconcile_payment needs, including the amount Square charged
+        assert "square_payment_id=sq-1, charged_amount_cents=2000," in caplog.text
+
+    @pytest.mark.unit
+    def test_failed_release_is_logged_for_reconciliation(self, checkout, caplog):
+        checkout.create_order.side_effect = RuntimeError("connection lost")
+        checkout.release.side_effect = RuntimeError("connection lost")
+        with pytest.raises(Exception, match="Your card has been charged"):
+            _create_order_with_payment()
+        assert '"inventory_released": false' in caplog.text
+
+
+@pytest.fixture
+def reconcile_db():
+    db = mock.MagicMock()
+    with mock.patch.object(payment_reconciliation_service, "check_payment_exists_locally", return_value=False), \
+            mock.patch.object(payment_reconciliation_service, "SessionLocal", return_value=db), \
+            mock.patch.object(payment_reconciliation_service, "record_order_created"), \
+            mock.patch.object(payment_reconciliation_service, "enqueue_order_created"):
+        yield db
+
+
+def _order_params(**overrides):
+    params = {
+        "user_id": 1,
+        "store_id": 1,
+        "product_items": ITEMS,
+        "total_amount": 20.0,
+        "order_total_amount": 20.0,
+        "pickup_or_delivery": "pickup",
+        "pickup_id": 3,
+    }
+    params.update(overrides)
+    return params
+
+
+class TestReconcileReservation:
+
+    @pytest.mark.unit
+    def test_reserves_released_stock_again(self, reconcile_db):
+        with mock.patch.object(payment_reconciliation_service, "reserve_inventory") as reserve:
+            payment_reconciliation_service.reconcile_payment("sq-1", "key-1", _order_params(inventory_released=True))
+        reserve.assert_called_once_with(reconcile_db, 1, ITEMS)
+        reconcile_db.commit.assert_called_once()
+
+    @pytest.mark.unit
+    def test_held_stock_is_not_reserved_twice(self, reconcile_db):
+        with mock.patch.object(payment_reconciliation_service, "reserve_inventory") as reserve:
+            payment_reconciliation_service.reconcile_payment("sq-1", "key-1", _order_params())
+        reserve.assert_not_called()
+
+    @pytest.mark.unit
+    def test_shortfall_does_not_block_paid_order(self, reconcile_db):
+        with mock.patch.object(
+            payment_reconciliation_service,
+            "reserve_inventory",
+            side_effect=InsufficientStockError("Insufficient stock for product(s) 10 in store 1", [10])
+        ):
+            payment_reconciliation_service.reconcile_payment("sq-1", "key-1", _order_params(inventory_released=True))
+        reconcile_db.commit.assert_called_once()
+
+
+class TestReconcileChargedAmount:
+
+    @pytest.mark.unit
+    def test_charge_must_equal_order_total(self, reconcile_db):
+        with pytest.raises(ValueError, match="Square charged 1999 cents but the order total is 2000 cents"):
+            payment_reconciliation_service.reconcile_payment("sq-1", "key-1", _order_params(), charged_amount_cents=1999)
+        reconcile_db.commit.assert_not_called()
+
+    @pytest.mark.unit
+    def test_by_idempotency_key_passes_square_payment(self, reconcile_db):
+        square_payment = {"payment_id": "sq-1", "status": "COMPLETED", "amount_cents": 2000, "receipt_url": "https://r"}
+        with mock.patch.object(payment_reconciliation_service, "find_payment_by_idempotency_key",
+                               return_value=square_payment), \
+                mock.patch.object(payment_reconciliation_service, "reconcile_payment") as reconcile:
+            payment_reconciliation_service.reconcile_payment_by_idempotency_key("key-1", _order_params())
+        reconcile.assert_called_once_with(
+            square_payment_id="sq-1", idempotency_key="key-1", order_params=_order_params(),
+            payment_status="COMPLETED", receipt_url="https://r", charged_amount_cents=2000
+        )
+
+    @pytest.mark.unit
+    def test_by_idempotency_key_without_square_payment(self, reconcile_db):
+        with mock.patch.object(payment_reconciliation_service, "find_payment_by_idempotency_key", return_value=None):
+            with pytest.raises(ValueError, match="No Square payment found"):
+                payment_reconciliation_service.reconcile_payment_by_idempotency_key("key-1", _order_params())
@@ -0,0 +1,102 @@
+"""
+Unit tests for delivery pincodes: the indexed reverse lookup of stores serving
+a pincode and address validation against a store's cached pincodes
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models.store import StoreModel
+from app.services import store_service, validation_service
+from app.services.store_service import get_stores_serving_pincode
+from app.services.validation_service import extract_pincode_from_address, validate_delivery_pincode
+
+
+class TestStoresServingPincode:
+
+    def _lookup(self, pincode):
+        """get_stores_serving_pincode against a mock session; returns (result, filter clauses)."""
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.all.return_value = ["store"]
+        with mock.patch.object(store_service, "SessionLocal", return_value=db):
+            result = get_stores_serving_pincode(pincode)
+        db.close.assert_called_once()
+        return result, db.query.return_value.filter.call_args.args
+
+    @pytest.mark.unit
+    def test_uses_array_containment(self):
+        result, clauses = self._lookup(" 75024 ")
+        assert result == ["store"]
+        compiled = clauses[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        # The form the GIN index on store.pincodes answers, with the pincode trimmed
+        assert str(compiled) == "store.pincodes @> ARRAY['75024']"
+
+    @pytest.mark.unit
+    def test_only_active_enabled_stores(self):
+        _, clauses = self._lookup("75024")
+        assert [str(clause.compile(dialect=postgresql.dialect())) for clause in clauses[1:]] == [
+            "store.is_active IS true", "store.disabled IS false"
+        ]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("pincode", ["", "   "])
+    def test_pincode_is_required(self, pincode):
+        with mock.patch.object(store_service, "SessionLocal") as session:
+            with pytest.raises(ValueError, match="Pincode is required"):
+                get_stores_serving_pincode(pincode)
+        session.assert_not_called()
+
+    @pytest.mark.unit
+    def test_pincodes_are_gin_indexed(self):
+        index, = [index for index in StoreModel.__table__.indexes if index.name == "ix_store_pincodes"]
+        assert [column.name for column in index.columns] == ["pincodes"]
+        assert index.dialect_options["postgresql"]["using"] == "gin"
+
+
+class TestValidateDeliveryPincode:
+
+    ADDRESS = "12 Elm St, Plano, TX 75024-1234"
+
+    def _validate(self, address, pincodes=(), config=True):
+        checkout_config = SimpleNamespace(
+            pincodes=frozenset(pincodes), serves_pincode=lambda p: not pincodes or p in pincodes
+        ) if config else None
+        with mock.patch.object(validation_service, "get_checkout_config", return_value=checkout_config) as get_config:
+            result = validate_delivery_pincode(address, 7)
+        get_config.assert_called_once_with(7)
+        return result
+
+    @pytest.mark.unit
+    def test_served_pincode(self):
+        assert self._validate(self.ADDRESS, {"75024", "75025"}) is True
+
+    @pytest.mark.unit
+    def test_store_without_pincodes_delivers_everywhere(self):
+        assert self._validate("no pincode here") is True
+
+    @pytest.mark.unit
+    def test_unserved_pincode(self):
+        with pytest.raises(ValueError, match="does not deliver to pincode 75024. Supported pincodes: 75001, 75002"):
+            self._validate(self.ADDRESS, {"75002", "75001"})
+
+    @pytest.mark.unit
+    def test_address_without_pincode(self):
+        with pytest.raises(ValueError, match="Could not extract pincode"):
+            self._validate("12 Elm St, Plano, TX", {"75024"})
+
+    @pytest.mark.unit
+    def test_unknown_store(self):
+        with pytest.raises(ValueError, match="Store with ID 7 not found"):
+            self._validate(self.ADDRESS, config=False)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("address, pincode", [
+        ("12 Elm St, Plano, TX 75024", "75024"),
+        ("12 Elm St, Plano, TX 75024-1234", "75024"),
+        ("Plano", None),
+    ])
+    def test_extract_pincode(self, address, pincode):
+        assert extract_pincode_from_address(address) == pincode
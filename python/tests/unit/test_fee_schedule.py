@@ -0,0 +1,146 @@
+"""
+Unit tests for compiled fee schedules, including property-based parity with
+the sort-and-scan tier lookup calculate_order_amount used before, and for the
+tier checks fee writes run
+"""
+
+import math
+from unittest import mock
+
+import pytest
+from hypothesis import given, strategies as st
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.fees import FeesModel
+from app.services import fees_service
+from app.services.fee_schedule import EMPTY_FEE_SCHEDULE, FeeSchedule
+from app.services.fees_service import create_fee, update_fee
+
+
+def _scan_fee(tiers, subtotal):
+    """Previous lookup: sort by limit (None last), first tier where subtotal <= limit."""
+    for limit, fee_rate in sorted(tiers, key=lambda t: t[0] if t[0] is not None else float('inf')):
+        if limit is None or subtotal <= limit:
+            return fee_rate
+    return 0.0
+
+
+amounts = st.floats(min_value=0, max_value=10_000, allow_nan=False, allow_infinity=False)
+# Few distinct limits, so that ties and subtotals equal to a limit are common
+limits = st.one_of(st.none(), st.sampled_from([0.0, 10.0, 25.0, 49.99, 50.0]), amounts)
+tiers = st.lists(st.tuples(limits, amounts), max_size=8)
+
+
+class TestFeeSchedule:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("subtotal, fee", [(0.0, 5.0), (25.0, 5.0), (25.01, 2.5), (50.0, 2.5), (500.0, 0.0)])
+    def test_first_tier_covering_subtotal(self, subtotal, fee):
+        schedule = FeeSchedule.compile([(None, 0.0), (50.0, 2.5), (25.0, 5.0)])
+        assert schedule.fee_for(subtotal) == fee
+
+    @pytest.mark.unit
+    def test_subtotal_above_every_limit_is_free(self):
+        assert FeeSchedule.compile([(10.0, 1.0)]).fee_for(10.5) == 0.0
+        assert EMPTY_FEE_SCHEDULE.fee_for(10.0) == 0.0
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("subtotal, fee", [
+        (9.99, 1.0), (10.0, 1.0), (10.000001, 2.0), (20.0, 2.0), (20.01, 3.0), (1e12, 3.0)
+    ])
+    def test_limits_are_inclusive(self, subtotal, fee):
+        schedule = FeeSchedule.compile([(20.0, 2.0), (None, 3.0), (10.0, 1.0)])
+        assert schedule.fee_for(subtotal) == fee
+
+    @pytest.mark.unit
+    def test_equal_limits_first_tier_wins(self):
+        assert FeeSchedule.compile([(10.0, 1.0), (10.0, 9.0)]).fee_for(10.0) == 1.0
+        assert FeeSchedule.compile([(None, 4.0), (None, 8.0)]).fee_for(10.0) == 4.0
+
+    @pytest.mark.unit
+    def test_zero_limit(self):
+        schedule = FeeSchedule.compile([(0.0, 7.0), (10.0, 1.0)])
+        assert schedule.fee_for(0.0) == 7.0
+        assert schedule.fee_for(0.01) == 1.0
+
+    @pytest.mark.unit
+    def test_open_ended_tier_only(self):
+        schedule = FeeSchedule.compile([(None, 4.0)])
+        assert schedule.limits == (math.inf,)
+        assert schedule.fee_for(0.0) == schedule.fee_for(1e12) == 4.0
+
+    @pytest.mark.unit
+    def test_empty_schedule(self):
+        assert FeeSchedule.compile([]) == EMPTY_FEE_SCHEDULE
+        assert EMPTY_FEE_SCHEDULE.fee_for(0.0) == 0.0
+
+    @pytest.mark.unit
+    @given(tiers=tiers, subtotal=amounts)
+    def test_matches_sort_and_scan(self, tiers, subtotal):
+        assert FeeSchedule.compile(tiers).fee_for(subtotal) == _scan_fee(tiers, subtotal)
+
+    @pytest.mark.unit
+    @given(tiers=tiers, data=st.data())
+    def test_matches_sort_and_scan_at_limits(self, tiers, data):
+        subtotal = data.draw(st.sampled_from([limit for limit, _ in tiers if limit is not None] or [0.0]))
+        assert FeeSchedule.compile(tiers).fee_for(subtotal) == _scan_fee(tiers, subtotal)
+
+    @pytest.mark.unit
+    @given(tiers=tiers)
+    def test_limits_sorted(self, tiers):
+        schedule = FeeSchedule.compile(tiers)
+        assert list(schedule.limits) == sorted(schedule.limits)
+        assert len(schedule.limits) == len(schedule.rates) == len(tiers)
+
+
+class TestTierValidation:
+
+    @pytest.fixture(autouse=True)
+    def session(self):
+        """Fees table in SQLite, with two delivery tiers and a pickup tier for store 7."""
+        engine = create_engine("sqlite://")
+        FeesModel.__table__.create(engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        db.add_all([
+            FeesModel(id=1, store_id=7, fee_rate=5.0, type="DELIVERY", limit=25.0),
+            FeesModel(id=2, store_id=7, fee_rate=0.0, type="DELIVERY", limit=None),
+            FeesModel(id=3, store_id=7, fee_rate=1.0, type="PICKUP", limit=25.0),
+        ])
+        db.commit()
+        db.close()
+        with mock.patch.object(fees_service, "SessionLocal", Session), \
+                mock.patch.object(fees_service, "bump_reference_version"):
+            yield
+        engine.dispose()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("fee_id, changes", [
+        (1, dict(fee_rate=4.0)),
+        (1, dict(fee_rate=4.0, limit=25.0)),
+        (2, dict(fee_rate=1.0)),
+        (3, dict(limit=25.0)),
+    ])
+    def test_update_keeping_its_own_limit(self, fee_id, changes):
+        fee = update_fee(fee_id, **changes)
+        assert {key: getattr(fee, key) for key in changes} == changes
+
+    @pytest.mark.unit
+    def test_update_onto_another_tiers_limit(self):
+        with pytest.raises(ValueError, match="already has a DELIVERY fee with limit 25.0"):
+            update_fee(3, type="DELIVERY")
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("limit, error", [
+        (25.0, "already has a DELIVERY fee with limit 25.0"),
+        (None, "already has a DELIVERY fee without a limit"),
+        (-1.0, "Fee limit cannot be negative"),
+    ])
+    def test_create_conflicting_tier(self, limit, error):
+        with pytest.raises(ValueError, match=error):
+            create_fee(7, 1.0, "USD", "DELIVERY", limit)
+
+    @pytest.mark.unit
+    def test_create_new_limit(self):
+        assert create_fee(7, 2.5, "USD", "DELIVERY", 50.0).limit == 50.0
@@ -0,0 +1,103 @@
+"""
+Unit tests for image variant generation (local storage backend, no database)
+"""
+
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image
+
+from app.services.image_storage import LocalImageStorage, set_image_storage
+from app.services.image_variant_service import _generate, available_formats, render_variants, variant_key
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = LocalImageStorage(str(tmp_path), "http://media.test/files")
+    set_image_storage(storage)
+    yield storage
+    set_image_storage(None)
+
+
+class TestRenderVariants:
+
+    @pytest.mark.unit
+    def test_resizes_without_upscaling(self):
+        variants = render_variants(_jpeg(600, 300), [160, 480, 960], ["webp"])
+
+        assert [(v["width"], v["height"]) for v in variants] == [(160, 80), (480, 240), (600, 300)]
+        for variant in variants:
+            with Image.open(io.BytesIO(variant["data"])) as image:
+                assert image.format == "WEBP"
+                assert image.size == (variant["width"], variant["height"])
+
+    @pytest.mark.unit
+    def test_one_variant_per_format(self):
+        formats = available_formats()
+        variants = render_variants(_jpeg(200, 200), [100], formats)
+
+        assert sorted(v["format"] for v in variants) == sorted(formats)
+
+    @pytest.mark.unit
+    def test_rejects_non_images(self):
+        with pytest.raises(ValueError):
+            render_variants(b"not an image", [160], ["webp"])
+
+
+class TestLocalImageStorage:
+
+    @pytest.mark.unit
+    def test_round_trip(self, storage):
+        storage.write("products/a b.webp", b"data", "image/webp")
+
+        url = storage.url("products/a b.webp")
+        assert storage.key_from_url(url + "?t=1") == "products/a b.webp"
+        assert storage.read("products/a b.webp") == b"data"
+
+    @pytest.mark.unit
+    def test_external_urls_and_escapes(self, storage):
+        assert storage.key_from_url("https://elsewhere.test/products/a.jpg") is None
+        with pytest.raises(ValueError):
+            storage.write("../outside.webp", b"data", "image/webp")
+
+
+class TestGenerate:
+
+    @pytest.mark.unit
+    def test_writes_variants_next_to_source(self, storage):
+        storage.write("products/rice.jpg", _jpeg(1200, 800), "image/jpeg")
+        url = storage.url("products/rice.jpg") + "?t=1"
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results = _generate(executor, [url], ["webp"])
+
+        widths = [variant["width"] for variant in results[url]]
+        assert widths == [160, 480, 960]
+        for variant in results[url]:
+            key = storage.key_from_url(variant["url"])
+            assert key == variant_key("products/rice.jpg", url, variant["width"], "webp")
+            assert key.startswith("products/variants/rice-")
+            assert storage.read(key)
+
+    @pytest.mark.unit
+    def test_unprocessable_images_get_no_variants(self, storage):
+        storage.write("products/broken.jpg", b"not an image", "image/jpeg")
+        urls = [
+            storage.url("products/broken.jpg"),
+            storage.url("products/missing.jpg"),
+            "https://elsewhere.test/a.jpg",
+        ]
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results = _generate(executor, urls, ["webp"])
+
+        assert results == {url: [] for url in urls}
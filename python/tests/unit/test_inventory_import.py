@@ -0,0 +1,215 @@
+"""
+Unit tests for the inventory file import: reading and parsing rows, chunking,
+and how row, chunk and file errors are reported
+"""
+
+import csv
+import io
+from unittest import mock
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services import inventory_import_service
+from app.services.inventory_import_service import (
+    SUMMARY_COUNTERS,
+    _write_chunk,
+    import_inventory,
+    iter_import_rows,
+    parse_import_row,
+)
+
+
+def _csv(*lines):
+    return io.BytesIO("\n".join(lines).encode("utf-8"))
+
+
+def _rows(count, start=0):
+    return [f"Product {i},Category {i % 3},{i}" for i in range(start, start + count)]
+
+
+def _report_lines(summary):
+    report = summary["error_report"]
+    if report is None:
+        return []
+    lines = list(csv.reader(io.TextIOWrapper(report, encoding="utf-8")))
+    report.close()
+    return lines[1:]
+
+
+class TestReadRows:
+
+    @pytest.mark.unit
+    def test_header_aliases_and_blank_rows(self):
+        file = _csv("Product Name,Category,Qty,Colour", "Rice,Grains,5,red", ",,,", "Dal,Grains,,")
+        assert list(iter_import_rows(file, "csv")) == [
+            (2, {"product_name": "Rice", "category": "Grains", "quantity": "5"}),
+            (4, {"product_name": "Dal", "category": "Grains", "quantity": ""}),
+        ]
+
+    @pytest.mark.unit
+    def test_missing_required_column(self):
+        with pytest.raises(ValueError, match="Missing required columns"):
+            list(iter_import_rows(_csv("name,price", "Rice,2"), "csv"))
+
+    @pytest.mark.unit
+    def test_empty_file(self):
+        with pytest.raises(ValueError, match="empty"):
+            list(iter_import_rows(_csv(""), "csv"))
+
+
+class TestParseRow:
+
+    @pytest.mark.unit
+    def test_values_are_converted(self):
+        row = parse_import_row({
+            "product_name": " Rice ", "category": "Grains", "price": "2.5", "quantity": "4.0",
+            "is_listed": "Yes", "is_available": False, "unit": "",
+        })
+        assert (row["product_name"], row["price"], row["quantity"]) == ("Rice", 2.5, 4)
+        assert (row["is_listed"], row["is_available"], row["unit"]) == (True, False, None)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("raw, error", [
+        ({"category": "Grains"}, "Product name is required"),
+        ({"product_name": "Rice"}, "Category is required"),
+        ({"product_name": "Rice", "category": "Grains", "price": "abc"}, "Invalid price"),
+        ({"product_name": "Rice", "category": "Grains", "price": "nan"}, "Invalid price"),
+        ({"product_name": "Rice", "category": "Grains", "quantity": "1.5"}, "whole number"),
+        ({"product_name": "Rice", "category": "Grains", "is_listed": "maybe"}, "Invalid is_listed"),
+    ])
+    def test_invalid(self, raw, error):
+        with pytest.raises(ValueError, match=error):
+            parse_import_row(raw)
+
+
+@pytest.fixture
+def db():
+    session = mock.MagicMock()
+    # Let exceptions raised inside ``with db.begin_nested()`` propagate
+    session.begin_nested.return_value.__exit__.return_value = False
+    with mock.patch.object(inventory_import_service, "SessionLocal", return_value=session):
+        yield session
+
+
+@pytest.fixture
+def written_chunks():
+    """Replace the database writes: every row is created, chunks are recorded."""
+    chunks = []
+
+    def import_chunk(db, store_id, chunk, caches, counts):
+        chunks.append([number for number, _ in chunk])
+        counts["created"] += len(chunk)
+        return []
+
+    with mock.patch.object(inventory_import_service, "_import_chunk", side_effect=import_chunk) as patched:
+        patched.chunks = chunks
+        yield patched
+
+
+class TestImportInventory:
+
+    @pytest.mark.unit
+    def test_rows_are_written_in_chunks_and_committed_once(self, db, written_chunks):
+        summary = import_inventory(1, _csv("name,category,qty", *_rows(5)), "csv", chunk_size=2)
+
+        assert written_chunks.chunks == [[2, 3], [4, 5], [6]]
+        assert (summary["total_rows"], summary["created"], summary["chunks"]) == (5, 5, 3)
+        assert summary["error_report"] is None
+        db.commit.assert_called_once()
+
+    @pytest.mark.unit
+    def test_repeated_product_starts_a_new_chunk(self, db, written_chunks):
+        file = _csv("name,category", "Rice,Grains", "Dal,Grains", "rice,grains", "Tea,Drinks")
+        import_inventory(1, file, "csv", chunk_size=10)
+        assert written_chunks.chunks == [[2, 3], [4, 5]]
+
+    @pytest.mark.unit
+    def test_invalid_rows_are_reported(self, db, written_chunks):
+        file = _csv("name,category,price", "Rice,Grains,2", ",Grains,1", "Dal,Grains,abc")
+        summary = import_inventory(1, file, "csv", chunk_size=10)
+
+        assert (summary["created"], summary["failed"]) == (1, 2)
+        assert _report_lines(summary) == [
+            ["3", "", "Grains", "Product name is required"],
+            ["4", "Dal", "Grains", "Invalid price: abc"],
+        ]
+
+    @pytest.mark.unit
+    def test_rejected_chunk_is_rolled_back_alone(self, db, written_chunks):
+        def import_chunk(db, store_id, chunk, caches, counts):
+            if chunk[0][0] == 4:
+                raise OperationalError("INSERT", {}, Exception("deadlock detected"))
+            counts["created"] += len(chunk)
+            return []
+
+        written_chunks.side_effect = import_chunk
+        summary = import_inventory(1, _csv("name,category", *_rows(5)), "csv", chunk_size=2)
+
+        assert (summary["created"], summary["failed"], summary["chunks"]) == (3, 2, 2)
+        error = "Rows 4-5 could not be written; none of them were imported"
+        assert summary["failed_chunks"] == [{"first_row": 4, "last_row": 5, "rows": 2, "error": error}]
+        assert [line[0] for line in _report_lines(summary)] == ["4", "5"]
+        db.commit.assert_called_once()
+
+    @pytest.mark.unit
+    def test_file_error_imports_nothing(self, db, written_chunks):
+        with mock.patch.object(inventory_import_service, "MAX_IMPORT_ROWS", 3):
+            with pytest.raises(ValueError, match="at most 3 rows"):
+                import_inventory(1, _csv("name,category", *_rows(5)), "csv", chunk_size=2)
+        assert written_chunks.chunks == [[2, 3]]
+        db.commit.assert_not_called()
+        db.rollback.assert_called_once()
+
+    @pytest.mark.unit
+    def test_unknown_store(self, db, written_chunks):
+        db.query.return_value.filter.return_value.first.return_value = None
+        with pytest.raises(ValueError, match="Store with ID 1 does not exist"):
+            import_inventory(1, _csv("name,category", *_rows(1)), "csv")
+        db.commit.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("import_format, chunk_size", [("xls", 10), ("csv", 0), ("csv", 10 ** 6)])
+    def test_invalid_arguments(self, import_format, chunk_size):
+        with pytest.raises(ValueError):
+            import_inventory(1, _csv("name,category"), import_format, chunk_size)
+
+
+class TestWriteChunk:
+
+    def _write(self, import_chunk):
+        caches = {"categories": {"grains": 1}, "products": {}}
+        summary = {**dict.fromkeys(SUMMARY_COUNTERS, 0), "chunks": 0, "failed_chunks": []}
+        report = mock.Mock()
+        db = mock.MagicMock()
+        db.begin_nested.return_value.__exit__.return_value = False
+        chunk = [(2, {"product_name": "Rice", "category": "Grains"})]
+        with mock.patch.object(inventory_import_service, "_import_chunk", side_effect=import_chunk):
+            _write_chunk(db, 1, chunk, caches, summary, report)
+        return caches, summary, report
+
+    @pytest.mark.unit
+    def test_written_chunk_updates_caches_and_counters(self):
+        def import_chunk(db, store_id, chunk, caches, counts):
+            caches["categories"]["tea"] = 2
+            caches["products"][(1, "rice")] = 10
+            counts["products_created"] += 1
+            counts["failed"] += 1
+            return [[2, "Rice", "Grains", "Invalid price"]]
+
+        caches, summary, report = self._write(import_chunk)
+        assert caches == {"categories": {"grains": 1, "tea": 2}, "products": {(1, "rice"): 10}}
+        assert (summary["products_created"], summary["failed"], summary["chunks"]) == (1, 1, 1)
+        report.writerows.assert_called_once_with([[2, "Rice", "Grains", "Invalid price"]])
+
+    @pytest.mark.unit
+    def test_rolled_back_chunk_leaves_caches_and_counters(self):
+        def import_chunk(db, store_id, chunk, caches, counts):
+            caches["categories"]["tea"] = 2
+            counts["categories_created"] += 1
+            raise OperationalError("INSERT", {}, Exception("connection reset"))
+
+        caches, summary, report = self._write(import_chunk)
+        assert caches == {"categories": {"grains": 1}, "products": {}}
+        assert (summary["categories_created"], summary["failed"], summary["chunks"]) == (0, 1, 0)
+        report.writerow.assert_called_once()
@@ -0,0 +1,179 @@
+"""
+Unit tests for inventory delta sync: how the cursor advances, trails recent
+writes by the commit lag, falls back to a full reset, and the tombstone purge job
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from app.db.models.inventory import InventoryModel
+from app.db.models.inventory_tombstone import InventoryTombstoneModel
+from app.services import inventory_sync_service
+from app.services.inventory_sync_service import (
+    SYNC_CURSOR_LAG,
+    TOMBSTONE_RETENTION_DAYS,
+    decode_sync_cursor,
+    encode_sync_cursor,
+    get_inventory_changes,
+    purge_inventory_tombstones,
+)
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return NOW
+
+
+def _changes(cursor=None, changed=(), tombstones=()):
+    """get_inventory_changes at NOW; returns (result, inventory query, tombstone query)."""
+    inventory = mock.MagicMock()
+    inventory.options.return_value.filter.return_value = inventory
+    inventory.filter.return_value = inventory
+    inventory.order_by.return_value.all.return_value = [
+        SimpleNamespace(id=i, updatedAt=stamp) for i, stamp in enumerate(changed)
+    ]
+    removed = mock.MagicMock()
+    removed.filter.return_value.order_by.return_value = [
+        SimpleNamespace(inventoryId=i, productId=i, deletedAt=stamp) for i, stamp in enumerate(tombstones)
+    ]
+    db = mock.MagicMock()
+    db.query.side_effect = lambda model: {InventoryModel: inventory, InventoryTombstoneModel: removed}[model]
+
+    with mock.patch.object(inventory_sync_service, "SessionLocal", return_value=db), \
+            mock.patch.object(inventory_sync_service, "datetime", FrozenDatetime):
+        result = get_inventory_changes(7, cursor)
+    return result, inventory, removed
+
+
+def _cursor(result):
+    return decode_sync_cursor(result["cursor"])
+
+
+class TestSyncCursor:
+
+    @pytest.mark.unit
+    def test_round_trip(self):
+        stamp = datetime(2026, 10, 19, 11, 59, 58, 123456)
+        assert decode_sync_cursor(encode_sync_cursor(stamp)) == stamp
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("cursor", ["garbage!", "bm90IGEgZGF0ZQ==", "//79"])
+    def test_invalid(self, cursor):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_sync_cursor(cursor)
+
+
+class TestCursorAdvance:
+
+    @pytest.mark.unit
+    def test_moves_to_newest_change(self):
+        since = NOW - timedelta(hours=1)
+        newest = NOW - timedelta(minutes=30)
+        result, inventory, _ = _changes(encode_sync_cursor(since), changed=[since + timedelta(minutes=1), newest])
+
+        assert _cursor(result) == newest
+        assert result["reset"] is False
+        # Only rows changed after the cursor are read
+        assert "inventory.\"updatedAt\" >" in str(inventory.filter.call_args.args[0])
+
+    @pytest.mark.unit
+    def test_tombstones_count_as_changes(self):
+        since = NOW - timedelta(hours=1)
+        removed_at = NOW - timedelta(minutes=5)
+        result, _, _ = _changes(
+            encode_sync_cursor(since), changed=[NOW - timedelta(minutes=20)], tombstones=[removed_at]
+        )
+        assert _cursor(result) == removed_at
+        assert result["removed"] == [{"inventory_id": 0, "product_id": 0, "removed_at": removed_at}]
+
+    @pytest.mark.unit
+    def test_no_changes_keeps_the_cursor(self):
+        since = NOW - timedelta(hours=1)
+        result, _, _ = _changes(encode_sync_cursor(since))
+        assert _cursor(result) == since
+
+
+class TestCursorLag:
+
+    @pytest.mark.unit
+    def test_trails_recent_changes(self):
+        since = NOW - timedelta(hours=1)
+        result, _, _ = _changes(encode_sync_cursor(since), changed=[NOW - timedelta(seconds=2)])
+        # Rows stamped in the last SYNC_CURSOR_LAG are sent again next time
+        assert _cursor(result) == NOW - SYNC_CURSOR_LAG
+
+    @pytest.mark.unit
+    def test_never_moves_backwards(self):
+        since = NOW - SYNC_CURSOR_LAG / 2
+        result, _, _ = _changes(encode_sync_cursor(since), changed=[NOW - timedelta(seconds=1)])
+        assert _cursor(result) == since
+
+
+class TestCursorReset:
+
+    @pytest.mark.unit
+    def test_first_sync_returns_everything(self):
+        result, inventory, removed = _changes(changed=[NOW - timedelta(days=3)])
+
+        assert result["reset"] is True
+        assert result["removed"] == []
+        inventory.filter.assert_not_called()
+        removed.filter.assert_not_called()
+        assert _cursor(result) == NOW - timedelta(days=3)
+
+    @pytest.mark.unit
+    def test_first_sync_of_empty_store(self):
+        result, _, _ = _changes()
+        assert _cursor(result) == NOW - SYNC_CURSOR_LAG
+
+    @pytest.mark.unit
+    def test_cursor_older_than_tombstones_resets(self):
+        since = NOW - timedelta(days=TOMBSTONE_RETENTION_DAYS, seconds=1)
+        result, inventory, removed = _changes(encode_sync_cursor(since), changed=[NOW - timedelta(days=1)])
+
+        assert result["reset"] is True
+        inventory.filter.assert_not_called()
+        removed.filter.assert_not_called()
+        assert _cursor(result) == NOW - timedelta(days=1)
+
+    @pytest.mark.unit
+    def test_cursor_within_retention_does_not_reset(self):
+        since = NOW - timedelta(days=TOMBSTONE_RETENTION_DAYS) + timedelta(seconds=1)
+        result, _, _ = _changes(encode_sync_cursor(since))
+        assert result["reset"] is False
+
+
+class TestPurgeTombstones:
+
+    @pytest.mark.unit
+    def test_deletes_expired_tombstones(self):
+        db = mock.MagicMock()
+        db.execute.return_value.rowcount = 3
+        assert purge_inventory_tombstones(retention_days=30, db=db) == 3
+        db.commit.assert_called_once()
+        db.close.assert_not_called()
+
+    @pytest.mark.unit
+    def test_job_failure_is_logged(self, caplog):
+        with mock.patch.object(inventory_sync_service, "purge_inventory_tombstones", side_effect=RuntimeError("boom")):
+            inventory_sync_service._tombstone_purge_job()
+        assert "Inventory tombstone purge failed: boom" in caplog.text
+
+    @pytest.mark.unit
+    def test_scheduler_runs_purge_daily(self):
+        with mock.patch.object(inventory_sync_service, "_scheduler", None), \
+                mock.patch.object(inventory_sync_service, "BackgroundScheduler") as scheduler:
+            inventory_sync_service.setup_tombstone_purge_scheduler()
+            inventory_sync_service.setup_tombstone_purge_scheduler()
+
+        scheduler.assert_called_once()
+        job = scheduler.return_value.add_job.call_args
+        assert job.args == (inventory_sync_service._tombstone_purge_job,)
+        assert (job.kwargs["trigger"], job.kwargs["hour"], job.kwargs["minute"]) == ("cron", 3, 30)
+        scheduler.return_value.start.assert_called_once()
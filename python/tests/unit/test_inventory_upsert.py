@@ -0,0 +1,161 @@
+"""
+Unit tests for bulk inventory upserts: per-row validation and outcomes, and
+the INSERT ... ON CONFLICT statements written for valid rows
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import inventory_service
+from app.services.inventory_service import BULK_UPSERT_MAX_ITEMS, bulk_upsert_inventory, upsert_inventory_rows
+
+KNOWN_PRODUCTS = {10, 20, 30}
+# Rows already stocked by store 7: product ID -> inventory ID
+STOCKED = {10: 100}
+
+
+@pytest.fixture
+def db():
+    """
+    A session whose products query returns KNOWN_PRODUCTS and whose upserts
+    return one row per inserted product, reporting existing STOCKED rows as updated.
+    """
+    db = mock.MagicMock()
+    db.query.return_value.filter.side_effect = lambda criterion: [
+        SimpleNamespace(id=product_id) for product_id in criterion.right.value if product_id in KNOWN_PRODUCTS
+    ]
+    db.statements = []
+
+    def execute(statement):
+        db.statements.append(statement)
+        rows = statement.compile().params
+        product_ids = [value for key, value in rows.items() if key.startswith("productId")]
+        return [
+            SimpleNamespace(id=STOCKED.get(product_id, 1000 + product_id), productId=product_id,
+                            inserted=product_id not in STOCKED)
+            for product_id in product_ids
+        ]
+
+    db.execute.side_effect = execute
+    with mock.patch.object(inventory_service, "mark_catalogs_stale") as mark_stale:
+        db.mark_stale = mark_stale
+        yield db
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestUpsertInventoryRows:
+
+    @pytest.mark.unit
+    def test_created_is_true_for_inserts_and_false_for_updates(self, db):
+        results = upsert_inventory_rows(db, 7, [
+            {"product_id": 10, "price": 5.0}, {"product_id": 20, "price": 6.0},
+        ])
+
+        assert results == [
+            {"product_id": 10, "inventory_id": 100, "success": True, "created": False, "error": None},
+            {"product_id": 20, "inventory_id": 1020, "success": True, "created": True, "error": None},
+        ]
+        assert len(db.statements) == 1
+        db.mark_stale.assert_called_once_with(db, [7])
+
+    @pytest.mark.unit
+    def test_partial_update_sets_only_the_provided_fields(self, db):
+        upsert_inventory_rows(db, 7, [{"product_id": 10, "quantity": 3, "price": None}])
+
+        sql = _sql(db.statements[0])
+        assert 'ON CONFLICT ON CONSTRAINT "uq_inventory_storeId_productId" DO UPDATE SET' in sql
+        set_clause = sql.split("DO UPDATE SET")[1].split("RETURNING")[0]
+        assert "quantity = excluded.quantity" in set_clause
+        assert '"updatedAt"' in set_clause
+        for field in ("price", "measurement", "unit", "is_listed", "is_available"):
+            assert field not in set_clause
+        # New rows get the column defaults for fields left out
+        assert "price" not in sql.split("ON CONFLICT")[0]
+
+    @pytest.mark.unit
+    def test_rows_setting_different_fields_are_separate_statements(self, db):
+        results = upsert_inventory_rows(db, 7, [
+            {"product_id": 10, "price": 5.0}, {"product_id": 20, "quantity": 2}, {"product_id": 30, "price": 1.0},
+        ])
+
+        assert [result["success"] for result in results] == [True, True, True]
+        assert len(db.statements) == 2
+
+    @pytest.mark.unit
+    def test_duplicate_product_is_rejected_after_the_first(self, db):
+        results = upsert_inventory_rows(db, 7, [
+            {"product_id": 20, "price": 5.0}, {"product_id": 20, "price": 6.0},
+        ])
+
+        assert (results[0]["success"], results[0]["inventory_id"]) == (True, 1020)
+        assert results[1] == {"product_id": 20, "inventory_id": None, "success": False, "created": False,
+                              "error": "Product with ID 20 appears more than once"}
+        assert db.statements[0].compile().params["price_m0"] == 5.0
+
+    @pytest.mark.unit
+    def test_unknown_product_is_rejected(self, db):
+        results = upsert_inventory_rows(db, 7, [{"product_id": 99, "price": 5.0}, {"product_id": 20, "price": 6.0}])
+
+        assert (results[0]["success"], results[0]["error"]) == (False, "Product with ID 99 does not exist")
+        assert results[1]["success"] is True
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("item, error", [
+        ({"product_id": 20, "price": -0.01}, "Price must not be negative"),
+        ({"product_id": 20, "quantity": -1}, "Quantity must not be negative"),
+    ])
+    def test_negative_values_are_rejected(self, db, item, error):
+        results = upsert_inventory_rows(db, 7, [item])
+
+        assert (results[0]["success"], results[0]["error"]) == (False, error)
+        assert db.statements == []
+        db.mark_stale.assert_not_called()
+
+    @pytest.mark.unit
+    def test_zero_price_and_quantity_are_allowed(self, db):
+        results = upsert_inventory_rows(db, 7, [{"product_id": 20, "price": 0.0, "quantity": 0}])
+        assert results[0]["success"] is True
+
+    @pytest.mark.unit
+    def test_no_items(self, db):
+        assert upsert_inventory_rows(db, 7, []) == []
+        db.query.assert_not_called()
+
+
+class TestBulkUpsertInventory:
+
+    @pytest.mark.unit
+    def test_commits_once(self):
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(id=7)
+        with mock.patch.object(inventory_service, "SessionLocal", return_value=db), \
+                mock.patch.object(inventory_service, "upsert_inventory_rows", return_value=["result"]) as upsert:
+            assert bulk_upsert_inventory(7, [{"product_id": 10}]) == ["result"]
+        upsert.assert_called_once_with(db, 7, [{"product_id": 10}])
+        db.commit.assert_called_once()
+        db.close.assert_called_once()
+
+    @pytest.mark.unit
+    def test_unknown_store_writes_nothing(self):
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = None
+        with mock.patch.object(inventory_service, "SessionLocal", return_value=db), \
+                mock.patch.object(inventory_service, "upsert_inventory_rows") as upsert:
+            with pytest.raises(ValueError, match="Store with ID 7 does not exist"):
+                bulk_upsert_inventory(7, [{"product_id": 10}])
+        upsert.assert_not_called()
+        db.rollback.assert_called_once()
+        db.commit.assert_not_called()
+
+    @pytest.mark.unit
+    def test_too_many_items(self):
+        with mock.patch.object(inventory_service, "SessionLocal") as session:
+            with pytest.raises(ValueError, match=f"At most {BULK_UPSERT_MAX_ITEMS}"):
+                bulk_upsert_inventory(7, [{"product_id": 10}] * (BULK_UPSERT_MAX_ITEMS + 1))
+        session.assert_not_called()
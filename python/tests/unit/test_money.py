@@ -0,0 +1,49 @@
+"""
+Unit tests for integer-cents money helpers
+"""
+
+import pytest
+from hypothesis import given, strategies as st
+
+from app.services.money import OrderAmounts, from_cents, percentage_of, rescale, to_cents
+
+
+class TestToCents:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("amount, cents", [
+        (0, 0), (1, 100), (19.99, 1999), (0.1 + 0.2, 30), (2.675, 268), (1.005, 101), (0.004, 0), ("3.335", 334),
+    ])
+    def test_rounds_half_up_on_decimal_form(self, amount, cents):
+        assert to_cents(amount) == cents
+
+    @pytest.mark.unit
+    @given(cents=st.integers(min_value=0, max_value=10**9))
+    def test_round_trip(self, cents):
+        assert to_cents(from_cents(cents)) == cents
+
+
+class TestArithmetic:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("cents, percentage, tax", [(1000, 8.25, 83), (999, 8.25, 82), (200, 12.5, 25), (0, 7.0, 0), (1234, 0, 0)])
+    def test_percentage_rounds_half_up(self, cents, percentage, tax):
+        assert percentage_of(cents, percentage) == tax
+
+    @pytest.mark.unit
+    @given(unit=st.integers(min_value=0, max_value=10**6), quantity=st.integers(min_value=1, max_value=100),
+           new_quantity=st.integers(min_value=0, max_value=100))
+    def test_rescale_is_exact_for_whole_unit_prices(self, unit, quantity, new_quantity):
+        assert rescale(unit * quantity, quantity, new_quantity) == unit * new_quantity
+
+    @pytest.mark.unit
+    def test_rescale_of_empty_line(self):
+        assert rescale(500, 0, 3) == 0
+
+    @pytest.mark.unit
+    def test_order_amounts(self):
+        amounts = OrderAmounts(subtotal=2249, delivery_fee=500, tax=186, tip=200)
+        assert amounts.total == 3135
+        assert amounts.as_dollars() == {
+            "subtotal": 22.49, "delivery_fee": 5.0, "tax_amount": 1.86, "tip_amount": 2.0, "total": 31.35, "total_cents": 3135,
+        }
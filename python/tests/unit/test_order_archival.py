@@ -0,0 +1,172 @@
+"""
+Unit tests for order partition maintenance, batched archival of closed
+orders and starting the maintenance scheduler in one worker only
+
+Partitioning itself needs Postgres; see tests/integration/test_order_partitions.py.
+"""
+
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.services import order_archival_service
+from app.services.order_archival_service import archive_closed_orders, ensure_order_partitions, run_order_maintenance
+
+NOW = datetime(2026, 11, 15, 9, 0)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return NOW
+
+
+@pytest.fixture
+def frozen_now():
+    with mock.patch.object(order_archival_service, "datetime", FrozenDatetime):
+        yield
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestEnsureOrderPartitions:
+
+    @pytest.mark.unit
+    def test_creates_months_ahead_and_archive_years(self, frozen_now):
+        db = mock.MagicMock()
+        names = ensure_order_partitions(months_ahead=2, db=db)
+
+        assert names == [
+            "orders_active_p202611", "orders_active_p202612", "orders_active_p202701",
+            "orders_archive_p2026", "orders_archive_p2027",
+            "order_items_active_p202611", "order_items_active_p202612", "order_items_active_p202701",
+            "order_items_archive_p2026", "order_items_archive_p2027",
+        ]
+        statements = [str(call.args[0]) for call in db.execute.call_args_list]
+        assert statements[2] == (
+            'CREATE TABLE IF NOT EXISTS "orders_active_p202701" PARTITION OF "orders_active" '
+            "FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')"
+        )
+        assert statements[4] == (
+            'CREATE TABLE IF NOT EXISTS "orders_archive_p2027" PARTITION OF "orders_archive" '
+            "FOR VALUES FROM ('2027-01-01') TO ('2028-01-01')"
+        )
+        db.commit.assert_called_once()
+        db.close.assert_not_called()
+
+    @pytest.mark.unit
+    def test_failure_rolls_back(self, frozen_now):
+        db = mock.MagicMock()
+        db.execute.side_effect = RuntimeError("permission denied")
+        with pytest.raises(RuntimeError):
+            ensure_order_partitions(db=db)
+        db.rollback.assert_called_once()
+        db.commit.assert_not_called()
+
+
+class TestArchiveClosedOrders:
+
+    def _archive(self, batches, **kwargs):
+        """archive_closed_orders where each orders UPDATE returns the next batch of ids."""
+        # A real (unbound) session builds the batch subquery; statements are not run
+        db = Session()
+        db.execute, db.commit, db.rollback = mock.Mock(), mock.Mock(), mock.Mock()
+        batches = iter(batches)
+        db.execute.side_effect = lambda statement: (
+            [(order_id,) for order_id in next(batches)] if statement.table.name == "orders" else mock.MagicMock()
+        )
+        return archive_closed_orders(db=db, **kwargs), db
+
+    @pytest.mark.unit
+    def test_archives_in_batches_until_none_left(self, frozen_now):
+        archived, db = self._archive([[1, 2], [3], []], older_than_days=30, batch_size=2)
+
+        assert archived == 3
+        # One commit per batch: orders, then their items
+        assert db.commit.call_count == 2
+        tables = [call.args[0].table.name for call in db.execute.call_args_list]
+        assert tables == ["orders", "order_items", "orders", "order_items", "orders"]
+
+    @pytest.mark.unit
+    def test_selects_old_closed_unarchived_orders(self, frozen_now):
+        _, db = self._archive([[]], older_than_days=30, batch_size=500)
+
+        statement = db.execute.call_args_list[0].args[0]
+        sql = _sql(statement)
+        assert 'orders."isArchived" IS false' in sql
+        assert "orders.status IN" in sql
+        assert "LIMIT" in sql
+        params = statement.compile(dialect=postgresql.dialect()).params
+        assert datetime(2026, 10, 16, 9, 0) in params.values()
+        assert 500 in params.values()
+        db.commit.assert_not_called()
+
+    @pytest.mark.unit
+    def test_items_of_the_batch_are_archived(self, frozen_now):
+        _, db = self._archive([[4, 5], []])
+        items = db.execute.call_args_list[1].args[0]
+        assert 'order_items."orderId" IN' in _sql(items)
+        assert [4, 5] in items.compile(dialect=postgresql.dialect()).params.values()
+
+
+class TestRunOrderMaintenance:
+
+    @pytest.mark.unit
+    def test_archival_runs_when_partitioning_fails(self, caplog):
+        with mock.patch.object(order_archival_service, "ensure_order_partitions", side_effect=RuntimeError("boom")), \
+                mock.patch.object(order_archival_service, "archive_closed_orders", return_value=4):
+            assert run_order_maintenance() == {"partitions": 0, "archived": 4}
+        assert "Order partition maintenance failed: boom" in caplog.text
+
+
+@pytest.fixture
+def worker():
+    """A fresh worker process: no scheduler, no lock, a mocked database connection."""
+    connection = mock.MagicMock()
+    with mock.patch.object(order_archival_service, "_scheduler", None), \
+            mock.patch.object(order_archival_service, "_lock_connection", None), \
+            mock.patch.object(order_archival_service, "engine") as engine, \
+            mock.patch.object(order_archival_service, "BackgroundScheduler") as scheduler:
+        engine.connect.return_value = connection
+        yield connection, scheduler
+
+
+class TestMaintenanceScheduler:
+
+    @pytest.mark.unit
+    def test_lock_holder_starts_scheduler(self, worker):
+        connection, scheduler = worker
+        connection.execute.return_value.scalar.return_value = True
+
+        order_archival_service.setup_order_maintenance_scheduler()
+
+        scheduler.return_value.start.assert_called_once()
+        connection.commit.assert_called_once()
+        connection.close.assert_not_called()
+        assert order_archival_service._lock_connection is connection
+
+    @pytest.mark.unit
+    def test_other_workers_do_not_start_it(self, worker):
+        connection, scheduler = worker
+        connection.execute.return_value.scalar.return_value = False
+
+        order_archival_service.setup_order_maintenance_scheduler()
+
+        scheduler.assert_not_called()
+        connection.close.assert_called_once()
+        assert order_archival_service._lock_connection is None
+
+    @pytest.mark.unit
+    def test_unreachable_database_does_not_start_it(self, worker):
+        connection, scheduler = worker
+        connection.execute.side_effect = RuntimeError("connection refused")
+
+        order_archival_service.setup_order_maintenance_scheduler()
+
+        scheduler.assert_not_called()
+        connection.close.assert_called_once()
@@ -0,0 +1,209 @@
+"""
+Unit tests for the streaming order export: CSV / NDJSON encoding, gzip
+framing, cursor streaming and who may export a store's orders
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_db
+from app.api.routes import exports
+from app.db.models.fees import FeeType
+from app.db.models.order import OrderStatus
+from app.db.models.payment import PaymentStatus, PaymentType
+from app.db.models.user import UserType
+from app.middleware.auth_middleware import CognitoUser, get_current_user
+from app.services import order_export_service
+from app.services.order_export_service import CSV_FIELDS, iter_export_orders, stream_order_export
+
+
+def _item(item_id, name, quantity, amount):
+    return SimpleNamespace(id=item_id, productId=item_id * 10, product=SimpleNamespace(name=name),
+                           quantity=quantity, orderAmount=amount)
+
+
+def _order(order_id, items=(), payment=True):
+    return SimpleNamespace(
+        id=order_id, display_code=f"PL{order_id}D", createdAt=datetime(2026, 10, 1, 9, 30), storeId=7,
+        createdByUserId=3, status=OrderStatus.DELIVERED, type=FeeType.DELIVERY,
+        totalAmount=20.0, deliveryFee=5.0, tipAmount=1.0, taxAmount=1.65, orderTotalAmount=27.65,
+        payment=SimpleNamespace(type=PaymentType.SQUARE, status=PaymentStatus.COMPLETED,
+                                amount=27.65, square_payment_id="sq-1") if payment else None,
+        cancelledAt=None, cancelMessage=None,
+        # Out of id order: the export sorts items by id
+        order_items=list(items),
+    )
+
+
+ORDERS = [
+    _order(1, [_item(2, 'Basmati, "aged"', 1, 12.5), _item(1, "Toor Dal", 2, 7.5)]),
+    _order(2, payment=False),
+]
+
+
+def _export(orders=ORDERS, **kwargs):
+    """Exported chunks of ``orders`` (iter_export_orders is not run)."""
+    with mock.patch.object(order_export_service, "iter_export_orders", return_value=iter(orders)) as read:
+        chunks = list(stream_order_export(**kwargs))
+    return chunks, read
+
+
+class TestEncoding:
+
+    @pytest.mark.unit
+    def test_csv_has_one_row_per_item(self):
+        chunks, _ = _export(export_format="csv")
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+
+        assert list(rows[0]) == CSV_FIELDS
+        assert [(row["order_id"], row["item_id"], row["product_name"]) for row in rows] == [
+            ("1", "1", "Toor Dal"), ("1", "2", 'Basmati, "aged"'), ("2", "", ""),
+        ]
+        assert (rows[0]["status"], rows[0]["order_type"], rows[0]["payment_type"]) == ("DELIVERED", "DELIVERY", "SQUARE")
+        assert (rows[0]["created_at"], rows[0]["order_total"]) == ("2026-10-01T09:30:00", "27.65")
+        assert rows[2]["payment_status"] == ""
+
+    @pytest.mark.unit
+    def test_ndjson_has_one_object_per_order(self):
+        chunks, _ = _export(export_format="ndjson")
+        records = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+
+        assert [record["order_id"] for record in records] == [1, 2]
+        assert records[0]["items"] == [
+            {"item_id": 1, "product_id": 10, "product_name": "Toor Dal", "quantity": 2, "item_amount": 7.5},
+            {"item_id": 2, "product_id": 20, "product_name": 'Basmati, "aged"', "quantity": 1, "item_amount": 12.5},
+        ]
+        assert (records[1]["items"], records[1]["payment_amount"]) == ([], None)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+    def test_output_is_flushed_in_chunks(self, export_format):
+        orders = [_order(order_id, [_item(1, "Rice", 1, 1.0)]) for order_id in range(50)]
+        with mock.patch.object(order_export_service, "CHUNK_SIZE", 1024):
+            chunks, _ = _export(orders, export_format=export_format)
+        assert len(chunks) > 1
+        assert all(chunks)
+        whole, _ = _export(orders, export_format=export_format)
+        assert b"".join(chunks) == b"".join(whole)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+    def test_gzip_stream_decompresses_to_the_plain_export(self, export_format):
+        plain, _ = _export(export_format=export_format)
+        compressed, _ = _export(export_format=export_format, compress=True)
+        assert compressed[0][:2] == b"\x1f\x8b"  # gzip magic
+        assert gzip.decompress(b"".join(compressed)) == b"".join(plain)
+
+    @pytest.mark.unit
+    def test_empty_gzip_export_is_a_valid_file(self):
+        compressed, _ = _export([], export_format="ndjson", compress=True)
+        assert gzip.decompress(b"".join(compressed)) == b""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("kwargs, error", [
+        (dict(export_format="xml"), "Invalid export format"),
+        (dict(statuses=["SHIPPED"]), "Invalid order status"),
+    ])
+    def test_invalid_request_fails_before_streaming(self, kwargs, error):
+        with mock.patch.object(order_export_service, "iter_export_orders") as read:
+            with pytest.raises(ValueError, match=error):
+                stream_order_export(**kwargs)
+        read.assert_not_called()
+
+
+class TestIterExportOrders:
+
+    def _query(self):
+        db = mock.MagicMock()
+        query = db.query.return_value.options.return_value
+        query.filter.return_value = query
+        streamed = query.order_by.return_value.execution_options.return_value
+        streamed.yield_per.return_value = iter(ORDERS)
+        return db, query, streamed
+
+    @pytest.mark.unit
+    def test_streams_through_a_server_side_cursor(self):
+        db, query, streamed = self._query()
+        with mock.patch.object(order_export_service, "SessionLocal", return_value=db):
+            assert list(iter_export_orders(store_id=7, statuses=["DELIVERED"], batch_size=50)) == ORDERS
+
+        query.order_by.return_value.execution_options.assert_called_once_with(stream_results=True)
+        streamed.yield_per.assert_called_once_with(50)
+        assert query.filter.call_count == 2
+        db.close.assert_called_once()
+
+    @pytest.mark.unit
+    def test_session_is_closed_when_the_download_stops(self):
+        db, _, _ = self._query()
+        with mock.patch.object(order_export_service, "SessionLocal", return_value=db):
+            orders = iter_export_orders()
+            next(orders)
+            db.close.assert_not_called()
+            orders.close()
+        db.close.assert_called_once()
+
+
+class TestExportEndpoint:
+
+    @pytest.fixture
+    def user(self):
+        return SimpleNamespace(id=5, email="m@example.com", type=UserType.STORE_MANAGER)
+
+    @pytest.fixture
+    def client(self, user):
+        db = mock.MagicMock()
+        # The caller's user row, then (for managers) the store ownership lookup
+        db.query.return_value.filter.return_value.first.side_effect = lambda: next(db.lookups)
+        app = FastAPI()
+        app.state.limiter = exports.limiter
+        app.include_router(exports.router)
+        app.dependency_overrides[get_current_user] = lambda: CognitoUser(
+            cognito_id="c-5", email=user.email, sub="c-5", token_claims={}
+        )
+        app.dependency_overrides[get_db] = lambda: db
+        with mock.patch.object(exports.limiter, "enabled", False), \
+                mock.patch.object(exports, "stream_order_export", return_value=iter([b"order_id\n"])) as stream:
+            client = TestClient(app)
+            client.db, client.stream = db, stream
+            yield client
+
+    def _get(self, client, lookups, url="/api/exports/orders?store_id=7"):
+        client.db.lookups = iter(lookups)
+        return client.get(url)
+
+    @pytest.mark.unit
+    def test_store_manager_exports_own_store(self, client, user):
+        response = self._get(client, [user, SimpleNamespace(id=7)], "/api/exports/orders?store_id=7&gzip=true")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        assert response.headers["content-disposition"].endswith('.csv.gz"')
+        assert client.stream.call_args.kwargs["compress"] is True
+
+    @pytest.mark.unit
+    def test_other_stores_manager_is_forbidden(self, client, user):
+        response = self._get(client, [user, None])
+        assert response.status_code == 403
+        client.stream.assert_not_called()
+
+    @pytest.mark.unit
+    def test_customer_is_forbidden(self, client, user):
+        user.type = UserType.USER
+        assert self._get(client, [user]).status_code == 403
+
+    @pytest.mark.unit
+    def test_only_admins_export_every_store(self, client, user):
+        assert self._get(client, [user], "/api/exports/orders").status_code == 400
+        user.type = UserType.ADMIN
+        response = self._get(client, [user], "/api/exports/orders?format=ndjson")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert client.stream.call_args.kwargs["store_id"] is None
@@ -0,0 +1,138 @@
+"""
+Unit tests for idempotent order creation: replays, keys reused for a
+different request, and requests racing on the same key
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.services import order_idempotency_service, order_service
+from app.services.order_idempotency_service import (
+    IdempotencyConflictError,
+    find_idempotent_order_id,
+    remember_idempotency_key,
+)
+from app.services.order_service import _commit_order, order_request_hash
+
+ITEMS = [{"product_id": 10, "quantity": 2}, {"product_id": 11, "quantity": 1}]
+
+
+def _hash(**overrides):
+    request = dict(
+        operation="createOrderWithCod",
+        store_id=1,
+        product_items=ITEMS,
+        pickup_or_delivery="pickup",
+        pickup_id=3,
+        tip_amount=2.0,
+    )
+    request.update(overrides)
+    return order_request_hash(**request)
+
+
+def _stored_key(user_id=1, order_id=42, request_hash=None):
+    """Session whose key lookup returns one stored row."""
+    db = mock.MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(
+        userId=user_id, orderId=order_id, requestHash=request_hash
+    )
+    return db
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    order_idempotency_service._cache.clear()
+    yield
+    order_idempotency_service._cache.clear()
+
+
+class TestOrderRequestHash:
+
+    @pytest.mark.unit
+    def test_same_request_same_hash(self):
+        assert _hash() == _hash(product_items=list(reversed(ITEMS)), tip_amount=2)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("change", [
+        {"store_id": 2},
+        {"product_items": [{"product_id": 10, "quantity": 3}]},
+        {"tip_amount": 2.01},
+        {"pickup_id": 4},
+        {"custom_order": "extra spicy"},
+        {"operation": "createOrderWithPayment"},
+    ])
+    def test_different_request_different_hash(self, change):
+        assert _hash(**change) != _hash()
+
+
+class TestReplay:
+
+    @pytest.mark.unit
+    def test_same_request_replays_order(self):
+        db = _stored_key(request_hash=_hash())
+        assert find_idempotent_order_id("key-1", 1, _hash(), db=db) == 42
+        # Served from the cache the second time
+        assert find_idempotent_order_id("key-1", 1, _hash()) == 42
+        db.query.assert_called_once()
+
+    @pytest.mark.unit
+    def test_unused_key_is_not_a_replay(self):
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = None
+        assert find_idempotent_order_id("key-1", 1, _hash(), db=db) is None
+
+    @pytest.mark.unit
+    def test_key_without_stored_hash_replays(self):
+        assert find_idempotent_order_id("key-1", 1, _hash(), db=_stored_key()) == 42
+
+    @pytest.mark.unit
+    def test_different_request_is_rejected(self):
+        remember_idempotency_key("key-1", 1, 42, _hash())
+        with pytest.raises(IdempotencyConflictError):
+            find_idempotent_order_id("key-1", 1, _hash(tip_amount=5.0))
+
+    @pytest.mark.unit
+    def test_other_users_key_is_rejected(self):
+        with pytest.raises(ValueError, match="already been used"):
+            find_idempotent_order_id("key-1", 2, _hash(), db=_stored_key(request_hash=_hash()))
+
+
+class TestInFlight:
+    """Two requests with one key both pass the replay check; the second commit hits the unique key."""
+
+    @pytest.fixture
+    def losing_commit(self):
+        db = mock.MagicMock()
+        db.commit.side_effect = IntegrityError("INSERT", {}, Exception("duplicate key"))
+        return db
+
+    @pytest.mark.unit
+    def test_first_commit_wins(self):
+        db = mock.MagicMock()
+        assert _commit_order(db, "key-1", 1, _hash()) is None
+        db.rollback.assert_not_called()
+
+    @pytest.mark.unit
+    def test_same_request_gets_winning_order(self, losing_commit):
+        remember_idempotency_key("key-1", 1, 42, _hash())
+        winner = SimpleNamespace(id=42)
+        with mock.patch.object(order_service, "get_order_by_id", return_value=winner):
+            assert _commit_order(losing_commit, "key-1", 1, _hash()) is winner
+        losing_commit.rollback.assert_called_once()
+
+    @pytest.mark.unit
+    def test_different_request_is_rejected(self, losing_commit):
+        remember_idempotency_key("key-1", 1, 42, _hash())
+        with pytest.raises(IdempotencyConflictError):
+            _commit_order(losing_commit, "key-1", 1, _hash(store_id=2))
+        losing_commit.rollback.assert_called_once()
+
+    @pytest.mark.unit
+    def test_unrelated_integrity_error_is_raised(self, losing_commit):
+        with mock.patch.object(order_idempotency_service, "SessionLocal") as session:
+            session.return_value.query.return_value.filter.return_value.first.return_value = None
+            with pytest.raises(IntegrityError):
+                _commit_order(losing_commit, "key-1", 1, _hash())
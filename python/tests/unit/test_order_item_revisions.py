@@ -0,0 +1,154 @@
+"""
+Unit tests for order item revisions: edits add a new current revision of a
+line, and reads return only current revisions
+"""
+
+from unittest import mock
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.order import OrderModel, OrderStatus
+from app.db.models.order_item import OrderItemModel
+from app.services import order_service
+from app.services.order_service import get_current_order_items, update_order_items
+
+
+@pytest.fixture
+def Session():
+    """orders, order_items and a minimal products table in SQLite, with one order of two lines."""
+    engine = create_engine("sqlite://")
+    OrderModel.__table__.create(engine)
+    OrderItemModel.__table__.create(engine)
+    with engine.begin() as connection:
+        # products.search_vector is a Postgres tsvector; the ORM only reads these columns
+        connection.execute(text(
+            'CREATE TABLE products (id INTEGER PRIMARY KEY, name VARCHAR, description VARCHAR, '
+            '"categoryId" INTEGER, image VARCHAR, image_variants JSON)'
+        ))
+        connection.execute(text("INSERT INTO products (id, name) VALUES (10, 'Toor Dal'), (20, 'Basmati')"))
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(OrderModel(id=1, createdByUserId=3, storeId=7, status=OrderStatus.PENDING,
+                      totalAmount=35.0, orderTotalAmount=35.0))
+    db.add_all([
+        OrderItemModel(id=1, orderId=1, productId=10, inventoryId=100, quantity=2, orderAmount=15.0),
+        OrderItemModel(id=2, orderId=1, productId=20, inventoryId=200, quantity=1, orderAmount=20.0),
+    ])
+    db.commit()
+    db.close()
+    with mock.patch.object(order_service, "SessionLocal", Session), \
+            mock.patch.object(order_service, "record_amount_change"), \
+            mock.patch.object(order_service, "release_inventory_lines") as release, \
+            mock.patch.object(order_service, "reserve_inventory_lines") as reserve:
+        Session.release, Session.reserve = release, reserve
+        yield Session
+
+
+def _revisions(Session, root_id):
+    """(id, revision, quantity, isCurrent) of every revision of a line, oldest first."""
+    db = Session()
+    try:
+        rows = db.query(OrderItemModel).filter(
+            (OrderItemModel.id == root_id) | (OrderItemModel.rootOrderItemId == root_id)
+        ).order_by(OrderItemModel.revision).all()
+        return [(row.id, row.revision, row.quantity, row.isCurrent) for row in rows]
+    finally:
+        db.close()
+
+
+def _update(updates, total=35.0):
+    return update_order_items(1, updates, total, order_total_amount=total)
+
+
+class TestUpdateOrderItems:
+
+    @pytest.mark.unit
+    def test_edit_adds_the_next_revision(self, Session):
+        _update([{"order_item_id": 1, "quantity_change": 1}], total=42.5)
+
+        assert _revisions(Session, 1) == [(1, 1, 2, False), (3, 2, 3, True)]
+        db = Session()
+        edited = db.get(OrderItemModel, 3)
+        assert (edited.rootOrderItemId, edited.orderAmount, edited.orderAmountCents) == (1, 22.5, 2250)
+        assert db.get(OrderItemModel, 1).updatedOrderitemsId == 3
+        db.close()
+        Session.reserve.assert_called_once()
+        assert Session.reserve.call_args.args[1] == {100: 1}
+
+    @pytest.mark.unit
+    def test_editing_an_old_revision_edits_the_current_one(self, Session):
+        _update([{"order_item_id": 1, "quantity_change": 1}])
+        _update([{"order_item_id": 1, "quantity_change": -2}])
+
+        assert _revisions(Session, 1) == [(1, 1, 2, False), (3, 2, 3, False), (4, 3, 1, True)]
+
+    @pytest.mark.unit
+    def test_several_updates_to_a_line_make_one_revision(self, Session):
+        _update([{"order_item_id": 1, "quantity_change": 3}, {"order_item_id": 1, "quantity_change": -1}])
+
+        assert _revisions(Session, 1) == [(1, 1, 2, False), (3, 2, 4, True)]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("quantity_change", [None, -5])
+    def test_removed_item_has_no_current_revision(self, Session, quantity_change):
+        _update([{"order_item_id": 2, "quantity_change": quantity_change}], total=15.0)
+
+        assert _revisions(Session, 2) == [(2, 1, 1, False), (3, 2, 0, False)]
+        assert Session.release.call_args.args[1] == {200: 1}
+        # The zero-quantity revision stays the head of the chain for clients walking updatedOrderitemsId
+        db = Session()
+        assert db.get(OrderItemModel, 2).updatedOrderitemsId == 3
+        assert db.get(OrderItemModel, 3).updatedOrderitemsId is None
+        db.close()
+
+    @pytest.mark.unit
+    def test_removed_item_cannot_be_edited(self, Session):
+        _update([{"order_item_id": 2, "quantity_change": None}], total=15.0)
+        _update([{"order_item_id": 2, "quantity_change": 1}], total=15.0)
+
+        assert _revisions(Session, 2) == [(2, 1, 1, False), (3, 2, 0, False)]
+
+    @pytest.mark.unit
+    def test_unknown_items_are_skipped(self, Session):
+        _update([{"order_item_id": 99, "quantity_change": 1}])
+
+        assert _revisions(Session, 1) == [(1, 1, 2, True)]
+        assert _revisions(Session, 2) == [(2, 1, 1, True)]
+
+    @pytest.mark.unit
+    def test_closed_order_is_not_edited(self, Session):
+        db = Session()
+        db.get(OrderModel, 1).status = OrderStatus.DELIVERED
+        db.commit()
+        db.close()
+
+        with pytest.raises(ValueError, match="Cannot update items"):
+            _update([{"order_item_id": 1, "quantity_change": 1}])
+        assert _revisions(Session, 1) == [(1, 1, 2, True)]
+
+
+class TestGetCurrentOrderItems:
+
+    @pytest.mark.unit
+    def test_returns_only_current_revisions_in_line_order(self, Session):
+        _update([{"order_item_id": 2, "quantity_change": 1}])
+        _update([{"order_item_id": 1, "quantity_change": 1}])
+
+        items = get_current_order_items(1)
+
+        # Line 1 (edited last) still comes first
+        assert [(item.id, item.quantity, item.product.name) for item in items] == [
+            (4, 3, "Toor Dal"), (3, 2, "Basmati"),
+        ]
+
+    @pytest.mark.unit
+    def test_removed_lines_are_not_returned(self, Session):
+        _update([{"order_item_id": 2, "quantity_change": None}], total=15.0)
+
+        assert [item.id for item in get_current_order_items(1)] == [1]
+
+    @pytest.mark.unit
+    def test_other_orders_lines_are_not_returned(self, Session):
+        assert get_current_order_items(2) == []
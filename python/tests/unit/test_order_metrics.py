@@ -0,0 +1,152 @@
+"""
+Unit tests for the order metrics rollup: deltas for created orders, status
+transitions and amount changes, the atomic upsert they are written with, and
+the backfill
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models.fees import FeeType
+from app.db.models.order import OrderStatus
+from app.services.order_metrics_service import (
+    apply_metric_deltas,
+    backfill_order_metrics,
+    order_created_deltas,
+    record_amount_change,
+    record_status_change,
+    status_change_deltas,
+)
+
+CREATED_AT = datetime(2026, 3, 1, 14, 37, 12)
+BUCKET = datetime(2026, 3, 1, 14)
+
+
+def _order(status=OrderStatus.PENDING, **overrides):
+    values = dict(
+        storeId=7,
+        createdAt=CREATED_AT,
+        status=status,
+        type=FeeType.DELIVERY,
+        totalAmount=20.0,
+        orderTotalAmount=25.5,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _executed(db):
+    """(SQL, parameters) of every statement executed on a mocked session."""
+    statements = []
+    for call in db.execute.call_args_list:
+        compiled = call.args[0].compile(dialect=postgresql.dialect())
+        statements.append((str(compiled), compiled.params))
+    return statements
+
+
+class TestMetricDeltas:
+
+    @pytest.mark.unit
+    def test_created_order_counts_in_its_hour(self):
+        assert order_created_deltas(_order()) == [((7, BUCKET, "PENDING", "DELIVERY"), 1, 20.0, 25.5)]
+
+    @pytest.mark.unit
+    def test_transition_moves_order_between_status_rows(self):
+        order = _order(OrderStatus.ACCEPTED)
+        assert status_change_deltas(order, OrderStatus.PENDING) == [
+            ((7, BUCKET, "PENDING", "DELIVERY"), -1, -20.0, -25.5),
+            ((7, BUCKET, "ACCEPTED", "DELIVERY"), 1, 20.0, 25.5),
+        ]
+
+    @pytest.mark.unit
+    def test_same_status_is_not_a_transition(self):
+        assert status_change_deltas(_order(), OrderStatus.PENDING) == []
+
+    @pytest.mark.unit
+    def test_missing_type_is_unknown(self):
+        (key, *_), = order_created_deltas(_order(type=None))
+        assert key[3] == "UNKNOWN"
+
+
+class TestApplyMetricDeltas:
+
+    @pytest.mark.unit
+    def test_increments_atomically_in_one_upsert(self):
+        db = mock.MagicMock()
+        record_status_change(db, _order(OrderStatus.ACCEPTED), OrderStatus.PENDING)
+
+        (sql, params), = _executed(db)
+        assert "ON CONFLICT ON CONSTRAINT uq_order_metrics_bucket DO UPDATE" in sql
+        assert '"orderCount" = (order_metrics."orderCount" + excluded."orderCount")' in sql
+        assert "SELECT" not in sql
+        assert [params["status_m0"], params["orderCount_m0"]] == ["ACCEPTED", 1]
+        assert [params["status_m1"], params["orderCount_m1"]] == ["PENDING", -1]
+
+    @pytest.mark.unit
+    def test_sums_deltas_for_the_same_row(self):
+        db = mock.MagicMock()
+        key = (7, BUCKET, "PENDING", "DELIVERY")
+        apply_metric_deltas(db, [(key, 1, 10.0, 12.0), (key, 1, 5.0, 6.0)])
+
+        (_, params), = _executed(db)
+        assert (params["orderCount_m0"], params["subtotalAmount_m0"], params["revenueAmount_m0"]) == (2, 15.0, 18.0)
+        assert "orderCount_m1" not in params
+
+    @pytest.mark.unit
+    def test_zero_deltas_write_nothing(self):
+        db = mock.MagicMock()
+        record_amount_change(db, _order(), 20.0, 25.5)
+        db.execute.assert_not_called()
+
+
+class TestLockedWriters:
+
+    @pytest.mark.unit
+    def test_item_update_locks_the_order(self):
+        from app.services import order_service
+
+        db = mock.MagicMock()
+        with mock.patch.object(order_service, "SessionLocal", return_value=db), \
+                mock.patch.object(order_service, "lock_order", return_value=None) as lock_order:
+            assert order_service.update_order_items(1, [], 10.0) is None
+        lock_order.assert_called_once_with(db, 1)
+
+
+class TestBackfill:
+
+    @pytest.mark.unit
+    def test_rebuilds_under_an_exclusive_lock(self):
+        db = mock.MagicMock()
+        backfill_order_metrics(since=CREATED_AT, db=db)
+
+        lock, rebuild = _executed(db)
+        assert lock[0] == "LOCK TABLE order_metrics IN EXCLUSIVE MODE"
+        assert rebuild[0].startswith('INSERT INTO order_metrics ("storeId", "bucketStart", status, "orderType", "orderCount"')
+        assert "GROUP BY" in rebuild[0]
+        assert BUCKET in rebuild[1].values()
+        db.query.return_value.filter.assert_called_once()
+        db.commit.assert_called_once()
+
+    @pytest.mark.unit
+    def test_sums_integer_cents(self):
+        db = mock.MagicMock()
+        backfill_order_metrics(db=db)
+
+        _, (rebuild, _) = _executed(db)
+        assert 'sum(orders."totalAmountCents")' in rebuild
+        assert 'sum(orders."orderTotalAmountCents")' in rebuild
+        assert "round" not in rebuild
+        assert 'orders."totalAmount" ' not in rebuild
+
+    @pytest.mark.unit
+    def test_rolls_back_on_failure(self):
+        db = mock.MagicMock()
+        db.execute.side_effect = [None, RuntimeError("boom")]
+        with pytest.raises(RuntimeError):
+            backfill_order_metrics(db=db)
+        db.rollback.assert_called_once()
+        db.commit.assert_not_called()
@@ -0,0 +1,241 @@
+"""
+Unit tests for the order transition table, single-order transitions and
+bulk status updates
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from app.db.models.order import OrderStatus
+from app.graphql.resolvers.order_resolver import OrderMutation
+from app.services import delivery_service, order_service
+from app.services.order_service import (
+    ORDER_TRANSITIONS,
+    apply_order_transition,
+    bulk_update_order_status,
+    check_order_transition,
+    parse_order_status,
+)
+
+S = OrderStatus
+SCHEDULE = datetime(2026, 10, 20, 15, 0)
+
+
+def _order(order_id=1, status=S.PENDING):
+    return SimpleNamespace(id=order_id, storeId=7, status=status, deliveryInstructions=None)
+
+
+class TestTransitionTable:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("current, target", [
+        (S.PENDING, S.ORDER_PLACED),
+        (S.PENDING, S.ACCEPTED),
+        (S.ACCEPTED, S.READY_FOR_DELIVERY),
+        (S.READY_FOR_DELIVERY, S.SCHEDULED),
+        (S.SCHEDULED, S.PICKED_UP),
+        (S.PICKED_UP, S.DELIVERED),
+        (S.PICKED_UP, S.CANCELLED),
+        (S.ACCEPTED, S.ACCEPTED),
+        # Reassigning the driver
+        (S.READY_FOR_DELIVERY, S.READY_FOR_DELIVERY),
+    ])
+    def test_allowed(self, current, target):
+        assert check_order_transition(current, target) is None
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("current, target", [
+        (S.DELIVERED, S.CANCELLED),
+        (S.CANCELLED, S.ACCEPTED),
+        (S.DELIVERED, S.PICKED_UP),
+        (S.ACCEPTED, S.PENDING),
+        (S.ACCEPTED, S.ORDER_PLACED),
+        (S.PICKED_UP, S.ACCEPTED),
+    ])
+    def test_rejected(self, current, target):
+        assert check_order_transition(current, target) == (
+            f"Cannot change order status from {current.value} to {target.value}"
+        )
+
+    @pytest.mark.unit
+    def test_terminal_statuses(self):
+        for transition in ORDER_TRANSITIONS.values():
+            assert S.DELIVERED not in transition.allowed_from
+            assert S.CANCELLED not in transition.allowed_from
+
+    @pytest.mark.unit
+    def test_every_status_has_a_rule(self):
+        assert set(ORDER_TRANSITIONS) == set(S)
+
+    @pytest.mark.unit
+    def test_unknown_status(self):
+        with pytest.raises(ValueError, match="Invalid order status"):
+            parse_order_status("SHIPPED")
+
+
+class TestApplyOrderTransition:
+
+    @pytest.fixture
+    def side_effects(self):
+        with mock.patch.object(order_service, "record_status_change") as record, \
+                mock.patch.object(order_service, "enqueue_status_change") as enqueue, \
+                mock.patch.object(order_service, "release_inventory_lines") as release, \
+                mock.patch.object(order_service, "current_item_quantities", return_value={3: 2}):
+            yield SimpleNamespace(record=record, enqueue=enqueue, release=release)
+
+    @pytest.mark.unit
+    def test_rejected_transition_writes_nothing(self, side_effects):
+        db = mock.MagicMock()
+        order = _order(status=S.DELIVERED)
+        with pytest.raises(ValueError, match="Cannot change order status"):
+            apply_order_transition(db, order, "CANCELLED")
+        assert order.status == S.DELIVERED
+        db.execute.assert_not_called()
+        side_effects.record.assert_not_called()
+
+    @pytest.mark.unit
+    def test_driver_required(self, side_effects):
+        with pytest.raises(ValueError, match="Driver ID is required"):
+            apply_order_transition(mock.MagicMock(), _order(status=S.ACCEPTED), "READY_FOR_DELIVERY")
+
+    @pytest.mark.unit
+    def test_cancellation_releases_stock_and_records_it(self, side_effects):
+        order = _order(status=S.ACCEPTED)
+        apply_order_transition(mock.MagicMock(), order, "CANCELLED", cancel_message="Out of stock", cancelled_by_user_id=9)
+        assert (order.status, order.cancelMessage, order.cancelledByUserId) == (S.CANCELLED, "Out of stock", 9)
+        side_effects.release.assert_called_once_with(mock.ANY, {3: 2})
+        side_effects.record.assert_called_once_with(mock.ANY, order, S.ACCEPTED)
+        side_effects.enqueue.assert_called_once_with(mock.ANY, order, S.ACCEPTED, notify_customer=False)
+
+    @pytest.mark.unit
+    def test_scheduled_keeps_the_assigned_driver(self, side_effects):
+        db = mock.MagicMock()
+        order = _order(status=S.READY_FOR_DELIVERY)
+        # No driver or schedule time, as the order screens send for SCHEDULED
+        assert apply_order_transition(db, order, "SCHEDULED") is None
+        assert order.status == S.SCHEDULED
+        db.query.assert_not_called()
+        db.add.assert_not_called()
+        # The existing delivery row (and its driver) is left alone
+        db.execute.assert_not_called()
+        side_effects.record.assert_called_once_with(mock.ANY, order, S.READY_FOR_DELIVERY)
+
+    @pytest.mark.unit
+    def test_same_status_is_a_no_op(self, side_effects):
+        db = mock.MagicMock()
+        apply_order_transition(db, _order(status=S.ACCEPTED), "ACCEPTED")
+        side_effects.record.assert_not_called()
+        db.execute.assert_not_called()
+
+
+class TestAssignDelivery:
+
+    def _assign(self, order):
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = None
+        with mock.patch.object(delivery_service, "SessionLocal", return_value=db), \
+                mock.patch.object(delivery_service, "lock_order", return_value=order), \
+                mock.patch.object(order_service, "record_status_change"), \
+                mock.patch.object(order_service, "enqueue_status_change"), \
+                mock.patch.object(order_service, "enqueue_delivery_assigned") as assigned:
+            delivery = delivery_service.assign_delivery(order.id, 4, SCHEDULE)
+        return delivery, db, assigned
+
+    @pytest.mark.unit
+    def test_assigns_driver_and_schedules(self):
+        order = _order(status=S.ACCEPTED)
+        delivery, db, assigned = self._assign(order)
+        assert (order.status, order.deliveryDate, delivery.driverId) == (S.SCHEDULED, SCHEDULE, 4)
+        db.add.assert_called_once_with(delivery)
+        assigned.assert_called_once_with(db, order, 4, SCHEDULE)
+        db.commit.assert_called_once()
+
+    @pytest.mark.unit
+    def test_reassigns_a_scheduled_order(self):
+        order = _order(status=S.SCHEDULED)
+        delivery, _, assigned = self._assign(order)
+        assert (order.status, delivery.driverId) == (S.SCHEDULED, 4)
+        assigned.assert_called_once()
+
+    @pytest.mark.unit
+    def test_closed_order_is_not_assigned(self):
+        with pytest.raises(ValueError, match="Cannot change order status from DELIVERED to SCHEDULED"):
+            self._assign(_order(status=S.DELIVERED))
+
+
+class TestBulkUpdateOrderStatus:
+
+    def _run(self, orders, order_ids, status="ACCEPTED"):
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.with_for_update.return_value.all.return_value = orders
+        with mock.patch.object(order_service, "SessionLocal", return_value=db), \
+                mock.patch.object(order_service, "apply_metric_deltas"), \
+                mock.patch.object(order_service, "enqueue_status_change") as enqueue, \
+                mock.patch.object(order_service, "check_order_transition", wraps=check_order_transition) as check:
+            results = bulk_update_order_status(7, order_ids, status)
+        return results, db, enqueue, check
+
+    @pytest.mark.unit
+    def test_rejected_orders_are_reported_and_left_alone(self):
+        orders = [_order(1, S.PENDING), _order(2, S.DELIVERED), _order(3, S.ACCEPTED)]
+        results, db, enqueue, check = self._run(orders, [1, 2, 3, 4])
+
+        assert [(r["order_id"], r["success"], r["changed"]) for r in results] == [
+            (1, True, True), (2, False, False), (3, True, False), (4, False, False)
+        ]
+        assert results[1]["error"] == "Cannot change order status from DELIVERED to ACCEPTED"
+        assert results[3]["error"] == "Order with ID 4 not found in store 7"
+        enqueue.assert_called_once_with(db, orders[0], S.PENDING, notify_customer=True)
+        db.commit.assert_called_once()
+        # Validated once per order found
+        assert check.call_count == 3
+
+    @pytest.mark.unit
+    def test_nothing_to_change_does_not_write(self):
+        results, db, enqueue, _ = self._run([_order(1, S.DELIVERED)], [1])
+        assert results[0]["success"] is False
+        db.execute.assert_not_called()
+        db.commit.assert_not_called()
+
+    @pytest.mark.unit
+    def test_driver_assignment_is_not_allowed_in_bulk(self):
+        with pytest.raises(ValueError, match="requires a driver"):
+            bulk_update_order_status(7, [1], "READY_FOR_DELIVERY")
+
+    @pytest.mark.unit
+    def test_scheduled_in_bulk_keeps_drivers(self):
+        results, db, _, _ = self._run([_order(1, S.READY_FOR_DELIVERY)], [1], status="SCHEDULED")
+        assert (results[0]["changed"], results[0]["status"]) == (True, "SCHEDULED")
+        # Only the orders UPDATE; no statement unassigns the delivery driver
+        assert db.execute.call_count == 1
+
+
+class TestUpdateOrderStatusResolver:
+
+    def _resolve(self, **kwargs):
+        resolver = next(
+            field for field in OrderMutation.__strawberry_definition__.fields
+            if field.python_name == "updateOrderStatus"
+        ).base_resolver.wrapped_func
+        status_input = SimpleNamespace(orderId=1, status="ACCEPTED", driverId=None, scheduleTime=None, deliveryInstructions=None)
+        with mock.patch("app.graphql.resolvers.order_resolver.transition_order", **kwargs):
+            return resolver(None, status_input)
+
+    @pytest.mark.unit
+    def test_invalid_transition_raises(self):
+        with pytest.raises(Exception, match="Cannot change order status"):
+            self._resolve(side_effect=ValueError("Cannot change order status from DELIVERED to ACCEPTED"))
+
+    @pytest.mark.unit
+    def test_missing_order_raises(self):
+        with pytest.raises(Exception, match="Order with ID 1 not found"):
+            self._resolve(return_value=None)
+
+    @pytest.mark.unit
+    def test_unexpected_error_raises_without_details(self):
+        with pytest.raises(Exception, match="An unexpected error occurred") as error:
+            self._resolve(side_effect=RuntimeError("connection reset"))
+        assert "connection reset" not in str(error.value)
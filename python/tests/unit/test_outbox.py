@@ -0,0 +1,171 @@
+"""
+Unit tests for the order outbox: events recorded by order writes, dispatch
+with retries, and which events email the customer
+"""
+
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models.order import OrderStatus
+from app.services import outbox_service
+from app.services.outbox_service import (
+    ORDER_CANCELLED,
+    ORDER_CREATED,
+    ORDER_STATUS_CHANGED,
+    dispatch_pending_events,
+    enqueue_order_created,
+    enqueue_status_change,
+    send_order_confirmation_email,
+    send_order_status_email,
+)
+
+
+def _order(status=OrderStatus.ACCEPTED):
+    return SimpleNamespace(id=5, storeId=7, status=status)
+
+
+def _event(event_id=1, event_type=ORDER_STATUS_CHANGED, attempts=1):
+    return SimpleNamespace(id=event_id, eventType=event_type, payload={"order_id": 5}, attempts=attempts)
+
+
+def _enqueued(db):
+    return [call.args[0] for call in db.add.call_args_list]
+
+
+class TestEnqueue:
+
+    @pytest.mark.unit
+    def test_order_created(self):
+        db = mock.MagicMock()
+        enqueue_order_created(db, _order(), notify_customer=True)
+        event, = _enqueued(db)
+        assert event.eventType == ORDER_CREATED
+        assert event.payload == {"order_id": 5, "store_id": 7, "notify_customer": True}
+        assert event.status == outbox_service.PENDING
+
+    @pytest.mark.unit
+    def test_status_change(self):
+        db = mock.MagicMock()
+        enqueue_status_change(db, _order(), OrderStatus.PENDING)
+        event, = _enqueued(db)
+        assert event.eventType == ORDER_STATUS_CHANGED
+        assert event.payload["old_status"] == "PENDING"
+        assert event.payload["status"] == "ACCEPTED"
+        assert event.payload["notify_customer"] is False
+
+    @pytest.mark.unit
+    def test_cancellation(self):
+        db = mock.MagicMock()
+        enqueue_status_change(db, _order(OrderStatus.CANCELLED), OrderStatus.ACCEPTED)
+        event, = _enqueued(db)
+        assert event.eventType == ORDER_CANCELLED
+
+    @pytest.mark.unit
+    def test_unchanged_status_records_nothing(self):
+        db = mock.MagicMock()
+        enqueue_status_change(db, _order(), OrderStatus.ACCEPTED)
+        db.add.assert_not_called()
+
+
+class TestDispatch:
+
+    @pytest.fixture
+    def handlers(self):
+        with mock.patch.dict(outbox_service._handlers, clear=True):
+            yield outbox_service._handlers
+
+    @pytest.mark.unit
+    def test_runs_handlers_and_completes_batch(self, handlers):
+        handler = mock.Mock()
+        handlers[ORDER_STATUS_CHANGED] = [handler]
+        events = [_event(1), _event(2)]
+        with mock.patch.object(outbox_service, "_claim_events", side_effect=[events]), \
+                mock.patch.object(outbox_service, "_complete_events") as complete:
+            assert dispatch_pending_events(batch_size=10) == 2
+        assert handler.call_count == 2
+        complete.assert_called_once_with(events, [None, None])
+
+    @pytest.mark.unit
+    def test_failed_handler_is_reported_not_raised(self, handlers):
+        handlers[ORDER_STATUS_CHANGED] = [mock.Mock(side_effect=RuntimeError("SendGrid down"))]
+        events = [_event(1)]
+        with mock.patch.object(outbox_service, "_claim_events", side_effect=[events]), \
+                mock.patch.object(outbox_service, "_complete_events") as complete:
+            dispatch_pending_events(batch_size=10)
+        complete.assert_called_once_with(events, ["SendGrid down"])
+
+    @pytest.mark.unit
+    def test_drains_full_batches_until_empty(self, handlers):
+        with mock.patch.object(outbox_service, "_claim_events", side_effect=[[_event(1)], [_event(2)], []]) as claim, \
+                mock.patch.object(outbox_service, "_complete_events"):
+            assert dispatch_pending_events(batch_size=1) == 2
+        assert claim.call_count == 3
+
+    @pytest.mark.unit
+    def test_retry_delay_backs_off_exponentially(self):
+        delays = [outbox_service._retry_delay(attempts) for attempts in (1, 2, 3)]
+        assert delays == [timedelta(seconds=30), timedelta(seconds=60), timedelta(seconds=120)]
+        assert outbox_service._retry_delay(50) == timedelta(seconds=outbox_service.RETRY_MAX_SECONDS)
+
+
+class TestCompleteEvents:
+
+    def _statuses(self, errors, attempts):
+        db = mock.MagicMock()
+        events = [_event(event_id, attempts=attempts) for event_id in range(1, len(errors) + 1)]
+        with mock.patch.object(outbox_service, "SessionLocal", return_value=db):
+            outbox_service._complete_events(events, errors)
+        db.commit.assert_called_once()
+        return [
+            call.args[0].compile(dialect=postgresql.dialect()).params["status"]
+            for call in db.execute.call_args_list
+        ]
+
+    @pytest.mark.unit
+    def test_sent_and_retried(self):
+        assert self._statuses([None, "boom"], attempts=1) == [outbox_service.SENT, outbox_service.PENDING]
+
+    @pytest.mark.unit
+    def test_gives_up_after_max_attempts(self):
+        assert self._statuses(["boom"], attempts=outbox_service.MAX_ATTEMPTS) == [outbox_service.FAILED]
+
+
+class TestCustomerEmails:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("handler, payload", [
+        (send_order_confirmation_email, {"order_id": 5}),
+        (send_order_confirmation_email, {"order_id": 5, "notify_customer": False}),
+        (send_order_status_email, {"order_id": 5, "status": "CANCELLED", "notify_customer": False}),
+        (send_order_status_email, {"order_id": 5, "status": "READY_FOR_DELIVERY", "notify_customer": True}),
+    ])
+    def test_skipped(self, handler, payload):
+        with mock.patch.object(outbox_service, "SessionLocal") as session:
+            handler(payload)
+        session.assert_not_called()
+
+    @pytest.mark.unit
+    def test_status_email_sent_when_requested(self):
+        db = mock.MagicMock()
+        db.query.return_value.join.return_value.filter.return_value.first.return_value = SimpleNamespace(email="c@example.com")
+        with mock.patch.object(outbox_service, "SessionLocal", return_value=db), \
+                mock.patch("app.services.email_service.EmailService") as email_service:
+            email_service.return_value.send_order_status_update.return_value = True
+            send_order_status_email({"order_id": 5, "status": "ACCEPTED", "notify_customer": True})
+        email_service.return_value.send_order_status_update.assert_called_once_with(
+            to_email="c@example.com", order_id="5", status="ACCEPTED"
+        )
+
+    @pytest.mark.unit
+    def test_failed_send_is_retried(self):
+        db = mock.MagicMock()
+        db.query.return_value.join.return_value.filter.return_value.first.return_value = SimpleNamespace(email="c@example.com")
+        with mock.patch.object(outbox_service, "SessionLocal", return_value=db), \
+                mock.patch("app.services.email_service.EmailService") as email_service:
+            email_service.return_value.send_order_status_update.return_value = False
+            with pytest.raises(RuntimeError):
+                send_order_status_email({"order_id": 5, "status": "ACCEPTED", "notify_customer": True})
@@ -0,0 +1,128 @@
+"""
+Unit tests for the product listing endpoint: ETag / Last-Modified
+revalidation, validation ahead of conditional requests, and its page cache
+"""
+
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import product as product_routes
+from app.services import reference_data_cache
+from app.services.reference_data_cache import FEES, PRODUCTS, ReferenceCache, _VersionedLRUCache
+
+LAST_MODIFIED = datetime(2026, 10, 1, 12, 30, 15, 500000)
+PAGE = {"items": [{"id": 1, "name": "Rice"}], "next_cursor": None, "has_more": False}
+
+
+@pytest.fixture
+def versions():
+    current = {PRODUCTS: (3, LAST_MODIFIED)}
+    with mock.patch.object(reference_data_cache, "_cache", _VersionedLRUCache(16)), \
+            mock.patch.object(reference_data_cache, "_read_versions", side_effect=lambda: dict(current)):
+        yield current
+
+
+@pytest.fixture
+def list_page(versions):
+    with mock.patch.object(product_routes, "_page_cache", ReferenceCache(2)), \
+            mock.patch.object(product_routes, "list_products_page", return_value=PAGE) as list_page:
+        yield list_page
+
+
+@pytest.fixture
+def client(list_page):
+    app = FastAPI()
+    app.include_router(product_routes.router)
+    return TestClient(app)
+
+
+def _etag(client, url="/products"):
+    return client.get(url).headers["etag"]
+
+
+class TestConditionalRequests:
+
+    @pytest.mark.unit
+    def test_page_with_validators(self, client):
+        response = client.get("/products")
+        assert response.status_code == 200
+        assert response.json() == PAGE
+        assert response.headers["etag"].startswith('"products-3-')
+        assert response.headers["last-modified"] == "Thu, 01 Oct 2026 12:30:15 GMT"
+        assert response.headers["cache-control"] == "no-cache"
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("template", ["{}", "W/{}", '"stale", {}', "*"])
+    def test_matching_etag_is_not_modified(self, client, list_page, template):
+        etag = _etag(client)
+        list_page.reset_mock()
+        response = client.get("/products", headers={"If-None-Match": template.format(etag)})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        list_page.assert_not_called()
+
+    @pytest.mark.unit
+    def test_etag_depends_on_parameters(self, client):
+        etags = {_etag(client, url) for url in ("/products", "/products?first=10", "/products?fields=id,name")}
+        assert len(etags) == 3
+
+    @pytest.mark.unit
+    def test_product_change_invalidates_etag(self, client, versions):
+        etag = _etag(client)
+        versions[PRODUCTS] = (4, datetime(2026, 10, 2))
+        reference_data_cache._cache.expire_versions()
+        assert client.get("/products", headers={"If-None-Match": etag}).status_code == 200
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("since, expected", [
+        ("Thu, 01 Oct 2026 12:30:15 GMT", 304),
+        ("Fri, 02 Oct 2026 00:00:00 GMT", 304),
+        ("Thu, 01 Oct 2026 12:30:14 GMT", 200),
+        ("not a date", 200),
+    ])
+    def test_if_modified_since(self, client, since, expected):
+        assert client.get("/products", headers={"If-Modified-Since": since}).status_code == expected
+
+    @pytest.mark.unit
+    def test_if_none_match_takes_precedence(self, client):
+        response = client.get("/products", headers={
+            "If-None-Match": '"stale"', "If-Modified-Since": "Fri, 02 Oct 2026 00:00:00 GMT"
+        })
+        assert response.status_code == 200
+
+
+class TestValidation:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("url, error", [
+        ("/products?fields=id,price", "Invalid fields"),
+        ("/products?first=0", "first must be between"),
+        ("/products?first=501", "first must be between"),
+    ])
+    def test_invalid_request_is_rejected_even_if_etag_matches(self, client, list_page, url, error):
+        response = client.get(url, headers={"If-None-Match": "*"})
+        assert response.status_code == 400
+        assert error in response.json()["detail"]
+        list_page.assert_not_called()
+
+
+class TestPageCache:
+
+    @pytest.mark.unit
+    def test_page_is_served_from_cache(self, client, list_page):
+        assert client.get("/products").json() == client.get("/products").json()
+        list_page.assert_called_once()
+
+    @pytest.mark.unit
+    def test_pages_do_not_evict_reference_data(self, client, list_page):
+        reference_data_cache._cache.put(FEES, 7, 1, ["fees"])
+        for first in range(1, 6):
+            client.get(f"/products?first={first}")
+
+        assert reference_data_cache._cache.get(FEES, 7, 1) == (1, ["fees"])
+        # The page cache itself is bounded
+        assert len(product_routes._page_cache._entries) == 2
@@ -0,0 +1,143 @@
+"""
+Unit tests for product search: keyset cursor encoding and the ordering and
+page boundary conditions that keep pages stable when ranks tie
+"""
+
+import base64
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.product_search_service import (
+    MAX_PAGE_SIZE,
+    _prefix_tsquery,
+    decode_cursor,
+    encode_cursor,
+    search_products,
+)
+
+
+def _page(rows, **kwargs):
+    """Run search_products on a mocked session returning ``rows``; returns (result, compiled query)."""
+    db = mock.MagicMock()
+    query = db.query.return_value.join.return_value.options.return_value.filter.return_value
+    query.filter.return_value = query
+    query.order_by.return_value.limit.return_value.all.return_value = rows
+    result = search_products(7, kwargs.pop("query", "toor dal"), db=db, **kwargs)
+
+    order_by = query.order_by.call_args.args
+    compiled = {
+        "order_by": [str(c.compile(dialect=postgresql.dialect())) for c in order_by],
+        "keyset": [
+            c.args[0].compile(dialect=postgresql.dialect()) for c in query.filter.call_args_list
+        ],
+        "limit": query.order_by.return_value.limit.call_args.args[0],
+    }
+    return result, compiled
+
+
+def _row(rank, product_id):
+    return SimpleNamespace(rank=rank, InventoryModel=SimpleNamespace(productId=product_id))
+
+
+class TestCursor:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("rank, product_id", [
+        (0.0, 1),
+        (0.1 + 0.2, 42),  # Not exactly representable in decimal
+        (0.6079271030426025, 2 ** 31 - 1),
+        (1e-300, 5),
+    ])
+    def test_round_trip_is_exact(self, rank, product_id):
+        assert decode_cursor(encode_cursor(rank, product_id)) == (rank, product_id)
+
+    @pytest.mark.unit
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(0.123456789, 99999)
+        assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=")
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("cursor", [
+        "not a cursor!",
+        "",
+        base64.urlsafe_b64encode(b"[1]").decode(),
+        base64.urlsafe_b64encode(b'{"rank": 1}').decode(),
+        base64.urlsafe_b64encode(b'["high", 3]').decode(),
+        base64.urlsafe_b64encode(b"[0.5, null]").decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        "é",
+    ])
+    def test_invalid(self, cursor):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor(cursor)
+
+
+class TestPrefixQuery:
+
+    @pytest.mark.unit
+    def test_terms_become_prefixes(self):
+        assert _prefix_tsquery("Toor D") == "toor:* & d:*"
+
+    @pytest.mark.unit
+    def test_operators_are_dropped(self):
+        assert _prefix_tsquery("rice & !(dal") == "rice:* & dal:*"
+        assert _prefix_tsquery("&|!") is None
+
+
+class TestTiedRanks:
+
+    @pytest.mark.unit
+    def test_product_id_breaks_rank_ties(self):
+        _, compiled = _page([])
+        assert compiled["order_by"][0].endswith("DESC")
+        assert compiled["order_by"][1] == "products.id"
+
+    @pytest.mark.unit
+    def test_next_page_continues_within_a_tied_rank(self):
+        _, compiled = _page([], after=encode_cursor(0.5, 10))
+        keyset = compiled["keyset"][-1]
+        sql = str(keyset)
+        # rank < last OR (rank = last AND id > last id): rows tied with the
+        # last one are neither repeated nor skipped
+        assert " < %(param_" in sql and " = %(param_" in sql
+        assert "products.id > %(id_1)s" in sql
+        assert 0.5 in keyset.params.values() and keyset.params["id_1"] == 10
+
+    @pytest.mark.unit
+    def test_end_cursor_is_the_last_returned_row(self):
+        rows = [_row(0.5, 3), _row(0.5, 8), _row(0.5, 9)]
+        result, compiled = _page(rows, first=2)
+
+        assert compiled["limit"] == 3  # One extra row tells whether there is more
+        assert result["has_more"] is True
+        assert len(result["items"]) == 2
+        assert decode_cursor(result["end_cursor"]) == (0.5, 8)
+
+    @pytest.mark.unit
+    def test_last_page(self):
+        result, _ = _page([_row(0.5, 3)], first=2)
+        assert result["has_more"] is False
+        assert decode_cursor(result["end_cursor"]) == (0.5, 3)
+
+    @pytest.mark.unit
+    def test_empty_page(self):
+        result, _ = _page([])
+        assert result == {"items": [], "end_cursor": None, "has_more": False}
+
+
+class TestValidation:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("kwargs, error", [
+        ({"query": "   "}, "must not be empty"),
+        ({"query": "x" * 101}, "at most"),
+        ({"first": 0}, "between"),
+        ({"first": MAX_PAGE_SIZE + 1}, "between"),
+        ({"after": "garbage"}, "Invalid cursor"),
+    ])
+    def test_invalid(self, kwargs, error):
+        with pytest.raises(ValueError, match=error):
+            search_products(7, kwargs.pop("query", "rice"), db=mock.MagicMock(), **kwargs)
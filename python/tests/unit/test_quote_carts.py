@@ -0,0 +1,76 @@
+"""
+Unit tests for batch cart quotes
+"""
+
+from types import MappingProxyType
+from unittest import mock
+
+import pytest
+
+from app.services import amount_calculation_service
+from app.services.amount_calculation_service import calculate_order_amount, quote_carts
+from app.services.checkout_config_service import CheckoutConfig
+from app.services.fee_schedule import FeeSchedule
+
+CONFIG = CheckoutConfig(
+    store_id=1,
+    tax_percentage=8.25,
+    cod_enabled=False,
+    square_connected=False,
+    square_location_configured=False,
+    pincodes=frozenset(),
+    fee_schedules=MappingProxyType({"DELIVERY": FeeSchedule.compile([(25.0, 5.0), (None, 0.0)])}),
+    location_codes=MappingProxyType({}),
+)
+PRICES = {(1, 10): 3.33, (1, 11): 12.5}
+ITEMS = [{"product_id": 10, "quantity": 3}, {"product_id": 11, "quantity": 1}]
+
+
+@pytest.fixture
+def checkout_config():
+    with mock.patch.object(amount_calculation_service, "get_checkout_config", side_effect=lambda store_id: CONFIG if store_id == 1 else None):
+        yield
+
+
+def _db(rows):
+    """Session whose single query returns ``rows`` (iterated or through .all())."""
+    db = mock.MagicMock()
+    result = db.query.return_value.filter.return_value
+    result.__iter__.return_value = iter(rows)
+    result.all.return_value = rows
+    return db
+
+
+class TestQuoteCarts:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("delivery_type, tip", [("delivery", 2.0), ("pickup", 0.0)])
+    def test_matches_calculate_order_amount(self, checkout_config, delivery_type, tip):
+        batch_db = _db([(store_id, product_id, price) for (store_id, product_id), price in PRICES.items()])
+        quote, = quote_carts([{"store_id": 1, "items": ITEMS, "delivery_type": delivery_type, "tip_amount": tip}], db=batch_db)
+
+        single_db = _db([(product_id, price) for (_, product_id), price in PRICES.items()])
+        expected = calculate_order_amount(1, ITEMS, delivery_type, tip, db=single_db)
+        assert quote.pop("error") is None
+        assert quote == expected
+
+    @pytest.mark.unit
+    def test_unquotable_carts_report_errors(self, checkout_config):
+        db = _db([(1, 10, 3.33)])
+        missing, unknown_store = quote_carts([
+            {"store_id": 1, "items": [{"product_id": 99, "quantity": 1}], "delivery_type": "pickup"},
+            {"store_id": 2, "items": [{"product_id": 10, "quantity": 1}], "delivery_type": "pickup"},
+        ], db=db)
+        assert missing["error"] == "Product ID 99 not found in store 1 inventory"
+        assert unknown_store["error"] == "Store ID 2 not found"
+        assert missing["total"] == unknown_store["total"] == 0.0
+
+    @pytest.mark.unit
+    def test_rejects_non_positive_quantity(self):
+        with pytest.raises(ValueError):
+            quote_carts([{"store_id": 1, "items": [{"product_id": 10, "quantity": 0}], "delivery_type": "pickup"}])
+
+    @pytest.mark.unit
+    def test_rejects_negative_tip(self):
+        with pytest.raises(ValueError, match="Tip amount cannot be negative"):
+            quote_carts([{"store_id": 1, "items": ITEMS, "delivery_type": "pickup", "tip_amount": -0.01}])
@@ -0,0 +1,175 @@
+"""
+Unit tests for the reference data cache: hits, reloads when a version moves,
+invalidation when a write commits, LRU eviction, and cached models
+"""
+
+from unittest import mock
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.db.models.fees import FeesModel, FeeType
+from app.services import reference_data_cache
+from app.services.reference_data_cache import (
+    FEES,
+    STORES,
+    ReferenceCache,
+    _VersionedLRUCache,
+    bump_reference_version,
+    clear_reference_cache,
+    get_cached,
+    get_cached_models,
+)
+
+
+@pytest.fixture
+def versions():
+    """Fresh cache whose version counters come from the returned dict."""
+    current = {FEES: (1, None), STORES: (1, None)}
+    with mock.patch.object(reference_data_cache, "_cache", _VersionedLRUCache(16)), \
+            mock.patch.object(reference_data_cache, "_read_versions", side_effect=lambda: dict(current)) as read:
+        read.current = current
+        yield read
+
+
+class TestGetCached:
+
+    @pytest.mark.unit
+    def test_hit_does_not_reload(self, versions):
+        loader = mock.Mock(return_value=[1, 2])
+        assert get_cached(FEES, 7, loader) == [1, 2]
+        assert get_cached(FEES, 7, loader) == [1, 2]
+        loader.assert_called_once()
+        versions.assert_called_once()
+
+    @pytest.mark.unit
+    def test_callers_get_their_own_list(self, versions):
+        first = get_cached(FEES, 7, lambda: [1])
+        first.append(2)
+        assert get_cached(FEES, 7, lambda: [99]) == [1]
+
+    @pytest.mark.unit
+    def test_keys_are_cached_separately(self, versions):
+        assert get_cached(FEES, 7, lambda: ["store 7"]) == ["store 7"]
+        assert get_cached(FEES, 8, lambda: ["store 8"]) == ["store 8"]
+
+    @pytest.mark.unit
+    def test_version_change_reloads_after_staleness_window(self, versions):
+        get_cached(FEES, 7, lambda: ["old"])
+        versions.current[FEES] = (2, None)
+        # Another worker's change is seen once the counters are re-read
+        assert get_cached(FEES, 7, lambda: ["new"]) == ["old"]
+        reference_data_cache._cache.expire_versions()
+        assert get_cached(FEES, 7, lambda: ["new"]) == ["new"]
+
+    @pytest.mark.unit
+    def test_combined_entities_reload_when_any_moves(self, versions):
+        get_cached((STORES, FEES), 7, lambda: ["old"])
+        versions.current[STORES] = (5, None)
+        reference_data_cache._cache.expire_versions()
+        assert get_cached((STORES, FEES), 7, lambda: ["new"]) == ["new"]
+
+
+class TestInvalidationOnCommit:
+
+    def _session(self):
+        session = Session()
+        session.execute = mock.Mock()
+        return session
+
+    @pytest.mark.unit
+    def test_commit_makes_the_next_read_recheck_versions(self, versions):
+        get_cached(FEES, 7, lambda: ["old"])
+        session = self._session()
+        bump_reference_version(session, FEES)
+        versions.current[FEES] = (2, None)
+
+        # Not yet committed: still served from memory
+        assert get_cached(FEES, 7, lambda: ["new"]) == ["old"]
+        session.commit()
+        assert get_cached(FEES, 7, lambda: ["new"]) == ["new"]
+        session.execute.assert_called_once()
+
+    @pytest.mark.unit
+    def test_rollback_keeps_the_cache(self, versions):
+        get_cached(FEES, 7, lambda: ["old"])
+        session = self._session()
+        bump_reference_version(session, FEES)
+        session.rollback()
+        assert get_cached(FEES, 7, lambda: ["new"]) == ["old"]
+        assert versions.call_count == 1
+
+
+class TestEviction:
+
+    @pytest.mark.unit
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = _VersionedLRUCache(2)
+        cache.put(FEES, 1, 1, "a")
+        cache.put(FEES, 2, 1, "b")
+        cache.get(FEES, 1, 1)
+        cache.put(FEES, 3, 1, "c")
+
+        assert cache.get(FEES, 1, 1) == (1, "a")
+        assert cache.get(FEES, 2, 1) is None
+        assert cache.get(FEES, 3, 1) == (1, "c")
+
+    @pytest.mark.unit
+    def test_separate_cache_keeps_its_own_entries(self, versions):
+        pages = ReferenceCache(1)
+        get_cached(FEES, 7, lambda: ["fees"])
+        get_cached(FEES, "page-1", lambda: ["page 1"], cache=pages)
+        get_cached(FEES, "page-2", lambda: ["page 2"], cache=pages)
+
+        assert get_cached(FEES, 7, lambda: ["reloaded"]) == ["fees"]
+        assert get_cached(FEES, "page-1", lambda: ["reloaded"], cache=pages) == ["reloaded"]
+
+    @pytest.mark.unit
+    def test_clear_empties_every_cache(self, versions):
+        pages = ReferenceCache(4)
+        pages.put(FEES, 1, 1, "a")
+        reference_data_cache._cache.put(FEES, 1, 1, "b")
+        clear_reference_cache()
+        assert pages.get(FEES, 1, 1) is None
+        assert reference_data_cache._cache.get(FEES, 1, 1) is None
+
+    @pytest.mark.unit
+    def test_entry_from_an_old_version_is_a_miss(self):
+        cache = _VersionedLRUCache(2)
+        cache.put(FEES, 1, 1, "a")
+        assert cache.get(FEES, 1, 2) is None
+
+
+class TestGetCachedModels:
+
+    ROW = (3, 7, 4.99, "USD", FeeType.DELIVERY, 25.0)
+
+    @pytest.fixture
+    def session(self, versions):
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value = [self.ROW]
+        with mock.patch.object(reference_data_cache, "SessionLocal", return_value=db):
+            yield db
+
+    @pytest.mark.unit
+    def test_builds_new_instances_from_cached_values(self, session):
+        first = get_cached_models(FEES, 7, FeesModel, FeesModel.store_id == 7)
+        second = get_cached_models(FEES, 7, FeesModel, FeesModel.store_id == 7)
+
+        session.query.assert_called_once()
+        fee, = first
+        assert (fee.id, fee.store_id, fee.fee_rate, fee.type, fee.limit) == (3, 7, 4.99, FeeType.DELIVERY, 25.0)
+        assert second[0] is not fee
+        assert inspect(fee).transient
+
+    @pytest.mark.unit
+    def test_caches_plain_values(self, session):
+        get_cached_models(FEES, 7, FeesModel, FeesModel.store_id == 7)
+        (_, values), = reference_data_cache._cache._entries.values()
+        assert values == [dict(zip(["id", "store_id", "fee_rate", "fee_currency", "type", "limit"], self.ROW))]
+
+    @pytest.mark.unit
+    def test_changing_an_instance_does_not_change_the_cache(self, session):
+        get_cached_models(FEES, 7, FeesModel, FeesModel.store_id == 7)[0].fee_rate = 0
+        assert get_cached_models(FEES, 7, FeesModel, FeesModel.store_id == 7)[0].fee_rate == 4.99
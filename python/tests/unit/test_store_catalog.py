@@ -0,0 +1,151 @@
+"""
+Unit tests for store catalog snapshots: read-only reads, the background
+rebuild, and ETag revalidation on the catalog endpoint
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes.catalog import router
+from app.db.models.store_catalog_snapshot import StoreCatalogSnapshotModel
+from app.services import store_catalog_service
+from app.services.store_catalog_service import _payload_etag, get_store_catalog, rebuild_stale_catalogs
+
+STORE = SimpleNamespace(id=7, section_headers=None)
+PAYLOAD = {"store_id": 7, "section_headers": [], "categories": [{"id": 1, "name": "Grains", "items": [{"name": "Rice"}]}]}
+
+
+def _snapshot(stale=False, version=3, payload=PAYLOAD):
+    return StoreCatalogSnapshotModel(
+        storeId=7, version=version, etag=_payload_etag(payload), payload=payload,
+        itemCount=1, stale=stale, builtAt=datetime(2026, 10, 1)
+    )
+
+
+@pytest.fixture
+def build_payload():
+    with mock.patch.object(store_catalog_service, "build_catalog_payload", return_value=PAYLOAD) as build:
+        yield build
+
+
+def _read(*rows):
+    """get_store_catalog against a session whose lookups return ``rows`` in turn."""
+    db = mock.MagicMock()
+    db.query.return_value.filter.return_value.first.side_effect = rows
+    with mock.patch.object(store_catalog_service, "SessionLocal", return_value=db):
+        return get_store_catalog(7), db
+
+
+class TestGetStoreCatalog:
+
+    @pytest.mark.unit
+    def test_fresh_snapshot_is_served(self, build_payload):
+        snapshot = _snapshot()
+        result, db = _read(snapshot)
+        assert result is snapshot
+        build_payload.assert_not_called()
+
+    @pytest.mark.unit
+    def test_stale_snapshot_is_built_without_writing(self, build_payload):
+        result, db = _read(_snapshot(stale=True, payload={"categories": []}), STORE)
+
+        assert result.payload == PAYLOAD
+        assert result.version == 4
+        db.add.assert_not_called()
+        db.execute.assert_not_called()
+        db.commit.assert_not_called()
+
+    @pytest.mark.unit
+    def test_unchanged_content_keeps_its_version(self, build_payload):
+        result, _ = _read(_snapshot(stale=True), STORE)
+        assert (result.version, result.etag) == (3, _payload_etag(PAYLOAD))
+
+    @pytest.mark.unit
+    def test_missing_snapshot_is_built_without_writing(self, build_payload):
+        result, db = _read(None, STORE)
+        assert (result.version, result.itemCount) == (1, 1)
+        db.commit.assert_not_called()
+
+    @pytest.mark.unit
+    def test_unknown_store(self, build_payload):
+        result, _ = _read(None, None)
+        assert result is None
+
+
+class TestRebuildStaleCatalogs:
+
+    def _db(self, stale):
+        db = mock.MagicMock()
+        locked = db.query.return_value.filter.return_value.order_by.return_value.with_for_update.return_value
+        locked.first.side_effect = stale + [None]
+        db.query.return_value.filter.return_value.first.return_value = STORE
+        return db, locked
+
+    @pytest.mark.unit
+    def test_rebuilds_and_saves_each_stale_snapshot(self, build_payload):
+        snapshots = [_snapshot(stale=True, payload={}), _snapshot(stale=True)]
+        db, locked = self._db(snapshots)
+
+        assert rebuild_stale_catalogs(db=db) == 2
+
+        assert [(s.stale, s.version) for s in snapshots] == [(False, 4), (False, 3)]
+        # Missing snapshots are created first, then one commit per rebuild
+        assert db.commit.call_count == 3
+        locked_query = db.query.return_value.filter.return_value.order_by.return_value.with_for_update
+        locked_query.assert_called_with(skip_locked=True)
+
+    @pytest.mark.unit
+    def test_stops_at_batch_size(self, build_payload):
+        db, locked = self._db([_snapshot(stale=True), _snapshot(stale=True)])
+        assert rebuild_stale_catalogs(batch_size=1, db=db) == 1
+
+    @pytest.mark.unit
+    def test_failure_rolls_back(self, build_payload):
+        db, _ = self._db([_snapshot(stale=True)])
+        build_payload.side_effect = RuntimeError("boom")
+        with pytest.raises(RuntimeError):
+            rebuild_stale_catalogs(db=db)
+        db.rollback.assert_called_once()
+
+
+class TestCatalogEndpoint:
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    @pytest.mark.unit
+    def test_served_with_etag(self, client):
+        with mock.patch("app.api.routes.catalog.get_store_catalog", return_value=_snapshot()):
+            response = client.get("/api/stores/7/catalog")
+        assert response.status_code == 200
+        assert response.headers["etag"] == f'"{_payload_etag(PAYLOAD)}"'
+        assert response.json()["version"] == 3
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("if_none_match", ['"{}"', 'W/"{}"', '"other", "{}"', "*"])
+    def test_matching_etag_is_not_modified(self, client, if_none_match):
+        with mock.patch("app.api.routes.catalog.get_store_catalog", return_value=_snapshot()):
+            response = client.get(
+                "/api/stores/7/catalog", headers={"If-None-Match": if_none_match.format(_payload_etag(PAYLOAD))}
+            )
+        assert response.status_code == 304
+        assert response.content == b""
+
+    @pytest.mark.unit
+    def test_changed_catalog_is_sent(self, client):
+        with mock.patch("app.api.routes.catalog.get_store_catalog", return_value=_snapshot()):
+            response = client.get("/api/stores/7/catalog", headers={"If-None-Match": '"outdated"'})
+        assert response.status_code == 200
+
+    @pytest.mark.unit
+    def test_unknown_store(self, client):
+        with mock.patch("app.api.routes.catalog.get_store_catalog", return_value=None):
+            assert client.get("/api/stores/7/catalog").status_code == 404
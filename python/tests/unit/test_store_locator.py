@@ -0,0 +1,65 @@
+"""
+Unit tests for the distance and bounding-box helpers of store discovery
+"""
+
+import random
+
+import pytest
+
+from app.services.store_locator_service import (
+    bounding_box,
+    haversine_miles,
+    validate_coordinates,
+    validate_location,
+)
+
+
+class TestHaversine:
+
+    @pytest.mark.unit
+    def test_known_distance(self):
+        # Dallas to Austin, about 182 miles
+        assert haversine_miles(32.7767, -96.7970, 30.2672, -97.7431) == pytest.approx(182, abs=2)
+
+    @pytest.mark.unit
+    def test_same_point_and_symmetry(self):
+        assert haversine_miles(33.0, -96.8, 33.0, -96.8) == 0
+        assert haversine_miles(33.0, -96.8, 34.1, -95.2) == pytest.approx(haversine_miles(34.1, -95.2, 33.0, -96.8))
+
+
+class TestBoundingBox:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("latitude", [0.0, 33.0, -45.0, 70.0])
+    def test_contains_every_point_within_radius(self, latitude):
+        rng = random.Random(7)
+        miles = 25.0
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, 10.0, miles)
+        for _ in range(2000):
+            lat = latitude + rng.uniform(-1, 1) * (max_lat - min_lat)
+            lon = 10.0 + rng.uniform(-1, 1) * (max_lon - min_lon)
+            if haversine_miles(latitude, 10.0, lat, lon) <= miles:
+                assert min_lat <= lat <= max_lat
+                assert min_lon <= lon <= max_lon
+
+    @pytest.mark.unit
+    def test_spans_every_longitude_near_pole_and_antimeridian(self):
+        assert bounding_box(89.9, 0.0, 50)[2:] == (-180.0, 180.0)
+        assert bounding_box(10.0, 179.9, 50)[2:] == (-180.0, 180.0)
+
+
+class TestValidation:
+
+    @pytest.mark.unit
+    def test_out_of_range(self):
+        with pytest.raises(ValueError):
+            validate_coordinates(91, 0)
+        with pytest.raises(ValueError):
+            validate_coordinates(0, -181)
+
+    @pytest.mark.unit
+    def test_coordinates_given_together(self):
+        validate_location(None, None)
+        validate_location(33.0, -96.8)
+        with pytest.raises(ValueError):
+            validate_location(33.0, None)
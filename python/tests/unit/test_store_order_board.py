@@ -0,0 +1,195 @@
+"""
+Unit tests for the store order board: filters, ordering and paging, and
+loading only the current item revisions in a fixed number of queries
+"""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.address import AddressModel
+from app.db.models.delivery import DeliveryModel
+from app.db.models.fee_type import FeeType
+from app.db.models.order import OrderModel, OrderStatus
+from app.db.models.order_item import OrderItemModel
+from app.db.models.pickup_address import PickupAddressModel
+from app.db.models.user import UserModel
+from app.graphql.resolvers.order_resolver import OrderQuery, StoreOrderBoardFilter
+from app.services import order_service
+from app.services.order_service import STORE_ORDER_BOARD_MAX_LIMIT, get_store_order_board
+
+S = OrderStatus
+START = datetime(2026, 10, 1, 12, 0)
+
+
+def _orders():
+    """Store 7's orders, one hour apart from START, plus an order of store 8."""
+    rows = [
+        # (id, status, type, display_code, isArchived)
+        (1, S.DELIVERED, FeeType.DELIVERY, "PL1D", True),
+        (2, S.PENDING, FeeType.DELIVERY, "PL2D", False),
+        (3, S.ACCEPTED, FeeType.PICKUP, "PL3P", False),
+        (4, S.PENDING, FeeType.PICKUP, "PL4P", False),
+        (5, S.CANCELLED, FeeType.DELIVERY, "PL5_D", False),
+    ]
+    orders = [
+        OrderModel(id=order_id, createdByUserId=3, storeId=7, status=status, type=order_type,
+                   display_code=display_code, isArchived=archived, totalAmount=10.0, orderTotalAmount=10.0,
+                   createdAt=START + timedelta(hours=order_id))
+        for order_id, status, order_type, display_code, archived in rows
+    ]
+    orders.append(OrderModel(id=6, createdByUserId=3, storeId=8, status=S.PENDING, type=FeeType.DELIVERY,
+                             display_code="PL6D", totalAmount=10.0, orderTotalAmount=10.0, createdAt=START))
+    return orders
+
+
+@pytest.fixture
+def engine():
+    """The board's tables in SQLite (products without its Postgres tsvector column)."""
+    engine = create_engine("sqlite://")
+    for model in (UserModel, AddressModel, PickupAddressModel, DeliveryModel, OrderModel, OrderItemModel):
+        model.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            'CREATE TABLE products (id INTEGER PRIMARY KEY, name VARCHAR, description VARCHAR, '
+            '"categoryId" INTEGER, image VARCHAR, image_variants JSON)'
+        ))
+        connection.execute(text("INSERT INTO products (id, name) VALUES (10, 'Toor Dal')"))
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add_all(_orders())
+    # Order 2's line was edited once: revision 1 is history, revision 2 is current
+    db.add_all([
+        OrderItemModel(id=1, orderId=2, productId=10, inventoryId=1, quantity=1, orderAmount=5.0,
+                       isCurrent=False, updatedOrderitemsId=2),
+        OrderItemModel(id=2, orderId=2, productId=10, inventoryId=1, quantity=2, orderAmount=10.0,
+                       revision=2, rootOrderItemId=1),
+        OrderItemModel(id=3, orderId=3, productId=10, inventoryId=1, quantity=1, orderAmount=5.0),
+    ])
+    db.commit()
+    db.close()
+    with mock.patch.object(order_service, "SessionLocal", Session):
+        yield engine
+
+
+def _ids(**kwargs):
+    return [order.id for order in get_store_order_board(7, **kwargs)["orders"]]
+
+
+class TestGetStoreOrderBoard:
+
+    @pytest.mark.unit
+    def test_newest_first_without_archived_or_other_stores(self, engine):
+        board = get_store_order_board(7)
+        assert [order.id for order in board["orders"]] == [5, 4, 3, 2]
+        assert board["total_count"] == 4
+
+    @pytest.mark.unit
+    def test_include_archived(self, engine):
+        assert _ids(include_archived=True) == [5, 4, 3, 2, 1]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("kwargs, expected", [
+        (dict(statuses=[S.PENDING]), [4, 2]),
+        (dict(statuses=[S.PENDING, S.ACCEPTED]), [4, 3, 2]),
+        (dict(statuses=[S.DELIVERED]), []),
+        (dict(statuses=[S.DELIVERED], include_archived=True), [1]),
+        (dict(order_type="pickup"), [4, 3]),
+        (dict(start_date=START + timedelta(hours=3)), [5, 4, 3]),
+        (dict(end_date=START + timedelta(hours=3)), [2]),
+        (dict(search="pl3"), [3]),
+        # LIKE wildcards in the search are matched literally
+        (dict(search="_"), [5]),
+        (dict(statuses=[S.PENDING], order_type="DELIVERY"), [2]),
+    ])
+    def test_filters(self, engine, kwargs, expected):
+        assert _ids(**kwargs) == expected
+
+    @pytest.mark.unit
+    def test_pages_share_the_total_count(self, engine):
+        first = get_store_order_board(7, limit=3)
+        second = get_store_order_board(7, limit=3, offset=3)
+        assert [order.id for order in first["orders"]] == [5, 4, 3]
+        assert [order.id for order in second["orders"]] == [2]
+        assert first["total_count"] == second["total_count"] == 4
+
+    @pytest.mark.unit
+    def test_ties_on_created_at_are_ordered_by_id(self, engine):
+        with engine.begin() as connection:
+            connection.execute(text('UPDATE orders SET "createdAt" = :at'), {"at": START})
+        assert _ids(limit=2) == [5, 4]
+        assert _ids(limit=2, offset=2) == [3, 2]
+
+    @pytest.mark.unit
+    def test_loads_only_current_item_revisions(self, engine):
+        orders = {order.id: order for order in get_store_order_board(7)["orders"]}
+        assert [(item.id, item.quantity, item.product.name) for item in orders[2].order_items] == [(2, 2, "Toor Dal")]
+        assert [item.id for item in orders[3].order_items] == [3]
+        assert orders[4].order_items == []
+
+    @pytest.mark.unit
+    def test_loads_a_page_in_three_queries(self, engine):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            orders = get_store_order_board(7, include_archived=True)["orders"]
+            for order in orders:
+                order.creator, order.address, order.delivery, [item.product for item in order.order_items]
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        # count, orders with their joined relations, current items with products
+        assert len(statements) == 3
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("kwargs, error", [
+        (dict(limit=0), "limit must be between"),
+        (dict(limit=STORE_ORDER_BOARD_MAX_LIMIT + 1), "limit must be between"),
+        (dict(offset=-1), "offset must not be negative"),
+        (dict(order_type="COURIER"), "Invalid order type"),
+    ])
+    def test_invalid_arguments(self, engine, kwargs, error):
+        with pytest.raises(ValueError, match=error):
+            get_store_order_board(7, **kwargs)
+
+
+class TestGetStoreOrderBoardResolver:
+
+    @pytest.fixture
+    def resolver(self):
+        return next(
+            field for field in OrderQuery.__strawberry_definition__.fields
+            if field.python_name == "getStoreOrderBoard"
+        ).base_resolver.wrapped_func
+
+    @pytest.mark.unit
+    def test_passes_filters_and_reports_more_pages(self, resolver):
+        board_filter = StoreOrderBoardFilter(statuses=[S.PENDING], orderType="PICKUP", search="PL",
+                                             startDate=START, includeArchived=True)
+        with mock.patch("app.graphql.resolvers.order_resolver.get_store_order_board",
+                        return_value={"orders": ["o1", "o2"], "total_count": 5}) as get_board:
+            board = resolver(None, 7, board_filter, limit=2, offset=2)
+
+        get_board.assert_called_once_with(
+            store_id=7, statuses=[S.PENDING], start_date=START, end_date=None, order_type="PICKUP",
+            search="PL", include_archived=True, limit=2, offset=2
+        )
+        assert (board.orders, board.total_count, board.has_more) == (["o1", "o2"], 5, True)
+
+    @pytest.mark.unit
+    def test_last_page_has_no_more(self, resolver):
+        with mock.patch("app.graphql.resolvers.order_resolver.get_store_order_board",
+                        return_value={"orders": ["o5"], "total_count": 5}) as get_board:
+            board = resolver(None, 7, limit=2, offset=4)
+        assert get_board.call_args.kwargs["include_archived"] is False
+        assert board.has_more is False
+
+    @pytest.mark.unit
+    def test_invalid_arguments_become_graphql_errors(self, resolver):
+        with mock.patch("app.graphql.resolvers.order_resolver.get_store_order_board",
+                        side_effect=ValueError("offset must not be negative")):
+            with pytest.raises(Exception, match="offset must not be negative"):
+                resolver(None, 7, offset=-1)
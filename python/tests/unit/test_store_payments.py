@@ -0,0 +1,81 @@
+"""
+Unit tests for store Square payments: the connection state is read from the
+database on every payment and the session is released before Square is called
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from app.services import payment_service
+from app.services.payment_service import PaymentError, create_square_payment_for_store
+
+CONNECTED = SimpleNamespace(is_square_connected=True, square_access_token="token", square_merchant_id="L1")
+
+
+@pytest.fixture
+def square():
+    with mock.patch.object(payment_service, "Square") as square:
+        square.return_value.payments.create.return_value = SimpleNamespace(
+            errors=None, payment=SimpleNamespace(
+                id="p-1", status="COMPLETED", receipt_url=None, amount_money=SimpleNamespace(amount=1000)
+            )
+        )
+        yield square
+
+
+def _pay(store):
+    """create_square_payment_for_store against a session whose store lookup returns ``store``."""
+    db = mock.MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = store
+    with mock.patch("app.db.session.SessionLocal", return_value=db):
+        try:
+            return create_square_payment_for_store(7, "cnon:1", 1000, "key-1"), db
+        except PaymentError as e:
+            return e, db
+
+
+class TestCreateSquarePaymentForStore:
+
+    @pytest.mark.unit
+    def test_connected_store_is_charged(self, square):
+        result, db = _pay(CONNECTED)
+
+        assert (result["payment_id"], result["amount_cents"]) == ("p-1", 1000)
+        square.assert_called_once_with(token="token", environment=mock.ANY)
+        assert square.return_value.payments.create.call_args.kwargs["location_id"] == "L1"
+        db.close.assert_called_once()
+
+    @pytest.mark.unit
+    def test_session_is_closed_before_calling_square(self, square):
+        calls = []
+        square.side_effect = lambda **kwargs: calls.append("square") or mock.DEFAULT
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = CONNECTED
+        db.close.side_effect = lambda: calls.append("close")
+        with mock.patch("app.db.session.SessionLocal", return_value=db):
+            create_square_payment_for_store(7, "cnon:1", 1000, "key-1")
+        assert calls == ["close", "square"]
+
+    @pytest.mark.unit
+    def test_does_not_read_cached_checkout_config(self, square):
+        with mock.patch("app.services.checkout_config_service.get_checkout_config") as get_config:
+            _pay(CONNECTED)
+        get_config.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("store, code", [
+        (None, "STORE_NOT_FOUND"),
+        (SimpleNamespace(is_square_connected=False, square_access_token="token", square_merchant_id="L1"),
+         "SQUARE_NOT_CONNECTED"),
+        (SimpleNamespace(is_square_connected=True, square_access_token=None, square_merchant_id="L1"),
+         "SQUARE_NOT_CONNECTED"),
+        (SimpleNamespace(is_square_connected=True, square_access_token="token", square_merchant_id=None),
+         "LOCATION_ID_MISSING"),
+    ])
+    def test_unusable_store_is_rejected(self, square, store, code):
+        error, db = _pay(store)
+        assert error.code == code
+        square.assert_not_called()
+        db.close.assert_called_once()
@@ -0,0 +1,220 @@
+"""
+Unit tests for store subdomains: host parsing, cached tenant resolution, the
+subdomain middleware (behind CORS) and store-scoped operations that default
+to the subdomain's store
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from app.db.models.user import UserType
+from app.graphql.permissions.store_permissions import IsStoreOwnerOrAdmin
+from app.graphql.resolvers.square_credential_resolver import SquareCredentialQuery
+from app.middleware.subdomain_middleware import SubdomainMiddleware
+from app.services import tenant_service
+from app.services.tenant_service import (
+    TenantContext,
+    _TenantCache,
+    extract_subdomain,
+    is_valid_subdomain,
+    normalize_subdomain,
+    resolve_tenant,
+)
+
+ORIGIN = "http://localhost:3000"
+TENANTS = {
+    "store1": TenantContext(store_id=1, subdomain="store1", is_active=True, disabled=False),
+    "closed": TenantContext(store_id=2, subdomain="closed", is_active=True, disabled=True),
+}
+
+
+class TestSubdomains:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("host, subdomain", [
+        ("store1.indimitra.com", "store1"),
+        ("Store1.Indimitra.com.", "store1"),
+        ("store1.localhost:3000", "store1"),
+        ("indimitra.com", None),
+        ("a.b.indimitra.com", None),
+        ("localhost:8000", None),
+        ("backend:8000", None),
+        ("store1.example.com", None),
+    ])
+    def test_extract(self, host, subdomain):
+        assert extract_subdomain(host) == subdomain
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("subdomain, valid", [
+        ("store1", True), ("my-store", True), ("1store", False), ("-store", False),
+        ("store_1", False), ("a" * 63, True), ("a" * 64, False),
+    ])
+    def test_valid(self, subdomain, valid):
+        assert is_valid_subdomain(subdomain) is valid
+
+    @pytest.mark.unit
+    def test_normalize(self):
+        assert normalize_subdomain("  My-Store ") == "my-store"
+        with pytest.raises(ValueError, match="reserved"):
+            normalize_subdomain("www")
+        with pytest.raises(ValueError, match="must start with a letter"):
+            normalize_subdomain("my store")
+
+
+class TestResolveTenant:
+
+    @pytest.fixture
+    def load(self):
+        version = [1]
+        with mock.patch.object(tenant_service, "_cache", _TenantCache(2)), \
+                mock.patch.object(tenant_service, "get_reference_version", side_effect=lambda _: (version[0], None)), \
+                mock.patch.object(tenant_service, "_load_tenant", side_effect=TENANTS.get) as load:
+            load.version = version
+            yield load
+
+    @pytest.mark.unit
+    def test_cached_after_first_lookup(self, load):
+        assert resolve_tenant("STORE1") == TENANTS["store1"]
+        assert resolve_tenant("store1") == TENANTS["store1"]
+        load.assert_called_once_with("store1")
+
+    @pytest.mark.unit
+    def test_unknown_subdomain_is_cached(self, load):
+        assert resolve_tenant("nope") is None
+        assert resolve_tenant("nope") is None
+        load.assert_called_once()
+
+    @pytest.mark.unit
+    def test_store_change_reloads(self, load):
+        resolve_tenant("store1")
+        load.version[0] = 2
+        resolve_tenant("store1")
+        assert load.call_count == 2
+
+    @pytest.mark.unit
+    def test_entries_expire(self, load):
+        with mock.patch.object(tenant_service.time, "monotonic", return_value=1000.0):
+            resolve_tenant("nope")
+        with mock.patch.object(
+            tenant_service.time, "monotonic", return_value=1000.0 + tenant_service.TENANT_CACHE_NEGATIVE_TTL_SECONDS
+        ):
+            resolve_tenant("nope")
+        assert load.call_count == 2
+
+    @pytest.mark.unit
+    def test_least_recently_used_is_evicted(self, load):
+        for subdomain in ("store1", "closed", "nope"):
+            resolve_tenant(subdomain)
+        resolve_tenant("store1")
+        assert load.call_count == 4
+
+
+@pytest.fixture
+def client():
+    """App with the subdomain and CORS middleware registered in the same order as app.main."""
+    app = FastAPI()
+    app.add_middleware(SubdomainMiddleware)
+    app.add_middleware(CORSMiddleware, allow_origins=[ORIGIN], allow_credentials=True,
+                       allow_methods=["*"], allow_headers=["*"])
+
+    @app.get("/tenant")
+    @app.get("/health")
+    def tenant(request: Request):
+        tenant = request.state.tenant
+        return {"store_id": tenant.store_id if tenant else None}
+
+    with mock.patch("app.middleware.subdomain_middleware.resolve_tenant", side_effect=TENANTS.get):
+        yield TestClient(app)
+
+
+def _get(client, host, path="/tenant", **kwargs):
+    return client.get(path, headers={"Host": host, "Origin": ORIGIN, **kwargs.pop("headers", {})}, **kwargs)
+
+
+class TestSubdomainMiddleware:
+
+    @pytest.mark.unit
+    def test_store_subdomain(self, client):
+        assert _get(client, "store1.indimitra.com").json() == {"store_id": 1}
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("host", ["indimitra.com", "www.indimitra.com", "backend:8000"])
+    def test_no_store(self, client, host):
+        assert _get(client, host).json() == {"store_id": None}
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("host, status", [
+        ("unknown.indimitra.com", 404),
+        ("bad_name.indimitra.com", 404),
+        ("closed.indimitra.com", 503),
+    ])
+    def test_rejections_carry_cors_headers(self, client, host, status):
+        response = _get(client, host)
+        assert response.status_code == status
+        assert response.headers["access-control-allow-origin"] == ORIGIN
+
+    @pytest.mark.unit
+    def test_preflight_is_answered_by_cors(self, client):
+        response = client.options("/tenant", headers={
+            "Host": "unknown.indimitra.com", "Origin": ORIGIN, "Access-Control-Request-Method": "POST"
+        })
+        assert response.status_code == 200
+
+    @pytest.mark.unit
+    def test_excluded_paths(self, client):
+        assert _get(client, "unknown.indimitra.com", path="/health").status_code == 200
+
+    @pytest.mark.unit
+    def test_local_development_override(self, client):
+        assert _get(client, "localhost:8000", params={"subdomain": "store1"}).json() == {"store_id": 1}
+        assert _get(client, "localhost:8000", headers={"X-Subdomain": "Store1"}).json() == {"store_id": 1}
+
+    @pytest.mark.unit
+    def test_app_registers_cors_outside_subdomains(self):
+        from app.main import app
+
+        # user_middleware lists the outermost middleware first
+        order = [middleware.cls for middleware in app.user_middleware]
+        assert order.index(CORSMiddleware) < order.index(SubdomainMiddleware)
+
+
+class TestStoreSquareStatus:
+
+    def _info(self, tenant=None):
+        request = SimpleNamespace(state=SimpleNamespace(user=SimpleNamespace(cognito_id="c-1")))
+        return SimpleNamespace(context={"request": request, "tenant": tenant})
+
+    @pytest.mark.unit
+    def test_permission_defaults_to_the_subdomain_store(self):
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value.first.side_effect = [
+            SimpleNamespace(type=UserType.STORE_MANAGER, id=5, email="m@example.com"), None
+        ]
+        with mock.patch("app.graphql.permissions.store_permissions.SessionLocal", return_value=db):
+            allowed = IsStoreOwnerOrAdmin().has_permission(None, self._info(TENANTS["store1"]), store_id=None)
+        assert allowed is False  # Not this manager's store, but checked against store 1
+        store_filter = db.query.return_value.filter.call_args_list[1].args[0]
+        assert store_filter.right.value == 1
+
+    @pytest.mark.unit
+    def test_permission_needs_a_store(self):
+        assert IsStoreOwnerOrAdmin().has_permission(None, self._info(), store_id=None) is False
+
+    @pytest.mark.unit
+    def test_resolver_defaults_to_the_subdomain_store(self):
+        resolver = next(
+            field for field in SquareCredentialQuery.__strawberry_definition__.fields
+            if field.python_name == "store_square_status"
+        ).base_resolver.wrapped_func
+        db = mock.MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(
+            id=1, name="Store 1", is_square_connected=False, square_merchant_id=None
+        )
+        with mock.patch("app.graphql.resolvers.square_credential_resolver.get_db", return_value=iter([db])):
+            status = resolver(None, self._info(TENANTS["store1"]))
+        assert (status.store_id, status.is_connected) == (1, False)